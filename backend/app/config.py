@@ -18,6 +18,7 @@ class Settings(BaseSettings):
 
     SOLANA_RPC_URL: str = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
     SOLANA_WEBSOCKET_URL: str = os.getenv("SOLANA_WEBSOCKET_URL", "wss://api.mainnet-beta.solana.com/")
+    SOLANA_RPC_URLS: str = os.getenv("SOLANA_RPC_URLS", "")  # Extra comma-separated endpoints for the RPC pool
 
     DEXSCREENER_API_URL: str = os.getenv("DEXSCREENER_API_URL", "https://api.dexscreener.com/latest/dex/tokens/")
     RUGCHECK_API_URL: str = os.getenv("RUGCHECK_API_URL", "https://api.rugcheck.xyz/v1/tokens/") # Confirm actual endpoint
@@ -36,6 +37,41 @@ class Settings(BaseSettings):
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", "6379"))  # Fixed: was "ე6379"
     REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
     
+    # Token ingestion pipeline ("memory" = in-process queue, "redis" = Redis stream shared by all app workers)
+    INGESTION_BACKEND: str = os.getenv("INGESTION_BACKEND", "memory")
+    INGESTION_QUEUE_SIZE: int = int(os.getenv("INGESTION_QUEUE_SIZE", "2000"))
+    ENRICHMENT_WORKERS: int = int(os.getenv("ENRICHMENT_WORKERS", "8"))
+    
+    # Immediate snipe fan-out: max buys in flight, and how long a user's queueing + buy may take
+    SNIPE_MAX_CONCURRENCY: int = int(os.getenv("SNIPE_MAX_CONCURRENCY", "16"))
+    SNIPE_BUY_TIMEOUT: float = float(os.getenv("SNIPE_BUY_TIMEOUT", "45.0"))
+
+    # Decrypted signers held in process memory for armed users: idle lifetime (seconds) and capacity
+    KEYPAIR_VAULT_TTL: float = float(os.getenv("KEYPAIR_VAULT_TTL", "1800"))
+    KEYPAIR_VAULT_MAX_ENTRIES: int = int(os.getenv("KEYPAIR_VAULT_MAX_ENTRIES", "5000"))
+    
+    # Warm orders: sign each armed user's snipe order while the buy is still being decided
+    WARM_ORDERS_ENABLED: bool = os.getenv("WARM_ORDERS_ENABLED", "true").lower() == "true"
+    WARM_ORDER_TTL: float = float(os.getenv("WARM_ORDER_TTL", "20.0"))          # Oldest order /execute is attempted with
+    WARM_ORDER_REFRESH: float = float(os.getenv("WARM_ORDER_REFRESH", "10.0"))  # Rebuild untaken orders this often...
+    WARM_ORDER_HOLD: float = float(os.getenv("WARM_ORDER_HOLD", "20.0"))        # ...for this long after the mint passed the filters
+
+    # Submission race: how many landing paths (Ultra, Jito bundle, RPC broadcast) a signed swap is raced across, and how long to wait for it to confirm
+    SUBMIT_MAX_ROUTES: int = int(os.getenv("SUBMIT_MAX_ROUTES", "3"))
+    SUBMIT_CONFIRM_TIMEOUT: float = float(os.getenv("SUBMIT_CONFIRM_TIMEOUT", "60.0"))
+
+    # Compute unit price bounds (micro-lamports) for fee_oracle's congestion-based priority fees
+    PRIORITY_FEE_MIN: int = int(os.getenv("PRIORITY_FEE_MIN", "1000"))
+    PRIORITY_FEE_MAX: int = int(os.getenv("PRIORITY_FEE_MAX", "2000000"))
+
+    # SOL balance cache (seconds) and accountSubscribe pushes for armed wallets
+    BALANCE_CACHE_TTL: float = float(os.getenv("BALANCE_CACHE_TTL", "3.0"))
+    BALANCE_SUBSCRIPTIONS_ENABLED: bool = os.getenv("BALANCE_SUBSCRIPTIONS_ENABLED", "true").lower() == "true"
+    
+    # Token price cache: in-memory LRU size, and whether to share entries across workers through Redis
+    PRICE_CACHE_MAX_ENTRIES: int = int(os.getenv("PRICE_CACHE_MAX_ENTRIES", "5000"))
+    PRICE_CACHE_REDIS: bool = os.getenv("PRICE_CACHE_REDIS", "true").lower() == "true"
+    
     DEX_AGGREGATOR_API_HOST: str = os.getenv("DEX_AGGREGATOR_API_HOST")
     TAVILY_API_KEY: str = os.getenv("TAVILY_API_KEY")
     
@@ -50,6 +86,8 @@ class Settings(BaseSettings):
     
     GRPC_URL: str = os.getenv("GRPC_URL")
     GRPC_TOKEN: str = os.getenv("GRPC_TOKEN")    
+    GEYSER_LISTENER_ENABLED: bool = os.getenv("GEYSER_LISTENER_ENABLED", "false").lower() == "true"
+    CURVE_PRICES_ENABLED: bool = os.getenv("CURVE_PRICES_ENABLED", "true").lower() == "true"  # Stream pump.fun curve accounts over GRPC_URL for monitor prices
     
     PUMPFUN_PROGRAM: str = os.getenv("PUMPFUN_PROGRAM")
     RAYDIUM_PROGRAM: str = os.getenv("RAYDIUM_PROGRAM")
@@ -66,6 +104,7 @@ class Settings(BaseSettings):
     JITO_MIN_TIP_LAMPORTS: int = os.getenv("JITO_MIN_TIP_LAMPORTS")
     JITO_MAX_TIP_LAMPORTS: int = os.getenv("JITO_MAX_TIP_LAMPORTS")
     JITO_USE_FOR_CRITICAL_TRADES: bool = os.getenv("JITO_USE_FOR_CRITICAL_TRADES")
+    JITO_TIP_TARGET_LANDING: float = float(os.getenv("JITO_TIP_TARGET_LANDING", "0.9"))  # Landing probability tip_auction prices bundle tips for
 
     ONCHAIN_API_KEY: str = os.getenv("ONCHAIN_API_KEY")
     
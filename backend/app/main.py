@@ -23,19 +23,36 @@ from app.routers.creators import openai_router, tokencreate_router, creator_user
 from app.routers.snipers import auth_router, token_router, trade_router, sniper_user_router
 from app.schemas.snipers.bot import LogTradeRequest
 from app.schemas.snipers.subscription import SubscriptionRequest
-from app.utils.jupiter_api import fetch_jupiter_with_retry, get_jupiter_token_data
+from app.utils.jupiter_api import fetch_jupiter_with_retry, get_jupiter_token_metadata, sol_price_ticker
 from app.utils.profitability_engine import engine as profitability_engine
-from app.utils.dexscreener_api import fetch_dexscreener_with_retry, get_dexscreener_data
+from app.utils.dexscreener_api import dexscreener_batcher, fetch_dexscreener_with_retry, get_dexscreener_data
 from app.utils.webacy_api import check_webacy_risk
+from app.utils.price_feed_hub import price_feed_hub
+from app.utils.curve_price_engine import curve_price_engine
+from app.utils.monitor_engine import monitor_engine
+from app.utils.http_clients import http_clients
+from app.utils.token_ingestion import token_ingestion
+from app.utils.index_scheduler import index_scheduler
+from app.utils.pumpfun_grpc_listener import PumpFunEvent, pumpfun_listener
+from app.utils.sniper_roster import ArmedSniper, publish_roster_event, sniper_roster
+from app.utils.snipe_dispatcher import SnipeReport, snipe_dispatcher
+from app.utils.warm_orders import warm_orders
+from app.utils.submission_race import submission_race
+from app.utils.confirmation_service import confirmation_service
+from app.utils.fee_oracle import fee_oracle
+from app.utils.tip_auction import tip_auction
+from app.utils.keypair_vault import keypair_vault
+from app.utils.balance_service import balance_service
+from app.utils.rpc_pool import rpc_pool
 from app import models, database
 from app.config import settings
 import redis.asyncio as redis
-from app.utils.bot_components import ConnectionManager, check_and_restart_stale_monitors, execute_user_buy, periodic_fee_cleanup, websocket_manager
+from app.utils.bot_components import ConnectionManager, check_and_restart_stale_monitors, execute_monitor_action, execute_user_buy, periodic_fee_cleanup, send_monitor_status, warm_initial_buy, websocket_manager
 import logging
 import os
 from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
-from app.utils import redis_client
+from app.utils import fee_manager, redis_client
 from collections import deque
 from typing import Set
 from app.utils.shared import save_bot_state, load_bot_state
@@ -216,29 +233,25 @@ async def start_persistent_bot_for_user(wallet_address: str):
                         await save_bot_state(wallet_address, False)
                         break
                     
-                    # Check balance - FIXED: Define sol_balance here
-                    sol_balance = 0.0
-                    try:
-                        async with AsyncClient(settings.SOLANA_RPC_URL) as client:
-                            balance_response = await client.get_balance(Pubkey.from_string(wallet_address))
-                            sol_balance = balance_response.value / 1_000_000_000
-                            
-                            if sol_balance < 0.1:  # Reduced minimum to 0.1 SOL
-                                logger.info(f"Insufficient balance for {wallet_address}: {sol_balance} SOL")
-                                # Send alert via WebSocket if connected
-                                await websocket_manager.send_personal_message(json.dumps({
-                                    "type": "log",
-                                    "log_type": "warning",
-                                    "message": f"Low balance: {sol_balance:.4f} SOL. Bot paused.",
-                                    "timestamp": datetime.utcnow().isoformat()
-                                }), wallet_address)
-                                await asyncio.sleep(60)  # Check less frequently when low balance
-                                continue
-                    except Exception as e:
-                        logger.error(f"Balance check failed for {wallet_address}: {e}")
+                    # Check balance (cached / batched with every other bot's lookup)
+                    sol_balance = await balance_service.get_balance(wallet_address)
+                    if sol_balance is None:
+                        logger.error(f"Balance check failed for {wallet_address}")
                         await asyncio.sleep(30)
                         continue
                     
+                    if sol_balance < 0.1:  # Reduced minimum to 0.1 SOL
+                        logger.info(f"Insufficient balance for {wallet_address}: {sol_balance} SOL")
+                        # Send alert via WebSocket if connected
+                        await websocket_manager.send_personal_message(json.dumps({
+                            "type": "log",
+                            "log_type": "warning",
+                            "message": f"Low balance: {sol_balance:.4f} SOL. Bot paused.",
+                            "timestamp": datetime.utcnow().isoformat()
+                        }), wallet_address)
+                        await asyncio.sleep(60)  # Check less frequently when low balance
+                        continue
+                    
                     # Process new tokens for this user
                     await process_user_specific_tokens(user, db)  # Use await instead of create_task
                 
@@ -328,14 +341,42 @@ async def lifespan(app: FastAPI):
         async with database.async_engine.begin() as conn:
             await conn.run_sync(models.Base.metadata.create_all)
 
+        # Open pooled HTTP clients before anything starts calling external APIs
+        await http_clients.start()
+        rpc_pool.start()
+        confirmation_service.start()
+        fee_oracle.start()  # Blockhash / priority fee / Jito tip readings for transaction builders
+
+        # Enrichment workers fed by the webhook / listeners
+        await token_ingestion.start(safe_enrich_token)
+
+        # Keep the armed sniper roster in sync (bot start/stop, settings, balances)
+        keypair_vault.start()
+        sniper_roster.start()
+
         # Core detection loops
         asyncio.create_task(safe_metadata_enrichment_loop())
         asyncio.create_task(restore_persistent_bots())
         
         # Start fee cleanup task
         asyncio.create_task(periodic_fee_cleanup())
+        
+        # SOL/USD for everything that converts SOL prices (bonding curves, entry prices, quotes)
+        sol_price_ticker.start()
+        
+        # On-chain bonding curve prices pushed into the price feeds (aggregators for everything else)
+        if settings.CURVE_PRICES_ENABLED and curve_price_engine.start():
+            price_feed_hub.attach_push_source(curve_price_engine)
+        
+        # One monitor engine for every open position; the stale check rehydrates it from open trades
+        monitor_engine.start(execute_monitor_action, send_monitor_status)
         asyncio.create_task(check_and_restart_stale_monitors())
 
+        # Pump.fun create / migrate stream (Yellowstone gRPC)
+        if settings.GEYSER_LISTENER_ENABLED:
+            pumpfun_listener.add_handler(handle_pumpfun_event)
+            pumpfun_listener.start()
+
         # logger.info("🚀 FlashSniper STARTED | Detecting Pump.fun + Raydium tokens in <2s")
         
         
@@ -348,7 +389,38 @@ async def lifespan(app: FastAPI):
             task.cancel()
         await asyncio.gather(*active_bot_tasks.values(), return_exceptions=True)
         
-        # Close Redis connection
+        # Stop the gRPC stream before the workers it feeds
+        await pumpfun_listener.close()
+        pending_snipes = list(snipe_tasks)
+        for task in pending_snipes:
+            task.cancel()
+        await asyncio.gather(*pending_snipes, return_exceptions=True)
+        
+        # Stop enrichment workers (unfinished tokens stay pending in NewTokens)
+        await token_ingestion.close()
+        await sniper_roster.close()
+        await warm_orders.close()
+        await submission_race.close()
+        await tip_auction.close()
+        await confirmation_service.close()
+        await fee_oracle.close()
+        await keypair_vault.close()
+        await balance_service.close()
+        await rpc_pool.close()
+        
+        # Stop position monitors, then the shared price feeds and readiness probes
+        await monitor_engine.close()
+        await curve_price_engine.close()
+        await sol_price_ticker.close()
+        await price_feed_hub.close()
+        await index_scheduler.close()
+        
+        # Release DexScreener lookups still in flight, then close pooled HTTP clients
+        await dexscreener_batcher.close()
+        await http_clients.close()
+        
+        # Write out batched fee decision records, then close Redis connection
+        await fee_manager.close()
         from app.utils.redis_client import close_redis_client
         await close_redis_client()
         
@@ -357,6 +429,7 @@ async def lifespan(app: FastAPI):
 
 app.router.lifespan_context = lifespan
 active_bot_tasks: Dict[str, asyncio.Task] = {}
+snipe_tasks: Set[asyncio.Task] = set()  # Launch snipes in flight, drained on shutdown
 
 class UserActivationManager:
     """Manages WebSocket connections to sniper engine for real-time user activation"""
@@ -397,120 +470,140 @@ class UserActivationManager:
 # Initialize the manager
 user_activation_manager = UserActivationManager() 
         
-async def trigger_immediate_snipe(mint_address: str, db: AsyncSession):
-    """Trigger immediate snipe for only ACTIVE users (connected via WebSocket)"""
+async def _immediate_buy(sniper: ArmedSniper, mint_address: str) -> bool:
+    """One user's immediate buy - its own session, nothing shared with the other snipers. False if it was skipped."""
+    wallet = sniper.wallet_address
+    logger.info(f"🔄 Executing immediate snipe for {wallet[:8]} on {mint_address[:8]}")
+    
+    # Transient token - execute_user_buy fetches the real data for its strategy
+    buy_token = TokenMetadata(
+        mint_address=mint_address,
+        token_symbol="UNKNOWN",
+        token_name="Unknown",
+        last_checked_at=datetime.utcnow(),
+        trading_recommendation="MOONBAG_BUY",  # Force buy
+        profitability_confidence=90,
+        profitability_score=95,
+        price_usd=0.0001,  # Default minimal price
+        liquidity_usd=10000,  # Default liquidity
+        token_decimals=6,
+    )
+    
+    async with AsyncSessionLocal() as buy_db:
+        bought = await execute_user_buy(sniper.user, buy_token, buy_db, websocket_manager)
+    
+    if bought:
+        sniper_roster.debit(wallet, sniper.buy_amount_sol)
+    return bought
+
+
+async def _notify_snipe_report(report: SnipeReport):
+    """Tell users whose immediate snipe didn't go through"""
+    for result in report.results:
+        if result.status == "failed":
+            log_type, message = "error", f"Immediate snipe failed: {(result.error or '')[:100]}"
+        elif result.status == "expired":
+            log_type, message = "warning", f"Immediate snipe skipped - no execution slot within {snipe_dispatcher.buy_timeout:.0f}s"
+        else:
+            continue
+        
+        await websocket_manager.send_personal_message(json.dumps({
+            "type": "log",
+            "log_type": log_type,
+            "message": message,
+            "timestamp": datetime.utcnow().isoformat()
+        }), result.wallet_address)
+
+
+async def trigger_immediate_snipe(mint_address: str):
+    """
+    Trigger immediate snipe for ACTIVE users (connected via WebSocket) whose bot is running.
+    
+    Users come from the in-memory sniper roster (settings, signer and cached
+    balance resolved ahead of time), so nothing here waits on SQL or RPC before
+    the buys start. Buys run concurrently through snipe_dispatcher (bounded,
+    premium first, per-user timeout), with every user's order already
+    being built and signed in the background (warm_orders).
+    """
     try:
-        # Get only ACTIVE users (connected via WebSocket)
         active_wallets = list(websocket_manager.active_connections.keys())
         
         if not active_wallets:
             logger.info(f"No active WebSocket connections for immediate snipe of {mint_address[:8]}")
             return
         
-        logger.info(f"⚡ Found {len(active_wallets)} active WebSocket connections")
+        snipers = sniper_roster.snapshot(active_wallets)
+        if not snipers:
+            logger.info(f"No armed snipers among {len(active_wallets)} active connections for {mint_address[:8]}")
+            return
         
-        # Get user data for active wallets
-        users_result = await db.execute(
-            select(User).where(
-                User.wallet_address.in_(active_wallets),
-                User.encrypted_private_key.isnot(None)
-            )
-        )
-        users = users_result.scalars().all()
+        eligible = []
+        for sniper in snipers:
+            if sniper.has_balance:
+                eligible.append(sniper)
+                continue
+            
+            logger.info(f"❌ Skipping {sniper.wallet_address[:8]} - insufficient balance: {sniper.balance_sol:.4f} SOL")
+            # Notify user without holding up the others
+            asyncio.create_task(websocket_manager.send_personal_message(json.dumps({
+                "type": "log",
+                "log_type": "warning",
+                "message": f"Insufficient balance for immediate snipe: {sniper.balance_sol:.4f} SOL < {sniper.buy_amount_sol} SOL required",
+                "timestamp": datetime.utcnow().isoformat()
+            }), sniper.wallet_address))
         
-        if not users:
-            logger.info(f"No active users with private keys for immediate snipe of {mint_address[:8]}")
+        if not eligible:
             return
         
-        logger.info(f"Triggering immediate snipe for {len(users)} ACTIVE users on {mint_address[:8]}")
-        
-        # Create minimal token data for immediate buy
-        minimal_token = TokenMetadata(
-            mint_address=mint_address,
-            token_symbol="UNKNOWN",
-            token_name="Unknown",
-            last_checked_at=datetime.utcnow(),
-            trading_recommendation="MOONBAG_BUY",  # Force buy
-            profitability_confidence=90,
-            profitability_score=95,
-            price_usd=0.0001,  # Default minimal price
-            liquidity_usd=10000,  # Default liquidity
-            token_decimals=9,  # Default decimals
-        )
+        logger.info(f"⚡ Triggering immediate snipe for {len(eligible)} ACTIVE users on {mint_address[:8]}")
         
-        # Trigger buy for each ACTIVE user
-        for user in users:
-            try:
-                # Check if user's bot is running (persistent or via bot_state)
-                bot_state = await load_bot_state(user.wallet_address)
-                is_bot_running = bot_state and bot_state.get("is_running", False) if bot_state else False
-                
-                if not is_bot_running:
-                    logger.info(f"Skipping {user.wallet_address[:8]} - bot not running")
-                    continue
-                
-                # Check if user has enough SOL balance
-                async with AsyncClient(settings.SOLANA_RPC_URL) as client:
-                    balance_response = await client.get_balance(Pubkey.from_string(user.wallet_address))
-                    sol_balance = balance_response.value / 1_000_000_000
-                    
-                    min_sol = user.buy_amount_sol or 0.1
-                    if sol_balance < min_sol:
-                        logger.info(f"❌ Skipping {user.wallet_address[:8]} - insufficient balance: {sol_balance:.4f} SOL")
-                        
-                        # Notify user
-                        await websocket_manager.send_personal_message(json.dumps({
-                            "type": "log",
-                            "log_type": "warning",
-                            "message": f"Insufficient balance for immediate snipe: {sol_balance:.4f} SOL < {min_sol} SOL required",
-                            "timestamp": datetime.utcnow().isoformat()
-                        }), user.wallet_address)
-                        continue
-                
-                logger.info(f"🔄 Executing immediate snipe for {user.wallet_address[:8]} on {mint_address[:8]}")
-                
-                # Use a separate session for each buy to avoid conflicts
-                async with AsyncSessionLocal() as buy_db:
-                    # Refresh user in new session
-                    buy_user_result = await buy_db.execute(
-                        select(User).where(User.wallet_address == user.wallet_address)
-                    )
-                    buy_user = buy_user_result.scalar_one_or_none()
-                    
-                    if buy_user:
-                        # Create a new TokenMetadata object in the new session
-                        buy_token = TokenMetadata(
-                            mint_address=mint_address,
-                            token_symbol="UNKNOWN",
-                            token_name="Unknown",
-                            last_checked_at=datetime.utcnow(),
-                            trading_recommendation="MOONBAG_BUY",
-                            profitability_confidence=90,
-                            profitability_score=95,
-                            price_usd=0.0001,
-                            liquidity_usd=10000,
-                            token_decimals=6,
-                        )
-                        
-                        # Execute buy
-                        await execute_user_buy(buy_user, buy_token, buy_db, websocket_manager)
-                        
-                        logger.info(f"✅ Immediate snipe executed for {buy_user.wallet_address[:8]}")
-                        
-            except Exception as e:
-                logger.error(f"❌ Failed immediate snipe for {user.wallet_address[:8]}: {e}")
-                
-                # Notify user of failure
-                await websocket_manager.send_personal_message(json.dumps({
-                    "type": "log",
-                    "log_type": "error",
-                    "message": f"Immediate snipe failed: {str(e)[:100]}",
-                    "timestamp": datetime.utcnow().isoformat()
-                }), user.wallet_address)
-                continue
+        # Sign each user's order while execute_user_buy works out the strategy
+        if settings.WARM_ORDERS_ENABLED:
+            for sniper in eligible:
+                warm_initial_buy(sniper.user, mint_address)
+        
+        report = await snipe_dispatcher.dispatch(
+            mint_address, eligible, lambda sniper: _immediate_buy(sniper, mint_address)
+        )
+        await _notify_snipe_report(report)
         
     except Exception as e:
         logger.error(f"❌ Error in trigger_immediate_snipe: {e}")
+
+
+async def _record_new_token(event: PumpFunEvent):
+    """Write the NewTokens recovery-log row, then hand the mint to the enrichment workers"""
+    try:
+        async with AsyncSessionLocal() as db:
+            exists = await db.get(NewTokens, event.mint)
+            if not exists:
+                db.add(NewTokens(
+                    mint_address=event.mint,
+                    bonding_curve=event.bonding_curve,
+                    pool_id=event.pool,
+                    timestamp=datetime.utcnow(),
+                    signature=event.signature,
+                    tx_type="pumpfun_token_create" if event.kind == "create" else "pumpfun_migration",
+                    metadata_status="pending",
+                    next_reprocess_time=datetime.utcnow(),
+                ))
+                await db.commit()
+    except Exception as e:
+        logger.error(f"Failed to record {event.kind} for {event.mint[:8]}: {e}")
+
+    await token_ingestion.submit(event.mint, source=f"geyser_{event.kind}")
+
+
+async def handle_pumpfun_event(event: PumpFunEvent):
+    """
+    Geyser stream handler: new launches go straight to the sniping path, the
+    DB write + enrichment happen alongside instead of in front of it.
+    """
+    if event.kind == "create":
+        task = asyncio.create_task(trigger_immediate_snipe(event.mint))
+        snipe_tasks.add(task)
+        task.add_done_callback(snipe_tasks.discard)
+    await _record_new_token(event)
              
               
 # ===================================================================
@@ -651,14 +744,13 @@ async def handle_signed_transaction(data: dict, wallet_address: str, db: AsyncSe
         signed_tx_base64 = data.get("signed_tx_base64")
         if not signed_tx_base64:
             raise ValueError("Missing signed transaction")
-        async with AsyncClient(settings.SOLANA_RPC_URL) as client:
-            signed_tx = VersionedTransaction.from_bytes(base64.b64decode(signed_tx_base64))
-            tx_hash = await client.send_raw_transaction(signed_tx)
-            logger.info(f"Transaction sent for {wallet_address}: {tx_hash}")
-            await websocket_manager.send_personal_message(
-                json.dumps({"type": "log", "message": f"Transaction sent: {tx_hash}", "status": "info"}),
-                wallet_address
-            )
+        signed_tx = VersionedTransaction.from_bytes(base64.b64decode(signed_tx_base64))
+        tx_hash = await rpc_pool.send_raw_transaction(bytes(signed_tx))
+        logger.info(f"Transaction sent for {wallet_address}: {tx_hash}")
+        await websocket_manager.send_personal_message(
+            json.dumps({"type": "log", "message": f"Transaction sent: {tx_hash}", "status": "info"}),
+            wallet_address
+        )
     except Exception as e:
         logger.error(f"Error handling signed transaction for {wallet_address}: {e}")
         await websocket_manager.send_personal_message(
@@ -759,6 +851,9 @@ async def apply_user_filters(user: User, token_meta: TokenMetadata, db: AsyncSes
 # ===================================================================
 # LOOP 2:- METADATA ENRICHMENT LOOP 
 # ===================================================================
+RECOVERY_SWEEP_INTERVAL = 5  # seconds
+RECOVERY_SWEEP_BATCH = 200
+
 async def safe_metadata_enrichment_loop():
     while True:
         try:
@@ -768,30 +863,37 @@ async def safe_metadata_enrichment_loop():
             await asyncio.sleep(30)
             
 async def metadata_enrichment_loop():
+    """
+    Recovery sweep over NewTokens. New tokens normally reach the enrichment
+    workers straight from the webhook / listeners via token_ingestion; this
+    loop only re-queues rows that are still pending (queue was full, worker
+    crashed, app restarted, retry due).
+    """
     while True:
-        # Process tokens one at a time to avoid conflicts
         async with AsyncSessionLocal() as db:
-            stmt = select(NewTokens).where(
+            stmt = select(NewTokens.mint_address).where(
                 NewTokens.metadata_status == "pending",
                 or_(
                     NewTokens.next_reprocess_time.is_(None),
                     NewTokens.next_reprocess_time <= datetime.utcnow()
                 )
-            ).order_by(NewTokens.timestamp).limit(1)  # Limit to 1 at a time
+            ).order_by(NewTokens.timestamp).limit(RECOVERY_SWEEP_BATCH)
             
             result = await db.execute(stmt)
             pending = result.scalars().all()
 
-            for token in pending:
-                try:
-                    # Process each token in its own transaction
-                    async with AsyncSessionLocal() as inner_db:
-                        await safe_enrich_token(token.mint_address, inner_db)
-                except Exception as e:
-                    logger.error(f"Failed to process {token.mint_address[:8]}: {e}")
-                    continue  # Continue with next token
+        requeued = 0
+        for mint_address in pending:
+            if token_ingestion.is_pending(mint_address):
+                continue
+            if not await token_ingestion.submit(mint_address, source="recovery"):
+                break  # Queue is full - try again next sweep
+            requeued += 1
 
-        await asyncio.sleep(1)  # Shorter sleep, process continuously
+        if requeued:
+            logger.info(f"♻️ Recovery sweep re-queued {requeued} pending tokens")
+
+        await asyncio.sleep(RECOVERY_SWEEP_INTERVAL)
         
         
 async def safe_enrich_token(mint_address: str, db: AsyncSession):
@@ -864,7 +966,7 @@ async def process_token_logic(mint_address: str, db: AsyncSession):
         # 2. Fetch Jupiter data for logo
         try:
             jupiter_data = await asyncio.wait_for(
-                get_jupiter_token_data(mint_address),
+                get_jupiter_token_metadata(mint_address),
                 timeout=5.0
             )
             
@@ -1058,6 +1160,7 @@ async def restore_persistent_bots():
     try:
         # Get all wallet addresses with active bots
         keys = await redis_client.keys("bot_state:*")
+        running_wallets = []
         for key in keys:
             # Handle both string and bytes
             if isinstance(key, bytes):
@@ -1074,13 +1177,18 @@ async def restore_persistent_bots():
                 try:
                     state = json.loads(state_data)
                     if state.get("is_running", False):
-                        wallet_address = key_str.replace("bot_state:", "")
-                        # Wait a bit before starting to avoid overload
-                        await asyncio.sleep(1)
-                        asyncio.create_task(start_persistent_bot_for_user(wallet_address))
-                        logger.info(f"Restored persistent bot for {wallet_address}")
+                        running_wallets.append(key_str.replace("bot_state:", ""))
                 except json.JSONDecodeError as e:
                     logger.error(f"Invalid JSON in bot state: {e}")
+        
+        # Arm the snipe roster first so immediate snipes work while bots restart
+        await sniper_roster.load_running(running_wallets)
+        
+        for wallet_address in running_wallets:
+            # Wait a bit before starting to avoid overload
+            await asyncio.sleep(1)
+            asyncio.create_task(start_persistent_bot_for_user(wallet_address))
+            logger.info(f"Restored persistent bot for {wallet_address}")
     except Exception as e:
         logger.error(f"Error restoring persistent bots: {e}")
 
@@ -1259,17 +1367,19 @@ async def update_user_rpc(
     current_user.custom_rpc_wss = wss_url
     await db.merge(current_user)
     await db.commit()
+    if https_url:
+        # Their reads and sends prefer this endpoint from now on
+        rpc_pool.register_endpoint(https_url)
+    await publish_roster_event(current_user.wallet_address, "refresh")
     return {"status": "Custom RPC settings updated."}
 
 @app.get("/wallet/balance/{wallet_address}")
 async def get_wallet_balance(wallet_address: str):
     try:
-        async with AsyncClient(settings.SOLANA_RPC_URL) as client:
-            pubkey = Pubkey.from_string(wallet_address)
-            balance_response = await client.get_balance(pubkey)
-            lamports = balance_response.value
-            sol_balance = lamports / 1_000_000_000
-            return {"wallet_address": wallet_address, "sol_balance": sol_balance}
+        sol_balance = await balance_service.get_balance(wallet_address)
+        if sol_balance is None:
+            raise ValueError("balance lookup failed")
+        return {"wallet_address": wallet_address, "sol_balance": sol_balance}
     except Exception as e:
         logger.error(f"Error fetching balance for {wallet_address}: {e}")
         raise HTTPException(status_code=500, detail=f"Error fetching balance: {str(e)}")
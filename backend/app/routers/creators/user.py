@@ -20,6 +20,8 @@ from app.schemas.creators.tokencreate import (
 from app.utils import redis_client
 from app.config import settings
 from app.security import encrypt_private_key_backend, get_current_user
+from app.utils.balance_service import balance_service
+from app.utils.keypair_vault import keypair_vault
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey
 from solders.keypair import Keypair
@@ -46,56 +48,18 @@ async def get_sol_balance(wallet_address: str) -> float:
         
         import asyncio
         
-        async with AsyncClient(
-            settings.SOLANA_RPC_URL,
-            timeout=10,  # 10 second timeout
-        ) as client:
-            try:
-                # Add timeout wrapper
-                pubkey = Pubkey.from_string(wallet_address)
-                
-                # Use asyncio.wait_for to add timeout
-                balance_response = await asyncio.wait_for(
-                    client.get_balance(pubkey),
-                    timeout=10.0
-                )
-                
-                if balance_response.value is None:
-                    return 0.0
-                    
-                return balance_response.value / 1_000_000_000
-                
-            except asyncio.TimeoutError:
-                logger.error(f"Timeout getting balance for {wallet_address[:8]}...")
-                return 0.0
-            except Exception as rpc_error:
-                logger.error(f"RPC error for {wallet_address[:8]}: {rpc_error}")
-                return 0.0
-                
+        # Cached / batched through balance_service
+        balance = await asyncio.wait_for(balance_service.get_balance(wallet_address), timeout=10.0)
+        return balance or 0.0
+        
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout getting balance for {wallet_address[:8]}...")
+        return 0.0
     except Exception as e:
         logger.error(f"Failed to get balance for {wallet_address[:8]}: {e}")
         return 0.0
 
 
-async def cache_decrypted_key(wallet_address: str, base58_key: str, ttl: int = 300):
-    """Cache decrypted key in Redis"""
-    await redis_client.setex(
-        f"creator:base58key:{wallet_address}", 
-        ttl, 
-        base58_key
-    )
-
-async def get_cached_decrypted_key(wallet_address: str) -> Optional[str]:
-    """Get cached decrypted key from Redis"""
-    try:
-        cached_key = await redis_client.get(f"creator:base58key:{wallet_address}")
-        if cached_key:
-            return cached_key.decode('utf-8') if isinstance(cached_key, bytes) else str(cached_key)
-        return None
-    except Exception as e:
-        logger.error(f"Error retrieving cached key: {e}")
-        return None
-
 # ============================================
 # USER PROFILE ENDPOINTS
 # ============================================
@@ -488,10 +452,17 @@ async def update_bot_wallet_balances(wallet_address: str):
             result = await session.execute(stmt)
             bot_wallets = result.scalars().all()
             
+            # All bot wallets in getMultipleAccounts batches of 100
+            balances = await balance_service.get_balances(
+                [wallet.public_key for wallet in bot_wallets], max_age=0
+            )
+            
             updated_count = 0
             for wallet in bot_wallets:
                 try:
-                    balance = await get_sol_balance(wallet.public_key)
+                    if wallet.public_key not in balances:
+                        continue
+                    balance = balances[wallet.public_key]
                     
                     # Update if balance changed
                     if wallet.current_balance != balance:
@@ -1271,17 +1242,12 @@ async def get_active_creators(
             bot_result = await db.execute(bot_stmt)
             bot_count = bot_result.scalar() or 0
             
-            # Get cached decrypted key
-            cached_key = await get_cached_decrypted_key(user.wallet_address)
-            if not cached_key:
-                try:
-                    from app.security import decrypt_private_key_backend
-                    decrypted_bytes = decrypt_private_key_backend(user.encrypted_private_key)
-                    cached_key = base58.b58encode(decrypted_bytes).decode('utf-8')
-                    await cache_decrypted_key(user.wallet_address, cached_key)
-                except Exception as e:
-                    logger.error(f"Failed to decrypt key for {user.wallet_address[:8]}: {e}")
-                    continue
+            # Active creators are held decrypted in this process (never cached in Redis)
+            try:
+                cached_key = keypair_vault.base58_for(user, admit=True)
+            except Exception as e:
+                logger.error(f"Failed to decrypt key for {user.wallet_address[:8]}: {e}")
+                continue
             
             active_creators.append({
                 "wallet_address": user.wallet_address,
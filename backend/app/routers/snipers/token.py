@@ -11,6 +11,7 @@ from app.utils.dexscreener_api import get_dexscreener_data
 from app.utils.raydium_apis import get_raydium_pool_info
 from app.utils.solscan_apis import get_solscan_token_meta
 from app.utils.token_safety import check_token_safety
+from app.utils.token_ingestion import token_ingestion
 
 
 # Configure logging
@@ -55,53 +56,57 @@ async def receive_new_token(
                     status_code=400,
                     detail=f"Missing required field: {field}"
                 )
+
+        mint_address = token_data["Mint"]
+        
+        # Check if token already exists
+        from sqlalchemy import select 
+        result = await db.execute(
+            select(NewTokens).where(NewTokens.mint_address == mint_address)
+        )
+        existing = result.scalar_one_or_none()
+        
+        if existing:
+            logger.info(f"Token {mint_address[:8]} already exists, skipping")
+            return {"status": "skipped", "message": "Token alreaedy processed"}
+        
+        # Convert UTC datetime to naive datetime
+        if 'timestamp' in token_data:
+            if isinstance(token_data['timestamp'], str):
+                # Parse and remove timezone
+                dt = datetime.fromisoformat(token_data['timestamp'].replace('Z', ''))
+                token_data['timestamp'] = dt  # Already naive
             
-            mint_address = token_data["Mint"]
-            
-            # Check if token already exists
-            from sqlalchemy import select 
-            result = await db.execute(
-                select(NewTokens).where(NewTokens.mint_address == mint_address)
-            )
-            existing = result.scalar_one_or_none()
-            
-            if existing:
-                logger.info(f"Token {mint_address[:8]} already exists, skipping")
-                return {"status": "skipped", "message": "Token alreaedy processed"}
-            
-            # Convert UTC datetime to naive datetime
-            if 'timestamp' in token_data:
-                if isinstance(token_data['timestamp'], str):
-                    # Parse and remove timezone
-                    dt = datetime.fromisoformat(token_data['timestamp'].replace('Z', ''))
-                    token_data['timestamp'] = dt  # Already naive
-                
-                elif hasattr(token_data['timestamp'], 'tzinfo') and token_data['timestamp'].tzinfo:
-                    # Remove timezone info
-                    token_data['timestamp'] = token_data['timestamp'].replace(tzinfo=None)
-
-            # Create new token entry
-            new_token = NewTokens(
-                mint_address=mint_address,
-                bonding_curve=token_data.get("Bonding_Curve"),
-                timestamp=token_data.get('timestamp') or datetime.utcnow(),
-                signature=token_data["signature"],
-                tx_type="pumpfun_token_create",
-                metadata_status="pending",
-                metadata_retry_count=0,
-                last_metadata_update=None,
-                next_reprocess_time=datetime.utcnow(),
-                dexscreener_processed=False,
-                webacy_processed=False,
-                profitability_processed=False,
-                last_error=None,
-                total_processing_time_ms=None
-            )
-            
-            db.add(new_token)
-            await db.commit()
-            
-            logger.info(f"✅ New token received from on-chain: {token_data['Name']} ({token_data['Symbol']}) - {mint_address[:8]}")
+            elif hasattr(token_data['timestamp'], 'tzinfo') and token_data['timestamp'].tzinfo:
+                # Remove timezone info
+                token_data['timestamp'] = token_data['timestamp'].replace(tzinfo=None)
+
+        # Create new token entry
+        new_token = NewTokens(
+            mint_address=mint_address,
+            bonding_curve=token_data.get("Bonding_Curve"),
+            timestamp=token_data.get('timestamp') or datetime.utcnow(),
+            signature=token_data["signature"],
+            tx_type="pumpfun_token_create",
+            metadata_status="pending",
+            metadata_retry_count=0,
+            last_metadata_update=None,
+            next_reprocess_time=datetime.utcnow(),
+            dexscreener_processed=False,
+            webacy_processed=False,
+            profitability_processed=False,
+            last_error=None,
+            total_processing_time_ms=None
+        )
+        
+        db.add(new_token)
+        await db.commit()
+        
+        logger.info(f"✅ New token received from on-chain: {token_data['Name']} ({token_data['Symbol']}) - {mint_address[:8]}")
+        
+        # Hand straight to the enrichment workers; the row above is the recovery log
+        queued = await token_ingestion.submit(mint_address, source="webhook")
+        return {"status": "queued" if queued else "pending", "mint": mint_address}
             
         
         
@@ -20,10 +20,14 @@ from app.dependencies import get_current_user_by_wallet
 from app.config import settings
 from app.schemas.snipers.bot import UpdateBotSettingsRequest
 from app.schemas.snipers.trade import BulkTradeLog, GetTradeQuoteRequest, GetTradeQuoteResponse, ImmediateSnipeRequest, SendSignedTransactionRequest, SendSignedTransactionResponse
-from app.utils.bot_components import execute_jupiter_swap, monitor_position, websocket_manager
+from app.utils.bot_components import execute_jupiter_swap, websocket_manager
 from app.security import get_current_user
 from app.utils import bot_components
 from app.utils.bot_logger import BotLogger
+from app.utils.sniper_roster import publish_roster_event
+from app.utils.balance_service import balance_service
+from app.utils.rpc_pool import rpc_pool
+from app.utils.fee_oracle import fee_oracle
 from app.utils.profitability_engine import engine as profitability_engine
 from app.utils.dexscreener_api import get_dexscreener_data
 
@@ -60,18 +64,15 @@ async def start_trading_bot(
 ):
     """Start persistent bot that survives browser closures"""
     # Check balance first
-    try:
-        async with AsyncClient(settings.SOLANA_RPC_URL) as client:
-            balance_response = await client.get_balance(Pubkey.from_string(current_user.wallet_address))
-            sol_balance = balance_response.value / 1_000_000_000
-            
-            if sol_balance < 0.3:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Insufficient SOL balance: {sol_balance:.4f}. Minimum 0.3 SOL required."
-                )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to check balance: {str(e)}")
+    sol_balance = await balance_service.get_balance(current_user.wallet_address, max_age=0)
+    if sol_balance is None:
+        raise HTTPException(status_code=500, detail="Failed to check balance")
+    
+    if sol_balance < 0.3:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Insufficient SOL balance: {sol_balance:.4f}. Minimum 0.3 SOL required."
+        )
     
     # Start bot directly using Redis state
     state = {
@@ -80,6 +81,7 @@ async def start_trading_bot(
         "settings": {}
     }
     await redis_client.setex(f"bot_state:{current_user.wallet_address}", 86400, json.dumps(state))
+    await publish_roster_event(current_user.wallet_address, "arm")
     
     return {"status": "success", "message": "Persistent trading bot started."}
     
@@ -92,6 +94,7 @@ async def stop_trading_bot(current_user: User = Depends(get_current_user)):
         "is_running": False,
         "last_heartbeat": datetime.utcnow().isoformat()
     }))
+    await publish_roster_event(current_user.wallet_address, "disarm")
     return {"status": "success", "message": "Trading bot stopped."}
 
 
@@ -121,6 +124,7 @@ async def update_bot_settings(
             setattr(current_user, key, value)
 
     await db.commit()
+    await publish_roster_event(current_user.wallet_address, "refresh")
     BotLogger(current_user.wallet_address).send_log("Settings updated live", "info")
     return {"status": "success", "message": "Settings updated"}
 
@@ -142,7 +146,7 @@ async def get_jupiter_quote(
             output_mint=request.token_out_address,
             amount_lamports=amount_lamports,
             slippage_bps=request.slippage,
-            priority_fee=100_000 if current_user.is_premium else 50_000
+            priority_fee=fee_oracle.priority_fee("high", fallback=100_000) if current_user.is_premium else fee_oracle.priority_fee("medium", fallback=50_000)
         )
 
         return GetTradeQuoteResponse(
@@ -260,19 +264,16 @@ async def broadcast_signed_tx(
 ):
     try:
         from solders.transaction import VersionedTransaction
-        from solana.rpc.async_api import AsyncClient
 
         tx = VersionedTransaction.from_bytes(base64.b64decode(request.signed_tx_base64))
-        async with AsyncClient(settings.SOLANA_RPC_URL) as client:
-            result = await client.send_raw_transaction(tx.serialize())
-            tx_hash = str(result.value)
-
-            BotLogger(current_user.wallet_address).send_log(
-                f"Transaction confirmed: {tx_hash[:8]}...{tx_hash[-6:]}",
-                "success",
-                tx_hash=tx_hash
-            )
-            return SendSignedTransactionResponse(transaction_hash=tx_hash)
+        tx_hash = await rpc_pool.send_raw_transaction(bytes(tx), preferred=current_user.custom_rpc_https)
+
+        BotLogger(current_user.wallet_address).send_log(
+            f"Transaction confirmed: {tx_hash[:8]}...{tx_hash[-6:]}",
+            "success",
+            tx_hash=tx_hash
+        )
+        return SendSignedTransactionResponse(transaction_hash=tx_hash)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Broadcast failed: {str(e)}")
 
@@ -11,6 +11,9 @@ from app.schemas.snipers.trade import TradeLog
 from app.schemas.snipers.user import UserBotSettingsResponse, UserBotSettingsUpdate, UserProfile
 from app.security import decrypt_private_key_backend, get_current_user
 from app.utils.shared import load_bot_state
+from app.utils.sniper_roster import publish_roster_event
+from app.utils.keypair_vault import keypair_vault
+from app.utils.balance_service import balance_service
 from app.config import settings as setting_api
 from pydantic import BaseModel
 import base58
@@ -172,6 +175,7 @@ async def update_user_settings(
         db.add(user_to_update) # Add to session if not already tracked
         await db.commit()
         await db.refresh(user_to_update) # Refresh to load any changes from DB (e.g., updated_at)
+        await publish_roster_event(wallet_address, "refresh")
         logger.info(f"User settings updated successfully for {wallet_address}")
         return user_to_update # Return the updated user object
     except Exception as e:
@@ -194,6 +198,7 @@ async def update_bot_settings(
         setattr(current_user, field, value)
     await db.merge(current_user)
     await db.commit()
+    await publish_roster_event(current_user.wallet_address, "refresh")
     return current_user
 
 @router.post("/decrypt-key-for-sniper")
@@ -251,28 +256,6 @@ async def decrypt_key_for_sniper(
         logger.error(f"Decryption failed for {wallet_address}: {e}")
         raise HTTPException(status_code=500, detail="Decryption failed")
     
-async def get_cached_decrypted_key(wallet_address: str) -> Optional[str]:
-    """Get cached base58 key from Redis"""
-    try:
-        cached_key = await redis_client.get(f"sniper:base58key:{wallet_address}")
-        if cached_key:
-            # Redis returns bytes, convert to string
-            if isinstance(cached_key, bytes):
-                return cached_key.decode('utf-8')
-            return str(cached_key)
-        return None
-    except Exception as e:
-        logger.error(f"Error retrieving cached key: {e}")
-        return None
-
-async def cache_decrypted_key(wallet_address: str, base58_key: str, ttl: int = 300):
-    """Cache base58 key in Redis (5 minutes)"""
-    await redis_client.setex(
-        f"sniper:base58key:{wallet_address}", 
-        ttl, 
-        base58_key
-    )
-    
 # Endpoint for TypeScript to get ACTIVE users with running bots
 @router.get("/active-users")
 async def get_active_users(
@@ -294,6 +277,7 @@ async def get_active_users(
         all_users = result.scalars().all()
         
         active_users = []
+        candidates = []
         
         for user in all_users:            
             # Method 1: Check WebSocket connection (most immediate)
@@ -311,79 +295,59 @@ async def get_active_users(
             is_active = has_ws_connection or has_bot_state or has_active_task
             
             if is_active:
-                # Get user's SOL balance (optional - can be commented for speed)
-                sol_balance = 0
+                candidates.append((user, bot_state, has_ws_connection, has_bot_state, has_active_task))
+        
+        # One batched lookup for every active wallet (failed lookups count as 0)
+        balances = await balance_service.get_balances([c[0].wallet_address for c in candidates])
+        
+        for user, bot_state, has_ws_connection, has_bot_state, has_active_task in candidates:
+            sol_balance = balances.get(user.wallet_address, 0)
+            
+            # Only include users with minimum balance (e.g., 0.1 SOL)
+            if sol_balance >= 0.1:
+                # CRITICAL: Decrypt the private key here and send as base58
                 try:
-                    from solana.rpc.async_api import AsyncClient
-                    from solders.pubkey import Pubkey
-                    from app.config import settings
-                    
-                    async with AsyncClient(settings.SOLANA_RPC_URL) as client:
-                        balance_response = await client.get_balance(Pubkey.from_string(user.wallet_address))
-                        sol_balance = balance_response.value / 1_000_000_000
-                except Exception:
-                    # If balance check fails, still include user but mark balance as 0
-                    sol_balance = 0
-                
-                # Only include users with minimum balance (e.g., 0.1 SOL)
-                if sol_balance >= 0.1:
-                    # CRITICAL: Decrypt the private key here and send as base58
-                    try:
-                        # Instead of decrypting each time, check cache first
-                        cached_key = await get_cached_decrypted_key(user.wallet_address)
-                        if cached_key:
-                            base58_key = cached_key
-                        else:
-                            # The user.encrypted_private_key in DB is Fernet-encrypted
-                            # We need to decrypt it first
-                            decrypted_bytes = decrypt_private_key_backend(user.encrypted_private_key)
-                            # Then convert to base58
-                            encoded = base58.b58encode(decrypted_bytes)
-                            # Some base58 implementations return string, some return bytes
-                            if isinstance(encoded, bytes):
-                                base58_key = encoded.decode('utf-8')
-                            else:
-                                base58_key = encoded
-                            await cache_decrypted_key(user.wallet_address, base58_key)
-                    except Exception as e:
-                        logger.error(f"Failed to process key for {user.wallet_address[:8]}: {e}")
-                        continue # Skip this user
+                    # Active users are held decrypted in this process (never cached in Redis)
+                    base58_key = keypair_vault.base58_for(user, admit=True)
+                except Exception as e:
+                    logger.error(f"Failed to process key for {user.wallet_address[:8]}: {e}")
+                    continue # Skip this user
                         
-                    active_users.append({
-                        "wallet_address": user.wallet_address,
-                        "buy_amount_sol": user.sniper_buy_amount_sol,
-                        "buy_slippage_bps": user.sniper_buy_slippage_bps,
-                        "is_premium": user.is_premium,
-                        "encrypted_private_key": base58_key,  # <-- Now, sending base58
-                        "sol_balance": sol_balance,
+                active_users.append({
+                    "wallet_address": user.wallet_address,
+                    "buy_amount_sol": user.sniper_buy_amount_sol,
+                    "buy_slippage_bps": user.sniper_buy_slippage_bps,
+                    "is_premium": user.is_premium,
+                    "encrypted_private_key": base58_key,  # <-- Now, sending base58
+                    "sol_balance": sol_balance,
                         
-                        # Premium filters
-                        "filter_socials_added": user.filter_socials_added,
-                        "filter_liquidity_burnt": user.filter_liquidity_burnt,
-                        "filter_check_pool_size_min_sol": user.filter_check_pool_size_min_sol,
-                        "filter_top_holders_max_pct": user.filter_top_holders_max_pct,
-                        "filter_safety_check_period_seconds": user.filter_safety_check_period_seconds,
+                    # Premium filters
+                    "filter_socials_added": user.filter_socials_added,
+                    "filter_liquidity_burnt": user.filter_liquidity_burnt,
+                    "filter_check_pool_size_min_sol": user.filter_check_pool_size_min_sol,
+                    "filter_top_holders_max_pct": user.filter_top_holders_max_pct,
+                    "filter_safety_check_period_seconds": user.filter_safety_check_period_seconds,
                         
-                        # Bot settings
-                        "bot_check_interval_seconds": user.sniper_bot_check_interval_seconds,
-                        "partial_sell_pct": user.sniper_partial_sell_pct,
-                        "trailing_sl_pct": user.sniper_trailing_sl_pct,
-                        "rug_liquidity_drop_pct": user.sniper_rug_liquidity_drop_pct,
+                    # Bot settings
+                    "bot_check_interval_seconds": user.sniper_bot_check_interval_seconds,
+                    "partial_sell_pct": user.sniper_partial_sell_pct,
+                    "trailing_sl_pct": user.sniper_trailing_sl_pct,
+                    "rug_liquidity_drop_pct": user.sniper_rug_liquidity_drop_pct,
                         
-                        # Activity status
-                        "has_ws_connection": has_ws_connection,
-                        "has_bot_state": has_bot_state,
-                        "has_active_task": has_active_task,
-                        "last_heartbeat": bot_state.get("last_heartbeat") if bot_state else None,
+                    # Activity status
+                    "has_ws_connection": has_ws_connection,
+                    "has_bot_state": has_bot_state,
+                    "has_active_task": has_active_task,
+                    "last_heartbeat": bot_state.get("last_heartbeat") if bot_state else None,
                         
-                        # Jito tip settings
-                        "jito_tip_account": user.jito_tip_account,
-                        "jito_current_tip_balance": user.jito_current_tip_balance,
-                        "jito_tip_per_tx": user.jito_tip_per_tx or 100_000,
-                        "jito_reserved_tip_amount": user.jito_reserved_tip_amount,
-                        "jito_tip_account_initialized": user.jito_tip_account_initialized,
-                        "needs_jito_funding": not user.jito_tip_account_initialized or (user.jito_current_tip_balance or 0) < (user.jito_reserved_tip_amount or 0.01)
-                    })
+                    # Jito tip settings
+                    "jito_tip_account": user.jito_tip_account,
+                    "jito_current_tip_balance": user.jito_current_tip_balance,
+                    "jito_tip_per_tx": user.jito_tip_per_tx or 100_000,
+                    "jito_reserved_tip_amount": user.jito_reserved_tip_amount,
+                    "jito_tip_account_initialized": user.jito_tip_account_initialized,
+                    "needs_jito_funding": not user.jito_tip_account_initialized or (user.jito_current_tip_balance or 0) < (user.jito_reserved_tip_amount or 0.01)
+                })
         
         print(f"📤 Sending {len(active_users)} active users to sniper engine")
         for user_data in active_users:
@@ -468,16 +432,9 @@ async def check_user_active(
         
         if user:
             # Quick balance check
-            try:
-                from solana.rpc.async_api import AsyncClient
-                from solders.pubkey import Pubkey
-                
-                async with AsyncClient(setting_api.SOLANA_RPC_URL) as client:
-                    balance_response = await client.get_balance(Pubkey.from_string(wallet_address))
-                    sol_balance = balance_response.value / 1_000_000_000
-                    has_sufficient_balance = sol_balance >= (user.sniper_buy_amount_sol or 0.1)
-            except:
-                pass 
+            sol_balance = await balance_service.get_balance(wallet_address)
+            if sol_balance is not None:
+                has_sufficient_balance = sol_balance >= (user.sniper_buy_amount_sol or 0.1)
         
         return {
             "is_active": has_ws or has_state or has_task,
@@ -512,6 +469,11 @@ async def bulk_check_active_users(
         )
         users = {user.wallet_address: user for user in result.scalars().all()}
         
+        # Batched balance lookup for every wallet that has a key
+        balances = await balance_service.get_balances([
+            w for w, u in users.items() if u.encrypted_private_key is not None
+        ])
+        
         for wallet_address in request.wallet_addresses:
             user = users.get(wallet_address)
             
@@ -525,20 +487,10 @@ async def bulk_check_active_users(
             # Check private key
             has_pk = user and user.encrypted_private_key is not None 
             
-            # Quick balance check (optional - can be commented for speed)
+            # Quick balance check
             has_balance = False 
-            if user and has_pk:
-                try:
-                    from solana.rpc.async_api import AsyncClient
-                    from solders.pubkey import Pubkey
-                    
-                    async with AsyncClient(setting_api.SOLANA_RPC_URL) as client:
-                        balance_response = await client.get_balance(Pubkey.from_string(wallet_address))
-                        sol_balance = balance_response.value / 1_000_000_000
-                        has_balance = sol_balance >= (user.sniper_buy_amount_sol or 0.1)
-                
-                except:
-                    has_balance = False 
+            if user and has_pk and wallet_address in balances:
+                has_balance = balances[wallet_address] >= (user.sniper_buy_amount_sol or 0.1)
             
             results[wallet_address] = {
                 "is_active": has_ws or has_state or has_task,
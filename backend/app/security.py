@@ -45,7 +45,7 @@ def encrypt_private_key_backend(private_key_bytes: bytes) -> str:
 
 def decrypt_private_key_backend(encrypted_private_key_data) -> bytes:
     """Decrypts private key - handles both str and bytes input."""
-    logger.info("Decrypting private key with backend master key")
+    logger.debug("Decrypting private key with backend master key")
     
     # Handle both string and bytes input
     if isinstance(encrypted_private_key_data, bytes):
@@ -3,12 +3,12 @@ import boto3
 from botocore.config import Config
 from botocore.exceptions import ClientError
 import uuid
-import aiohttp
 import asyncio
 from io import BytesIO
 from typing import Optional
 import logging
 from app.config import settings
+from app.utils.http_clients import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -74,19 +74,16 @@ class CloudflareR2Service:
     async def download_image(self, url: str) -> Optional[bytes]:
         """Download image from URL asynchronously"""
         try:
-            # Set a timeout for the download
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        content = await response.read()
-                        if len(content) > 10 * 1024 * 1024:  # 10MB limit
-                            logger.error("Image too large (max 10MB)")
-                            return None
-                        return content
-                    else:
-                        logger.error(f"Failed to download image: {response.status}")
-                        return None
+            response = await http_clients.client_for(url).get(url, timeout=30.0)
+            if response.status_code == 200:
+                content = response.content
+                if len(content) > 10 * 1024 * 1024:  # 10MB limit
+                    logger.error("Image too large (max 10MB)")
+                    return None
+                return content
+            else:
+                logger.error(f"Failed to download image: {response.status_code}")
+                return None
         except Exception as e:
             logger.error(f"Image download failed: {e}")
             return None
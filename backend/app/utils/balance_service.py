@@ -0,0 +1,303 @@
+# app/utils/balance_service.py
+import asyncio
+import itertools
+import logging
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from solana.rpc.commitment import Confirmed
+from solana.rpc.types import DataSliceOpts
+from solana.rpc.websocket_api import connect
+from solders.account_decoder import UiAccountEncoding, UiDataSliceConfig
+from solders.commitment_config import CommitmentLevel
+from solders.pubkey import Pubkey
+from solders.rpc.config import RpcAccountInfoConfig
+from solders.rpc.requests import AccountSubscribe
+from solders.rpc.responses import SubscriptionResult
+
+from app.config import settings
+from app.utils.rpc_pool import rpc_pool
+
+logger = logging.getLogger(__name__)
+
+MAX_ACCOUNTS_PER_CALL = 100  # getMultipleAccounts hard limit
+LAMPORTS_PER_SOL = 1_000_000_000
+
+BalanceListener = Callable[[str, float], None]
+
+
+class BalanceService:
+    """
+    SOL balances for many wallets with as few RPC calls as possible.
+
+    - Lookups are served from a short-TTL cache; misses that arrive within
+      `window` seconds are coalesced and fetched with getMultipleAccounts
+      (up to 100 wallets per call, no account data) through rpc_pool.
+    - Watched wallets (armed snipers) are also subscribed over the RPC
+      websocket with accountSubscribe; every push updates the cache and
+      notifies listeners, so their balance stays fresh without polling.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.BALANCE_CACHE_TTL,
+        window: float = 0.005,
+        ws_url: Optional[str] = settings.SOLANA_WEBSOCKET_URL,
+        subscriptions_enabled: bool = settings.BALANCE_SUBSCRIPTIONS_ENABLED,
+    ):
+        self.ttl = ttl
+        self.window = window
+        self.ws_url = ws_url
+        self.subscriptions_enabled = subscriptions_enabled and bool(ws_url)
+        self._cache: Dict[str, tuple] = {}  # wallet -> (sol, fetched_at)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._listeners: List[BalanceListener] = []
+        self._watched: Set[str] = set()
+        self._subscribed: Dict[str, int] = {}  # wallet -> subscription id
+        self._watch_changed: Optional[asyncio.Event] = None
+        self._ws_task: Optional[asyncio.Task] = None
+        self.stats = {"rpc_calls": 0, "accounts": 0, "cache_hits": 0, "pushes": 0}
+
+    def add_listener(self, listener: BalanceListener):
+        """listener(wallet, sol) is called on every refreshed or pushed balance"""
+        self._listeners.append(listener)
+
+    def cached(self, wallet_address: str, max_age: Optional[float] = None) -> Optional[float]:
+        entry = self._cache.get(wallet_address)
+        if entry is None:
+            return None
+        sol, fetched_at = entry
+        # Subscribed wallets are kept current by pushes
+        if wallet_address in self._subscribed:
+            return sol
+        if time.monotonic() - fetched_at > (self.ttl if max_age is None else max_age):
+            return None
+        return sol
+
+    def update(self, wallet_address: str, sol: float):
+        self._cache[wallet_address] = (sol, time.monotonic())
+        for listener in self._listeners:
+            try:
+                listener(wallet_address, sol)
+            except Exception as e:
+                logger.error(f"Balance listener failed for {wallet_address[:8]}: {e}")
+
+    def invalidate(self, wallet_address: str):
+        """Drop a cached balance (e.g. right after a trade from that wallet)"""
+        self._cache.pop(wallet_address, None)
+
+    async def get_balance(self, wallet_address: str, max_age: Optional[float] = None) -> Optional[float]:
+        """SOL balance of one wallet, or None if it couldn't be fetched"""
+        balances = await self.get_balances([wallet_address], max_age=max_age)
+        return balances.get(wallet_address)
+
+    async def get_balances(self, wallet_addresses: Iterable[str], max_age: Optional[float] = None) -> Dict[str, float]:
+        """
+        SOL balances for many wallets. Wallets whose lookup failed (bad address,
+        RPC error) are missing from the result.
+        """
+        result: Dict[str, float] = {}
+        futures: Dict[str, asyncio.Future] = {}
+        for wallet in dict.fromkeys(wallet_addresses):
+            sol = self.cached(wallet, max_age)
+            if sol is not None:
+                self.stats["cache_hits"] += 1
+                result[wallet] = sol
+            else:
+                futures[wallet] = self._enqueue(wallet)
+
+        if futures:
+            # Shield so one cancelled caller doesn't cancel the shared futures
+            values = await asyncio.gather(*(asyncio.shield(f) for f in futures.values()))
+            for wallet, sol in zip(futures, values):
+                if sol is not None:
+                    result[wallet] = sol
+        return result
+
+    def _enqueue(self, wallet_address: str) -> asyncio.Future:
+        future = self._pending.get(wallet_address)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[wallet_address] = future
+            if len(self._pending) >= MAX_ACCOUNTS_PER_CALL:
+                self._schedule_flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._schedule_flush)
+        return future
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch = dict(list(self._pending.items())[:MAX_ACCOUNTS_PER_CALL])
+        for wallet in batch:
+            del self._pending[wallet]
+        if batch:
+            task = asyncio.create_task(self._fetch_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_later(0, self._schedule_flush)
+
+    async def _fetch_batch(self, batch: Dict[str, asyncio.Future]):
+        try:
+            await self._resolve_batch(batch)
+        finally:
+            # Cancelled or crashed part-way: don't leave callers waiting forever
+            for future in batch.values():
+                if not future.done():
+                    future.set_result(None)
+
+    async def _resolve_batch(self, batch: Dict[str, asyncio.Future]):
+        pubkeys: Dict[str, Pubkey] = {}
+        for wallet, future in batch.items():
+            try:
+                pubkeys[wallet] = Pubkey.from_string(wallet)
+            except ValueError:
+                logger.warning(f"Invalid wallet address for balance lookup: {wallet}")
+                if not future.done():
+                    future.set_result(None)
+
+        accounts = None
+        if pubkeys:
+            try:
+                response = await rpc_pool.call(
+                    "get_multiple_accounts",
+                    list(pubkeys.values()),
+                    commitment=Confirmed,
+                    data_slice=DataSliceOpts(offset=0, length=0),
+                )
+                accounts = response.value
+                self.stats["rpc_calls"] += 1
+                self.stats["accounts"] += len(pubkeys)
+            except Exception as e:
+                logger.error(f"getMultipleAccounts failed for {len(pubkeys)} wallets: {e}")
+
+        for i, wallet in enumerate(pubkeys):
+            future = batch[wallet]
+            if accounts is None:
+                if not future.done():
+                    future.set_result(None)
+                continue
+            # Never-funded wallets don't exist on chain yet → 0 SOL
+            account = accounts[i] if i < len(accounts) else None
+            sol = (account.lamports if account else 0) / LAMPORTS_PER_SOL
+            self.update(wallet, sol)
+            if not future.done():
+                future.set_result(sol)
+
+    # ===================================================================
+    # ACCOUNT SUBSCRIPTIONS
+    # ===================================================================
+    def watch(self, wallet_address: str):
+        """Keep this wallet's balance pushed over the websocket"""
+        if not self.subscriptions_enabled or wallet_address in self._watched:
+            return
+        self._watched.add(wallet_address)
+        self._ensure_ws_running()
+        self._watch_changed.set()
+
+    def unwatch(self, wallet_address: str):
+        if wallet_address in self._watched:
+            self._watched.discard(wallet_address)
+            self._watch_changed.set()
+
+    def _ensure_ws_running(self):
+        if self._ws_task is None or self._ws_task.done():
+            self._watch_changed = asyncio.Event()
+            self._ws_task = asyncio.create_task(self._subscription_loop())
+
+    def _account_subscribe_request(self, wallet: str, request_id: int) -> AccountSubscribe:
+        config = RpcAccountInfoConfig(
+            encoding=UiAccountEncoding.Base64,
+            data_slice=UiDataSliceConfig(0, 0),
+            commitment=CommitmentLevel.Confirmed,
+        )
+        return AccountSubscribe(Pubkey.from_string(wallet), config, request_id)
+
+    async def _sync_subscriptions(self, ws, requested: Dict[int, str], request_ids):
+        for wallet in list(self._subscribed):
+            if wallet not in self._watched:
+                sub_id = self._subscribed.pop(wallet)
+                if sub_id in ws.subscriptions:
+                    await ws.account_unsubscribe(sub_id)
+        for wallet in self._watched - set(self._subscribed) - set(requested.values()):
+            request_id = next(request_ids)
+            requested[request_id] = wallet
+            await ws.send_data(self._account_subscribe_request(wallet, request_id))
+
+    def _handle_ws_messages(self, messages, requested: Dict[int, str]):
+        by_sub = {sub_id: wallet for wallet, sub_id in self._subscribed.items()}
+        for message in messages:
+            if isinstance(message, SubscriptionResult):
+                wallet = requested.pop(message.id, None)
+                if wallet:
+                    self._subscribed[wallet] = message.result
+                    by_sub[message.result] = wallet
+                continue
+            wallet = by_sub.get(getattr(message, "subscription", None))
+            value = getattr(getattr(message, "result", None), "value", None)
+            if wallet and value is not None and wallet in self._watched:
+                self.stats["pushes"] += 1
+                self.update(wallet, value.lamports / LAMPORTS_PER_SOL)
+
+    async def _subscription_loop(self):
+        backoff = 1.0
+        while True:
+            requested: Dict[int, str] = {}
+            # Our own request ids, far away from the ones the library uses for unsubscribes
+            request_ids = itertools.count(1_000_000)
+            try:
+                async with connect(self.ws_url) as ws:
+                    logger.info(f"📡 Balance subscriptions connected ({len(self._watched)} wallets)")
+                    backoff = 1.0
+                    while True:
+                        self._watch_changed.clear()
+                        await self._sync_subscriptions(ws, requested, request_ids)
+
+                        recv = asyncio.create_task(ws.recv())
+                        changed = asyncio.create_task(self._watch_changed.wait())
+                        done, _ = await asyncio.wait({recv, changed}, return_when=asyncio.FIRST_COMPLETED)
+                        if recv in done:
+                            changed.cancel()
+                            self._handle_ws_messages(recv.result(), requested)
+                        else:
+                            # Cancelling recv() is safe - the message stays queued for the next read
+                            recv.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Balance subscription stream dropped: {e}")
+            finally:
+                # Subscription ids die with the connection; cached values fall back to the TTL
+                self._subscribed.clear()
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def close(self):
+        """Stop subscriptions and in-flight lookups (called on app shutdown)"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result(None)
+        self._pending.clear()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._ws_task:
+            self._ws_task.cancel()
+            await asyncio.gather(self._ws_task, return_exceptions=True)
+            self._ws_task = None
+        self._watched.clear()
+        self._cache.clear()
+
+
+# Global instance
+balance_service = BalanceService()
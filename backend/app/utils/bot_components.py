@@ -1568,12 +1568,11 @@ import json
 import base64
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import redis.asyncio as redis
-import aiohttp
 import httpx
 from fastapi import WebSocket
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from solders.pubkey import Pubkey
 from solders.keypair import Keypair
@@ -1586,12 +1585,26 @@ from app.database import AsyncSessionLocal
 from app.models import Trade, User, TokenMetadata
 from app.utils.dexscreener_api import fetch_dexscreener_with_retry, get_dexscreener_data
 from app.config import settings
-from app.security import decrypt_private_key_backend
-from app.utils.jupiter_api import get_jupiter_token_data, safe_float
+from app.utils.keypair_vault import keypair_vault
+from app.utils.sniper_roster import sniper_roster
+from app.utils.warm_orders import WarmOrder, warm_orders
+from app.utils.jupiter_api import get_jupiter_token_data, get_jupiter_token_metadata, safe_float, sol_price_ticker
 from app.utils.webacy_api import check_webacy_risk
 from app.utils.jito_bundles import get_jito_manager, JitoBundleManager
+from app.utils.fee_oracle import fee_oracle
+from app.utils.tip_auction import tip_auction
 from app.utils import fee_manager
 from app.utils.redis_client import get_redis_client
+from app.utils.price_feed_hub import price_feed_hub
+from app.utils.price_cache import ANY_AGE, FRESH, price_cache
+from app.utils.curve_price_engine import PUMPFUN_TOKEN_DECIMALS, curve_price_engine
+from app.utils.monitor_engine import MonitorAction, MonitoredPosition, monitor_engine
+from app.utils.monitor_snapshots import restore as restore_snapshot
+from app.utils.rule_table import TRAILING_ACTIVATION_PCT
+from app.utils.http_clients import http_clients
+from app.utils.rpc_pool import rpc_pool
+from app.utils.confirmation_service import confirmation_service
+from app.utils.submission_race import RouteAck, jito_route, rpc_route, signature_of, submission_race
 import random
 import time
 from decimal import Decimal, ROUND_DOWN
@@ -1602,8 +1615,6 @@ logger = logging.getLogger(__name__)
 # Get the shared Redis client
 redis_client = get_redis_client()
 
-monitor_tasks: Dict[int, asyncio.Task] = {}
-price_cache: Dict[str, Dict] = {}
 
 
 # class ConnectionManager:
@@ -1722,7 +1733,7 @@ class TokenAccountManager:
         user: User, 
         mint: str, 
         create_if_missing: bool = True,
-        priority_fee: int = 10000  # Micro-lamports for priority fee
+        priority_fee: Optional[int] = None  # Micro-lamports - defaults to fee_oracle's medium level
     ) -> Optional[str]:
         """
         Get existing Associated Token Account (ATA) or create one efficiently.
@@ -1742,16 +1753,15 @@ class TokenAccountManager:
         
         # Check on-chain if account exists
         try:
-            async with AsyncClient(settings.SOLANA_RPC_URL) as client:
-                account_info = await client.get_account_info(ata)
-                if account_info.value:
-                    logger.info(f"✅ Reusing existing ATA for {mint[:8]}: {ata_str[:8]}...")
-                    
-                    # Track ATA usage for analytics
-                    await redis_client.hincrby(f"ata_usage:{user.wallet_address}", mint, 1)
-                    await redis_client.expire(f"ata_usage:{user.wallet_address}", 86400)  # 24h
-                    
-                    return ata_str
+            account_info = await rpc_pool.call("get_account_info", ata, preferred=user.custom_rpc_https)
+            if account_info.value:
+                logger.info(f"✅ Reusing existing ATA for {mint[:8]}: {ata_str[:8]}...")
+                
+                # Track ATA usage for analytics
+                await redis_client.hincrby(f"ata_usage:{user.wallet_address}", mint, 1)
+                await redis_client.expire(f"ata_usage:{user.wallet_address}", 86400)  # 24h
+                
+                return ata_str
         except Exception as e:
             logger.debug(f"Error checking ATA existence: {e}")
         
@@ -1872,11 +1882,14 @@ class MEVProtector:
         mint: str,
         amount_lamports: int,
         is_buy: bool,
-        priority_fee: int = 100000  # 0.0001 SOL for priority
+        priority_fee: Optional[int] = None  # Defaults to fee_oracle's high level
     ) -> Dict:
         """
         Create stealth transactions to avoid front-running
         """
+        if priority_fee is None:
+            priority_fee = fee_oracle.priority_fee("high", fallback=100_000)
+
         # Random delay to avoid predictable patterns
         delay_ms = random.randint(50, 300)
         await asyncio.sleep(delay_ms / 1000)
@@ -2002,35 +2015,46 @@ rug_detector = RugDetector()
 
 # Move this function to the TOP after imports but before class definitions
 async def check_and_restart_stale_monitors():
-    """Check if monitor tasks are running and restart if needed"""
+    """Keep monitor_engine in line with the trades table: pick up untracked open trades, drop ones sold elsewhere"""
     while True:
         try:
-            # Use a single session for the check
             async with AsyncSessionLocal() as db:
-                # Find trades that should be monitored but don't have active tasks
+                tracked = monitor_engine.trade_ids()
+                recent_or_tracked = [Trade.buy_timestamp > datetime.utcnow() - timedelta(hours=24)]
+                if tracked:
+                    recent_or_tracked.append(Trade.id.in_(tracked))
                 result = await db.execute(
                     select(Trade).where(
                         Trade.sell_timestamp.is_(None),
-                        Trade.buy_timestamp > datetime.utcnow() - timedelta(hours=24)
+                        or_(*recent_or_tracked)
                     )
                 )
                 trades = result.scalars().all()
                 
-                for trade in trades:
-                    if trade.id not in monitor_tasks:
-                        logger.info(f"🔄 Restarting monitor for trade {trade.id}")
-                        
-                        # Get user - use the same session
-                        user_result = await db.execute(
-                            select(User).where(User.wallet_address == trade.user_wallet_address)
-                        )
-                        user = user_result.scalar_one_or_none()
-                        
-                        if user and trade.token_decimals and trade.amount_tokens:
-                            # Pass the database session to avoid creating new ones
-                            asyncio.create_task(
-                                restart_monitor_for_trade(trade, user, db)
-                            )
+                # Sold manually or by another worker - stop tracking
+                open_ids = {trade.id for trade in trades}
+                for trade_id in tracked - open_ids:
+                    monitor_engine.remove(trade_id)
+                    logger.info(f"✅ Trade {trade_id} closed outside the monitor, stopped tracking")
+                
+                missing = [
+                    trade for trade in trades
+                    if trade.id not in tracked and trade.token_decimals and trade.amount_tokens
+                ]
+                if missing:
+                    # One query for every user involved, one Redis round trip for their monitor state
+                    wallets = {trade.user_wallet_address for trade in missing}
+                    users_result = await db.execute(select(User).where(User.wallet_address.in_(wallets)))
+                    users = {user.wallet_address: user for user in users_result.scalars().all()}
+                    snapshots = await monitor_engine.snapshots.load([trade.id for trade in missing])
+                    if snapshots:
+                        logger.info(f"💾 Restored monitor state for {len(snapshots)}/{len(missing)} trades")
+                    
+                    for trade in missing:
+                        user = users.get(trade.user_wallet_address)
+                        if user:
+                            logger.info(f"🔄 Restarting monitor for trade {trade.id}")
+                            await restart_monitor_for_trade(trade, user, snapshots.get(trade.id))
             
             # Session auto-closes here
         
@@ -2039,23 +2063,19 @@ async def check_and_restart_stale_monitors():
         
         await asyncio.sleep(30)
 
-async def restart_monitor_for_trade(trade: Trade, user: User, db: AsyncSession):
-    """Helper to restart monitor for a trade with existing session"""
+async def restart_monitor_for_trade(trade: Trade, user: User, snapshot: Optional[Dict[str, Any]] = None):
+    """Put an open trade back under monitor_engine (after a restart or a lost position)"""
     try:
-        # Note: We don't use the passed db session because monitor_position creates its own
-        await monitor_position(
-            user=user,
+        await start_monitor_for_trade(
             trade=trade,
+            user=user,
             entry_price_usd=trade.price_usd_at_trade or 0,
             token_decimals=trade.token_decimals,
             token_amount=trade.amount_tokens,
-            websocket_manager=websocket_manager
+            snapshot=snapshot,
         )
     except Exception as e:
         logger.error(f"Failed to restart monitor for trade {trade.id}: {e}")
-    finally:
-        # Don't close the session here - it's managed by check_and_restart_stale_monitors
-        pass
         
 # ===================================================================
 # Correct Jupiter Referral ATA (2025)
@@ -2069,31 +2089,6 @@ def get_jupiter_referral_ata(referral_pda: str, mint: str) -> str:
 # ===================================================================
 # Non-blocking transaction confirmation
 # ===================================================================
-async def _confirm_tx_async(rpc_url: str, signature: str, label: str, wallet_address: str, input_sol: float):
-    try:
-        async with AsyncClient(rpc_url) as client:
-            sig = Signature.from_string(signature)
-            resp = await client.confirm_transaction(sig, commitment="confirmed")
-            statuses = resp.value
-            if statuses and len(statuses) > 0 and statuses[0].err:
-                err = statuses[0].err
-                err_str = str(err)
-                error_type = "UNKNOWN"
-                if "6025" in err_str:
-                    error_type = "INSUFFICIENT_INPUT_LIQUIDITY"
-                    user_msg = json.dumps({
-                        "type": "log",
-                        "message": f"{label} failed: Low liquidity (error 6025). Input {input_sol} SOL too small — try 0.1+ SOL.",
-                        "status": "warning",
-                        "tx": f"https://solscan.io/tx/{signature}"
-                    })
-                    await websocket_manager.send_personal_message(user_msg, wallet_address)
-                logger.warning(f"{label} {signature} failed on-chain ({error_type}): {err}")
-            else:
-                logger.info(f"{label} {signature} CONFIRMED")
-    except Exception as e:
-        logger.warning(f"Confirmation failed for {signature}: {e}")
-
 async def get_fee_statistics():
     """Get statistics about collected fees"""
     try:
@@ -2273,63 +2268,20 @@ async def execute_jupiter_swap(
         slippage_bps = mev_config["slippage_bps"]
         logger.info(f"🕵️ Stealth mode: Using {slippage_bps}bps slippage")
     
-    # 🔥 USE JITO FOR ALL CRITICAL TRADES + FORCED JITO
+    # 🔥 CRITICAL TRADES + FORCED JITO: a tipped Jito bundle joins the submission race
+    jito_tip_lamports = None
     if use_jito_for_critical and (IS_CRITICAL_TRADE or FORCE_JITO):
-        try:
-            logger.info(f"🚀 ULTRA-PRIORITY Jito bundle: {label} {input_sol:.4f} SOL")
-            
-            # Get MEV detection
-            has_mev = await mev_protector.detect_mev_activity(
-                output_mint if "BUY" in label else input_mint
-            )
-            
-            # Increase tip if MEV detected
-            extra_tip = 50000 if has_mev else 0  # Extra 0.00005 SOL for MEV zones
-            
-            # Get Jupiter transaction
-            regular_result = await execute_jupiter_swap_internal(
-                user, input_mint, output_mint, amount, slippage_bps, 
-                f"JITO_{label}", max_retries
-            )
-            
-            if regular_result.get("raw_tx_base64"):
-                # Get Jito manager
-                jito_manager = await get_jito_manager()
-                
-                # Get user keypair
-                private_key_bytes = decrypt_private_key_backend(user.encrypted_private_key)
-                keypair = Keypair.from_bytes(private_key_bytes)
-                
-                # Execute with Jito bundles
-                jito_result = await jito_manager.execute_jupiter_swap_with_jito(
-                    signed_transaction_base64=regular_result["raw_tx_base64"],
-                    user_keypair=keypair,
-                    label=f"JITO_ULTRA_{label}"
-                )
-                
-                # Merge results
-                merged_result = {**regular_result, **jito_result}
-                merged_result["method"] = "jupiter_ultra_with_jito"
-                merged_result["jito_guaranteed"] = True 
-                merged_result["extra_tip"] = extra_tip
-                
-                logger.info(f"✅ Jito ULTRA executed for {label} | Bundle: {jito_result.get('bundle_id', 'N/A')}")
-                
-                # Track Jito success
-                await redis_client.hincrby("jito_stats", "successful_bundles", 1)
-                
-                return merged_result
-            
-        except Exception as jito_error:
-            logger.warning(f"Jito bundle failed: {jito_error}")
-            # Track Jito failure
-            await redis_client.hincrby("jito_stats", "failed_bundles", 1)
-            # Fall back to regular execution
-    
-    # Regular execution with MEV protection
+        # Increase tip if MEV detected
+        has_mev = await mev_protector.detect_mev_activity(
+            output_mint if "BUY" in label else input_mint
+        )
+        extra_tip = 50000 if has_mev else 0  # Extra 0.00005 SOL for MEV zones
+        jito_tip_lamports = tip_auction.recommend() + extra_tip
+        logger.info(f"🚀 ULTRA-PRIORITY {label} {input_sol:.4f} SOL | Jito tip {jito_tip_lamports} lamports")
+
     return await execute_jupiter_swap_internal(
-        user, input_mint, output_mint, amount, slippage_bps, 
-        label, max_retries, stealth_mode
+        user, input_mint, output_mint, amount, slippage_bps,
+        label, max_retries, stealth_mode, jito_tip_lamports
     )
 
 
@@ -2340,6 +2292,11 @@ async def calculate_sol_value(mint: str, token_amount_lamports: int, decimals: i
         if mint == settings.SOL_MINT:
             return token_amount_lamports / 1_000_000_000
         
+        # Still on its bonding curve: what the sell actually gets, price impact included
+        curve = await curve_price_engine.fetch(mint)
+        if curve and not curve.complete:
+            return curve.sell_sol_out(token_amount_lamports / (10 ** decimals))
+        
         # Get current price from Jupiter
         quote = await get_jupiter_quote_price(mint)
         if quote and quote.get("priceSOL"):
@@ -2384,11 +2341,11 @@ async def execute_jito_optimized_sell(
             mint=mint,
             trade_type=label
         )
-        await redis_client.setex(fee_key, 300, json.dumps({
+        fee_manager.record_decision(fee_key, {
             **fee_decision,
             "estimated_sol": estimated_sol_value,
             "timestamp": datetime.utcnow().isoformat()
-        }))
+        }, ttl=300)
         
         # First create the regular Jupiter swap
         swap_result = await execute_jupiter_swap(
@@ -2431,75 +2388,237 @@ async def execute_jito_optimized_sell(
             use_jito_for_critical=False
         )
           
-async def execute_jupiter_swap_internal(
-    user: User,
-    input_mint: str,
-    output_mint: str,
-    amount: int,
-    slippage_bps: int,
-    label: str = "swap",
-    max_retries: int = 3,
-    stealth_mode: bool = False 
-) -> dict:
+ULTRA_BASE = "https://api.jup.ag/ultra/v1"
+
+
+async def _swap_fee_decision(user: User, input_mint: str, output_mint: str, input_sol: float, label: str) -> dict:
+    """Fee decision for a swap, audited in Redis under the swap's fee key"""
+    mint = output_mint if "BUY" in label else input_mint
 
-    input_sol = amount / 1_000_000_000.0
-    
     # Use fee_manager for ALL fee decisions
     fee_decision = await fee_manager.calculate_fee_decision(
         user=user,
         trade_type=label,
         amount_sol=input_sol,
-        mint=output_mint if "BUY" in label else input_mint,
+        mint=mint,
         pnl_pct=0.0  # Will be updated for sells if needed
     )
-    
-    apply_referral_fee = fee_decision["should_apply"]
-    referral_fee = fee_decision["referral_fee"]  # Already a string
-    
-    # Store fee decision in Redis
+
+    # Audit record in Redis (batched, off the swap path)
     fee_key = fee_manager.get_fee_decision_key(
         user_wallet=user.wallet_address,
-        mint=output_mint if "BUY" in label else input_mint,
+        mint=mint,
         trade_type=label
     )
-    await redis_client.setex(fee_key, 600, json.dumps(fee_decision))
-    
+    fee_manager.record_decision(fee_key, fee_decision, ttl=600)
+
     logger.info(f"💰 Fee decision for {label}: {fee_decision['reason']} | Details: {fee_decision.get('details', '')}")
-    
-    
-    
+    return fee_decision
+
+
+def _referral_account_for(fee_decision: dict, label: str) -> Optional[str]:
+    """The Ultra referral account to charge the fee through, or None for no fee"""
+    referral_account = getattr(settings, 'JUPITER_REFERRAL_ACCOUNT', None)
+
+    if fee_decision["should_apply"] and referral_account:
+        logger.info(f"💰 Using Ultra referral account: {referral_account[:8]}...")
+        logger.info(f"   Applying {int(fee_decision['referral_fee'])/100}% fee on {label} transaction")
+        return referral_account
+
+    logger.info(f"💰 No fee applied for this transaction")
+    return None
+
+
+def _ultra_headers() -> dict:
+    # REQUIRED: Jupiter API Key for Ultra API
+    if not getattr(settings, "JUPITER_API_KEY", None):
+        raise Exception("JUPITER_API_KEY is required for Ultra API. Get one from portal.jup.ag")
+
+    return {
+        "Content-Type": "application/json",
+        "x-api-key": settings.JUPITER_API_KEY
+    }
+
+
+def _ultra_order_params(
+    input_mint: str,
+    output_mint: str,
+    amount: int,
+    slippage_bps: int,
+    taker: str,
+    fee_account: Optional[str] = None,
+    referral_fee: Optional[str] = None
+) -> dict:
+    order_params = {
+        "inputMint": input_mint,
+        "outputMint": output_mint,
+        "amount": str(amount),
+        "slippageBps": str(slippage_bps),
+        "taker": taker,
+    }
+
+    # 🔥 Add referral parameters ONLY if fees should apply
+    if fee_account:
+        order_params["referralAccount"] = fee_account
+        order_params["referralFee"] = referral_fee  # Dynamic fee from FeeOptimizer
+        logger.info(f"💰 Adding {int(referral_fee)/100:.1f}% fee via Ultra API")
+    else:
+        logger.info("💰 Proceeding without fee - optimized pricing")
+    return order_params
+
+
+async def _get_signed_ultra_order(session, order_params: dict, headers: dict, keypair: Keypair, attempt: int = 0) -> Tuple[dict, str]:
+    """GET /order, validate it and sign it. Returns (order_data, signed transaction base64)"""
+    order_resp = await session.get(f"{ULTRA_BASE}/order", params=order_params, headers=headers)
+    if order_resp.status_code != 200:
+        txt = order_resp.text
+
+        # Referral token account not initialized - the caller may retry without referral
+        if "referralAccount is initialized" in txt:
+            logger.warning(f"Referral token account not initialized for this swap")
+            raise Exception(f"Order failed: {txt[:200]}")
+
+        logger.error(f"Order failed: Status {order_resp.status_code}, Response: {txt[:500]}")
+
+        # Parse Jupiter error messages
+        try:
+            error_data = json.loads(txt)
+            if "errorMessage" in error_data:
+                raise Exception(f"Jupiter order failed: {error_data['errorMessage']}")
+        except:
+            pass
+
+        raise Exception(f"Order failed (attempt {attempt+1}): {txt[:300]}")
+
+    order_data = order_resp.json()
+
+    # Validate order response
+    if "transaction" not in order_data:
+        logger.error(f"No transaction in order response: {order_data}")
+        raise Exception("Jupiter didn't return a transaction")
+
+    if "requestId" not in order_data:
+        logger.error(f"No requestId in order response: {order_data}")
+        raise Exception("Jupiter didn't return a requestId")
+
+    if "outAmount" not in order_data or int(order_data["outAmount"]) <= 0:
+        logger.error(f"Invalid output amount: {order_data.get('outAmount', 'missing')}")
+        raise Exception("Order returned 0 output - insufficient liquidity")
+
+    # Sign the transaction
+    try:
+        tx_buf = base64.b64decode(order_data["transaction"])
+        if len(tx_buf) < 32:  # Minimum transaction size check
+            logger.error(f"Transaction buffer too small: {len(tx_buf)} bytes")
+            raise Exception("Invalid transaction data received from Jupiter")
+
+        original_tx = VersionedTransaction.from_bytes(tx_buf)
+        message_bytes = to_bytes_versioned(original_tx.message)
+        user_signature = keypair.sign_message(message_bytes)
+
+        # Create signed transaction
+        signed_tx = VersionedTransaction.populate(original_tx.message, [user_signature])
+        signed_transaction_base64 = base64.b64encode(bytes(signed_tx)).decode("utf-8")
+
+    except Exception as tx_error:
+        logger.error(f"Transaction decoding failed: {tx_error}")
+        raise Exception(f"Failed to process transaction: {str(tx_error)[:100]}")
+
+    return order_data, signed_transaction_base64
+
+
+async def prepare_warm_order(user: User, input_mint: str, output_mint: str, amount: int, slippage_bps: int, label: str) -> Optional[WarmOrder]:
+    """Fee decision + signed Ultra order for a swap that may be about to happen (see warm_orders)"""
+    # Only armed snipers are warmed - their keypair is already in memory
+    keypair = keypair_vault.get(user.wallet_address)
+    if keypair is None:
+        return None
+
+    fee_decision = await _swap_fee_decision(user, input_mint, output_mint, amount / 1_000_000_000.0, label)
+    fee_account = _referral_account_for(fee_decision, label)
+    order_params = _ultra_order_params(
+        input_mint, output_mint, amount, slippage_bps, str(user.wallet_address),
+        fee_account, fee_decision["referral_fee"]
+    )
+    async with http_clients.session(ULTRA_BASE) as session:
+        order_data, signed_transaction_base64 = await _get_signed_ultra_order(session, order_params, _ultra_headers(), keypair)
+    return WarmOrder(order_data, signed_transaction_base64, fee_decision)
+
+
+def initial_buy_terms(user: User, strategy: dict) -> Tuple[int, int]:
+    """(amount_lamports, slippage_bps) of the initial buy execute_user_buy sends for this strategy"""
+    total_sol = user.sniper_buy_amount_sol
+    initial_buy_sol = total_sol * (strategy["initial_buy_pct"] / 100)
+    amount_lamports = int(initial_buy_sol * 1_000_000_000)
+    slippage_bps = min(int(strategy["slippage_bps"]), 5000)
+    return amount_lamports, slippage_bps
+
+
+def warm_initial_buy(user: User, mint: str):
+    """
+    Start building the initial snipe order before execute_user_buy decides it.
+    Fresh launches have no market data yet, so the buy will almost always run
+    the default strategy - warm exactly those terms.
+    """
+    amount_lamports, slippage_bps = initial_buy_terms(user, get_default_strategy())
+    warm_orders.warm(
+        (user.wallet_address, settings.SOL_MINT, mint, amount_lamports, slippage_bps),
+        lambda: prepare_warm_order(user, settings.SOL_MINT, mint, amount_lamports, slippage_bps, "INITIAL_SNIPE"),
+    )
+
+
+async def execute_jupiter_swap_internal(
+    user: User,
+    input_mint: str,
+    output_mint: str,
+    amount: int,
+    slippage_bps: int,
+    label: str = "swap",
+    max_retries: int = 3,
+    stealth_mode: bool = False,
+    jito_tip_lamports: Optional[int] = None  # Also race a Jito bundle with this tip
+) -> dict:
+
+    input_sol = amount / 1_000_000_000.0
+
+    # Pre-built and signed while the buy was being decided? Then only /execute is left
+    warm = None
+    if not stealth_mode:
+        warm = await warm_orders.take((user.wallet_address, input_mint, output_mint, amount, slippage_bps))
+
+    if warm is not None:
+        fee_decision = warm.fee_decision
+        logger.info(f"🔥 Warm order for {label} ({warm.age:.1f}s old) | Fee: {fee_decision['reason']}")
+    else:
+        fee_decision = await _swap_fee_decision(user, input_mint, output_mint, input_sol, label)
+
+    referral_fee = fee_decision["referral_fee"]  # Already a string
+
+
+
     # FIX: Ensure MIN_BUY_SOL is a float
     min_buy_sol_str = getattr(settings, 'MIN_BUY_SOL', '0.01')
     try:
         min_buy_sol = float(min_buy_sol_str)
     except (ValueError, TypeError):
         min_buy_sol = 0.05  # Default fallback
-    
+
     # Min buy checks - FIXED: Compare floats properly
     if label == "BUY" and not user.is_premium:
         min_for_free = max(min_buy_sol, 0.01)
         if input_sol < min_for_free:
             raise Exception(f"Free users need min {min_for_free:.2f} SOL for buys. Current: {input_sol:.4f} SOL")
-    
+
     if label == "BUY" and input_sol < min_buy_sol:
         raise Exception(f"Min input too low: {input_sol:.4f} SOL < {min_buy_sol:.2f} SOL")
 
     user_pubkey = str(user.wallet_address)
-    private_key_bytes = decrypt_private_key_backend(user.encrypted_private_key)
-    keypair = Keypair.from_bytes(private_key_bytes)
-    
+    keypair = keypair_vault.keypair_for(user)
+
     # Get the Ultra referral account
-    referral_account = getattr(settings, 'JUPITER_REFERRAL_ACCOUNT', None)
-    
-    if apply_referral_fee and referral_account:
-        logger.info(f"💰 Using Ultra referral account: {referral_account[:8]}...")
-        logger.info(f"   Applying {int(referral_fee)/100}% fee on {label} transaction")  # FIXED
-        fee_account = referral_account
-    else:
-        logger.info(f"💰 No fee applied for this transaction")
-        apply_referral_fee = False
-        fee_account = None
-        
+    fee_account = _referral_account_for(fee_decision, label)
+    apply_referral_fee = fee_account is not None
+
     # Add MEV protection logic at the beginning if stealth_mode is True
     if stealth_mode:
         mev_config = await mev_protector.create_stealth_transaction(
@@ -2509,77 +2628,44 @@ async def execute_jupiter_swap_internal(
         logger.info(f"🕵️ Stealth mode active: Using {slippage_bps}bps slippage")
 
 
-    # REQUIRED: Jupiter API Key for Ultra API
-    if not getattr(settings, "JUPITER_API_KEY", None):
-        raise Exception("JUPITER_API_KEY is required for Ultra API. Get one from portal.jup.ag")
-    
-    headers = {
-        "Content-Type": "application/json",
-        "x-api-key": settings.JUPITER_API_KEY
-    }
+    headers = _ultra_headers()
 
     for attempt in range(max_retries):
         try:
-            async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=60)) as session:
-                base = "https://api.jup.ag/ultra/v1"
-                
+            base = ULTRA_BASE
+            async with http_clients.session(base) as session:
+
                 # =============================================================
-                # 1. GET ORDER WITH SMART FEE LOGIC
+                # 1. GET + SIGN ORDER WITH SMART FEE LOGIC (already done if it was warm)
                 # =============================================================
-                order_params = {
-                    "inputMint": input_mint,
-                    "outputMint": output_mint,
-                    "amount": str(amount),
-                    "slippageBps": str(slippage_bps),
-                    "taker": user_pubkey,
-                }
-                
-                # 🔥 Add referral parameters ONLY if fees should apply
-                if apply_referral_fee and fee_account:
-                    order_params["referralAccount"] = fee_account
-                    order_params["referralFee"] = referral_fee  # Dynamic fee from FeeOptimizer
-                    logger.info(f"💰 Adding {int(referral_fee)/100:.1f}% fee via Ultra API")
+                if warm is not None:
+                    order_data, signed_transaction_base64 = warm.order_data, warm.signed_tx
+                    warm = None  # Single use - retries order afresh
                 else:
-                    logger.info("💰 Proceeding without fee - optimized pricing")
-                            
-                logger.info(f"Getting order for {label}: {input_sol:.4f} SOL | {input_mint[:8]}... → {output_mint[:8]}...")
-                
-                order_resp = await session.get(f"{base}/order", params=order_params)
-                if order_resp.status != 200:
-                    txt = await order_resp.text()
-                    
-                    # Check if it's a referral initialization error
-                    if "referralAccount is initialized" in txt:
-                        logger.warning(f"Referral token account not initialized for this swap")
-                        
+                    order_params = _ultra_order_params(
+                        input_mint, output_mint, amount, slippage_bps, user_pubkey,
+                        fee_account if apply_referral_fee else None, referral_fee
+                    )
+
+                    logger.info(f"Getting order for {label}: {input_sol:.4f} SOL | {input_mint[:8]}... → {output_mint[:8]}...")
+
+                    try:
+                        order_data, signed_transaction_base64 = await _get_signed_ultra_order(
+                            session, order_params, headers, keypair, attempt
+                        )
+                    except Exception as order_error:
                         # Try again without referral on the first attempt
-                        if attempt == 0 and apply_referral_fee:  # Use existing variable
+                        if "referralAccount is initialized" in str(order_error) and attempt == 0 and apply_referral_fee:
                             logger.info("Retrying without referral account...")
                             apply_referral_fee = False
                             continue
-                        else:
-                            logger.error(f"Order failed: Status {order_resp.status}, Response: {txt[:500]}")
-                            raise Exception(f"Order failed: {txt[:200]}")
-                    
-                    logger.error(f"Order failed: Status {order_resp.status}, Response: {txt[:500]}")
-                    
-                    # Parse Jupiter error messages
-                    try:
-                        error_data = json.loads(txt)
-                        if "errorMessage" in error_data:
-                            raise Exception(f"Jupiter order failed: {error_data['errorMessage']}")
-                    except:
-                        pass
-                    
-                    raise Exception(f"Order failed (attempt {attempt+1}): {txt[:300]}")
-                
-                order_data = await order_resp.json()
-                
+                        raise
+
                 # 🔥 CHECK IF 1% FEE IS APPLIED
                 fee_applied = False
                 fee_amount = 0
                 fee_percentage = 0.0
-                
+
                 if "feeBps" in order_data:
                     fee_bps = int(order_data.get("feeBps", 0))
                     # if fee_bps >= 100:  # At least 1% fee
@@ -2587,9 +2673,9 @@ async def execute_jupiter_swap_internal(
                     #     fee_percentage = fee_bps / 100  # Convert to percentage
                     #     in_amount = int(order_data["inAmount"])
                     #     fee_amount = (in_amount * fee_bps) // 10000
-                        
+
                     #     logger.info(f"💰 1% FEE CONFIRMED: {fee_bps}bps fee applied")
-                        
+
                     #     # Log fee details
                     #     fee_mint = order_data.get("feeMint", "Unknown")
                     #     if "So111" in fee_mint:
@@ -2602,19 +2688,19 @@ async def execute_jupiter_swap_internal(
                     #         logger.info(f"   Estimated fee: {fee_amount} tokens")
                     # else:
                     #     logger.warning(f"⚠️ Fee mismatch: {fee_bps}bps (expected 100bps)")
-                    
+
                     # Fix the fee calculation
                     if "feeBps" in order_data:
                         fee_bps = int(order_data.get("feeBps", 0))
                         if fee_bps >= 100:  # At least 1% fee
                             fee_applied = True
                             fee_percentage = fee_bps / 100  # BPS to percentage
-                            
+
                             in_amount = int(order_data["inAmount"])
                             fee_amount_lamports = (in_amount * fee_bps) // 10000
-                            
+
                             logger.info(f"💰 1% FEE CONFIRMED: {fee_bps}bps fee applied")
-                            
+
                             # Log fee details
                             fee_mint = order_data.get("feeMint", "Unknown")
                             if "So111" in fee_mint:  # SOL
@@ -2625,112 +2711,33 @@ async def execute_jupiter_swap_internal(
                                 logger.info(f"   Estimated fee: {fee_usdc:.6f} USDC")
                             else:
                                 logger.info(f"   Estimated fee: {fee_amount_lamports} raw units")
-                
-                # Validate order response
-                if "transaction" not in order_data:
-                    logger.error(f"No transaction in order response: {order_data}")
-                    raise Exception("Jupiter didn't return a transaction")
-                
-                if "requestId" not in order_data:
-                    logger.error(f"No requestId in order response: {order_data}")
-                    raise Exception("Jupiter didn't return a requestId")
-                
-                if "outAmount" not in order_data or int(order_data["outAmount"]) <= 0:
-                    logger.error(f"Invalid output amount: {order_data.get('outAmount', 'missing')}")
-                    raise Exception("Order returned 0 output - insufficient liquidity")
-                
+
                 logger.info(f"{label} order: {int(order_data['inAmount'])/1e9:.4f} SOL → {int(order_data['outAmount'])} tokens | Slippage: {order_data.get('slippageBps', '?')}bps | 1% Fee: {'✅' if fee_applied else '❌'}")
                 
                 # =============================================================
-                # 2. SIGN TRANSACTION
-                # =============================================================
-                try:
-                    tx_buf = base64.b64decode(order_data["transaction"])
-                    if len(tx_buf) < 32:  # Minimum transaction size check
-                        logger.error(f"Transaction buffer too small: {len(tx_buf)} bytes")
-                        raise Exception("Invalid transaction data received from Jupiter")
-                    
-                    original_tx = VersionedTransaction.from_bytes(tx_buf)
-                    message_bytes = to_bytes_versioned(original_tx.message)
-                    user_signature = keypair.sign_message(message_bytes)
-                    
-                    # Create signed transaction
-                    signed_tx = VersionedTransaction.populate(original_tx.message, [user_signature])
-                    raw_tx = bytes(signed_tx)
-                    signed_transaction_base64 = base64.b64encode(raw_tx).decode("utf-8")
-                    
-                except Exception as tx_error:
-                    logger.error(f"Transaction decoding failed: {tx_error}")
-                    raise Exception(f"Failed to process transaction: {str(tx_error)[:100]}")
-                # =============================================================
-                # 3. EXECUTE ORDER (Jupiter sends the transaction)
+                # 3. SUBMIT - Ultra /execute raced against a Jito bundle and a raw RPC broadcast
                 # =============================================================
                 execute_payload = {
                     "signedTransaction": signed_transaction_base64,
                     "requestId": order_data["requestId"]
                 }
-                
-                execute_resp = await session.post(f"{base}/execute", json=execute_payload)
-                if execute_resp.status != 200:
-                    txt = await execute_resp.text()
-                    logger.error(f"Execute failed: Status {execute_resp.status}, Response: {txt[:500]}")
-                    raise Exception(f"Execute failed (attempt {attempt+1}): {txt[:300]}")
-                
-                execute_data = await execute_resp.json()
-                
-                # Check execution status
-                if execute_data.get("status") == "Success":
-                    signature = execute_data.get("signature")
-                    if not signature:
-                        raise Exception("Execute succeeded but no signature returned")
-                    
-                    logger.info(f"{label} SUCCESS → https://solscan.io/tx/{signature}")
-                    
-                    # Log success details
-                    input_amount_result = execute_data.get("inputAmountResult", order_data["inAmount"])
-                    output_amount_result = execute_data.get("outputAmountResult", order_data["outAmount"])
-                    
-                    # 🔥 TRACK FEE IF APPLIED
-                    if fee_applied:
-                        # Store fee info for analytics
-                        await store_fee_info(
-                            wallet_address=user.wallet_address,
-                            tx_signature=signature,
-                            fee_amount=fee_amount,
-                            fee_mint=order_data.get("feeMint", "Unknown"),  # This is correct
-                            trade_type=label,
-                            input_amount=int(input_amount_result),
-                            output_amount=int(output_amount_result)
-                        )
-                    
-                    logger.info(f"{label} executed: {int(input_amount_result)/1e9:.4f} SOL → {int(output_amount_result)} tokens | 1% Fee: {'✅' if fee_applied else '❌'}")
-                    
-                    # Fire-and-forget confirmation
-                    rpc_url = user.custom_rpc_https or settings.SOLANA_RPC_URL
-                    asyncio.create_task(_confirm_tx_async(rpc_url, signature, label, user_pubkey, input_sol))
-                    
-                    return {
-                        "raw_tx_base64": signed_transaction_base64,
-                        "signature": signature,
-                        "out_amount": int(output_amount_result),
-                        "in_amount": int(input_amount_result),
-                        "estimated_referral_fee": fee_amount,
-                        "fee_applied": fee_applied,
-                        "fee_percentage": fee_percentage,
-                        "fee_bps": fee_bps if fee_applied else 0,
-                        "fee_mint": order_data.get("feeMint", "") if fee_applied else "",  # Add this line
-                        "method": "jup_ultra_referral",
-                        "status": "success",
-                        "request_id": order_data["requestId"],
-                        "referral_used": fee_applied
-                    }
-                
-                else:
+
+                async def ultra_execute() -> RouteAck:
+                    execute_resp = await session.post(f"{base}/execute", json=execute_payload, headers=headers)
+                    if execute_resp.status_code != 200:
+                        txt = execute_resp.text
+                        logger.error(f"Execute failed: Status {execute_resp.status_code}, Response: {txt[:500]}")
+                        raise Exception(f"Execute failed (attempt {attempt+1}): {txt[:300]}")
+
+                    execute_data = execute_resp.json()
+                    if execute_data.get("status") == "Success":
+                        return RouteAck(confirmed=True, detail=execute_data)
+
                     # Execution failed
                     status = execute_data.get("status", "Unknown")
                     error_code = execute_data.get("code", -1)
                     signature = execute_data.get("signature")
-                    
+
                     # Map error codes to user-friendly messages
                     error_messages = {
                         -1: "Missing cached order (requestId expired)",
@@ -2747,16 +2754,89 @@ async def execute_jupiter_swap_internal(
                         -1006: "Transaction timed out",
                         -1007: "Gasless unsupported wallet"
                     }
-                    
+
                     error_msg = error_messages.get(error_code, f"Error code: {error_code}")
-                    
+
                     if signature:
                         logger.warning(f"{label} EXECUTE FAILED ({status}): {error_msg} | Tx: https://solscan.io/tx/{signature}")
-                        raise Exception(f"{label} failed: {error_msg}")
                     else:
                         logger.warning(f"{label} EXECUTE FAILED ({status}): {error_msg}")
-                        raise Exception(f"{label} failed: {error_msg}")
-        
+                    raise Exception(f"{label} failed: {error_msg}")
+
+                routes = {"ultra": ultra_execute}
+                if jito_tip_lamports is not None:
+                    routes["jito"] = jito_route(signed_transaction_base64, keypair, jito_tip_lamports)
+                if not stealth_mode:
+                    # Public RPCs see the transaction before it lands - not for stealth trades
+                    routes["rpc"] = rpc_route(signed_transaction_base64, preferred=user.custom_rpc_https)
+
+                last_valid_block_height = order_data.get("lastValidBlockHeight")
+                last_valid_block_height = int(last_valid_block_height) if last_valid_block_height else None
+                race = await submission_race.submit(
+                    signature_of(signed_transaction_base64), routes, label, last_valid_block_height
+                )
+
+                if "jito" in race.raced:
+                    await redis_client.hincrby("jito_stats", "successful_bundles" if race.route == "jito" else "failed_bundles", 1)
+
+                if not race.landed:
+                    if len(race.errors) == len(race.raced):
+                        raise Exception(race.errors.get("ultra") or next(iter(race.errors.values())))
+                    if not race.expired:
+                        # Already broadcast and the blockhash is still live - a new order now could trade twice
+                        logger.warning(f"{label} not confirmed after {submission_race.confirm_timeout:.0f}s, waiting for it to land or expire")
+                        status = await confirmation_service.wait(race.signature, "confirmed", last_valid_block_height)
+                        race.landed, race.err, race.expired = status.landed, status.err, status.expired
+                    if not race.landed:
+                        raise Exception(f"{label} expired without landing")
+
+                signature = race.signature
+                if race.err:
+                    logger.warning(f"{label} FAILED on-chain via {race.route} | Tx: https://solscan.io/tx/{signature}")
+                    raise Exception(f"{label} failed on-chain: {race.err}")
+
+                logger.info(f"{label} SUCCESS via {race.route} → https://solscan.io/tx/{signature}")
+                execute_data = race.acks["ultra"].detail if "ultra" in race.acks else {}
+
+                # Log success details
+                input_amount_result = execute_data.get("inputAmountResult", order_data["inAmount"])
+                output_amount_result = execute_data.get("outputAmountResult", order_data["outAmount"])
+                
+                # 🔥 TRACK FEE IF APPLIED
+                if fee_applied:
+                    # Store fee info for analytics
+                    await store_fee_info(
+                        wallet_address=user.wallet_address,
+                        tx_signature=signature,
+                        fee_amount=fee_amount,
+                        fee_mint=order_data.get("feeMint", "Unknown"),  # This is correct
+                        trade_type=label,
+                        input_amount=int(input_amount_result),
+                        output_amount=int(output_amount_result)
+                    )
+                
+                logger.info(f"{label} executed: {int(input_amount_result)/1e9:.4f} SOL → {int(output_amount_result)} tokens | 1% Fee: {'✅' if fee_applied else '❌'}")
+                
+                return {
+                    "raw_tx_base64": signed_transaction_base64,
+                    "signature": signature,
+                    "out_amount": int(output_amount_result),
+                    "in_amount": int(input_amount_result),
+                    "estimated_referral_fee": fee_amount,
+                    "fee_applied": fee_applied,
+                    "fee_percentage": fee_percentage,
+                    "fee_bps": fee_bps if fee_applied else 0,
+                    "fee_mint": order_data.get("feeMint", "") if fee_applied else "",  # Add this line
+                    "method": "jup_ultra_referral",
+                    "route": race.route,
+                    "routes_raced": race.raced,
+                    "jito_guaranteed": race.route == "jito",
+                    "bundle_id": race.acks["jito"].detail.get("bundle_id") if "jito" in race.acks else None,
+                    "status": "success",
+                    "request_id": order_data["requestId"],
+                    "referral_used": fee_applied
+                }
+
         except Exception as e:
             error_str = str(e)
             
@@ -2858,7 +2938,7 @@ async def get_on_chain_data_for_strategy(mint: str, timeout_seconds: int = 3) ->
         # Use asyncio.gather to fetch both in parallel with timeout
         async with asyncio.timeout(timeout_seconds):
             jupiter_task = get_jupiter_token_data(mint)  # Use your existing function
-            dexscreener_task = fetch_dexscreener_with_retry(mint)  # Use your existing function
+            dexscreener_task = fetch_dexscreener_with_retry(mint, timeout=timeout_seconds)  # Use your existing function
             
             # Execute both
             results = await asyncio.gather(
@@ -3073,14 +3153,14 @@ def calculate_sniper_strategy_from_data(jupiter_data: dict, dexscreener_data: di
 
 
 
-async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, websocket_manager: ConnectionManager):
-    """Execute immediate buy with data-driven strategy using your existing APIs"""
+async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, websocket_manager: ConnectionManager) -> bool:
+    """Execute immediate buy with data-driven strategy using your existing APIs. Returns True if it bought."""
     mint = token.mint_address
     lock_key = f"buy_lock:{user.wallet_address}:{mint}"
     
     if await redis_client.get(lock_key):
         logger.info(f"Buy locked for {mint} – skipping")
-        return
+        return False
     
     await redis_client.setex(lock_key, 60, "1")
     
@@ -3093,7 +3173,7 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
             user=user,
             mint=mint,
             create_if_missing=True,
-            priority_fee=5000   # Use moderate priority fee
+            priority_fee=fee_oracle.priority_fee("medium", fallback=5000)
         )
         
         if not ata_address:
@@ -3105,7 +3185,7 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
         fee_decision = await fee_manager.calculate_fee_decision(
             user=user,
             trade_type="BUY",
-            amount_sol=user.buy_amount_sol,
+            amount_sol=user.sniper_buy_amount_sol,
             mint=mint,
             pnl_pct=0.0  # No PnL for buy
         )
@@ -3116,15 +3196,15 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
             mint=mint,
             trade_type="BUY"
         )
-        await redis_client.setex(fee_key, 600, json.dumps({
+        fee_manager.record_decision(fee_key, {
             **fee_decision,
             "timestamp": datetime.utcnow().isoformat()
-        }))
+        }, ttl=600)
         
         # Track trade for analytics
         await fee_manager.track_trade_for_fee_optimization(
             user_wallet=user.wallet_address,
-            amount_sol=user.buy_amount_sol,
+            amount_sol=user.sniper_buy_amount_sol,
             mint=mint,
             trade_type="BUY"
         )
@@ -3146,7 +3226,7 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
         
         # STEP 3: Execute initial buy
         token_symbol = token.token_symbol or mint[:8]
-        total_sol = user.buy_amount_sol
+        total_sol = user.sniper_buy_amount_sol
         initial_buy_sol = total_sol * (strategy["initial_buy_pct"] / 100)
         
         # Send strategy info to user
@@ -3158,12 +3238,11 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
         }), user.wallet_address)
         
         # Execute initial buy
-        amount_lamports = int(initial_buy_sol * 1_000_000_000)
-        slippage_bps = min(int(strategy["slippage_bps"]), 5000)
+        amount_lamports, slippage_bps = initial_buy_terms(user, strategy)  # Same terms warm_initial_buy orders with
         
         # Properly get decimals
         try:
-            jupiter_data_result = await get_jupiter_token_data(mint)
+            jupiter_data_result = await get_jupiter_token_metadata(mint)
             if jupiter_data_result and "decimals" in jupiter_data_result:
                 decimals = int(jupiter_data_result["decimals"])
                 logger.info(f"📊 Using decimals from Jupiter: {decimals}")
@@ -3238,7 +3317,7 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
         
         # If no USD price from API, calculate from SOL price
         if estimated_entry_price_usd <= 0:
-            sol_price = await get_jupiter_token_data(settings.SOL_MINT)
+            sol_price = await sol_price_ticker.get()
             estimated_entry_price_usd = actual_entry_price_sol * sol_price
         
         logger.info(f"📊 Entry price: {actual_entry_price_sol:.10f} SOL/token ≈ ${estimated_entry_price_usd:.10f}")
@@ -3265,7 +3344,7 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
             first_tp_level = strategy["take_profit_levels"][0]["profit_pct"]
         else:
             # Fallback to user's setting or default
-            first_tp_level = user.sell_take_profit_pct or 50.0
+            first_tp_level = user.sniper_sell_take_profit_pct or 50.0
         
         trade = Trade(
             user_wallet_address=user.wallet_address,
@@ -3317,23 +3396,10 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
         # STEP 6: Start advanced monitoring
         logger.info(f"🎯 Starting advanced monitor for {trade.id} with {strategy['strategy_type']} strategy")
         
-        # With THIS (explicit launch):
-        advanced_monitor_task = asyncio.create_task(
-            start_advanced_monitor_for_trade(
-                trade=trade,
-                user=user,
-                entry_price_usd=estimated_entry_price_usd,
-                token_decimals=decimals,
-                token_amount=output_tokens,
-                total_sol_allocated=total_sol,
-                initial_buy_sol=initial_buy_sol,
-                strategy=strategy,
-                websocket_manager=websocket_manager
-            )
-        )
-
-        # Store for management
-        monitor_tasks[trade.id] = advanced_monitor_task
+        # Strategy rules are rebuilt from strategy_data; no per-trade task
+        position = MonitoredPosition.from_trade(trade, user)
+        position.entry_price_usd = estimated_entry_price_usd
+        monitor_engine.add(position)
         logger.info(f"🔥 ADVANCED MONITOR LAUNCHED for {trade.id}")
 
         await websocket_manager.send_personal_message(json.dumps({
@@ -3342,6 +3408,7 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
             "message": f"✅ Initial snipe successful! {output_tokens:.2f} tokens purchased. Strategy: {strategy['strategy_type']}",
             "timestamp": datetime.utcnow().isoformat()
         }), user.wallet_address)
+        return True
         
     except Exception as e:
         logger.error(f"🚨 IMMEDIATE BUY FAILED for {mint}: {e}", exc_info=True)
@@ -3363,686 +3430,228 @@ async def execute_user_buy(user: User, token: TokenMetadata, db: AsyncSession, w
         await redis_client.delete(lock_key)
 
 
-async def get_tp_state(trade_id: int) -> Dict:
-    """Get TP state from Redis (survives bot restarts)"""
-    key = f"tp_state:{trade_id}"
-    state_json = await redis_client.get(key)
-    if state_json:
-        return json.loads(state_json)
+async def _load_monitor_user(wallet_address: str) -> Optional[User]:
+    """User for a monitor action - the roster's snapshot while the bot is armed, else one DB read"""
+    sniper = sniper_roster.get(wallet_address)
+    if sniper:
+        return sniper.user
     
-    # Default state
-    return {
-        "triggered": {},
-        "highest_pnl": 0,
-        "scale_in_triggered": False
-    }
-
-async def save_tp_state(trade_id: int, state: Dict):
-    """Save TP state to Redis"""
-    key = f"tp_state:{trade_id}"
-    await redis_client.setex(key, 86400, json.dumps(state))  # 24h expiry
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User).where(User.wallet_address == wallet_address))
+        return result.scalar_one_or_none()
 
 
-
-async def start_advanced_monitor_for_trade(
-    trade: Trade, 
-    user: User, 
-    entry_price_usd: float, 
-    token_decimals: int, 
-    token_amount: float,
-    total_sol_allocated: float, 
-    initial_buy_sol: float,
-    strategy: dict, 
-    websocket_manager: ConnectionManager
-):
+async def execute_monitor_action(action: MonitorAction):
     """
-    🔥 FIXED ADVANCED MONITOR with proper PnL calculation and DCA triggering
+    Execute an action fired by monitor_engine (sell / DCA / scale-in).
+    This is the only place the monitor touches the DB: one short session per transition.
     """
+    position = action.position
+    user = await _load_monitor_user(position.wallet_address)
+    if not user:
+        logger.error(f"User {position.wallet_address[:8]} not found for trade {position.trade_id}, dropping position")
+        position.closed = True
+        return
+    
+    if action.kind == "sell":
+        await _execute_monitor_sell(user, action)
+    else:
+        await _execute_monitor_buy(user, action)
+
+
+async def _execute_monitor_sell(user: User, action: MonitorAction):
+    position = action.position
+    mint = position.mint
+    
+    sell_tokens = position.token_amount if action.is_full_exit else position.token_amount * (action.sell_pct / 100)
+    sell_lamports = int(sell_tokens * (10 ** position.token_decimals))
+    if sell_lamports <= 0:
+        position.closed = action.is_full_exit
+        return
     
-    # Create a database session for this entire monitor
-    db = AsyncSessionLocal()
+    logger.info(f"🔄 {action.reason} for {mint[:8]} (trade {position.trade_id}): selling {action.sell_pct:g}% at PnL {action.pnl:.2f}%")
     
     try:
-        mint = trade.mint_address
-        trade_id = trade.id
-        
-        logger.info(f"📋 Verifying ATA for {mint[:8]}...")
-        try:
-            ata_address = await TokenAccountManager.get_or_create_ata(
+        if action.jito:
+            swap = await execute_jito_optimized_sell(
                 user=user,
                 mint=mint,
-                create_if_missing=False,
-                priority_fee=1000
+                amount_lamports=sell_lamports,
+                label=f"{action.reason}_SELL",
+                slippage_bps=action.slippage_bps,
+            )
+        else:
+            swap = await execute_jupiter_swap(
+                user=user,
+                input_mint=mint,
+                output_mint=settings.SOL_MINT,
+                amount=sell_lamports,
+                slippage_bps=action.slippage_bps,
+                label=f"{action.reason}_SELL",
             )
-            if ata_address:
-                logger.info(f"✅ ATA verified for {mint[:8]}: {ata_address[:8]}...")
-        except Exception as e:
-            logger.warning(f"⚠️ ATA check warning: {e}")
-        
-        # Refresh trade object within our session
-        trade_result = await db.execute(select(Trade).where(Trade.id == trade_id))
-        db_trade = trade_result.scalar_one_or_none()
-        
-        if not db_trade:
-            logger.error(f"Trade {trade_id} not found in database")
-            return
-        
-        trade = db_trade  # Use the session-bound trade object
-        
-        # Parse strategy data
-        dca_levels = strategy.get("dca_buy_levels", [])
-        tp_levels = strategy.get("take_profit_levels", [])
-        stop_loss_pct = strategy.get("stop_loss", 20.0)
-        initial_timeout_minutes = strategy.get("timeout_minutes", 10)
-        
-        remaining_sol = total_sol_allocated - initial_buy_sol
-        current_token_amount = token_amount
-        
-        # Strategy config
-        SCALE_IN_ON_PUMP = True
-        USE_TRAILING_STOP = True
-        DYNAMIC_TIMEOUT = True
-        
-        # Track state - FIXED: Use string keys for DCA
-        dca_triggered = {}
-        if dca_levels:
-            for level in dca_levels:
-                key = f"{level['price_pct']}"  # String key like "-10"
-                dca_triggered[key] = False
-            logger.info(f"DCA levels configured: {dca_levels}")
-            logger.info(f"DCA triggered state: {dca_triggered}")
-        
-        # Get TP state from Redis
-        tp_state = await get_tp_state(trade_id)
-        tp_triggered = tp_state.get("triggered", {})
-        if not tp_triggered:
-            tp_triggered = {level["profit_pct"]: False for level in tp_levels}
-        
-        scale_in_triggered = tp_state.get("scale_in_triggered", False)
-        highest_pnl = tp_state.get("highest_pnl", 0)
-        
-        # Trailing stop variables
-        trailing_stop_triggered = False
-        trailing_stop_distance = 15.0
-        
-        # Momentum tracking
-        price_history = []
-        volume_spike_detected = False
-        
-        logger.info(f"🚀 ADVANCED MONITOR STARTED for {mint[:8]}")
-        logger.info(f"  Strategy: {strategy['strategy_type']}")
-        logger.info(f"  Scale IN on pump: {'✅' if SCALE_IN_ON_PUMP else '❌'}")
-        logger.info(f"  Trailing stop: {'✅' if USE_TRAILING_STOP else '❌'}")
-        logger.info(f"  Remaining SOL: {remaining_sol:.4f}")
-        logger.info(f"  DCA levels: {len(dca_levels)}")
-        logger.info(f"  TP levels: {len(tp_levels)}")
-        
-        iteration = 0
-        start_time = datetime.utcnow()
-        current_timeout_minutes = initial_timeout_minutes
-        
-        while True:
-            iteration += 1
-            current_time = datetime.utcnow()
-            elapsed_seconds = (current_time - start_time).total_seconds()
-            
-            # ============================================================
-            # 1. GET CURRENT MARKET DATA WITH DEBUGGING
-            # ============================================================
-            dex_data = await fetch_dexscreener_with_retry(mint)
-            if not dex_data or not dex_data.get("priceUsd"):
-                logger.warning(f"⚠️ No price data for {mint[:8]} - retrying in 3s")
-                await asyncio.sleep(3)
-                continue
-            
-            # DEBUG: Log price source
-            if iteration % 10 == 0:
-                source = dex_data.get("_source", "unknown")
-                if dex_data.get("_stale"):
-                    stale_age = dex_data.get("_stale_seconds", 0)
-                    logger.debug(f"📊 Using stale price ({stale_age:.0f}s old) from {source}")
-                else:
-                    logger.debug(f"📊 Fresh price from {source}")
-            
-            # ============================================================
-            # 2. CORRECT PnL CALCULATION WITH DEBUGGING
-            # ============================================================
-            current_price_usd = float(dex_data["priceUsd"])
-            
-            # DEBUG: Show prices
-            if iteration <= 5 or iteration % 20 == 0:  # First 5 iterations and every 20th
-                logger.debug(f"=== PRICE DEBUG ===")
-                logger.debug(f"Entry price (USD): ${entry_price_usd:.10f}")
-                logger.debug(f"Current price (USD): ${current_price_usd:.10f}")
-                logger.debug(f"Price source: {dex_data.get('_source', 'unknown')}")
-            
-            # FIXED PnL calculation
-            if entry_price_usd > 0 and current_price_usd > 0:
-                current_pnl = ((current_price_usd / entry_price_usd) - 1) * 100
-                
-                # DEBUG: Show calculation
-                if iteration <= 3:
-                    logger.debug(f"PnL CALC: ({current_price_usd:.10f}/{entry_price_usd:.10f} - 1) * 100 = {current_pnl:.2f}%")
-            else:
-                current_pnl = 0
-                logger.warning(f"Invalid prices: entry=${entry_price_usd}, current=${current_price_usd}")
-            
-            # Get SOL price for display only
-            current_price_sol = 0
-            if dex_data.get("priceSOL"):
-                current_price_sol = float(dex_data["priceSOL"])
-            else:
-                sol_price = await get_jupiter_token_data(settings.SOL_MINT)
-                if sol_price > 0:
-                    current_price_sol = current_price_usd / sol_price
-            
-            # SOL PnL for display only
-            current_pnl_sol = 0
-            if trade.price_sol_at_trade and current_price_sol > 0:
-                current_pnl_sol = ((current_price_sol / trade.price_sol_at_trade) - 1) * 100
-            
-            # Update highest PnL
-            if current_pnl > highest_pnl:
-                highest_pnl = current_pnl
-                logger.debug(f"📈 New high: {highest_pnl:.1f}%")
-                tp_state["highest_pnl"] = highest_pnl
-                await save_tp_state(trade_id, tp_state)
-            
-            # Update price history
-            price_history.append(current_price_usd)
-            if len(price_history) > 5:
-                price_history.pop(0)
-            
-            # ============================================================
-            # 3. DYNAMIC TIMEOUT ADJUSTMENT
-            # ============================================================
-            if DYNAMIC_TIMEOUT:
-                if current_pnl > 50 and elapsed_seconds > 300:
-                    current_timeout_minutes = max(initial_timeout_minutes, 30)
-                    logger.info(f"⏱️ Extended timeout to {current_timeout_minutes}min")
-            
-            # ============================================================
-            # 4. CHECK TIMEOUT
-            # ============================================================
-            if elapsed_seconds >= current_timeout_minutes * 60:
-                tp_levels_hit = sum(1 for v in tp_triggered.values() if v)
-                
-                if tp_levels_hit > 0 or current_pnl > 5:
-                    current_timeout_minutes += 5
-                    logger.info(f"⏱️ Extending timeout (TP hits: {tp_levels_hit}, PnL: {current_pnl:.1f}%)")
-                    await save_tp_state(trade_id, tp_state)
-                    continue
-                
-                logger.info(f"⏰ Strategy timeout reached for {mint[:8]} (no TP hits, PnL: {current_pnl:.1f}%)")
-                
-                try:
-                    sell_lamports = int(current_token_amount * (10 ** token_decimals))
-                    
-                    swap = await execute_jito_optimized_sell(
-                        user=user,
-                        mint=mint,
-                        amount_lamports=sell_lamports,
-                        label="TIMEOUT_SELL",
-                        slippage_bps=2000, 
-                    )
-                    
-                    trade = await db.get(Trade, trade_id)
-                    if trade:
-                        trade.sell_timestamp = datetime.utcnow()
-                        trade.sell_reason = "Timeout"
-                        trade.sell_tx_hash = swap.get("signature")
-                        trade.price_usd_at_trade = current_price_usd
-                        trade.profit_usd = (current_price_usd - entry_price_usd) * current_token_amount
-                        trade.solscan_sell_url = f"https://solscan.io/tx/{swap.get('signature')}"
-                        
-                        if swap.get("fee_applied"):
-                            trade.fee_applied = True
-                            trade.fee_amount = swap.get("estimated_referral_fee", 0)
-                            trade.fee_percentage = swap.get("fee_percentage", 0.0)
-                            trade.fee_bps = swap.get("fee_bps", None)
-                            trade.fee_mint = swap.get("fee_mint", None)
-                            trade.fee_collected_at = datetime.utcnow()
-                        
-                        await db.commit()
-                    
-                    await redis_client.delete(f"tp_state:{trade_id}")
-                    
-                    await websocket_manager.send_personal_message(json.dumps({
-                        "type": "log",
-                        "log_type": "info",
-                        "message": f"⏰ Timeout: Sold {mint[:8]} after {current_timeout_minutes}min | PnL: {current_pnl:.1f}%",
-                        "timestamp": current_time.isoformat()
-                    }), user.wallet_address)
-                    
-                except Exception as e:
-                    logger.error(f"Timeout sell failed: {e}")
-                    await websocket_manager.send_personal_message(json.dumps({
-                        "type": "log",
-                        "log_type": "error",
-                        "message": f"❌ Timeout sell failed: {str(e)[:100]}",
-                        "timestamp": current_time.isoformat()
-                    }), user.wallet_address)
-                
-                break
-            
-            # ============================================================
-            # 5. MOMENTUM & VOLUME ANALYSIS
-            # ============================================================
-            try:
-                buys_5m = dex_data.get("txns", {}).get("m5", {}).get("buys", 0)
-                sells_5m = dex_data.get("txns", {}).get("m5", {}).get("sells", 0)
-                
-                if sells_5m > buys_5m * 3 and current_pnl > 10:
-                    logger.warning(f"🚨 HEAVY SELLING: {sells_5m}s vs {buys_5m}b")
-                    
-                    if current_pnl > 25 and not scale_in_triggered:
-                        sell_percentage = 30
-                        sell_token_amount = current_token_amount * (sell_percentage / 100)
-                        
-                        try:
-                            sell_lamports = int(sell_token_amount * (10 ** token_decimals))
-                            await execute_jupiter_swap(
-                                user=user,
-                                input_mint=mint,
-                                output_mint=settings.SOL_MINT,
-                                amount=sell_lamports,
-                                slippage_bps=2000,
-                                label="HEAVY_SELL_EXIT",
-                            )
-                            
-                            current_token_amount -= sell_token_amount
-                            trade.amount_tokens = current_token_amount
-                            await db.commit()
-                            
-                            await websocket_manager.send_personal_message(json.dumps({
-                                "type": "log",
-                                "log_type": "warning",
-                                "message": f"🚨 Heavy selling! Sold {sell_percentage}% to protect profits.",
-                                "timestamp": current_time.isoformat()
-                            }), user.wallet_address)
-                            
-                        except Exception as e:
-                            logger.error(f"Heavy sell exit failed: {e}")
-                
-                if buys_5m > 10 and not volume_spike_detected:
-                    volume_spike_detected = True
-                    logger.info(f"📊 Volume spike: {buys_5m} buys in 5m")
-                    
-            except Exception as e:
-                logger.debug(f"Momentum analysis failed: {e}")
-            
-            # ============================================================
-            # 6. 🔥 DCA BUY ON DIPS (FIXED IMPLEMENTATION)
-            # ============================================================
-            if dca_levels and remaining_sol > 0.001:
-                for dca_level in dca_levels:
-                    target_drop_pct = dca_level["price_pct"]  # e.g., -10
-                    buy_pct = dca_level["buy_pct"]
-                    level_key = f"{target_drop_pct}"
-                    
-                    # Check if DCA already triggered for this level
-                    if not dca_triggered.get(level_key, False):
-                        # DCA triggers when price drops TO or BELOW target percentage
-                        # current_pnl is negative when price drops
-                        # For -10% DCA, trigger when current_pnl <= -10
-                        if current_pnl <= target_drop_pct:
-                            dca_sol = remaining_sol * (buy_pct / 100)
-                            
-                            if dca_sol > 0.001:
-                                logger.info(f"📉 DCA TRIGGERED! Price dropped {current_pnl:.1f}% (target: {target_drop_pct}%)")
-                                
-                                try:
-                                    dca_lamports = int(dca_sol * 1_000_000_000)
-                                    dca_swap = await execute_jupiter_swap(
-                                        user=user,
-                                        input_mint=settings.SOL_MINT,
-                                        output_mint=mint,
-                                        amount=dca_lamports,
-                                        slippage_bps=2500,
-                                        label=f"DCA_{abs(target_drop_pct)}%_DROP",
-                                    )
-                                    
-                                    dca_tokens = dca_swap["out_amount"] / (10 ** token_decimals)
-                                    current_token_amount += dca_tokens
-                                    remaining_sol -= dca_sol
-                                    dca_triggered[level_key] = True
-                                    
-                                    # Update database
-                                    trade.amount_tokens = current_token_amount
-                                    await db.commit()
-                                    
-                                    logger.info(f"✅ DCA bought {dca_tokens:.2f} tokens at {current_pnl:.1f}% drop")
-                                    
-                                    await websocket_manager.send_personal_message(json.dumps({
-                                        "type": "log",
-                                        "log_type": "info",
-                                        "message": f"📉 DCA: Bought {dca_tokens:.2f} tokens at {current_pnl:.1f}% drop",
-                                        "timestamp": current_time.isoformat()
-                                    }), user.wallet_address)
-                                    
-                                except Exception as e:
-                                    logger.error(f"DCA buy failed: {e}")
-            
-            # ============================================================
-            # 7. 🔥 SCALE IN ON PUMP STRATEGY
-            # ============================================================
-            if SCALE_IN_ON_PUMP and remaining_sol > 0.001 and not scale_in_triggered:
-                scale_in_levels = [
-                    {"profit_pct": 25, "buy_pct": 30},
-                    {"profit_pct": 50, "buy_pct": 30},
-                    {"profit_pct": 100, "buy_pct": 20},
-                ]
-                
-                for level in scale_in_levels:
-                    profit_pct = level["profit_pct"]
-                    buy_pct = level["buy_pct"]
-                    
-                    if (current_pnl >= profit_pct and 
-                        current_pnl < profit_pct * 1.2):
-                        
-                        scale_in_sol = remaining_sol * (buy_pct / 100)
-                        
-                        if scale_in_sol > 0.001:
-                            logger.info(f"🔥 SCALE IN at {profit_pct}% profit: {scale_in_sol:.4f} SOL")
-                            
-                            try:
-                                scale_lamports = int(scale_in_sol * 1_000_000_000)
-                                scale_swap = await execute_jupiter_swap(
-                                    user=user,
-                                    input_mint=settings.SOL_MINT,
-                                    output_mint=mint,
-                                    amount=scale_lamports,
-                                    slippage_bps=1500,
-                                    label=f"SCALE_IN_{profit_pct}",
-                                )
-                                
-                                scale_tokens = scale_swap["out_amount"] / (10 ** token_decimals)
-                                current_token_amount += scale_tokens
-                                remaining_sol -= scale_in_sol
-                                scale_in_triggered = True
-                                
-                                tp_state["scale_in_triggered"] = True
-                                await save_tp_state(trade_id, tp_state)
-                                
-                                trade.amount_tokens = current_token_amount
-                                await db.commit()
-                                
-                                logger.info(f"✅ Scale in successful: +{scale_tokens:.2f} tokens")
-                                
-                                await websocket_manager.send_personal_message(json.dumps({
-                                    "type": "log",
-                                    "log_type": "info",
-                                    "message": f"🔥 Scaled IN at {profit_pct}% profit. New total: {current_token_amount:.2f} tokens",
-                                    "timestamp": current_time.isoformat()
-                                }), user.wallet_address)
-                                
-                                # Reset scale-in after 30 seconds
-                                async def reset_scale_in():
-                                    await asyncio.sleep(30)
-                                    nonlocal scale_in_triggered
-                                    scale_in_triggered = False
-                                    tp_state["scale_in_triggered"] = False
-                                    await save_tp_state(trade_id, tp_state)
-                                    logger.info(f"🔁 Scale-in cooldown ended for {mint[:8]}")
-                                
-                                asyncio.create_task(reset_scale_in())
-                                
-                            except Exception as e:
-                                logger.error(f"Scale in failed: {e}")
-            
-            # ============================================================
-            # 8. TAKE PROFIT STRATEGY
-            # ============================================================
-            adjusted_tp_levels = []
-            
-            if strategy["strategy_type"] == "new_launch":
-                adjusted_tp_levels = [
-                    {"profit_pct": 25, "sell_pct": 40},
-                    {"profit_pct": 50, "sell_pct": 30},
-                    {"profit_pct": 100, "sell_pct": 20},
-                    {"profit_pct": 200, "sell_pct": 10},
-                ]
-            else:
-                adjusted_tp_levels = tp_levels
-            
-            for tp_level in adjusted_tp_levels:
-                profit_pct = tp_level["profit_pct"]
-                sell_pct = tp_level["sell_pct"]
-                
-                if not tp_triggered.get(profit_pct, False) and current_pnl >= profit_pct:
-                    sell_token_amount = current_token_amount * (sell_pct / 100)
-                    
-                    estimated_sol_value = current_price_sol * sell_token_amount
-                    
-                    fee_decision = await fee_manager.calculate_fee_decision(
-                        user=user,
-                        trade_type=f"TP_{profit_pct}",
-                        amount_sol=estimated_sol_value,
-                        mint=mint,
-                        pnl_pct=current_pnl
-                    )
-                    
-                    fee_key = fee_manager.get_fee_decision_key(
-                        user_wallet=user.wallet_address,
-                        mint=mint,
-                        trade_type=f"TP_{profit_pct}"
-                    )
-                    await redis_client.setex(fee_key, 300, json.dumps({
-                        **fee_decision,
-                        "pnl_at_sell": current_pnl,
-                        "estimated_sol": estimated_sol_value,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }))
-                    
-                    tp_triggered[profit_pct] = True
-                    tp_state["triggered"] = tp_triggered
-                    await save_tp_state(trade_id, tp_state)
-                                        
-                    if sell_token_amount > 0:
-                        logger.info(f"🎯 TP {profit_pct}% HIT: Selling {sell_pct}%")
-                            
-                        sell_lamports = int(sell_token_amount * (10 ** token_decimals))
-                        
-                        try:
-                            tp_swap = await execute_jito_optimized_sell(
-                                user=user,
-                                mint=mint,
-                                amount_lamports=sell_lamports,
-                                label=f"TP_{profit_pct}_SELL",
-                                slippage_bps=1000,
-                            )
-                            
-                            current_token_amount -= sell_token_amount
-                            trade.amount_tokens = current_token_amount
-                            await db.commit()
-                            
-                            profit_usd = (current_price_usd - entry_price_usd) * sell_token_amount
-                            
-                            logger.info(f"✅ TP {profit_pct}%: Sold {sell_pct}% for ${profit_usd:.4f}")
-                            
-                            await websocket_manager.send_personal_message(json.dumps({
-                                "type": "log",
-                                "log_type": "success",
-                                "message": f"💰 TP {profit_pct}%: Sold {sell_pct}% for ${profit_usd:.2f} profit",
-                                "timestamp": current_time.isoformat()
-                            }), user.wallet_address)
-                            
-                            if current_token_amount <= 0:
-                                trade.sell_timestamp = datetime.utcnow()
-                                trade.sell_reason = f"TP_{profit_pct}"
-                                trade.sell_tx_hash = tp_swap.get("signature")
-                                trade.price_usd_at_trade = current_price_usd
-                                trade.profit_usd = (current_price_usd - entry_price_usd) * token_amount
-                                trade.solscan_sell_url = f"https://solscan.io/tx/{tp_swap.get('signature')}"
-                                await db.commit()
-                                
-                                await redis_client.delete(f"tp_state:{trade_id}")
-                                
-                                logger.info(f"✅ All tokens sold via TP for {mint[:8]}")
-                                return
-                                
-                        except Exception as e:
-                            logger.error(f"TP sell failed: {e}")
-            
-            # ============================================================
-            # 9. TRAILING STOP LOSS
-            # ============================================================
-            if USE_TRAILING_STOP and highest_pnl > 30:
-                trailing_stop_level = highest_pnl - trailing_stop_distance
-                
-                if current_pnl <= trailing_stop_level and not trailing_stop_triggered:
-                    logger.info(f"🛑 TRAILING STOP triggered: {current_pnl:.1f}% ≤ {trailing_stop_level:.1f}%")
-                    trailing_stop_triggered = True
-                    
-                    sell_lamports = int(current_token_amount * (10 ** token_decimals))
-                    
-                    try:
-                        sl_swap = await execute_jito_optimized_sell(
-                            user=user,
-                            mint=mint,
-                            amount_lamports=sell_lamports,
-                            label="TRAILING_STOP_SELL",
-                            slippage_bps=2000,
-                        )
-                        
-                        profit_usd = (current_price_usd - entry_price_usd) * current_token_amount
-                        
-                        trade.sell_timestamp = datetime.utcnow()
-                        trade.sell_reason = "Trailing Stop"
-                        trade.sell_tx_hash = sl_swap.get("signature")
-                        trade.price_usd_at_trade = current_price_usd
-                        trade.profit_usd = profit_usd
-                        trade.solscan_sell_url = f"https://solscan.io/tx/{sl_swap.get('signature')}"
-                        await db.commit()
-                        
-                        await redis_client.delete(f"tp_state:{trade_id}")
-                        
-                        await websocket_manager.send_personal_message(json.dumps({
-                            "type": "log",
-                            "log_type": "warning",
-                            "message": f"🛑 Trailing stop: Sold all at {current_pnl:.1f}% (from high: {highest_pnl:.1f}%). Profit: ${profit_usd:.2f}",
-                            "timestamp": current_time.isoformat()
-                        }), user.wallet_address)
-                        
-                        logger.info(f"✅ Trailing stop executed: ${profit_usd:.2f} profit")
-                        break
-                        
-                    except Exception as e:
-                        logger.error(f"Trailing stop sell failed: {e}")
-            
-            # ============================================================
-            # 10. REGULAR STOP LOSS
-            # ============================================================
-            if current_pnl <= -stop_loss_pct:
-                logger.info(f"🛑 STOP LOSS triggered at {current_pnl:.1f}% for {mint[:8]}")
-                
-                sell_lamports = int(current_token_amount * (10 ** token_decimals))
-                
-                try:
-                    sl_swap = await execute_jupiter_swap(
-                        user=user,
-                        input_mint=mint,
-                        output_mint=settings.SOL_MINT,
-                        amount=sell_lamports,
-                        slippage_bps=2000,
-                        label="STOP_LOSS_SELL",
-                    )
-                    
-                    trade.sell_timestamp = datetime.utcnow()
-                    trade.sell_reason = "Stop Loss"
-                    trade.sell_tx_hash = sl_swap.get("signature")
-                    trade.price_usd_at_trade = current_price_usd
-                    trade.profit_usd = (current_price_usd - entry_price_usd) * current_token_amount
-                    trade.solscan_sell_url = f"https://solscan.io/tx/{sl_swap.get('signature')}"
-                    await db.commit()
-                    
-                    await redis_client.delete(f"tp_state:{trade_id}")
-                    
-                    await websocket_manager.send_personal_message(json.dumps({
-                        "type": "log",
-                        "log_type": "warning",
-                        "message": f"🛑 STOP LOSS: Sold all at {current_pnl:.1f}% loss",
-                        "timestamp": current_time.isoformat()
-                    }), user.wallet_address)
-                    
-                    logger.info(f"✅ Stop loss executed for {mint[:8]}")
-                    break
-                    
-                except Exception as e:
-                    logger.error(f"Stop loss sell failed: {e}")
-            
-            # ============================================================
-            # 11. STATUS UPDATES WITH DEBUG INFO
-            # ============================================================
-            if iteration % 5 == 0:
-                # Calculate next DCA level
-                next_dca_level = None
-                dca_levels_triggered = sum(1 for v in dca_triggered.values() if v)
-                
-                if dca_levels:
-                    for level in sorted(dca_levels, key=lambda x: x["price_pct"]):
-                        level_key = f"{level['price_pct']}"
-                        if not dca_triggered.get(level_key, False):
-                            next_dca_level = level["price_pct"]
-                            break
-                
-                status_update = {
-                    "type": "strategy_update",
-                    "mint": mint,
-                    "current_price": current_price_usd,
-                    "entry_price": entry_price_usd,
-                    "pnl_percent": round(current_pnl, 2),
-                    "pnl_usd": round(((current_price_usd - entry_price_usd) * current_token_amount), 6),
-                    "pnl_sol": round(current_pnl_sol, 2),
-                    "highest_pnl": round(highest_pnl, 2),
-                    "current_tokens": current_token_amount,
-                    "remaining_sol": remaining_sol,
-                    "tp_levels_triggered": sum(1 for v in tp_triggered.values() if v),
-                    "total_tp_levels": len(tp_triggered),
-                    "dca_levels_triggered": dca_levels_triggered,
-                    "total_dca_levels": len(dca_levels),
-                    "next_dca_level": next_dca_level,
-                    "scale_in_triggered": scale_in_triggered,
-                    "time_left": max(0, current_timeout_minutes * 60 - elapsed_seconds),
-                    "trailing_stop_active": USE_TRAILING_STOP and highest_pnl > 30,
-                    "trailing_stop_level": round(highest_pnl - trailing_stop_distance, 2) if USE_TRAILING_STOP and highest_pnl > 30 else None,
-                    "timestamp": current_time.isoformat()
-                }
-                
-                await websocket_manager.send_personal_message(json.dumps(status_update), user.wallet_address)
-                
-                # Log with DCA info
-                logger.info(
-                    f"📊 {mint[:8]}: ${current_price_usd:.10f} | "
-                    f"PnL: {current_pnl:.2f}% (High: {highest_pnl:.2f}%) | "
-                    f"TP: {sum(1 for v in tp_triggered.values() if v)}/{len(tp_triggered)} | "
-                    f"DCA: {dca_levels_triggered}/{len(dca_levels)} | "
-                    f"Time: {max(0, current_timeout_minutes * 60 - elapsed_seconds):.0f}s"
-                )
-            
-            # Wait before next check
-            await asyncio.sleep(2)
-        
-        logger.info(f"🛑 Advanced monitor completed for {mint[:8]} after {iteration} iterations")
-        
     except Exception as e:
-        logger.error(f"Advanced monitor failed for {trade.mint_address}: {e}", exc_info=True)
         await websocket_manager.send_personal_message(json.dumps({
             "type": "log",
             "log_type": "error",
-            "message": f"❌ Advanced monitor failed: {str(e)[:100]}",
+            "message": f"❌ {action.reason} sell failed: {str(e)[:100]}",
             "timestamp": datetime.utcnow().isoformat()
         }), user.wallet_address)
+        raise
     
-    finally:
-        # Clean up task reference
-        if trade_id in monitor_tasks:
-            del monitor_tasks[trade_id]
+    # Book this leg
+    position.token_amount = max(0.0, position.token_amount - sell_tokens)
+    if action.price_usd > 0:  # A timeout sell can fire before the first price (restarted position)
+        position.realized_usd += (action.price_usd - position.entry_price_usd) * sell_tokens
+    if action.price_sol and position.entry_price_sol:
+        position.realized_sol += (action.price_sol - position.entry_price_sol) * sell_tokens
+    full_exit = action.is_full_exit or position.token_amount <= 0
+    signature = swap.get("signature")
+    
+    async with AsyncSessionLocal() as db:
+        trade = await db.get(Trade, position.trade_id)
+        if trade:
+            if full_exit:
+                trade.sell_timestamp = datetime.utcnow()
+                trade.sell_reason = action.reason
+                trade.sell_tx_hash = signature
+                if action.price_usd > 0:
+                    trade.price_usd_at_trade = action.price_usd
+                trade.solscan_sell_url = f"https://solscan.io/tx/{signature}"
+            else:
+                trade.amount_tokens = position.token_amount
+                trade.sell_reason = f"{action.reason} (Partial)"
+            trade.profit_usd = position.realized_usd
+            if position.realized_sol:
+                trade.profit_sol = position.realized_sol
+            
+            # Store fee info if applied
+            if swap.get("fee_applied"):
+                trade.fee_applied = True
+                trade.fee_amount = swap.get("estimated_referral_fee", 0)
+                trade.fee_percentage = swap.get("fee_percentage", 0.0)
+                trade.fee_bps = swap.get("fee_bps", None)
+                trade.fee_mint = swap.get("fee_mint", None)
+                trade.fee_collected_at = datetime.utcnow()
             
-        # CRITICAL: Close session
-        await db.close()
+            await db.commit()
+    
+    if full_exit:
+        position.closed = True
+    
+    message = f"✅ {action.reason}: Sold {action.sell_pct:g}% of {position.symbol} | PnL: {action.pnl:.2f}% | Profit: ${position.realized_usd:.4f}"
+    if not full_exit:
+        message += f" | Remaining: {position.token_amount:.2f} tokens"
+    await websocket_manager.send_personal_message(json.dumps({
+        "type": "log",
+        "log_type": "success" if action.pnl >= 0 else "warning",
+        "message": message,
+        "timestamp": datetime.utcnow().isoformat()
+    }), user.wallet_address)
+    
+    if full_exit:
+        await websocket_manager.send_personal_message(json.dumps({
+            "type": "trade_instruction",
+            "action": "sell",
+            "mint": mint,
+            "reason": action.reason,
+            "pnl_pct": round(action.pnl, 2),
+            "profit_usd": position.realized_usd,
+            "profit_sol": position.realized_sol,
+            "entry_price_sol": position.entry_price_sol,
+            "exit_price_sol": action.price_sol,
+            "signature": signature,
+            "solscan_url": f"https://solscan.io/tx/{signature}"
+        }), user.wallet_address)
+    
+    logger.info(f"✅ {action.reason} SELL COMPLETED for {mint[:8]} | PnL: {action.pnl:.2f}% | Profit: ${position.realized_usd:.4f}")
 
 
+async def _execute_monitor_buy(user: User, action: MonitorAction):
+    position = action.position
+    mint = position.mint
+    
+    logger.info(f"{'📉' if action.kind == 'dca_buy' else '🔥'} {action.reason} for {mint[:8]}: {action.buy_sol:.4f} SOL at PnL {action.pnl:.1f}%")
+    
+    swap = await execute_jupiter_swap(
+        user=user,
+        input_mint=settings.SOL_MINT,
+        output_mint=mint,
+        amount=int(action.buy_sol * 1_000_000_000),
+        slippage_bps=action.slippage_bps,
+        label=action.reason,
+    )
+    
+    bought_tokens = swap["out_amount"] / (10 ** position.token_decimals)
+    position.token_amount += bought_tokens
+    position.remaining_sol = max(0.0, position.remaining_sol - action.buy_sol)
+    
+    async with AsyncSessionLocal() as db:
+        trade = await db.get(Trade, position.trade_id)
+        if trade:
+            trade.amount_tokens = position.token_amount
+            if trade.strategy_data:
+                strategy_data = json.loads(trade.strategy_data)
+                strategy_data["remaining_sol"] = position.remaining_sol
+                trade.strategy_data = json.dumps(strategy_data)
+            await db.commit()
+    
+    if action.kind == "scale_in":
+        message = f"🔥 Scaled IN at {action.level:g}% profit. New total: {position.token_amount:.2f} tokens"
+    else:
+        message = f"📉 DCA: Bought {bought_tokens:.2f} tokens at {action.pnl:.1f}% drop"
+    
+    await websocket_manager.send_personal_message(json.dumps({
+        "type": "log",
+        "log_type": "info",
+        "message": message,
+        "timestamp": datetime.utcnow().isoformat()
+    }), user.wallet_address)
+
+
+async def send_monitor_status(position: MonitoredPosition):
+    """Periodic status push for one monitored position"""
+    now = time.time()
+    pnl_sol = 0
+    if position.entry_price_sol and position.last_price_sol:
+        pnl_sol = ((position.last_price_sol / position.entry_price_sol) - 1) * 100
+    
+    if position.advanced:
+        trailing_active = position.highest_pnl > TRAILING_ACTIVATION_PCT
+        status_update = {
+            "type": "strategy_update",
+            "mint": position.mint,
+            "current_price": position.last_price_usd,
+            "entry_price": position.entry_price_usd,
+            "pnl_percent": round(position.last_pnl, 2),
+            "pnl_usd": round((position.last_price_usd - position.entry_price_usd) * position.token_amount, 6),
+            "pnl_sol": round(pnl_sol, 2),
+            "highest_pnl": round(position.highest_pnl, 2),
+            "current_tokens": position.token_amount,
+            "remaining_sol": position.remaining_sol,
+            "tp_levels_triggered": len(position.tp_hit),
+            "total_tp_levels": len(position.tp_ladder),
+            "dca_levels_triggered": len(position.dca_hit),
+            "total_dca_levels": len(position.dca_ladder),
+            "next_dca_level": next((pct for pct, _ in position.dca_ladder if pct not in position.dca_hit), None),
+            "scale_in_triggered": now < position.scale_in_until,
+            "time_left": position.time_left(now),
+            "trailing_stop_active": trailing_active,
+            "trailing_stop_level": round(position.highest_pnl - position.trailing_distance_pct, 2) if trailing_active else None,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    else:
+        status_update = {
+            "type": "position_update",
+            "mint": position.mint,
+            "current_price": position.last_price_usd,
+            "pnl_percent": round(position.last_pnl, 2),
+            "entry_price": position.entry_price_usd,
+            "time_left_seconds": position.time_left(now),
+            "timeout_seconds": position.timeout_seconds,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    await websocket_manager.send_personal_message(json.dumps(status_update), position.wallet_address)
 
 
 async def get_jito_statistics() -> Dict:
@@ -4064,6 +3673,9 @@ async def get_jito_statistics() -> Dict:
             "success_rate_percent": round(success_rate, 2),
             "successful_sells_via_jito": successful_sells,
             "estimated_tip_cost_sol": successful_bundles * 0.00001, # 0.00001 SOL per tip
+            "submission_routes": submission_race.route_stats(),  # This worker's landing paths, best first
+            "fee_oracle": fee_oracle.snapshot(),  # Current blockhash age, priority fee levels and landed-tip percentiles
+            "tip_curve": tip_auction.curve(),  # Landing probability by tip for this time of day and congestion
             "last_updated": datetime.utcnow().isoformat()
         }
         
@@ -4080,7 +3692,7 @@ async def reset_scale_trigger(delay_seconds: int):
 async def adaptive_slippage_calculator(mint: str, base_slippage: int = 1500) -> int:
     """Calculate adaptive slippage based on token volatility"""
     try:
-        dexscreener_data = await fetch_dexscreener_with_retry(mint)
+        dexscreener_data = await fetch_dexscreener_with_retry(mint, timeout=2)
         if not dexscreener_data:
             return base_slippage
         
@@ -4106,7 +3718,7 @@ async def get_real_time_trading_signal(mint: str) -> dict:
     try:
         # Get fresh data
         jupiter_data = await get_jupiter_token_data(mint)
-        dexscreener_data = await fetch_dexscreener_with_retry(mint)
+        dexscreener_data = await fetch_dexscreener_with_retry(mint, timeout=3)
         
         if not jupiter_data or not dexscreener_data:
             return {"signal": "NEUTRAL", "confidence": 0, "reason": "No data"}
@@ -4264,572 +3876,90 @@ async def get_last_trade_price_from_db(mint: str) -> Optional[Dict]:
 async def get_jupiter_quote_price(mint: str) -> Optional[Dict]:
     """Get price directly from Jupiter quote API"""
     try:
-        async with aiohttp.ClientSession() as session:
+        async with http_clients.session("https://quote-api.jup.ag") as session:
             # Quote for 1 token to SOL
             url = f"https://quote-api.jup.ag/v6/quote?inputMint={mint}&outputMint={settings.SOL_MINT}&amount=1000000"
-            async with session.get(url, timeout=2.0) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    if data and "outAmount" in data:
-                        sol_amount = int(data["outAmount"]) / 1_000_000_000
-                        
-                        # Convert SOL to USD
-                        sol_price = await get_jupiter_token_data(settings.SOL_MINT)
-                        usd_price = sol_amount * sol_price
-                        
-                        return {
-                            "priceUsd": usd_price,
-                            "priceSOL": sol_amount,
-                            "_source": "jupiter_quote"
-                        }
+            resp = await session.get(url, timeout=2.0)
+            if resp.status_code == 200:
+                data = resp.json()
+                if data and "outAmount" in data:
+                    sol_amount = int(data["outAmount"]) / 1_000_000_000
+                    
+                    # Convert SOL to USD
+                    sol_price = await sol_price_ticker.get()
+                    usd_price = sol_amount * sol_price
+                    
+                    return {
+                        "priceUsd": usd_price,
+                        "priceSOL": sol_amount,
+                        "_source": "jupiter_quote"
+                    }
     except Exception as e:
         logger.debug(f"Jupiter quote failed for {mint}: {e}")
     return None
          
-async def get_cached_price(mint: str):
-    now = datetime.utcnow()
-    if mint in price_cache:
-        cached = price_cache[mint]
-        age = (now - cached["timestamp"]).total_seconds()
-        if age < 8:
-            return cached["data"]
-        elif age < 30:
-            # Allow stale up to 30s during high volatility
-            logger.debug(f"Using slightly stale price ({age:.0f}s old) for {mint[:8]}")
-            return cached["data"]
-    
-    try:
-        data = await fetch_dexscreener_with_retry(mint)
-        if data and data.get("priceUsd"):
-            price_cache[mint] = {"timestamp": now, "data": data}
-            return data
-    except Exception as e:
-        logger.debug(f"Price fetch failed for {mint[:8]}: {e}")
-    
-    # Fallback to stale if exists
-    if mint in price_cache:
-        age = (now - price_cache[mint]["timestamp"]).total_seconds()
-        logger.warning(f"Using stale price ({age:.0f}s old) for {mint[:8]} as fallback")
-        return price_cache[mint]["data"]
-    
-    return None
-
-async def start_monitor_for_trade(trade: Trade, user: User, entry_price_usd: float, token_decimals: int, token_amount: float):
-    """Start monitor task for a trade"""
-    try:
-        logger.info(f"🎯 STARTING MONITOR for trade {trade.id} ({trade.mint_address[:8]})")
-        
-        # Create the monitor task
-        monitor_task = asyncio.create_task(
-            monitor_position(
-                user=user,
-                trade=trade,
-                entry_price_usd=entry_price_usd,
-                token_decimals=token_decimals,
-                token_amount=token_amount,
-                websocket_manager=websocket_manager
-            )
-        )
-        
-        # Store the task reference
-        monitor_tasks[trade.id] = monitor_task
-        
-        # Add callback to clean up when done
-        monitor_task.add_done_callback(lambda t: monitor_tasks.pop(trade.id, None))
-        
-        return monitor_task
-        
-    except Exception as e:
-        logger.error(f"Failed to start monitor for trade {trade.id}: {e}")
-        raise
-
-# ===================================================================
-# MONITOR & SELL (Updated for Ultra API)
-# ===================================================================
+async def get_cached_price(mint: str, max_age: float = 30.0, max_stale: Optional[float] = ANY_AGE):
+    """
+    DexScreener data for a mint through the shared price_cache. Defaults suit
+    display / heuristics (30s is fresh enough, any stale entry beats none);
+    trading paths pass max_age=FRESH, max_stale=None to get fresh data or None.
+    """
+    return await price_cache.get(mint, max_age=max_age, max_stale=max_stale)
 
-async def monitor_position(
-    user: User,
+async def start_monitor_for_trade(
     trade: Trade,
+    user: User,
     entry_price_usd: float,
     token_decimals: int,
     token_amount: float,
-    websocket_manager: ConnectionManager
+    snapshot: Optional[Dict[str, Any]] = None,
 ):
-    """
-    Monitor position and execute sells based on criteria.
-    Uses a SINGLE database session for the entire monitor lifecycle.
-    """
-    
-    if token_amount <= 0:
-        logger.warning(f"Invalid token_amount {token_amount} for {trade.mint_address} – skipping monitor")
-        return
-    
-    # Create ONE session for the entire monitor (CRITICAL FIX)
-    db = AsyncSessionLocal()
-    
+    """Hand an open trade to monitor_engine. Returns the position, or None if it was already monitored."""
     try:
-        trade_id = trade.id
-        mint = trade.mint_address
+        position = MonitoredPosition.from_trade(trade, user)
+        position.entry_price_usd = entry_price_usd or position.entry_price_usd
+        position.token_decimals = token_decimals
+        position.token_amount = token_amount
         
-        if not trade_id:
-            logger.error(f"Trade ID is missing for {mint}")
-            await websocket_manager.send_personal_message(json.dumps({
-                "type": "log",
-                "log_type": "error",
-                "message": f"❌ Monitor failed: Trade ID missing for {mint[:8]}",
-                "timestamp": datetime.utcnow().isoformat()
-            }), user.wallet_address)
-            return
+        # Rule state from before a restart (high-water mark, TP / DCA progress, extended deadline)
+        if snapshot:
+            restore_snapshot(position, snapshot)
         
-        # Fetch trade ONCE at the beginning
-        trade_result = await db.execute(select(Trade).where(Trade.id == trade_id))
-        current_trade = trade_result.scalar_one_or_none()
+        if not monitor_engine.add(position):
+            return None
         
-        if not current_trade:
-            logger.error(f"Trade {trade_id} not found in database for {mint}")
-            await websocket_manager.send_personal_message(json.dumps({
-                "type": "log",
-                "log_type": "error",
-                "message": f"❌ Monitor failed: Trade {trade_id} not found in database",
-                "timestamp": datetime.utcnow().isoformat()
-            }), user.wallet_address)
-            return
-        
-        # Get user ONCE at the beginning
-        user_result = await db.execute(select(User).where(User.wallet_address == user.wallet_address))
-        current_user = user_result.scalar_one_or_none()
-        
-        if not current_user:
-            logger.error(f"User {user.wallet_address} not found during monitor setup")
-            return
-        
-        # 🔥 Get the EXACT buy timestamp from the trade
-        timing_base = current_trade.buy_timestamp if current_trade.buy_timestamp else datetime.utcnow()
-        amount_lamports = int(token_amount * (10 ** token_decimals))  # Full amount
-        
-        # Get user settings ONCE (they rarely change during monitor)
-        timeout_seconds = current_user.sell_timeout_seconds or 3600  # Default 1 hour
-        take_profit_pct = current_user.sell_take_profit_pct or 50.0
-        stop_loss_pct = current_user.sell_stop_loss_pct or 20.0
-        partial_sell_pct = current_user.partial_sell_pct or 0
-        
-        # Log that monitoring has started
-        logger.info(f"🚀 MONITOR STARTED for {mint[:8]}... | Trade ID: {current_trade.id}")
-        logger.info(f"  User: {current_user.wallet_address[:8]}")
-        logger.info(f"  Buy time: {timing_base}")
-        logger.info(f"  Timeout: {timeout_seconds}s (Will auto-sell at: {timing_base + timedelta(seconds=timeout_seconds)})")
-        logger.info(f"  Take profit: {take_profit_pct}%")
-        logger.info(f"  Stop loss: {stop_loss_pct}%")
-        logger.info(f"  Token amount: {token_amount:.2f}")
-        
-        # Send monitoring started message to frontend
+        logger.info(f"🎯 STARTED MONITOR for trade {trade.id} ({trade.mint_address[:8]})")
         await websocket_manager.send_personal_message(json.dumps({
             "type": "log",
             "log_type": "info",
-            "message": f"📈 Monitoring {current_trade.token_symbol or mint[:8]}... | Auto-sell in {timeout_seconds}s",
+            "message": f"📈 Monitoring {position.symbol}... | Auto-sell in {position.time_left():.0f}s",
             "timestamp": datetime.utcnow().isoformat()
         }), user.wallet_address)
         
-        iteration = 0
-        start_time = datetime.utcnow()
-        
-        while True:
-            iteration += 1
-            current_time = datetime.utcnow()
-            
-            try:
-                # ============================================================
-                # 🎯 CHECK #1: REFRESH TRADE STATUS (using same session)
-                # ============================================================
-                await db.refresh(current_trade)  # Refresh trade object from database
-                
-                if current_trade.sell_timestamp:
-                    logger.info(f"Trade {mint[:8]}... already sold at {current_trade.sell_timestamp}, stopping monitor")
-                    await websocket_manager.send_personal_message(json.dumps({
-                        "type": "log",
-                        "log_type": "info",
-                        "message": f"✅ Position already sold, stopping monitor",
-                        "timestamp": current_time.isoformat()
-                    }), user.wallet_address)
-                    break
-                
-                # ============================================================
-                # 🎯 CHECK #2: TIMEOUT - USING SAME SESSION
-                # ============================================================
-                elapsed_seconds = (current_time - timing_base).total_seconds()
-                
-                # DEBUG: Log timeout status every 10 iterations
-                if iteration % 10 == 0:
-                    time_left = max(0, timeout_seconds - elapsed_seconds)
-                    logger.info(f"⏰ Timeout check for {mint[:8]}: {elapsed_seconds:.0f}s / {timeout_seconds}s ({(elapsed_seconds/timeout_seconds*100):.1f}%)")
-                
-                # TIMEOUT TRIGGER
-                if elapsed_seconds >= timeout_seconds:
-                    logger.info(f"⏰ TIMEOUT REACHED for {mint[:8]}: {elapsed_seconds:.0f}s >= {timeout_seconds}s")
-                    
-                    # Get current price for PnL calculation
-                    dex = await get_cached_price(mint)
-                    current_price = 0
-                    
-                    if dex and dex.get("priceUsd"):
-                        current_price = float(dex["priceUsd"])
-                    
-                    # Calculate PnL based on ACTUAL entry price from trade
-                    if current_trade.price_usd_at_trade and current_price > 0:
-                        pnl = (current_price / current_trade.price_usd_at_trade - 1) * 100
-                    else:
-                        pnl = 0
-                    
-                    # Send timeout notification
-                    await websocket_manager.send_personal_message(json.dumps({
-                        "type": "log",
-                        "log_type": "warning",
-                        "message": f"⏰ TIMEOUT: Selling {current_trade.token_symbol or mint[:8]} after {timeout_seconds}s (PnL: {pnl:.2f}%)",
-                        "timestamp": current_time.isoformat()
-                    }), user.wallet_address)
-                    
-                    # Execute the sell WITH SAME SESSION
-                    await execute_timeout_sell(
-                        current_user, mint, amount_lamports, trade_id, db,
-                        current_trade.price_usd_at_trade or entry_price_usd, 
-                        current_price, pnl, websocket_manager
-                    )
-                    
-                    # Monitor job is done
-                    break
-                
-                # ============================================================
-                # CHECK #3: PRICE-BASED CONDITIONS
-                # ============================================================
-                
-                # Fetch current price
-                dex = await get_cached_price(mint)
-                if not dex or not dex.get("priceUsd"):
-                    logger.debug(f"No price data for {mint[:8]}... - waiting")
-                    await asyncio.sleep(5)
-                    continue
-                
-                current_price = float(dex["priceUsd"])
-                
-                if entry_price_usd <= 0 or current_price <= 0:
-                    logger.debug(f"Invalid price for {mint[:8]}: entry=${entry_price_usd}, current=${current_price}")
-                    await asyncio.sleep(5)
-                    continue
-                
-                # Calculate PnL
-                # pnl = (current_price / entry_price_usd - 1) * 100
-                
-                # 🔥 FIX: Use SOL price for PnL calculation
-                sol_price = await get_jupiter_token_data(settings.SOL_MINT)
-                if sol_price > 0:
-                    current_price_sol = current_price / sol_price
-                    
-                    # Get entry price in SOL from trade
-                    if current_trade.price_sol_at_trade and current_price_sol > 0:
-                        pnl = ((current_price_sol / current_trade.price_sol_at_trade) - 1) * 100
-                        logger.debug(f"📊 SOL-based PnL: {pnl:.2f}%")
-                    else:
-                        # Fallback to USD calculation
-                        pnl = (current_price / entry_price_usd - 1) * 100
-                else:
-                    # USD calculation as last resort
-                    pnl = (current_price / entry_price_usd - 1) * 100
-                
-                # ============================================================
-                # MOMENTUM-BASED ADJUSTMENTS
-                # ============================================================
-                try:
-                    # Get recent transaction data
-                    if dex and "txns" in dex:
-                        buys_5m = dex["txns"].get("m5", {}).get("buys", 0)
-                        sells_5m = dex["txns"].get("m5", {}).get("sells", 0)
-                        
-                        # If heavy selling, exit faster
-                        if sells_5m > buys_5m * 3 and pnl > 5:  # 3x more sells, but we're in profit
-                            logger.info(f"🚨 Heavy selling detected for {mint[:8]}, taking profit early")
-                            await websocket_manager.send_personal_message(json.dumps({
-                                "type": "log",
-                                "log_type": "warning",
-                                "message": f"🚨 Heavy selling detected ({sells_5m} sells vs {buys_5m} buys). Taking profit early.",
-                                "timestamp": current_time.isoformat()
-                            }), user.wallet_address)
-                            
-                            await execute_price_based_sell(
-                                current_user, mint, amount_lamports, trade_id, db,
-                                entry_price_usd, current_price, pnl,
-                                "Early Exit (Heavy Selling)", False, token_decimals, websocket_manager
-                            )
-                            break
-                            
-                        # If strong buying, let it run longer
-                        if buys_5m > sells_5m * 2 and pnl > 0:
-                            # Extend timeout by 30 seconds
-                            timeout_seconds += 30
-                            logger.info(f"📈 Strong buying for {mint[:8]}, extending timeout by 30s")
-                            
-                            await websocket_manager.send_personal_message(json.dumps({
-                                "type": "log",
-                                "log_type": "info",
-                                "message": f"📈 Strong buying detected ({buys_5m} buys vs {sells_5m} sells). Extending timeout.",
-                                "timestamp": current_time.isoformat()
-                            }), user.wallet_address)
-                            
-                except Exception as e:
-                    logger.debug(f"Momentum check failed: {e}")
-                
-                # ============================================================
-                # STATUS UPDATES
-                # ============================================================
-                if iteration % 15 == 0:
-                    logger.info(f"📊 Monitor {mint[:8]}: ${current_price:.6f} | PnL: {pnl:.2f}% | Time left: {max(0, timeout_seconds - elapsed_seconds):.0f}s")
-                    
-                    # Send heartbeat to frontend
-                    await websocket_manager.send_personal_message(json.dumps({
-                        "type": "position_update",
-                        "mint": mint,
-                        "current_price": current_price,
-                        "pnl_percent": round(pnl, 2),
-                        "entry_price": entry_price_usd,
-                        "time_left_seconds": max(0, timeout_seconds - elapsed_seconds),
-                        "timeout_seconds": timeout_seconds,
-                        "timestamp": current_time.isoformat()
-                    }), user.wallet_address)
-                
-                # ============================================================
-                # PRICE-BASED SELL CONDITIONS
-                # ============================================================
-                sell_reason = None
-                sell_partial = False
-                sell_amount_lamports = amount_lamports
-                
-                # 2A. Take Profit
-                if take_profit_pct and pnl >= take_profit_pct:
-                    sell_reason = "Take Profit"
-                    if partial_sell_pct and partial_sell_pct < 100:
-                        sell_partial = True
-                        sell_amount_lamports = int(amount_lamports * (partial_sell_pct / 100))
-                    logger.info(f"🎯 TAKE PROFIT for {mint[:8]}: PnL {pnl:.2f}% >= {take_profit_pct}%")
-                
-                # 2B. Stop Loss
-                elif stop_loss_pct and pnl <= -stop_loss_pct:
-                    sell_reason = "Stop Loss"
-                    logger.info(f"🛑 STOP LOSS for {mint[:8]}: PnL {pnl:.2f}% <= -{stop_loss_pct}%")
-                
-                # 2C. Execute sell if any price condition met
-                if sell_reason:
-                    # Get token decimals from trade or database
-                    token_decimals = trade.token_decimals or 9
-                    
-                    # Get SOL price using proper helper
-                    price_data = await get_token_price_in_sol(mint, token_decimals)
-                    current_price_sol = price_data["price_sol"]
-                    
-                    # Calculate estimated SOL value
-                    token_amount_sold = sell_amount_lamports / (10 ** token_decimals)
-                    estimated_sol_value = current_price_sol * token_amount_sold
-                    
-                    # Get fee decision
-                    fee_decision = await fee_manager.calculate_fee_decision(
-                        user=user,
-                        trade_type=sell_reason,
-                        amount_sol=estimated_sol_value,
-                        mint=mint,
-                        pnl_pct=pnl
-                    )
-                    
-                    # Store for the swap execution
-                    fee_key = fee_manager.get_fee_decision_key(
-                        user_wallet=user.wallet_address,
-                        mint=mint,
-                        trade_type=sell_reason
-                    )
-                    await redis_client.setex(fee_key, 300, json.dumps(fee_decision))
-                    
-                    # Execute the sell
-                    await execute_price_based_sell(
-                        current_user, mint, sell_amount_lamports, trade_id, db,
-                        entry_price_usd, current_price, pnl, sell_reason, sell_partial,
-                        token_decimals, websocket_manager, fee_decision  # Pass fee decision
-                    )
-                                    
-                    if sell_partial:
-                        # Update remaining amount and continue monitoring
-                        amount_lamports -= sell_amount_lamports
-                        token_amount -= (sell_amount_lamports / (10 ** token_decimals))
-                        logger.info(f"✅ Partial sell executed. Remaining: {token_amount:.2f} tokens")
-                        continue
-                    else:
-                        # Full sell - exit monitor
-                        break
-                
-                # ============================================================
-                # WAIT BEFORE NEXT CHECK
-                # ============================================================
-                await asyncio.sleep(4)  # Check every 4 seconds
-                
-            except Exception as e:
-                logger.error(f"Monitor error for {mint} on iteration {iteration}: {e}", exc_info=True)
-                await db.rollback()  # Rollback any failed transaction
-                await asyncio.sleep(10)
-                
-                # After too many errors, check if we should stop
-                if iteration > 100:  # ~10 minutes of errors
-                    logger.error(f"Too many monitor errors for {mint}, stopping")
-                    await websocket_manager.send_personal_message(json.dumps({
-                        "type": "log",
-                        "log_type": "error",
-                        "message": f"❌ Monitor stopped due to errors for {current_trade.token_symbol or mint[:8]}",
-                        "timestamp": current_time.isoformat()
-                    }), user.wallet_address)
-                    break
-        
-        logger.info(f"🛑 MONITOR STOPPED for {mint[:8]}... after {iteration} iterations")
+        return position
         
     except Exception as e:
-        logger.error(f"Fatal error in monitor setup for {trade.mint_address}: {e}", exc_info=True)
-        await websocket_manager.send_personal_message(json.dumps({
-            "type": "log",
-            "log_type": "error",
-            "message": f"❌ Monitor failed to start for {trade.token_symbol or trade.mint_address[:8]}",
-            "timestamp": datetime.utcnow().isoformat()
-        }), user.wallet_address)
-        
-    finally:
-        # CRITICAL: Close the session when done
-        await db.close()
-        
-async def execute_timeout_sell(user: User, mint: str, amount_lamports: int, trade_id: int, 
-                              session: AsyncSession, entry_price: float, current_price: float,
-                              pnl: float, websocket_manager: ConnectionManager):
-    """Execute a sell due to timeout"""
-    try:
-        # Get the trade with ALL details
-        trade_result = await session.execute(
-            select(Trade).where(Trade.id == trade_id)
-        )
-        trade = trade_result.scalar_one_or_none()
-        
-        if not trade:
-            logger.error(f"Trade {trade_id} not found for timeout sell")
-            return
-        
-        # Get correct decimals from trade (CRITICAL)
-        token_decimals = trade.token_decimals
-        if token_decimals is None:
-            # Try to get from Jupiter
-            jupiter_data = await get_jupiter_token_data(mint)
-            token_decimals = jupiter_data.get("decimals", 9) if jupiter_data else 9
-            logger.warning(f"⚠️ No decimals in trade, using {token_decimals} from Jupiter")
-        
-        # Calculate actual SOL amount
-        actual_sol_amount = amount_lamports / 1_000_000_000
-        token_amount = amount_lamports / (10 ** token_decimals)
-        
-        logger.info(f"🔄 Executing TIMEOUT sell for {mint[:8]}... ({actual_sol_amount:.4f} SOL = {token_amount:.2f} tokens)")
-        
-        # Get entry price in SOL from trade
-        entry_price_sol = trade.price_sol_at_trade
-        
-        # 🔥 FIX: Get current token price in SOL with correct decimals
-        current_price_sol = await get_token_price_in_sol(mint, token_decimals)
-        
-        # Calculate PnL properly
-        if entry_price_sol and entry_price_sol > 0 and current_price_sol > 0:
-            real_pnl = ((current_price_sol / entry_price_sol) - 1) * 100
-            profit_sol = (current_price_sol - entry_price_sol) * token_amount
-            logger.info(f"📊 SOL PnL: {real_pnl:.2f}% | Profit: {profit_sol:.6f} SOL")
-        else:
-            # Fallback to USD calculation
-            if entry_price > 0 and current_price > 0:
-                real_pnl = ((current_price / entry_price) - 1) * 100
-                sol_price = await get_jupiter_token_data(settings.SOL_MINT)
-                profit_sol = ((current_price - entry_price) * token_amount) / sol_price if sol_price > 0 else 0
-                logger.warning(f"⚠️ Using USD PnL: {real_pnl:.2f}%")
-            else:
-                real_pnl = pnl
-                profit_sol = 0
-                logger.error(f"❌ No valid prices for PnL calculation")
-                
-        # Get user's sell slippage
-        slippage_bps = int(user.sell_slippage_bps) if user.sell_slippage_bps else 500
-        
-        # Execute the sell swap
-        swap = await execute_jupiter_swap(
-            user=user,
-            input_mint=mint,
-            output_mint=settings.SOL_MINT,
-            amount=amount_lamports,
-            slippage_bps=slippage_bps,
-            label="TIMEOUT_SELL",
-        )
-        
-        # Convert profit to USD if we have SOL price
-        sol_price = await get_jupiter_token_data(settings.SOL_MINT)
-        profit_usd = profit_sol * sol_price if profit_sol > 0 else 0
-        
-        # Update trade record with CORRECT values
-        if trade:
-            trade.sell_timestamp = datetime.utcnow()
-            trade.sell_reason = "Timeout"
-            trade.sell_tx_hash = swap.get("signature")
-            trade.price_usd_at_trade = current_price
-            trade.profit_usd = profit_usd
-            trade.profit_sol = profit_sol
-            
-            # Store fee info if applied
-            if swap.get("fee_applied"):
-                trade.fee_applied = True
-                trade.fee_amount = swap.get("estimated_referral_fee", 0)
-                trade.fee_percentage = swap.get("fee_percentage", 0.0)
-                trade.fee_bps = swap.get("fee_bps", None)
-                trade.fee_mint = swap.get("fee_mint", None)
-                trade.fee_collected_at = datetime.utcnow()
-            
-            trade.solscan_sell_url = f"https://solscan.io/tx/{swap.get('signature')}"
-            
-            await session.commit()
-        
-        # Send success message with REAL PnL
-        await websocket_manager.send_personal_message(json.dumps({
-            "type": "log",
-            "log_type": "success",
-            "message": f"✅ TIMEOUT SELL: Sold {mint[:8]} after timeout. PnL: {real_pnl:.2f}% | Profit: {profit_sol:.6f} SOL (${profit_usd:.6f})",
-            "timestamp": datetime.utcnow().isoformat()
-        }), user.wallet_address)
-        
-        # Send trade instruction to frontend with correct PnL
-        await websocket_manager.send_personal_message(json.dumps({
-            "type": "trade_instruction",
-            "action": "sell",
-            "mint": mint,
-            "reason": "Timeout",
-            "pnl_pct": round(real_pnl, 2),
-            "profit_usd": profit_usd,
-            "profit_sol": profit_sol,
-            "entry_price_sol": entry_price_sol,
-            "exit_price_sol": current_price_sol,
-            "signature": swap["signature"],
-            "solscan_url": f"https://solscan.io/tx/{swap['signature']}"
-        }), user.wallet_address)
-        
-        logger.info(f"✅ TIMEOUT SELL COMPLETED for {mint[:8]} | PnL: {real_pnl:.2f}% | Profit: {profit_sol:.6f} SOL (${profit_usd:.6f})")
-        
-    except Exception as e:
-        logger.error(f"❌ TIMEOUT SELL FAILED for {mint[:8]}: {e}", exc_info=True)
-        await websocket_manager.send_personal_message(json.dumps({
-            "type": "log",
-            "log_type": "error",
-            "message": f"❌ Timeout sell failed: {str(e)[:100]}",
-            "timestamp": datetime.utcnow().isoformat()
-        }), user.wallet_address)
-          
+        logger.error(f"Failed to start monitor for trade {trade.id}: {e}")
+        raise
+
 async def get_token_price_in_sol(mint: str, token_decimals: int = None) -> Dict[str, Any]:
     """
     Get current token price in SOL with all metadata
     Returns: {"price_sol": float, "price_usd": float, "decimals": int, "source": str}
     """
     try:
-        # First try: Use existing Jupiter data function
+        # First try: the bonding curve itself (pump.fun tokens before migration)
+        curve = await curve_price_engine.fetch(mint)
+        if curve and not curve.complete and curve_price_engine.sol_usd > 0:
+            return {
+                "price_sol": curve.price_sol,
+                "price_usd": curve.price_sol * curve_price_engine.sol_usd,
+                "decimals": PUMPFUN_TOKEN_DECIMALS,
+                "source": "bonding_curve",
+                "data": {"virtual_sol_reserves": curve.virtual_sol_reserves, "virtual_token_reserves": curve.virtual_token_reserves},
+            }
+        
+        # Second try: Use existing Jupiter data function
         jupiter_data = await get_jupiter_token_data(mint)
         
         if jupiter_data:
@@ -4838,7 +3968,7 @@ async def get_token_price_in_sol(mint: str, token_decimals: int = None) -> Dict[
                 token_decimals = jupiter_data["decimals"]
             
             # Get SOL price
-            sol_price = await get_jupiter_token_data(settings.SOL_MINT)
+            sol_price = await sol_price_ticker.get()
             
             if jupiter_data.get("usd_price") and sol_price > 0:
                 price_sol = jupiter_data["usd_price"] / sol_price
@@ -4850,47 +3980,44 @@ async def get_token_price_in_sol(mint: str, token_decimals: int = None) -> Dict[
                     "data": jupiter_data
                 }
         
-        # Second try: Jupiter quote API with proper decimals
+        # Third try: Jupiter quote API with proper decimals
         if token_decimals is not None:
             try:
                 amount = 10 ** token_decimals  # 1 token
-                async with aiohttp.ClientSession() as session:
+                async with http_clients.session("https://quote-api.jup.ag") as session:
                     url = f"https://quote-api.jup.ag/v6/quote?inputMint={mint}&outputMint={settings.SOL_MINT}&amount={amount}"
                     headers = {"x-api-key": settings.JUPITER_API_KEY} if hasattr(settings, "JUPITER_API_KEY") else {}
-                    async with session.get(url, headers=headers, timeout=2.0) as resp:
-                        if resp.status == 200:
-                            data = await resp.json()
-                            if data and "outAmount" in data:
-                                out_amount = int(data["outAmount"])
-                                price_sol = out_amount / (10 ** token_decimals) / 1_000_000_000
-                                
-                                # Convert to USD
-                                sol_price = await get_jupiter_token_data(settings.SOL_MINT)
-                                price_usd = price_sol * sol_price if sol_price > 0 else 0
-                                
-                                return {
-                                    "price_sol": price_sol,
-                                    "price_usd": price_usd,
-                                    "decimals": token_decimals,
-                                    "source": "jupiter_quote",
-                                    "data": data
-                                }
+                    resp = await session.get(url, headers=headers, timeout=2.0)
+                    if resp.status_code == 200:
+                        data = resp.json()
+                        if data and "outAmount" in data:
+                            out_amount = int(data["outAmount"])
+                            price_sol = out_amount / (10 ** token_decimals) / 1_000_000_000
+                            
+                            # Convert to USD
+                            sol_price = await sol_price_ticker.get()
+                            price_usd = price_sol * sol_price if sol_price > 0 else 0
+                            
+                            return {
+                                "price_sol": price_sol,
+                                "price_usd": price_usd,
+                                "decimals": token_decimals,
+                                "source": "jupiter_quote",
+                                "data": data
+                            }
             except Exception as e:
                 logger.debug(f"Jupiter quote failed: {e}")
         
-        # Third try: DexScreener
-        dex_data = await get_cached_price(mint)
-        if dex_data and dex_data.get("priceUsd"):
-            sol_price = await get_jupiter_token_data(settings.SOL_MINT)
-            if sol_price > 0:
-                price_sol = float(dex_data["priceUsd"]) / sol_price
-                return {
-                    "price_sol": price_sol,
-                    "price_usd": float(dex_data["priceUsd"]),
-                    "decimals": token_decimals or dex_data.get("decimals", 9),
-                    "source": "dexscreener",
-                    "data": dex_data
-                }
+        # Fourth try: DexScreener (fresh or nothing - this price sizes trades)
+        dex_data = await get_cached_price(mint, max_age=FRESH, max_stale=None)
+        if dex_data and dex_data.get("price_native"):
+            return {
+                "price_sol": float(dex_data["price_native"]),
+                "price_usd": float(dex_data["price_usd"]),
+                "decimals": token_decimals or dex_data.get("decimals", 9),
+                "source": "dexscreener",
+                "data": dex_data
+            }
         
     except Exception as e:
         logger.error(f"Failed to get token price in SOL for {mint}: {e}")
@@ -4898,108 +4025,6 @@ async def get_token_price_in_sol(mint: str, token_decimals: int = None) -> Dict[
     return {"price_sol": 0, "price_usd": 0, "decimals": token_decimals or 9, "source": "failed", "data": {}}
 
  
-async def execute_price_based_sell(user: User, mint: str, amount_lamports: int, trade_id: int,
-                                  session: AsyncSession, entry_price: float, current_price: float,
-                                  pnl: float, reason: str, is_partial: bool,
-                                  token_decimals: int, websocket_manager: ConnectionManager,
-                                  fee_decision: Dict[str, Any] = None):
-    """Execute a sell based on price conditions (TP/SL)"""
-    try:
-        logger.info(f"🔄 Executing {reason} sell for {mint[:8]}...")
-        
-        # Get user's sell slippage
-        slippage_bps = int(user.sell_slippage_bps) if user.sell_slippage_bps else 500
-        
-        # Execute the sell swap
-        swap = await execute_jupiter_swap(
-            user=user,
-            input_mint=mint,
-            output_mint=settings.SOL_MINT,
-            amount=amount_lamports,
-            slippage_bps=slippage_bps,
-            label=f"{reason}_SELL",
-        )
-        
-        # Update trade record
-        trade_result = await session.execute(
-            select(Trade).where(Trade.id == trade_id)
-        )
-        trade = trade_result.scalar_one_or_none()
-        
-        # 🔥 FIX: Calculate profit in SOL first, then convert to USD
-        token_amount_sold = amount_lamports / (10 ** token_decimals)
-        
-        # Get SOL prices
-        entry_price_sol = 0
-        if trade and trade.price_sol_at_trade:
-            entry_price_sol = trade.price_sol_at_trade
-        
-        current_price_sol = 0
-        sol_price = await get_jupiter_token_data(settings.SOL_MINT)
-        if sol_price > 0:
-            current_price_sol = current_price / sol_price
-        
-        # Calculate profit
-        if entry_price_sol > 0 and current_price_sol > 0:
-            profit_sol = (current_price_sol - entry_price_sol) * token_amount_sold
-            profit_usd = profit_sol * sol_price if sol_price > 0 else 0
-            logger.info(f"📊 Profit: {profit_sol:.6f} SOL (${profit_usd:.6f})")
-        else:
-            # Fallback to USD calculation
-            profit_usd = (current_price - entry_price) * token_amount_sold
-            profit_sol = profit_usd / sol_price if sol_price > 0 else 0
-
-        if trade:
-            if is_partial:
-                # Update remaining amount
-                trade.amount_tokens = trade.amount_tokens - (amount_lamports / (10 ** token_decimals))
-                trade.profit_usd = profit_usd
-                trade.profit_sol = profit_sol
-                trade.sell_reason = f"{reason} (Partial)"
-            else:
-                # Full sell
-                trade.sell_timestamp = datetime.utcnow()
-                trade.sell_reason = reason
-                trade.sell_tx_hash = swap.get("signature")
-                trade.price_usd_at_trade = current_price
-                trade.profit_usd = profit_usd
-                trade.profit_sol = profit_sol
-                trade.solscan_sell_url = f"https://solscan.io/tx/{swap.get('signature')}"
-            
-            # Store fee info if applied
-            if swap.get("fee_applied"):
-                trade.fee_applied = True
-                trade.fee_amount = swap.get("estimated_referral_fee", 0)
-                trade.fee_percentage = swap.get("fee_percentage", 0.0)
-                trade.fee_bps = swap.get("fee_bps", None)
-                trade.fee_mint = swap.get("fee_mint", None)
-                trade.fee_collected_at = datetime.utcnow()
-            
-            await session.commit()
-        
-        # Send success message
-        message = f"✅ {reason}: Sold {mint[:8]}. PnL: {pnl:.2f}%"
-        if is_partial:
-            message += " (Partial)"
-        
-        await websocket_manager.send_personal_message(json.dumps({
-            "type": "log",
-            "log_type": "success",
-            "message": message,
-            "timestamp": datetime.utcnow().isoformat()
-        }), user.wallet_address)
-        
-        logger.info(f"✅ {reason} SELL COMPLETED for {mint[:8]}")
-        
-    except Exception as e:
-        logger.error(f"❌ {reason} SELL FAILED for {mint[:8]}: {e}")
-        await websocket_manager.send_personal_message(json.dumps({
-            "type": "log",
-            "log_type": "error",
-            "message": f"❌ {reason} sell failed: {str(e)[:100]}",
-            "timestamp": datetime.utcnow().isoformat()
-        }), user.wallet_address)
-                 
 async def cleanup_fee_decisions(user_wallet: str):
     """Clean up old fee decision keys"""
     try:
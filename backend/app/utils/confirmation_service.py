@@ -0,0 +1,223 @@
+# app/utils/confirmation_service.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
+
+from app.utils.rpc_pool import rpc_pool
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 0.4            # seconds between status sweeps while anything is pending
+MAX_BATCH = 256                # getSignatureStatuses limit per request
+BLOCK_HEIGHT_REFRESH = 1.0     # seconds a block height reading is reused for expiry checks
+BLOCKHASH_VALIDITY = 150       # blocks a blockhash stays usable
+MAX_WATCH_AGE = 180.0          # seconds - backstop for entries whose expiry can't be worked out
+
+COMMITMENTS = ("processed", "confirmed", "finalized")
+
+
+def _commitment_of(status) -> str:
+    level = status.confirmation_status
+    if level == TransactionConfirmationStatus.Processed:
+        return "processed"
+    if level == TransactionConfirmationStatus.Confirmed:
+        return "confirmed"
+    return "finalized"  # Old enough to come back without a level means rooted
+
+
+@dataclass
+class Confirmation:
+    """Outcome of a watched signature"""
+    signature: str
+    commitment: Optional[str] = None   # Level reached - None if it never landed
+    slot: Optional[int] = None
+    err: Optional[str] = None          # On-chain error if it landed but failed
+    expired: bool = False              # Blockhash ran out before it landed
+
+    @property
+    def landed(self) -> bool:
+        return self.commitment is not None
+
+    @property
+    def ok(self) -> bool:
+        return self.landed and self.err is None
+
+
+@dataclass
+class _Watch:
+    last_valid_block_height: Optional[int]
+    waiters: List[Tuple[str, asyncio.Future]] = field(default_factory=list)   # (commitment, future) per watch() call
+    added: float = field(default_factory=time.monotonic)
+
+
+class ConfirmationService:
+    """
+    One status loop for every transaction the app is waiting on.
+
+    watch() registers a signature and returns a future that resolves to a
+    Confirmation once the signature reaches the requested commitment (with
+    its slot and any on-chain error), or with expired=True once the chain
+    passes its last_valid_block_height without it landing. Signatures
+    watched without one get current block height + 150, which is never
+    earlier than the real limit.
+
+    All pending signatures are swept together every POLL_INTERVAL -
+    getSignatureStatuses in batches of 256, plus one getBlockHeight a
+    second for expiry - so hundreds of pending swaps cost a few RPC calls
+    per second instead of a poll loop each.
+    """
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._pending: Dict[str, _Watch] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._height: Optional[int] = None
+        self._height_at = 0.0
+        self.stats = {"watched": 0, "confirmed": 0, "failed": 0, "expired": 0, "sweeps": 0, "rpc_calls": 0, "rpc_errors": 0}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def watch(
+        self, signature: str, commitment: str = "confirmed", last_valid_block_height: Optional[int] = None
+    ) -> asyncio.Future:
+        """Future resolving to this signature's Confirmation. Cancelling it stops this watch only."""
+        if commitment not in COMMITMENTS:
+            raise ValueError(f"Unknown commitment: {commitment}")
+        entry = self._pending.get(signature)
+        if entry is None:
+            entry = self._pending[signature] = _Watch(last_valid_block_height)
+            self.stats["watched"] += 1
+        elif last_valid_block_height is not None:
+            entry.last_valid_block_height = max(entry.last_valid_block_height or 0, last_valid_block_height)
+
+        future = asyncio.get_running_loop().create_future()
+        entry.waiters.append((commitment, future))
+        self.start()
+        self._wake.set()
+        return future
+
+    async def wait(
+        self, signature: str, commitment: str = "confirmed",
+        last_valid_block_height: Optional[int] = None, timeout: Optional[float] = None
+    ) -> Confirmation:
+        """Wait for a signature (raises asyncio.TimeoutError after `timeout` seconds)"""
+        future = self.watch(signature, commitment, last_valid_block_height)
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+    async def lookup(self, signatures: List[str]) -> Dict[str, Optional[Confirmation]]:
+        """One-off status read, without watching"""
+        statuses = await self._fetch_statuses(signatures)
+        return {sig: self._to_confirmation(sig, status) for sig, status in zip(signatures, statuses)}
+
+    async def _fetch_statuses(self, signatures: List[str]) -> list:
+        self.stats["rpc_calls"] += 1
+        resp = await rpc_pool.call("get_signature_statuses", [Signature.from_string(s) for s in signatures])
+        return resp.value
+
+    async def _block_height(self) -> int:
+        self.stats["rpc_calls"] += 1
+        return (await rpc_pool.call("get_block_height")).value
+
+    @staticmethod
+    def _to_confirmation(signature: str, status) -> Optional[Confirmation]:
+        if status is None:
+            return None
+        err = str(status.err) if status.err is not None else None
+        return Confirmation(signature, commitment=_commitment_of(status), slot=status.slot, err=err)
+
+    async def _current_height(self) -> Optional[int]:
+        if self._height is None or time.monotonic() - self._height_at > BLOCK_HEIGHT_REFRESH:
+            try:
+                self._height = await self._block_height()
+                self._height_at = time.monotonic()
+            except Exception as e:
+                self.stats["rpc_errors"] += 1
+                logger.debug(f"Block height read failed: {e}")
+        return self._height
+
+    def _resolve(self, signature: str, entry: _Watch, confirmation: Confirmation):
+        waiting, resolved = [], False
+        for commitment, future in entry.waiters:
+            if future.done():
+                continue
+            if confirmation.expired or COMMITMENTS.index(confirmation.commitment) >= COMMITMENTS.index(commitment):
+                future.set_result(confirmation)
+                resolved = True
+            else:
+                waiting.append((commitment, future))   # Wants a higher commitment
+        entry.waiters = waiting
+        if not waiting:
+            self._pending.pop(signature, None)
+            if resolved:
+                self.stats["expired" if confirmation.expired else "failed" if confirmation.err else "confirmed"] += 1
+
+    async def sweep(self):
+        """Check every pending signature once"""
+        # Forget signatures nobody is waiting on any more
+        for sig in [s for s, e in self._pending.items() if all(f.done() for _, f in e.waiters)]:
+            del self._pending[sig]
+        if not self._pending:
+            return
+        self.stats["sweeps"] += 1
+
+        height = await self._current_height()
+        if height is not None:
+            for entry in self._pending.values():
+                if entry.last_valid_block_height is None:
+                    entry.last_valid_block_height = height + BLOCKHASH_VALIDITY
+
+        signatures = list(self._pending)
+        batches = [signatures[i:i + MAX_BATCH] for i in range(0, len(signatures), MAX_BATCH)]
+        results = await asyncio.gather(*(self._fetch_statuses(b) for b in batches), return_exceptions=True)
+
+        now = time.monotonic()
+        for batch, statuses in zip(batches, results):
+            if isinstance(statuses, Exception):
+                self.stats["rpc_errors"] += 1
+                logger.debug(f"Status sweep failed for {len(batch)} signatures: {statuses}")
+                continue
+            for sig, status in zip(batch, statuses):
+                entry = self._pending.get(sig)
+                if entry is None:
+                    continue
+                confirmation = self._to_confirmation(sig, status)
+                if confirmation is not None:
+                    self._resolve(sig, entry, confirmation)
+                elif (height is not None and height > entry.last_valid_block_height) or now - entry.added > MAX_WATCH_AGE:
+                    self._resolve(sig, entry, Confirmation(sig, expired=True))
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wake.clear()
+                await self._wake.wait()
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Confirmation sweep error: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for entry in self._pending.values():
+            for _, future in entry.waiters:
+                future.cancel()
+        self._pending.clear()
+
+
+# Global instance
+confirmation_service = ConfirmationService()
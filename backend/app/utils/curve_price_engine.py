@@ -0,0 +1,337 @@
+# app/utils/curve_price_engine.py
+import asyncio
+import hashlib
+import logging
+import struct
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Optional, Set
+
+import base58
+import grpc
+from solders.pubkey import Pubkey
+
+from app.generated import geyser_pb2
+from app.generated.geyser_pb2_grpc import GeyserStub
+from app.utils.jupiter_api import sol_price_ticker
+from app.utils.price_feed_hub import PriceTick, price_feed_hub
+from app.utils.pumpfun_grpc_listener import GRPC_TOKEN, GRPC_URL, PUMPFUN_PROGRAM, create_grpc_channel
+from app.utils.rpc_pool import rpc_pool
+
+logger = logging.getLogger(__name__)
+
+BONDING_CURVE_DISCRIMINATOR = hashlib.sha256(b"account:BondingCurve").digest()[:8]
+_CURVE_LAYOUT = struct.Struct("<QQQQQ?")  # virtual token, virtual sol, real token, real sol, supply, complete
+PUMPFUN_TOKEN_DECIMALS = 6
+LAMPORTS_PER_SOL = 1_000_000_000
+
+
+@dataclass
+class CurveState:
+    """A decoded pump.fun bonding curve account. Reserves are raw units (lamports / 6-decimal token units)."""
+    virtual_token_reserves: int
+    virtual_sol_reserves: int
+    real_token_reserves: int
+    real_sol_reserves: int
+    token_total_supply: int
+    complete: bool
+    slot: int = 0
+
+    @property
+    def price_sol(self) -> float:
+        """Spot price in SOL per token"""
+        if self.virtual_token_reserves <= 0:
+            return 0.0
+        return (self.virtual_sol_reserves / LAMPORTS_PER_SOL) / (self.virtual_token_reserves / 10 ** PUMPFUN_TOKEN_DECIMALS)
+
+    def buy_tokens_out(self, sol_in: float) -> float:
+        """Tokens a buy of `sol_in` SOL receives on the constant-product curve (before fees)"""
+        lamports_in = sol_in * LAMPORTS_PER_SOL
+        k = self.virtual_token_reserves * self.virtual_sol_reserves
+        raw_out = self.virtual_token_reserves - k / (self.virtual_sol_reserves + lamports_in)
+        return min(raw_out, self.real_token_reserves) / 10 ** PUMPFUN_TOKEN_DECIMALS
+
+    def sell_sol_out(self, tokens_in: float) -> float:
+        """SOL a sell of `tokens_in` tokens receives (before fees)"""
+        raw_in = tokens_in * 10 ** PUMPFUN_TOKEN_DECIMALS
+        k = self.virtual_token_reserves * self.virtual_sol_reserves
+        lamports_out = self.virtual_sol_reserves - k / (self.virtual_token_reserves + raw_in)
+        return min(lamports_out, self.real_sol_reserves) / LAMPORTS_PER_SOL
+
+    def buy_impact_pct(self, sol_in: float) -> float:
+        """How much worse than spot the average fill of a buy is, in %"""
+        tokens = self.buy_tokens_out(sol_in)
+        if tokens <= 0 or self.price_sol <= 0:
+            return 100.0
+        return ((sol_in / tokens) / self.price_sol - 1) * 100
+
+    def sell_impact_pct(self, tokens_in: float) -> float:
+        sol = self.sell_sol_out(tokens_in)
+        if tokens_in <= 0 or self.price_sol <= 0:
+            return 0.0
+        return (1 - (sol / tokens_in) / self.price_sol) * 100
+
+
+def decode_bonding_curve(data: bytes, slot: int = 0) -> Optional[CurveState]:
+    """BondingCurve account data → CurveState, or None if it isn't one"""
+    if len(data) < 8 + _CURVE_LAYOUT.size or data[:8] != BONDING_CURVE_DISCRIMINATOR:
+        return None
+    return CurveState(*_CURVE_LAYOUT.unpack_from(data, 8), slot=slot)
+
+
+@lru_cache(maxsize=4096)
+def bonding_curve_address(mint: str) -> str:
+    """The curve PDA for a pump.fun mint (same address NewTokens.bonding_curve records)"""
+    address, _ = Pubkey.find_program_address(
+        [b"bonding-curve", bytes(Pubkey.from_string(mint))], Pubkey.from_string(PUMPFUN_PROGRAM)
+    )
+    return str(address)
+
+
+class CurvePriceEngine:
+    """
+    On-chain prices for pump.fun tokens still on their bonding curve.
+
+    Watched mints' curve accounts are streamed over one Yellowstone gRPC
+    account subscription; every update is decoded in-process and published
+    to price_feed_hub straight away, so monitors see a trade's price in the
+    same slot instead of on the next aggregator poll. A mint is seeded with
+    one getAccountInfo when it is watched. Mints without a decodable curve
+    (not pump.fun, or migrated - complete) are given up on and the hub keeps
+    polling DexScreener for them.
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = GRPC_URL,
+        token: Optional[str] = GRPC_TOKEN,
+        secure: bool = True,
+        commitment: int = geyser_pb2.CommitmentLevel.PROCESSED,
+    ):
+        self.endpoint = endpoint
+        self.token = token
+        self.secure = secure
+        self.commitment = commitment
+        self._curve_of: Dict[str, str] = {}        # curve address -> mint
+        self._states: Dict[str, CurveState] = {}   # mint -> latest decoded curve
+        self._undecodable: Set[str] = set()
+        self._requests: Optional[asyncio.Queue] = None
+        self._resubscribe_scheduled = False
+        self._task: Optional[asyncio.Task] = None
+        self._seeds: Set[asyncio.Task] = set()
+        self.stats = {"updates": 0, "published": 0, "seeded": 0, "undecodable": 0, "reconnects": 0}
+
+    @property
+    def sol_usd(self) -> float:
+        """USD prices are SOL prices × this (0 until the ticker has a price)"""
+        return sol_price_ticker.price
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    # ===================================================================
+    # PRICE SOURCE (price_feed_hub push source)
+    # ===================================================================
+    def watch(self, mint: str):
+        """Start following a mint's curve (no-op when disabled or known undecodable)"""
+        if not self.enabled or mint in self._undecodable:
+            return
+        curve = bonding_curve_address(mint)
+        if curve in self._curve_of:
+            return
+        self._curve_of[curve] = mint
+        self._schedule_resubscribe()
+        self._spawn_seed(mint)
+
+    def _spawn_seed(self, mint: str):
+        task = asyncio.create_task(self._seed(mint))
+        self._seeds.add(task)
+        task.add_done_callback(self._seeds.discard)
+
+    def unwatch(self, mint: str):
+        self._curve_of.pop(bonding_curve_address(mint), None)
+        self._states.pop(mint, None)
+        self._schedule_resubscribe()
+
+    def current(self, mint: str) -> Optional[PriceTick]:
+        """The mint's curve price as a tick, or None if the curve isn't being followed"""
+        state = self._states.get(mint)
+        if state is None or state.complete or self.sol_usd <= 0:
+            return None
+        return self._tick(mint, state)
+
+    def state(self, mint: str) -> Optional[CurveState]:
+        return self._states.get(mint)
+
+    async def fetch(self, mint: str) -> Optional[CurveState]:
+        """Latest curve for any mint: the streamed state if watched, else one getAccountInfo"""
+        state = self._states.get(mint)
+        if state is not None:
+            return state
+        if mint in self._undecodable:
+            return None
+        try:
+            response = await rpc_pool.call("get_account_info", Pubkey.from_string(bonding_curve_address(mint)))
+        except Exception as e:
+            logger.debug(f"Curve fetch failed for {mint[:8]}: {e}")
+            return None
+        account = response.value
+        state = None
+        if account is not None and str(account.owner) == PUMPFUN_PROGRAM:
+            state = decode_bonding_curve(bytes(account.data), slot=response.context.slot)
+        if state is None or state.complete:
+            self._undecodable.add(mint)  # Not pump.fun, or migrated - don't ask again
+        return state
+
+    def _tick(self, mint: str, state: CurveState) -> PriceTick:
+        price_sol = state.price_sol
+        return PriceTick(
+            mint=mint,
+            price_usd=price_sol * self.sol_usd,
+            source="bonding_curve",
+            fetched_at=time.monotonic(),
+            data={
+                "price_native": price_sol,
+                "price_usd": price_sol * self.sol_usd,
+                "virtual_sol_reserves": state.virtual_sol_reserves,
+                "virtual_token_reserves": state.virtual_token_reserves,
+                "real_sol_reserves": state.real_sol_reserves,
+                "slot": state.slot,
+            },
+        )
+
+    def _give_up(self, mint: str, reason: str):
+        self._undecodable.add(mint)
+        self.stats["undecodable"] += 1
+        self.unwatch(mint)
+        logger.info(f"📉 {mint[:8]} has no live bonding curve ({reason}) - aggregator prices only")
+
+    async def _seed(self, mint: str):
+        state = await self.fetch(mint)
+        if bonding_curve_address(mint) not in self._curve_of:
+            return  # Unwatched meanwhile
+        if state is None:
+            if mint in self._undecodable:
+                self._give_up(mint, "no curve account")
+            # else a failed RPC call - the stream still delivers the next trade
+        elif state.complete:
+            self._give_up(mint, "migrated")
+        else:
+            self.stats["seeded"] += 1
+            self._apply(mint, state)
+
+    def _apply(self, mint: str, state: CurveState):
+        current = self._states.get(mint)
+        if current is not None and state.slot < current.slot:
+            return  # Out-of-order update
+        if state.complete:
+            self._give_up(mint, "migrated")
+            return
+        self._states[mint] = state
+        if self.sol_usd > 0:
+            price_feed_hub.publish(self._tick(mint, state))
+            self.stats["published"] += 1
+
+    # ===================================================================
+    # STREAM
+    # ===================================================================
+    def build_request(self) -> "geyser_pb2.SubscribeRequest":
+        request = geyser_pb2.SubscribeRequest(commitment=self.commitment)
+        # An empty account filter would match every account - send none instead
+        if self._curve_of:
+            request.accounts["curves"].CopyFrom(
+                geyser_pb2.SubscribeRequestFilterAccounts(account=list(self._curve_of))
+            )
+        return request
+
+    def _schedule_resubscribe(self):
+        # Watches / unwatches in the same loop iteration share one filter update
+        if self._requests is None or self._resubscribe_scheduled:
+            return
+        self._resubscribe_scheduled = True
+        asyncio.get_running_loop().call_soon(self._resubscribe)
+
+    def _resubscribe(self):
+        self._resubscribe_scheduled = False
+        if self._requests is not None:
+            self._requests.put_nowait(self.build_request())
+
+    async def _request_stream(self) -> AsyncIterator:
+        yield self.build_request()
+        while True:
+            yield await self._requests.get()
+
+    def handle_update(self, update: "geyser_pb2.SubscribeUpdate"):
+        if not update.HasField("account"):
+            return
+        info = update.account.account
+        mint = self._curve_of.get(base58.b58encode(info.pubkey).decode())
+        if mint is None:
+            return
+        self.stats["updates"] += 1
+        state = decode_bonding_curve(bytes(info.data), slot=update.account.slot)
+        if state is not None:
+            self._apply(mint, state)
+
+    async def _stream_once(self):
+        channel = create_grpc_channel(self.endpoint, self.token, secure=self.secure)
+        self._requests = asyncio.Queue()
+        try:
+            call = GeyserStub(channel).Subscribe(self._request_stream())
+            logger.info(f"📡 Bonding curve stream connected ({len(self._curve_of)} curves)")
+            async for update in call:
+                if update.HasField("ping"):
+                    self._requests.put_nowait(geyser_pb2.SubscribeRequest(ping=geyser_pb2.SubscribeRequestPing(id=1)))
+                    continue
+                self.handle_update(update)
+        finally:
+            self._requests = None
+            await channel.close()
+
+    async def _run(self):
+        """Stream forever with reconnect; re-seeds every curve after a gap"""
+        backoff = 1.0
+        while True:
+            try:
+                await self._stream_once()
+                backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except grpc.aio.AioRpcError as e:
+                logger.error(f"Bonding curve stream error: {e.code()} {e.details()}")
+            except Exception as e:
+                logger.error(f"Bonding curve stream crashed: {e}")
+
+            self.stats["reconnects"] += 1
+            # Updates missed while disconnected: drop the states so the hub falls back until re-seeded
+            self._states.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+            for mint in list(self._curve_of.values()):
+                self._spawn_seed(mint)
+
+    def start(self) -> Optional[asyncio.Task]:
+        if not self.endpoint:
+            logger.warning("GRPC_URL not set - bonding curve prices disabled, using aggregators only")
+            return None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        seeds = list(self._seeds)
+        for task in seeds:
+            task.cancel()
+        await asyncio.gather(*seeds, return_exceptions=True)
+        self._curve_of.clear()
+        self._states.clear()
+
+
+# Global instance
+curve_price_engine = CurvePriceEngine()
@@ -0,0 +1,139 @@
+# app/utils/deadline_scheduler.py
+import asyncio
+import heapq
+import logging
+import math
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DueCallback = Callable[[List[Hashable]], None]
+
+
+class DeadlineScheduler:
+    """
+    Owns many deadlines (epoch seconds) and calls on_due(keys) when they pass.
+
+    A hashed timer wheel: deadlines are bucketed into `resolution`-wide slots,
+    so moving a key to a new deadline is a set move (O(1)); only the first
+    key to land in an empty slot pushes that slot onto a small heap of
+    occupied slots. A single loop timer is armed for the earliest occupied
+    slot - nothing runs between deadlines, and each key fires at most
+    `resolution` seconds after its deadline.
+    """
+
+    def __init__(self, resolution: float = 0.1):
+        self.resolution = resolution
+        self._buckets: Dict[int, Set[Hashable]] = {}
+        self._slot_of: Dict[Hashable, int] = {}
+        self._deadline_of: Dict[Hashable, float] = {}
+        self._slots: List[int] = []  # Occupied slots (lazy - emptied slots are skipped)
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._armed_slot: Optional[int] = None
+        self._on_due: Optional[DueCallback] = None
+        self.stats = {"scheduled": 0, "fired": 0}
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slot_of
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        return self._deadline_of.get(key)
+
+    def start(self, on_due: DueCallback):
+        self._on_due = on_due
+        self._arm()
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Set (or move) the deadline for a key"""
+        slot = math.ceil(deadline / self.resolution)
+        self._deadline_of[key] = deadline
+        old = self._slot_of.get(key)
+        if old == slot:
+            return
+
+        if old is not None:
+            self._discard(key, old)
+        bucket = self._buckets.get(slot)
+        if bucket is None:
+            bucket = self._buckets[slot] = set()
+            heapq.heappush(self._slots, slot)
+        bucket.add(key)
+        self._slot_of[key] = slot
+        self.stats["scheduled"] += 1
+
+        if self._armed_slot is None or slot < self._armed_slot:
+            self._arm()
+
+    def cancel(self, key: Hashable):
+        """Drop a key's deadline (no-op if it has none)"""
+        slot = self._slot_of.pop(key, None)
+        self._deadline_of.pop(key, None)
+        if slot is not None:
+            self._discard(key, slot)
+
+    def _discard(self, key: Hashable, slot: int):
+        bucket = self._buckets.get(slot)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[slot]
+
+    def _arm(self):
+        # Drop slots that were emptied by reschedules / cancels
+        while self._slots and self._slots[0] not in self._buckets:
+            heapq.heappop(self._slots)
+
+        if not self._slots or self._on_due is None:
+            self._disarm()
+            return
+
+        slot = self._slots[0]
+        if slot == self._armed_slot and self._handle is not None:
+            return
+
+        self._disarm()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Armed by start() once the loop runs
+        delay = max(0.0, slot * self.resolution - time.time())
+        self._handle = loop.call_at(loop.time() + delay, self._fire)
+        self._armed_slot = slot
+
+    def _disarm(self):
+        if self._handle is not None:
+            self._handle.cancel()
+        self._handle = None
+        self._armed_slot = None
+
+    def _fire(self):
+        self._handle = None
+        self._armed_slot = None
+        current = math.floor(time.time() / self.resolution)
+
+        due: List[Hashable] = []
+        while self._slots and self._slots[0] <= current:
+            bucket = self._buckets.pop(heapq.heappop(self._slots), None)
+            for key in bucket or ():
+                del self._slot_of[key]
+                del self._deadline_of[key]
+                due.append(key)
+
+        self._arm()
+        if due:
+            self.stats["fired"] += len(due)
+            try:
+                self._on_due(due)
+            except Exception as e:
+                logger.error(f"Deadline callback failed for {len(due)} keys: {e}", exc_info=True)
+
+    def close(self):
+        self._disarm()
+        self._buckets.clear()
+        self._slot_of.clear()
+        self._deadline_of.clear()
+        self._slots.clear()
@@ -1,12 +1,219 @@
 import asyncio
 import logging
 import httpx
+from typing import Dict, List, Optional, Set
+
+from app.utils.http_clients import http_clients
+from app.utils.index_scheduler import index_scheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def parse_dexscreener_pool(pool: dict) -> dict:
+    """Flatten one DexScreener pair object into the dict shape the rest of the app uses"""
+    # Extract basic fields.
+    dexscreener_url = pool.get("url", "")
+    pair_address = pool.get("pairAddress", "")
+    price_native = pool.get("priceNative", "")
+    price_usd = pool.get("priceUsd", "")
+    liquidity_obj = pool.get("liquidity", {})
+    liquidity_usd = liquidity_obj.get("usd", 0.0)
+    market_cap = pool.get("marketCap", 0.0)
+    pair_created_at = pool.get("pairCreatedAt", 0)
+    dex_id = pool.get("dexId", "")
+    fdv = pool.get("fdv", 0.0)
+
+    # Extract base token info
+    base_token = pool.get("baseToken", {})
+    token_name = base_token.get("name", "")
+    token_symbol = base_token.get("symbol", "")
+
+    # Extract volume data
+    volume = pool.get("volume", {})
+    volume_h24 = volume.get("h24", 0.0)
+    volume_h6 = volume.get("h6", 0.0)
+    volume_h1 = volume.get("h1", 0.0)
+    volume_m5 = volume.get("m5", 0.0)
+
+    # Extract price change data
+    price_change = pool.get("priceChange", {})
+    price_change_h1 = price_change.get("h1", 0.0)
+    price_change_m5 = price_change.get("m5", 0.0)
+    price_change_h6 = price_change.get("h6", 0.0)
+    price_change_h24 = price_change.get("h24", 0.0)
+
+    # Extract websites and socials from the "info" object.
+    info = pool.get("info", {})
+    # For websites, the API returns an array; join them if available.
+    websites_list = info.get("websites", [])
+    if websites_list and isinstance(websites_list, list):
+        # Each item is expected to be a dict with a "url" key.
+        websites = ", ".join([item.get("url", "").strip() for item in websites_list if item.get("url")])
+        if not websites:
+            websites = "N/A"
+    else:
+        websites = "N/A"
+
+    # For socials, iterate over the array to find Twitter and Telegram.
+    socials = info.get("socials", [])
+    twitter = "N/A"
+    telegram = "N/A"
+    if socials and isinstance(socials, list):
+        for social in socials:
+            social_type = social.get("type", "").lower()
+            social_url = social.get("url", "").strip()
+            if social_type == "twitter" and social_url:
+                twitter = social_url
+            elif social_type == "telegram" and social_url:
+                telegram = social_url
+
+    return {
+        "dexscreener_url": dexscreener_url,
+        "pair_address": pair_address,
+        "price_native": price_native,
+        "price_usd": price_usd,
+        "liquidity": liquidity_usd,
+        "market_cap": market_cap,  # Note: Fixed typo from 'market_cap' to match your docstring
+        "pair_created_at": pair_created_at,
+        "websites": websites,
+        "twitter": twitter,
+        "telegram": telegram,
+        "token_name": token_name,
+        "token_symbol": token_symbol,
+        "dex_id": dex_id,
+        "liquidity_usd": liquidity_obj.get("usd", 0.0),
+        "fdv": pool.get("fdv", 0.0),
+        "volume_h24": volume_h24,
+        "volume_h6": volume_h6,
+        "volume_h1": volume_h1,
+        "volume_m5": volume_m5,
+        "price_change_m5": price_change_m5,
+        "price_change_h1": price_change_h1,
+        "price_change_h6": price_change_h6,
+        "price_change_h24": price_change_h24,
+    }
+
+
+DEXSCREENER_TOKENS_URL = "https://api.dexscreener.com/tokens/v1/solana/{addresses}"
+DEXSCREENER_MAX_ADDRESSES = 30  # Hard limit of the tokens endpoint
+
+
+def _pick_pool(pairs: List[dict], mint_address: str) -> Optional[dict]:
+    """Deepest-liquidity pair where the mint is the base token (falls back to quote side)"""
+    base = [p for p in pairs if (p.get("baseToken") or {}).get("address") == mint_address]
+    candidates = base or [p for p in pairs if (p.get("quoteToken") or {}).get("address") == mint_address]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda p: float((p.get("liquidity") or {}).get("usd") or 0))
+
+
+class DexScreenerBatcher:
+    """
+    Coalesces get_dexscreener_data() calls that arrive within `window` seconds
+    into one `/tokens/v1/solana/{a,b,c}` request (max 30 addresses) and resolves
+    each caller with its own parsed pool dict. The same mint requested twice in
+    one window shares a single future.
+    """
+
+    def __init__(self, window: float = 0.005, max_batch: int = DEXSCREENER_MAX_ADDRESSES):
+        self.window = window
+        self.max_batch = min(max_batch, DEXSCREENER_MAX_ADDRESSES)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "mints": 0}
+
+    async def get(self, mint_address: str) -> dict:
+        future = self._pending.get(mint_address)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[mint_address] = future
+
+            if len(self._pending) >= self.max_batch:
+                self._schedule_flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.window, self._schedule_flush)
+
+        # Shield so one cancelled caller doesn't cancel the shared future
+        return await asyncio.shield(future)
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch = dict(list(self._pending.items())[:self.max_batch])
+        for mint in batch:
+            del self._pending[mint]
+        if batch:
+            task = asyncio.create_task(self._fetch_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        # Anything left over (more than one batch queued) goes in the next window
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._schedule_flush)
+
+    async def _fetch_batch(self, batch: Dict[str, asyncio.Future]):
+        try:
+            await self._resolve_batch(batch)
+        finally:
+            # Cancelled (shutdown) or failed part-way - nobody may be left waiting
+            for future in batch.values():
+                if not future.done():
+                    future.set_result({})
+
+    async def _resolve_batch(self, batch: Dict[str, asyncio.Future]):
+        url = DEXSCREENER_TOKENS_URL.format(addresses=",".join(batch))
+        pairs: List[dict] = []
+        try:
+            response = await http_clients.client_for(url).get(url)
+            response.raise_for_status()
+            data = response.json()
+            if isinstance(data, list):
+                pairs = data
+            self.stats["requests"] += 1
+            self.stats["mints"] += len(batch)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error fetching Dexscreener data for {len(batch)} mints: {e.response.status_code}")
+        except Exception as e:
+            logger.error(f"Error fetching Dexscreener data for {len(batch)} mints: {e}")
+
+        for mint_address, future in batch.items():
+            if future.done():
+                continue
+            try:
+                pool = _pick_pool(pairs, mint_address)
+                if pool is None:
+                    if pairs or len(batch) == 1:
+                        logger.info(f"No Dexscreener data found for {mint_address}")
+                    future.set_result({})
+                else:
+                    future.set_result(parse_dexscreener_pool(pool))
+            except Exception as e:
+                logger.error(f"Error parsing Dexscreener data for {mint_address}: {e}")
+                future.set_result({})
+
+    async def close(self):
+        """Cancel in-flight batches and release every waiting caller (app shutdown)"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_result({})
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Global instance
+dexscreener_batcher = DexScreenerBatcher()
+
+
 async def get_dexscreener_data(mint_address: str) -> dict:
     """
     Asynchronously fetches pool data from Dexscreener for the given token mint on Solana.
@@ -33,109 +240,17 @@ async def get_dexscreener_data(mint_address: str) -> dict:
       - price_change_h6: 6-hour price change percentage.
       - price_change_h24: 24-hour price change percentage.
     Returns a dict with these fields (or default values if not found).
+
+    Requests are coalesced by `dexscreener_batcher`, so concurrent callers share
+    one multi-address call instead of one request per mint.
     """
-    url = f"https://api.dexscreener.com/token-pairs/v1/solana/{mint_address}"
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            data = response.json()
-        
-        # Dexscreener returns an array of pool objects.
-        if not data or not isinstance(data, list) or len(data) == 0:
-            logger.info(f"No Dexscreener data found for {mint_address}")
-            return {}
-        
-        # We'll use the first pool for our data.
-        pool = data[0]
-
-        # Extract basic fields.
-        dexscreener_url = pool.get("url", "")
-        pair_address = pool.get("pairAddress", "")
-        price_native = pool.get("priceNative", "")
-        price_usd = pool.get("priceUsd", "")
-        liquidity_obj = pool.get("liquidity", {})
-        liquidity_usd = liquidity_obj.get("usd", 0.0)
-        market_cap = pool.get("marketCap", 0.0)
-        pair_created_at = pool.get("pairCreatedAt", 0)
-        dex_id = pool.get("dexId", "")
-        fdv = pool.get("fdv", 0.0)
-
-        # Extract base token info
-        base_token = pool.get("baseToken", {})
-        token_name = base_token.get("name", "")
-        token_symbol = base_token.get("symbol", "")
-
-        # Extract volume data
-        volume = pool.get("volume", {})
-        volume_h24 = volume.get("h24", 0.0)
-        volume_h6 = volume.get("h6", 0.0)
-        volume_h1 = volume.get("h1", 0.0)
-        volume_m5 = volume.get("m5", 0.0)
-
-        # Extract price change data
-        price_change = pool.get("priceChange", {})
-        price_change_h1 = price_change.get("h1", 0.0)
-        price_change_m5 = price_change.get("m5", 0.0)
-        price_change_h6 = price_change.get("h6", 0.0)
-        price_change_h24 = price_change.get("h24", 0.0)
-
-        # Extract websites and socials from the "info" object.
-        info = pool.get("info", {})
-        # For websites, the API returns an array; join them if available.
-        websites_list = info.get("websites", [])
-        if websites_list and isinstance(websites_list, list):
-            # Each item is expected to be a dict with a "url" key.
-            websites = ", ".join([item.get("url", "").strip() for item in websites_list if item.get("url")])
-            if not websites:
-                websites = "N/A"
-        else:
-            websites = "N/A"
+    return await dexscreener_batcher.get(mint_address)
+
 
-        # For socials, iterate over the array to find Twitter and Telegram.
-        socials = info.get("socials", [])
-        twitter = "N/A"
-        telegram = "N/A"
-        if socials and isinstance(socials, list):
-            for social in socials:
-                social_type = social.get("type", "").lower()
-                social_url = social.get("url", "").strip()
-                if social_type == "twitter" and social_url:
-                    twitter = social_url
-                elif social_type == "telegram" and social_url:
-                    telegram = social_url
-
-        return {
-            "dexscreener_url": dexscreener_url,
-            "pair_address": pair_address,
-            "price_native": price_native,
-            "price_usd": price_usd,
-            "liquidity": liquidity_usd,
-            "market_cap": market_cap,  # Note: Fixed typo from 'market_cap' to match your docstring
-            "pair_created_at": pair_created_at,
-            "websites": websites,
-            "twitter": twitter,
-            "telegram": telegram,
-            "token_name": token_name,
-            "token_symbol": token_symbol,
-            "dex_id": dex_id,
-            "liquidity_usd": liquidity_obj.get("usd", 0.0),
-            "fdv": pool.get("fdv", 0.0),
-            "volume_h24": volume_h24,
-            "volume_h6": volume_h6,
-            "volume_h1": volume_h1,
-            "volume_m5": volume_m5,
-            "price_change_m5": price_change_m5,
-            "price_change_h1": price_change_h1,
-            "price_change_h6": price_change_h6,
-            "price_change_h24": price_change_h24,
-        }
-    except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error fetching Dexscreener data for {mint_address}: {e.response.status_code}")
-        return {}
-    except Exception as e:
-        logger.error(f"Error fetching Dexscreener data for {mint_address}: {e}")
-        return {}
+async def get_dexscreener_data_many(mint_addresses: List[str]) -> Dict[str, dict]:
+    """Fetch several mints at once (chunked into 30-address calls by the batcher)"""
+    results = await asyncio.gather(*(dexscreener_batcher.get(m) for m in mint_addresses))
+    return dict(zip(mint_addresses, results))
 
 
 
@@ -144,26 +259,37 @@ async def get_dexscreener_data(mint_address: str) -> dict:
 # ===================================================================
 # 2b. NEW: Smart DexScreener Fetch with Retry + Delay
 # ===================================================================
-async def fetch_dexscreener_with_retry(mint: str, max_attempts: int = 9) -> dict:
-    for attempt in range(max_attempts):
-        data = await get_dexscreener_data(mint)
-        price_usd = 0.0
-        if data and data.get("price_usd"):
-            try:
-                price_usd = float(data["price_usd"])
-            except (ValueError, TypeError):
-                price_usd = 0.0
+DEXSCREENER_INDEX_TIMEOUT = 180.0  # Default deadline for callers that can afford to wait
 
-        if price_usd > 0:
-            logger.info(f"DexScreener ready → {mint[:8]} | ${price_usd:.10f} | MC: ${data.get('market_cap', 0):,.0f} | Attempt {attempt + 1}")
-            return data
 
-        delay = min(8 + (attempt ** 2) * 7, 160)
-        logger.info(f"DexScreener not ready {mint[:8]} → waiting {delay}s (attempt {attempt+1})")
-        await asyncio.sleep(delay)
+def _has_price(data: dict) -> bool:
+    try:
+        return float(data.get("price_usd") or 0) > 0
+    except (ValueError, TypeError):
+        return False
+
+
+async def _probe_dexscreener(mints: List[str]) -> Dict[str, dict]:
+    results = await get_dexscreener_data_many(mints)
+    return {mint: data for mint, data in results.items() if data and _has_price(data)}
 
-    logger.warning(f"DexScreener failed permanently for {mint[:8]}")
-    return {}
 
+index_scheduler.register_source("dexscreener", _probe_dexscreener, batch_size=DEXSCREENER_MAX_ADDRESSES)
 
 
+async def fetch_dexscreener_with_retry(
+    mint: str,
+    max_attempts: int = 9,
+    timeout: float = DEXSCREENER_INDEX_TIMEOUT,
+) -> dict:
+    """
+    Wait until DexScreener has a priced pool for `mint`, up to `timeout` seconds.
+    Probing is done by the shared index_scheduler, so this never sleeps in the
+    caller's coroutine - it returns {} at the deadline instead.
+    """
+    data = await index_scheduler.wait_until_indexed(
+        "dexscreener", mint, timeout=timeout, max_attempts=max_attempts
+    )
+    if data:
+        logger.info(f"DexScreener ready → {mint[:8]} | ${float(data['price_usd']):.10f} | MC: ${data.get('market_cap', 0):,.0f}")
+    return data
@@ -1,11 +1,18 @@
 # app/utils/fee_manager.py
+import asyncio
+import json
 import logging
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 from app.models import User
-from app.utils.fee_tracker import FeeTracker
+from app.utils.fee_tracker import LARGE_TRADE_SOL, FeeProfile, FeeTracker
 
 logger = logging.getLogger(__name__)
 
+DECISION_CACHE_MAX_USERS = 5000
+AUDIT_FLUSH_DELAY = 1.0         # seconds - decision records inside this window share one pipeline
+AUDIT_MAX_PENDING = 10000       # Records held while Redis is unreachable before the oldest are dropped
+
 class UnifiedFeeManager:
     """Unified fee calculation and decision making"""
     
@@ -15,7 +22,13 @@ class UnifiedFeeManager:
     
     def __init__(self, redis_client):
         """Initialize with Redis client"""
+        self.redis = redis_client
         self.tracker = FeeTracker(redis_client)
+        # wallet -> (profile tier, {(premium, trade type, large trade, losing): decision})
+        self._decisions: "OrderedDict[str, Tuple[tuple, Dict[tuple, Dict[str, Any]]]]" = OrderedDict()
+        self._audit: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()   # key -> (ttl, payload)
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"decision_hits": 0, "decision_misses": 0, "audit_flushes": 0, "audit_written": 0, "audit_dropped": 0}
     
     async def calculate_fee_decision(
         self,
@@ -60,13 +73,42 @@ class UnifiedFeeManager:
                 "details": f"Stop loss at {pnl_pct:.1f}% loss"
             }
         
-        # 4. Use the tracker for the actual decision
+        # 4. Everything below depends only on the profile tier and a few flags - memoised per user
+        profile = await self.tracker.cached_profile(user.wallet_address)
+        tier = profile.tier()
+        cached = self._decisions.get(user.wallet_address)
+        if cached is None or cached[0] != tier:
+            cached = self._decisions[user.wallet_address] = (tier, {})   # Crossed a bucket boundary
+        self._decisions.move_to_end(user.wallet_address)
+        while len(self._decisions) > DECISION_CACHE_MAX_USERS:
+            self._decisions.popitem(last=False)
+
+        key = (bool(user.is_premium), trade_type, amount_sol > LARGE_TRADE_SOL, pnl_pct < -5.0)
+        decision = cached[1].get(key)
+        if decision is None:
+            self.stats["decision_misses"] += 1
+            decision = cached[1][key] = await self._profile_decision(user, trade_type, amount_sol, mint, pnl_pct, profile)
+        else:
+            self.stats["decision_hits"] += 1
+        return dict(decision)
+
+    async def _profile_decision(
+        self,
+        user: User,
+        trade_type: str,
+        amount_sol: float,
+        mint: str,
+        pnl_pct: float,
+        profile: FeeProfile
+    ) -> Dict[str, Any]:
+        """Steps that read the user's fee profile"""
         should_apply = await self.tracker.should_apply_fee(
             user_wallet=user.wallet_address,
             trade_type=trade_type,
             amount_sol=amount_sol,
             mint=mint,
-            pnl_pct=pnl_pct
+            pnl_pct=pnl_pct,
+            profile=profile
         )
         
         if not should_apply:
@@ -83,7 +125,8 @@ class UnifiedFeeManager:
             user_wallet=user.wallet_address,
             amount_sol=amount_sol,
             trade_type=trade_type,
-            is_premium=user.is_premium
+            is_premium=user.is_premium,
+            profile=profile
         )
         
         if fee_bps <= 0:
@@ -124,9 +167,47 @@ class UnifiedFeeManager:
             mint=mint,
             trade_type=trade_type
         )
-        
-        
-        
-        
-        
-        
\ No newline at end of file
+
+    # ------------------------------------------------------------------
+    # Decision audit records
+    # ------------------------------------------------------------------
+    def record_decision(self, key: str, record: Dict[str, Any], ttl: int = 600):
+        """Queue a fee decision for the audit trail - written with the next batch, not on the trade path"""
+        self._audit[key] = (ttl, json.dumps(record))
+        self._audit.move_to_end(key)
+        while len(self._audit) > AUDIT_MAX_PENDING:
+            self._audit.popitem(last=False)
+            self.stats["audit_dropped"] += 1
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                pass  # No loop (yet) - the next record schedules it
+
+    async def _flush_later(self):
+        await asyncio.sleep(AUDIT_FLUSH_DELAY)
+        self._flush_task = None  # Records from here on schedule the next flush
+        await self.flush()
+
+    async def flush(self):
+        batch, self._audit = self._audit, OrderedDict()
+        if not batch:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for key, (ttl, payload) in batch.items():
+            pipe.setex(key, ttl, payload)
+        try:
+            await pipe.execute()
+            self.stats["audit_flushes"] += 1
+            self.stats["audit_written"] += len(batch)
+        except Exception as e:
+            logger.error(f"Fee decision audit flush failed ({len(batch)} records): {e}")
+            # Retry with the next flush unless a newer record replaced it meanwhile
+            for key, value in batch.items():
+                self._audit.setdefault(key, value)
+
+    async def close(self):
+        """Write out pending audit records (app shutdown)"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
@@ -0,0 +1,203 @@
+# app/utils/fee_oracle.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from solana.rpc.commitment import Confirmed
+from solders.hash import Hash
+
+from app.config import settings
+from app.utils.http_clients import http_clients
+from app.utils.rpc_pool import rpc_pool
+
+logger = logging.getLogger(__name__)
+
+BLOCKHASH_REFRESH = 0.4     # seconds - about one slot
+BLOCKHASH_MAX_AGE = 20.0    # seconds - older than this and blockhash() fetches inline
+FEE_REFRESH = 2.0           # getRecentPrioritizationFees already covers the last 150 slots
+FEE_MAX_AGE = 10.0          # seconds - an older fee reading no longer counts as live
+TIP_REFRESH = 10.0
+JITO_TIP_FLOOR_URL = "https://bundles.jito.wtf/api/v1/bundles/tip_floor"
+
+PRIORITY_LEVELS = {"low": 25, "medium": 50, "high": 75, "very_high": 95}   # percentile of recent slot fees
+FEE_ACCOUNTS = (  # Writable accounts whose fee market our transactions bid into
+    settings.PUMPFUN_PROGRAM or "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P",   # pump.fun
+    "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4",                              # Jupiter v6 router
+)
+DEFAULT_JITO_TIP = 10_000   # lamports, until the tip floor has been read
+TIP_PERCENTILES = (25, 50, 75, 95, 99)
+
+
+def _percentile(ordered: List[int], pct: float) -> int:
+    """Nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+@dataclass
+class CachedBlockhash:
+    blockhash: Hash
+    last_valid_block_height: int
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+
+class FeeOracle:
+    """
+    Background view of what a transaction needs right now.
+
+    Keeps a confirmed blockhash refreshed every slot, the recent
+    prioritization fees (per-slot minimums over the last 150 slots) and
+    Jito's landed-tip percentiles, so transaction builders read them from
+    memory instead of asking the RPC on the hot path. Fee and tip readings
+    move with congestion and are clamped to the configured bounds; until
+    the fee reading is live, callers get the fixed fee they used before.
+    """
+
+    def __init__(self):
+        self._blockhash: Optional[CachedBlockhash] = None
+        self._slot_fees: List[int] = []           # Ascending, micro-lamports per CU
+        self._fees_at = 0.0                        # time.monotonic() of the last fee reading
+        self._tips: Dict[int, int] = {}            # percentile -> lamports
+        self._refresh: Optional[asyncio.Future] = None
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"blockhash_refreshes": 0, "inline_fetches": 0, "errors": 0}
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def latest_blockhash(self) -> Optional[CachedBlockhash]:
+        """Cached blockhash, or None if it is missing or too old to build with"""
+        cached = self._blockhash
+        if cached is None or cached.age > BLOCKHASH_MAX_AGE:
+            return None
+        return cached
+
+    async def blockhash(self) -> CachedBlockhash:
+        """Cached blockhash - fetched on the spot only if the refresh loop has fallen behind"""
+        cached = self.latest_blockhash()
+        if cached is not None:
+            return cached
+        self.stats["inline_fetches"] += 1
+        return await self._refresh_blockhash()
+
+    @property
+    def fees_live(self) -> bool:
+        """A recent reading in which someone actually paid for priority - all zeros carry no signal"""
+        return time.monotonic() - self._fees_at <= FEE_MAX_AGE and any(self._slot_fees)
+
+    def priority_fee(self, level: str = "medium", fallback: Optional[int] = None) -> int:
+        """
+        Compute unit price (micro-lamports) that recent slots landed at for
+        this level. `fallback` is the caller's old fixed fee, returned while
+        the reading isn't live.
+        """
+        if fallback is not None and not self.fees_live:
+            return fallback
+        fee = _percentile(self._slot_fees, PRIORITY_LEVELS[level])
+        return max(settings.PRIORITY_FEE_MIN, min(fee, settings.PRIORITY_FEE_MAX))
+
+    def jito_tip(self, percentile: int = 50) -> int:
+        """Lamports that landed `percentile`% of recent Jito bundles"""
+        tip = DEFAULT_JITO_TIP
+        if self._tips:
+            tip = self._tips[min((p for p in self._tips if p >= percentile), default=max(self._tips))]
+        return self.clamp_tip(tip)
+
+    @staticmethod
+    def clamp_tip(tip: int) -> int:
+        """Keep a tip within JITO_MIN_TIP_LAMPORTS..JITO_MAX_TIP_LAMPORTS"""
+        low = int(settings.JITO_MIN_TIP_LAMPORTS or 1000)
+        high = int(settings.JITO_MAX_TIP_LAMPORTS or 10_000_000)
+        return max(low, min(int(tip), high))
+
+    def snapshot(self) -> dict:
+        cached = self._blockhash
+        return {
+            "blockhash": str(cached.blockhash) if cached else None,
+            "blockhash_age_s": round(cached.age, 2) if cached else None,
+            "last_valid_block_height": cached.last_valid_block_height if cached else None,
+            "priority_fees": {level: self.priority_fee(level) for level in PRIORITY_LEVELS},
+            "fee_slots": len(self._slot_fees),
+            "fees_live": self.fees_live,
+            "jito_tips": {p: self.jito_tip(p) for p in TIP_PERCENTILES},
+            **self.stats,
+        }
+
+    # ------------------------------------------------------------------
+    # Refreshes
+    # ------------------------------------------------------------------
+    async def _refresh_blockhash(self) -> CachedBlockhash:
+        # Concurrent callers share one request
+        if self._refresh is not None and not self._refresh.done():
+            return await asyncio.shield(self._refresh)
+        self._refresh = asyncio.get_running_loop().create_future()
+        try:
+            blockhash, last_valid_block_height = await self._fetch_blockhash()
+            cached = CachedBlockhash(blockhash, last_valid_block_height, time.monotonic())
+            self._blockhash = cached
+            self.stats["blockhash_refreshes"] += 1
+            self._refresh.set_result(cached)
+            return cached
+        except Exception as e:
+            self._refresh.set_exception(e)
+            self._refresh.exception()  # Retrieved - waiters get it re-raised
+            raise
+
+    async def _fetch_blockhash(self) -> Tuple[Hash, int]:
+        resp = await rpc_pool.call("get_latest_blockhash", Confirmed)
+        return resp.value.blockhash, resp.value.last_valid_block_height
+
+    async def _fetch_slot_fees(self) -> List[int]:
+        # solana-py has no wrapper for this method
+        result = await rpc_pool.request("getRecentPrioritizationFees", [list(FEE_ACCOUNTS)])
+        return [int(f["prioritizationFee"]) for f in result]
+
+    async def refresh_fees(self):
+        self._slot_fees = sorted(await self._fetch_slot_fees())
+        self._fees_at = time.monotonic()
+
+    async def refresh_tips(self):
+        async with http_clients.session(JITO_TIP_FLOOR_URL) as client:
+            resp = await client.get(JITO_TIP_FLOOR_URL)
+            resp.raise_for_status()
+            floor = resp.json()[0]
+        self._tips = {
+            p: int(float(floor[f"landed_tips_{p}th_percentile"]) * 1_000_000_000)
+            for p in TIP_PERCENTILES if floor.get(f"landed_tips_{p}th_percentile") is not None
+        }
+
+    async def _every(self, interval: float, refresh, what: str):
+        while True:
+            try:
+                await refresh()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.debug(f"Fee oracle {what} refresh failed: {e}")
+            await asyncio.sleep(interval)
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._every(BLOCKHASH_REFRESH, self._refresh_blockhash, "blockhash")),
+                asyncio.create_task(self._every(FEE_REFRESH, self.refresh_fees, "priority fee")),
+                asyncio.create_task(self._every(TIP_REFRESH, self.refresh_tips, "Jito tip")),
+            ]
+            logger.info("⛽ Fee oracle started (blockhash, priority fees, Jito tips)")
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+# Global instance
+fee_oracle = FeeOracle()
@@ -1,132 +1,252 @@
 # app/utils/fee_tracker.py
 import logging
-import redis.asyncio as redis
-from typing import Optional
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
-# Redis client (you can import your existing redis_client or create a new one)
-# If you already have redis_client in bot_components.py, you can pass it as parameter
-# or create a new connection
+# Fee ledger layout (per wallet):
+#   fee_profile:{wallet}   hash - total_trades, "v:<day>" SOL volume per UTC day, "n:<hour>" trades per hour
+#   fee_buckets:{wallet}   sorted set - each bucket field, scored by when it leaves its window
+PROFILE_KEY = "fee_profile:{}"
+BUCKETS_KEY = "fee_buckets:{}"
+TOKEN_TRADES_KEY = "token_trades:{}:{}"
+LEGACY_KEYS = ("total_trades:{}", "volume_30d:{}", "trade_count_24h:{}")  # Pre-ledger counters, folded in on first write
+
+VOLUME_WINDOW_DAYS = 30
+COUNT_WINDOW_HOURS = 24
+TOKEN_TRADES_TTL = 604800  # 7 days
+
+PROFILE_CACHE_TTL = 30.0       # seconds a cached profile is trusted - picks up trades tracked by other workers
+PROFILE_CACHE_MAX_ENTRIES = 5000
+
+# Fee rule thresholds
+SMALL_TRADE_SOL = 0.1
+LARGE_TRADE_SOL = 1.0
+HIGH_FREQUENCY_TRADES_24H = 10
+HIGH_VOLUME_SOL = 100
+WHALE_VOLUME_SOL = 500
+GRACE_TRADES = 3
+
+# One atomic round trip per trade: bump the counters, index the buckets
+# and drop the ones that have slid out of their window
+TRACK_TRADE_LUA = """
+-- KEYS: profile, buckets, token trades, legacy total / volume / 24h count
+-- ARGV: now, amount_sol, day field, day expiry, hour field, hour expiry, token trades ttl
+if redis.call('HEXISTS', KEYS[1], 'total_trades') == 0 then
+    local legacy = redis.call('MGET', KEYS[4], KEYS[5], KEYS[6])
+    if legacy[1] then redis.call('HSET', KEYS[1], 'total_trades', legacy[1]) end
+    if legacy[2] then redis.call('HINCRBYFLOAT', KEYS[1], ARGV[3], legacy[2]) end
+    if legacy[3] then redis.call('HINCRBY', KEYS[1], ARGV[5], legacy[3]) end
+    redis.call('DEL', KEYS[4], KEYS[5], KEYS[6])
+end
+redis.call('HINCRBY', KEYS[1], 'total_trades', 1)
+redis.call('HINCRBYFLOAT', KEYS[1], ARGV[3], ARGV[2])
+redis.call('HINCRBY', KEYS[1], ARGV[5], 1)
+redis.call('ZADD', KEYS[2], ARGV[4], ARGV[3], ARGV[6], ARGV[5])
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+if #expired > 0 then
+    redis.call('HDEL', KEYS[1], unpack(expired))
+    redis.call('ZREM', KEYS[2], unpack(expired))
+end
+redis.call('INCR', KEYS[3])
+redis.call('EXPIRE', KEYS[3], ARGV[7])
+return #expired
+"""
+
+
+@dataclass
+class FeeProfile:
+    """A wallet's trading activity, as the fee rules see it"""
+    total_trades: int = 0
+    trades_24h: int = 0
+    volume_30d: float = 0.0
+    changes_at: float = float("inf")   # When the next bucket slides out of its window
+
+    def tier(self) -> Tuple[bool, int, bool]:
+        """The parts of the profile the fee rules branch on - equal tiers get equal decisions"""
+        volume = 2 if self.volume_30d > WHALE_VOLUME_SOL else 1 if self.volume_30d > HIGH_VOLUME_SOL else 0
+        return self.trades_24h > HIGH_FREQUENCY_TRADES_24H, volume, self.total_trades < GRACE_TRADES
+
+    @classmethod
+    def from_hash(cls, fields: dict, now: Optional[float] = None) -> "FeeProfile":
+        """Sum the buckets still inside their window (expired ones may linger until the next write)"""
+        now = time.time() if now is None else now
+        first_day = int(now // 86400) - VOLUME_WINDOW_DAYS
+        first_hour = int(now // 3600) - COUNT_WINDOW_HOURS
+        profile = cls()
+        for field, value in fields.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            if field == "total_trades":
+                profile.total_trades = int(value)
+            elif field.startswith("v:") and int(field[2:]) > first_day:
+                profile.volume_30d += float(value)
+                profile.changes_at = min(profile.changes_at, (int(field[2:]) + VOLUME_WINDOW_DAYS) * 86400)
+            elif field.startswith("n:") and int(field[2:]) > first_hour:
+                profile.trades_24h += int(value)
+                profile.changes_at = min(profile.changes_at, (int(field[2:]) + COUNT_WINDOW_HOURS) * 3600)
+        return profile
+
+
+@dataclass
+class _CachedProfile:
+    fields: Optional[dict]   # Ledger hash as last read, kept current with this worker's trades - None if legacy-only
+    profile: FeeProfile
+    loaded_at: float
+
 
 class FeeTracker:
     """Track trade metrics for fee optimization - NO circular dependencies"""
-    
+
     def __init__(self, redis_client):
         self.redis = redis_client
-    
+        self._track_script = redis_client.register_script(TRACK_TRADE_LUA)
+        self._cached: "OrderedDict[str, _CachedProfile]" = OrderedDict()
+
     async def track_trade_for_fee_optimization(
         self,
         user_wallet: str,
         amount_sol: float,
         mint: str,
-        trade_type: str 
+        trade_type: str,
+        now: Optional[float] = None
     ):
         """Track trade metrics for future fee optimization"""
-        
-        # Track 24h trade count
-        await self.redis.incr(f"trade_count_24h:{user_wallet}")
-        await self.redis.expire(f"trade_count_24h:{user_wallet}", 86400)
-        
-        # Track 30d volume
-        volume_key = f"volume_30d:{user_wallet}"
-        current_volume = await self.redis.get(volume_key) or "0"
-        new_volume = float(current_volume) + amount_sol
-        await self.redis.set(volume_key, str(new_volume))
-        await self.redis.expire(volume_key, 2592000)  # 30 days
-        
-        # Track total trades
-        await self.redis.incr(f"total_trades:{user_wallet}")
-        
-        # Track token-specific trading
-        token_trades_key = f"token_trades:{user_wallet}:{mint}"
-        await self.redis.incr(token_trades_key)
-        await self.redis.expire(token_trades_key, 604800) # 7 days
-    
+        now = time.time() if now is None else now
+        day, hour = int(now // 86400), int(now // 3600)
+        await self._track_script(
+            keys=[
+                PROFILE_KEY.format(user_wallet),
+                BUCKETS_KEY.format(user_wallet),
+                TOKEN_TRADES_KEY.format(user_wallet, mint),
+                *(key.format(user_wallet) for key in LEGACY_KEYS),
+            ],
+            args=[
+                now, amount_sol,
+                f"v:{day}", (day + VOLUME_WINDOW_DAYS) * 86400,
+                f"n:{hour}", (hour + COUNT_WINDOW_HOURS) * 3600,
+                TOKEN_TRADES_TTL,
+            ],
+        )
+
+        # Mirror the write in the cached copy so this worker's next decision sees it
+        cached = self._cached.get(user_wallet)
+        if cached is not None:
+            if cached.fields is None:
+                del self._cached[user_wallet]  # The script just folded the legacy counters in - reload
+                return
+            fields = cached.fields
+            fields["total_trades"] = int(fields.get("total_trades", 0)) + 1
+            fields[f"v:{day}"] = float(fields.get(f"v:{day}", 0)) + amount_sol
+            fields[f"n:{hour}"] = int(fields.get(f"n:{hour}", 0)) + 1
+            cached.profile = FeeProfile.from_hash(fields, now)
+
+    async def _load(self, user_wallet: str, now: Optional[float] = None) -> Tuple[Optional[dict], FeeProfile]:
+        fields = await self.redis.hgetall(PROFILE_KEY.format(user_wallet))
+        if fields:
+            return fields, FeeProfile.from_hash(fields, now)
+        # Nothing on the ledger yet - a wallet that hasn't traded since it was introduced
+        total, volume, count = await self.redis.mget([key.format(user_wallet) for key in LEGACY_KEYS])
+        return None, FeeProfile(total_trades=int(total or 0), trades_24h=int(count or 0), volume_30d=float(volume or 0))
+
+    async def fee_profile(self, user_wallet: str, now: Optional[float] = None) -> FeeProfile:
+        """The wallet's full fee profile in one HGETALL"""
+        return (await self._load(user_wallet, now))[1]
+
+    async def cached_profile(self, user_wallet: str) -> FeeProfile:
+        """fee_profile() from process memory - re-read after PROFILE_CACHE_TTL or once a bucket slides out"""
+        now = time.time()
+        cached = self._cached.get(user_wallet)
+        if cached is not None and now - cached.loaded_at < PROFILE_CACHE_TTL and now < cached.profile.changes_at:
+            return cached.profile
+
+        fields, profile = await self._load(user_wallet, now)
+        self._cached[user_wallet] = _CachedProfile(fields, profile, now)
+        self._cached.move_to_end(user_wallet)
+        while len(self._cached) > PROFILE_CACHE_MAX_ENTRIES:
+            self._cached.popitem(last=False)
+        return profile
+
     async def should_apply_fee(
         self,
         user_wallet: str,
         trade_type: str,
         amount_sol: float,
         mint: str,
-        pnl_pct: float = 0.0
+        pnl_pct: float = 0.0,
+        profile: Optional[FeeProfile] = None
     ) -> bool:
         """
         Determine if we should apply referral fee based on multiple factors.
         Returns True if fee should be applied.
         """
-        
+
         # 1. NEVER apply fees on losing trades
         if pnl_pct < -5.0 and trade_type in ["SELL", "STOP_LOSS", "TIMEOUT"]:
             logger.info(f"💰 Fee waived: Trade at {pnl_pct:.1f}% loss")
-            return False 
-        
+            return False
+
         # 2. Small trade threshold
-        SMALL_TRADE_THRESHOLD = 0.1 # SOL
-        if amount_sol < SMALL_TRADE_THRESHOLD:
+        if amount_sol < SMALL_TRADE_SOL:
             logger.info(f"💰 Fee waived: Small trade ({amount_sol:.4f} SOL)")
-            return False 
-        
+            return False
+
+        profile = profile or await self.fee_profile(user_wallet)
+
         # 3. High-frequency trader discount
-        user_trades_24h = await self.redis.get(f"trade_count_24h:{user_wallet}")
-        if user_trades_24h and int(user_trades_24h) > 10:
+        if profile.trades_24h > HIGH_FREQUENCY_TRADES_24H:
             # High-frequency traders get 50% fee discount
-            logger.info(f"💰 Reduced fee: High-frequency trader ({user_trades_24h} trades/24h)")
+            logger.info(f"💰 Reduced fee: High-frequency trader ({profile.trades_24h} trades/24h)")
             return True # Still apply fee, but at reduced rate
-        
+
         # 4. VIP/Whale discount
-        total_volume_30d = await self.redis.get(f"volume_30d:{user_wallet}")
-        if total_volume_30d and float(total_volume_30d) > 100:  # 100 SOL volume
-            logger.info(f"💰 Reduced fee: High-volume trader ({float(total_volume_30d):.1f} SOL/30d))")
+        if profile.volume_30d > HIGH_VOLUME_SOL:
+            logger.info(f"💰 Reduced fee: High-volume trader ({profile.volume_30d:.1f} SOL/30d))")
             return True # Apply at reduced rate
-        
+
         # 5. New user grace period (first 3 trades fee)
-        user_trade_count = await self.redis.get(f"total_trades:{user_wallet}")
-        if not user_trade_count or int(user_trade_count) < 3:
-            logger.info(f"💰 Fee waived: New user grace period (trade {int(user_trade_count or 0) + 1}/3)")
-            return False 
-        
+        if profile.total_trades < GRACE_TRADES:
+            logger.info(f"💰 Fee waived: New user grace period (trade {profile.total_trades + 1}/{GRACE_TRADES})")
+            return False
+
         # 6. Default: Apply fee for profitable, medium+ sized trades
         return True
-    
+
     async def calculate_optimal_fee_bps(
         self,
         user_wallet: str,
         amount_sol: float,
         trade_type: str,
-        is_premium: bool = False
+        is_premium: bool = False,
+        profile: Optional[FeeProfile] = None
     ) -> int:
         """
         Calculate optimal fee in basis points.
         Lower fees for better user experience, higher for profitability.
         """
-        
+
         base_fee = 100  # 1% default
-        
+
         # Premium users get 50% discount
         if is_premium:
             base_fee = 50   # 0.5%
-            
+
         # Volume-based discounts
-        volume_30d = await self.redis.get(f"volume_30d:{user_wallet}")
-        if volume_30d:
-            volume = float(volume_30d)
-            if volume > 500:    # 500 SOL volume
-                base_fee = max(25, base_fee // 2)   # At most 50% discount
-            elif volume > 100:  # 100 SOL volume
-                base_fee = max(50, base_fee * 2 // 3)   # 33% discount
-        
+        profile = profile or await self.fee_profile(user_wallet)
+        volume = profile.volume_30d
+        if volume > WHALE_VOLUME_SOL:
+            base_fee = max(25, base_fee // 2)   # At most 50% discount
+        elif volume > HIGH_VOLUME_SOL:
+            base_fee = max(50, base_fee * 2 // 3)   # 33% discount
+
         # Trade size based adjustment
-        if amount_sol > 1.0:    # Large trades get slight discount
+        if amount_sol > LARGE_TRADE_SOL:    # Large trades get slight discount
             base_fee = max(50, base_fee - 10)
-        
+
         # Don't apply fees to stop losses
         if "STOP_LOSS" in trade_type or "TIMEOUT" in trade_type:
             return 0
-        
+
         return base_fee
-    
-    
-    
-    
-    
\ No newline at end of file
@@ -0,0 +1,150 @@
+# app/utils/http_clients.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass(frozen=True)
+class HostProfile:
+    """Connection settings for one external host"""
+    connect_timeout: float = 5.0
+    read_timeout: float = 15.0
+    max_connections: int = 20
+    max_keepalive: int = 10
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+    warm_url: Optional[str] = None  # Hit once at startup so the first snipe skips the TLS handshake
+
+
+# Hosts on the trading hot path get short timeouts and bigger pools
+HOST_PROFILES: Dict[str, HostProfile] = {
+    "api.dexscreener.com": HostProfile(
+        connect_timeout=3.0, read_timeout=8.0, max_connections=30, max_keepalive=15,
+        warm_url="https://api.dexscreener.com/",
+    ),
+    "lite-api.jup.ag": HostProfile(
+        connect_timeout=3.0, read_timeout=10.0, max_connections=30, max_keepalive=15,
+        warm_url="https://lite-api.jup.ag/",
+    ),
+    "api.jup.ag": HostProfile(
+        connect_timeout=2.0, read_timeout=10.0, max_connections=50, max_keepalive=25,
+        warm_url="https://api.jup.ag/",
+    ),
+    "quote-api.jup.ag": HostProfile(
+        connect_timeout=2.0, read_timeout=5.0, max_connections=30, max_keepalive=15,
+    ),
+    "api.webacy.com": HostProfile(
+        connect_timeout=5.0, read_timeout=30.0, max_connections=10, max_keepalive=5,
+    ),
+    "api.rugcheck.xyz": HostProfile(
+        connect_timeout=5.0, read_timeout=15.0, max_connections=10, max_keepalive=5,
+    ),
+    "pro-api.solscan.io": HostProfile(
+        connect_timeout=5.0, read_timeout=15.0, max_connections=10, max_keepalive=5,
+    ),
+    "api-v3.raydium.io": HostProfile(
+        connect_timeout=5.0, read_timeout=15.0, max_connections=10, max_keepalive=5,
+    ),
+}
+
+# Image hosts, IPFS gateways, etc. all share one pool
+DEFAULT_PROFILE = HostProfile(connect_timeout=5.0, read_timeout=30.0, http2=False)
+DEFAULT_POOL = "_default"
+
+
+class HttpClientRegistry:
+    """
+    Application-scoped httpx clients, one per external host.
+
+    Each host keeps its own connection pool, keep-alive and timeouts, so
+    requests reuse warm TLS connections instead of paying a fresh handshake
+    on every call. Started and closed from the FastAPI lifespan.
+    """
+
+    def __init__(self, profiles: Dict[str, HostProfile] = None, default_profile: HostProfile = DEFAULT_PROFILE):
+        self.profiles = profiles if profiles is not None else HOST_PROFILES
+        self.default_profile = default_profile
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _build_client(self, profile: HostProfile) -> httpx.AsyncClient:
+        timeout = httpx.Timeout(
+            profile.read_timeout,
+            connect=profile.connect_timeout,
+            pool=profile.connect_timeout,
+        )
+        limits = httpx.Limits(
+            max_connections=profile.max_connections,
+            max_keepalive_connections=profile.max_keepalive,
+            keepalive_expiry=profile.keepalive_expiry,
+        )
+        return httpx.AsyncClient(
+            timeout=timeout,
+            limits=limits,
+            http2=profile.http2 and HTTP2_AVAILABLE,
+            follow_redirects=True,
+        )
+
+    def get(self, host: str) -> httpx.AsyncClient:
+        """Shared client for a host name (unknown hosts share the default pool)"""
+        key = host if host in self.profiles else DEFAULT_POOL
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            profile = self.profiles.get(key, self.default_profile)
+            client = self._build_client(profile)
+            self._clients[key] = client
+        return client
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """Shared client for the host of a full URL"""
+        return self.get(urlsplit(url).hostname or "")
+
+    @asynccontextmanager
+    async def session(self, url: str):
+        """
+        Drop-in for `async with httpx.AsyncClient() as client:` blocks -
+        yields the shared client for the URL's host and leaves it open.
+        """
+        yield self.client_for(url)
+
+    async def _warm(self, host: str, url: str):
+        try:
+            await self.get(host).head(url)
+        except Exception as e:
+            logger.debug(f"Warm-up for {host} failed: {e}")
+
+    async def start(self):
+        """Create the pools and open one connection to each hot-path host"""
+        for host in self.profiles:
+            self.get(host)
+        await asyncio.gather(*(
+            self._warm(host, profile.warm_url)
+            for host, profile in self.profiles.items()
+            if profile.warm_url
+        ))
+        logger.info(
+            f"🌐 HTTP client pools ready for {len(self.profiles)} hosts "
+            f"(http2={'on' if HTTP2_AVAILABLE else 'off'})"
+        )
+
+    async def close(self):
+        """Close every pooled client (called on app shutdown)"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
+
+
+# Global instance
+http_clients = HttpClientRegistry()
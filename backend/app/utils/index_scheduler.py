@@ -0,0 +1,210 @@
+# app/utils/index_scheduler.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# probe(mints) -> {mint: data} for the mints that are indexed now (missing = not yet)
+ProbeFn = Callable[[List[str]], Awaitable[Dict[str, dict]]]
+
+
+@dataclass
+class _Tracked:
+    source: str
+    mint: str
+    attempts: int = 0
+    max_attempts: int = 10
+    next_probe_at: float = 0.0
+    waiters: List[asyncio.Future] = field(default_factory=list)
+
+
+@dataclass
+class _Source:
+    probe: ProbeFn
+    batch_size: int
+    backoff: Callable[[int], float]
+
+
+def default_backoff(attempt: int) -> float:
+    """1s, 2s, 4s, 8s ... capped at 60s - probes are batched so early retries are cheap"""
+    return min(2 ** attempt, 60)
+
+
+class IndexScheduler:
+    """
+    Central "wait-until-indexed" scheduler for APIs that lag new launches
+    (DexScreener, Jupiter).
+
+    Not-yet-indexed mints live in one min-heap keyed by their next probe time.
+    A single loop pops whatever is due, probes each source in batches and
+    resolves every waiter for a mint as soon as data shows up. Callers get a
+    deadline instead of parking their own coroutine in a sleep loop; a caller
+    timing out doesn't stop tracking, so the next caller for the same mint
+    still benefits from the probes already done.
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, _Source] = {}
+        self._tracked: Dict[Tuple[str, str], _Tracked] = {}
+        self._heap: List[Tuple[float, int, str, str]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"probes": 0, "probe_calls": 0, "ready": 0, "gave_up": 0}
+
+    def register_source(
+        self,
+        name: str,
+        probe: ProbeFn,
+        batch_size: int = 30,
+        backoff: Callable[[int], float] = default_backoff,
+    ):
+        self._sources[name] = _Source(probe=probe, batch_size=batch_size, backoff=backoff)
+
+    def pending_count(self, source: Optional[str] = None) -> int:
+        if source is None:
+            return len(self._tracked)
+        return sum(1 for key in self._tracked if key[0] == source)
+
+    async def wait_until_indexed(
+        self,
+        source: str,
+        mint: str,
+        timeout: float,
+        max_attempts: int = 10,
+    ) -> dict:
+        """
+        Resolve with the source's data for `mint` once it is indexed, or {} when
+        `timeout` expires first (or the scheduler gives up on the mint).
+        """
+        if source not in self._sources:
+            raise ValueError(f"Unknown index source: {source}")
+
+        self._ensure_running()
+        future = asyncio.get_running_loop().create_future()
+        key = (source, mint)
+        tracked = self._tracked.get(key)
+        if tracked is None:
+            tracked = _Tracked(source=source, mint=mint, max_attempts=max_attempts)
+            self._tracked[key] = tracked
+            self._push(tracked, time.monotonic())  # First probe right away
+        else:
+            tracked.max_attempts = max(tracked.max_attempts, max_attempts)
+        tracked.waiters.append(future)
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"{source} not indexed yet for {mint[:8]} after {timeout:.1f}s")
+            return {}
+        finally:
+            if not future.done():
+                future.cancel()
+            if future in tracked.waiters:
+                tracked.waiters.remove(future)
+
+    def _push(self, tracked: _Tracked, at: float):
+        tracked.next_probe_at = at
+        heapq.heappush(self._heap, (at, next(self._seq), tracked.source, tracked.mint))
+        if self._wakeup:
+            self._wakeup.set()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def _pop_due(self, now: float) -> Dict[str, List[_Tracked]]:
+        due: Dict[str, List[_Tracked]] = {}
+        while self._heap and self._heap[0][0] <= now:
+            at, _, source, mint = heapq.heappop(self._heap)
+            tracked = self._tracked.get((source, mint))
+            # Skip heap entries that were superseded or already resolved
+            if tracked is None or tracked.next_probe_at != at:
+                continue
+            due.setdefault(source, []).append(tracked)
+        return due
+
+    async def _probe_source(self, source_name: str, items: List[_Tracked]):
+        source = self._sources[source_name]
+        for i in range(0, len(items), source.batch_size):
+            chunk = items[i:i + source.batch_size]
+            mints = [t.mint for t in chunk]
+            try:
+                found = await source.probe(mints) or {}
+            except Exception as e:
+                logger.warning(f"{source_name} readiness probe failed: {e}")
+                found = {}
+            self.stats["probe_calls"] += 1
+            self.stats["probes"] += len(chunk)
+
+            now = time.monotonic()
+            for tracked in chunk:
+                key = (source_name, tracked.mint)
+                data = found.get(tracked.mint)
+                tracked.attempts += 1
+
+                if data:
+                    self.stats["ready"] += 1
+                    logger.info(f"{source_name} ready → {tracked.mint[:8]} | attempt {tracked.attempts}")
+                    self._finish(key, data)
+                elif not tracked.waiters:
+                    # Everyone timed out - stop probing until someone asks again
+                    self._tracked.pop(key, None)
+                elif tracked.attempts >= tracked.max_attempts:
+                    self.stats["gave_up"] += 1
+                    logger.warning(f"{source_name} failed permanently for {tracked.mint[:8]} after {tracked.attempts} probes")
+                    self._finish(key, {})
+                else:
+                    self._push(tracked, now + source.backoff(tracked.attempts))
+
+    def _finish(self, key: Tuple[str, str], data: dict):
+        tracked = self._tracked.pop(key, None)
+        if not tracked:
+            return
+        for waiter in tracked.waiters:
+            if not waiter.done():
+                waiter.set_result(data)
+        tracked.waiters.clear()
+
+    async def _run(self):
+        while True:
+            try:
+                now = time.monotonic()
+                due = self._pop_due(now)
+                if due:
+                    await asyncio.gather(*(
+                        self._probe_source(name, items) for name, items in due.items()
+                    ))
+                    continue
+
+                self._wakeup.clear()
+                sleep_for = (self._heap[0][0] - now) if self._heap else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Index scheduler loop error: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self):
+        """Stop the scheduler and release every waiter with {} (called on app shutdown)"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for key in list(self._tracked):
+            self._finish(key, {})
+        self._heap.clear()
+
+
+# Global instance
+index_scheduler = IndexScheduler()
@@ -3,16 +3,18 @@ import json
 import base64
 from typing import List, Dict, Optional
 from jito_py_rpc import JitoJsonRpcSDK
-from solana.rpc.async_api import AsyncClient
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 from solders.system_program import TransferParams, transfer
-from solders.transaction import Transaction
+from solders.transaction import Transaction, VersionedTransaction
 from solders.message import Message
 from solders.instruction import Instruction
 from solders.hash import Hash
 import logging
 from app.config import settings
+from app.utils.confirmation_service import confirmation_service
+from app.utils.fee_oracle import fee_oracle
+from app.utils.tip_auction import tip_auction
 
 logger = logging.getLogger(__name__)
 
@@ -22,21 +24,15 @@ class JitoBundleManager:
     def __init__(self, block_engine_url: str = settings.JITO_BLOCK_ENGINE_URL):
         self.block_engine_url = block_engine_url
         self.sdk = None
-        self.solana_client = None 
         
     async def initialize(self):
-        """Initialize Jito SDK and Solana client"""
+        """Initialize Jito SDK (RPC calls go through rpc_pool)"""
         try:
             # Initialize Jito SDK
             if not self.sdk:
                 self.sdk = JitoJsonRpcSDK(self.block_engine_url)
                 logger.info(f"✅ Jito SDK initialized: {self.block_engine_url}")
             
-            # Initialize Solana client
-            if not self.solana_client:
-                self.solana_client = AsyncClient(settings.SOLANA_RPC_URL)
-                logger.info(f"✅ Solana client initialized: {settings.SOLANA_RPC_URL}")
-            
             logger.info(f"✅ Jito Bundle Manager initialized: {self.block_engine_url}")
             return True
             
@@ -48,10 +44,12 @@ class JitoBundleManager:
         self,
         transactions: List[str], # List of base64 encoded transactions
         user_keypair: Keypair,
-        tip_amount_lamports: int = settings.JITO_MIN_TIP_LAMPORTS # 0.000005 SOL tip
+        tip_amount_lamports: Optional[int] = None # Defaults to tip_auction's price for the target landing rate
     ) -> Dict:
         """Create a bundle with Jito tip for priority execution"""
         try:
+            if tip_amount_lamports is None:
+                tip_amount_lamports = tip_auction.recommend()
             # Get a random tip account from Jito
             tip_account_str = self.sdk.get_random_tip_account()
             if not tip_account_str:
@@ -66,17 +64,17 @@ class JitoBundleManager:
                 lamports=tip_amount_lamports
             ))
             
-            # Get recent blockhash
-            recent_blockhash = await self.solana_client.get_latest_blockhash()
+            # Recent blockhash from the oracle - no RPC round trip unless it has gone stale
+            recent_blockhash = (await fee_oracle.blockhash()).blockhash
             
             # Create tip transaction
             tip_message = Message.new_with_blockhash(
                 [tip_ix],
                 user_keypair.pubkey(),
-                recent_blockhash.value.blockhash
+                recent_blockhash
             )
             tip_transaction = Transaction.new_unsigned(tip_message)
-            tip_transaction.sign([user_keypair], recent_blockhash.value.blockhash)
+            tip_transaction.sign([user_keypair], recent_blockhash)
             
             # Serialize tip transaction
             serialized_tip = base64.b64encode(bytes(tip_transaction)).decode('ascii')
@@ -90,7 +88,8 @@ class JitoBundleManager:
             return {
                 "bundle": full_bundle,
                 "tip_account": tip_account_str,
-                "tip_amount": tip_amount_lamports
+                "tip_amount": tip_amount_lamports,
+                "tip_signature": str(tip_transaction.signatures[0])
             }
             
         except Exception as e:
@@ -172,143 +171,35 @@ class JitoBundleManager:
                 # Wait before retry
                 await asyncio.sleep(retry_delay * (attempt + 1))
     
-    async def check_bundle_status(
-        self,
-        bundle_id: str,
-        max_attempts: int = 30,
-        delay: float = 2.0
-    ) -> str:
-        """Check bundle status with comprehensive monitoring"""
-        for attempt in range(max_attempts):
-            try:
-                logger.debug(f"Checking bundle status {bundle_id} (attempt {attempt + 1}/{max_attempts})")
-                
-                # FIX: Use list format as shown in example.py
-                response = self.sdk.get_inflight_bundle_statuses([bundle_id])
-                
-                if response is None:
-                    logger.warning(f"None response from get_inflight_bundle_statuses")
-                    await asyncio.sleep(delay)
-                    continue
-                
-                if not response.get('success', False):
-                    error_msg = response.get('error', 'Unknown error')
-                    logger.warning(f"Error checking bundle status: {error_msg}")
-                    await asyncio.sleep(delay)
-                    continue
-                
-                # FIX: Handle response structure properly
-                if 'data' not in response or 'result' not in response['data']:
-                    logger.warning("Unexpected response structure - missing data.result")
-                    await asyncio.sleep(delay)
-                    continue
-                
-                result = response['data']['result']
-                
-                # According to the example, result should have 'value' key
-                if 'value' not in result or not result['value']:
-                    logger.debug(f"Bundle {bundle_id} not found in response")
-                    await asyncio.sleep(delay)
-                    continue
-                
-                bundle_status = result['value'][0]
-                status = bundle_status.get('status', 'Unknown')
-                
-                logger.debug(f"Bundle {bundle_id} status: {status}")
-                
-                if status == "Landed":
-                    logger.info(f"✅ Bundle {bundle_id} has landed on-chain!")
-                    # Confirm finalization
-                    final_status = await self.confirm_landed_bundle(bundle_id)
-                    return final_status
-                elif status == 'Failed':
-                    logger.warning(f"❌ Bundle {bundle_id} has failed")
-                    return 'Failed'
-                elif status == 'Invalid':
-                    if attempt < 5:
-                        logger.debug(f"Bundle {bundle_id} is currently invalid, checking again...")
-                    else:
-                        logger.error(f"Bundle {bundle_id} is invalid (not in system or outside 5-minute window)")
-                        return 'Invalid'
-                elif status == 'Pending':
-                    logger.debug(f"Bundle {bundle_id} is still pending...")
-                else:
-                    logger.warning(f"Unknown status '{status}' for bundle {bundle_id}")
-                
-                await asyncio.sleep(delay)
-                
-            except Exception as e:
-                logger.error(f"Error checking bundle status: {e}")
-                await asyncio.sleep(delay)
-        
-        logger.warning(f"Max attempts reached for bundle {bundle_id}")
-        return 'Timeout'
-    
-    async def confirm_landed_bundle(
+    async def send_swap_bundle(
         self,
-        bundle_id: str,
-        max_attempts: int = 60,
-        delay: float = 2.0
-    ) -> str:
-        """Confirm bundle has been finalized on-chain"""
-        for attempt in range(max_attempts):
-            try:
-                logger.debug(f"Confirming bundle {bundle_id} (attempt {attempt + 1}/{max_attempts})")
-                
-                response = self.sdk.get_bundle_statuses([bundle_id])
-                
-                if not response or not response.get('success', False):
-                    await asyncio.sleep(delay)
-                    continue
-                
-                if 'data' not in response or 'result' not in response['data']:
-                    await asyncio.sleep(delay)
-                    continue 
-                
-                result = response['data']['result']
-                if 'value' not in result or not result['value']:
-                    await asyncio.sleep(delay)
-                    continue
-                
-                bundle_status = result['value'][0]
-                if bundle_status.get('bundle_id') != bundle_id:
-                    await asyncio.sleep(delay)
-                    continue
-                
-                status = bundle_status.get('confirmation_status')
-                
-                if status == 'finalized':
-                    logger.info(f"🎉 Bundle {bundle_id} has been FINALIZED on-chain!")
-                    
-                    # Extract transaction IDs
-                    if 'transactions' in bundle_status and bundle_status['transactions']:
-                        tx_ids = bundle_status['transactions']
-                        for tx_id in tx_ids:
-                            logger.info(f"📄 Transaction: https://solscan.io/tx/{tx_id}")
-                    
-                    return 'Finalized'
-                elif status == 'confirmed':
-                    logger.debug(f"Bundle {bundle_id} confirmed but not yet finalized...")
-                elif status == 'processed':
-                    logger.debug(f"Bundle {bundle_id} processed but not yet confirmed...")
-                else:
-                    logger.debug(f"Unexpected status '{status}' during confirmation")
-                    
-                # Check for errors
-                err = bundle_status.get('err', {}).get('Ok')
-                if err is not None:
-                    logger.error(f"Error in bundle {bundle_id}: {err}")
-                    return 'Failed'
-                
-                await asyncio.sleep(delay)
-                
-            except Exception as e:
-                logger.error(f"Error confirming bundle: {e}")
-                await asyncio.sleep(delay)
-        
-        logger.warning(f"Max confirmation attempts reached for bundle {bundle_id}")
-        return 'Landed'
-    
+        signed_transaction_base64: str,
+        user_keypair: Keypair,
+        tip_amount_lamports: Optional[int] = None
+    ) -> Dict:
+        """
+        Submit a signed swap as a [tip, swap] bundle without waiting for it to land.
+        Returns the bundle id and the tip transaction's signature - the tip only
+        lands if the bundle does, so its status tells whether Jito delivered the swap.
+        """
+        bundle_data = await self.create_bundle_with_tip(
+            transactions=[signed_transaction_base64],
+            user_keypair=user_keypair,
+            tip_amount_lamports=tip_amount_lamports
+        )
+        # The SDK is blocking HTTP - keep it off the event loop
+        result = await asyncio.to_thread(self.sdk.send_bundle, bundle_data["bundle"])
+        if not result or not result.get("success") or "result" not in result.get("data", {}):
+            raise Exception(f"Jito bundle rejected: {(result or {}).get('error', result)}")
+
+        swap_signature = str(VersionedTransaction.from_bytes(base64.b64decode(signed_transaction_base64)).signatures[0])
+        tip_auction.observe(bundle_data["tip_signature"], bundle_data["tip_amount"], swap_signature)
+        return {
+            "bundle_id": result["data"]["result"],
+            "tip_signature": bundle_data["tip_signature"],
+            "tip_amount": bundle_data["tip_amount"]
+        }
+
     async def execute_jupiter_swap_with_jito(
         self,
         signed_transaction_base64: str,
@@ -322,8 +213,7 @@ class JitoBundleManager:
             # Create bundle with the Jupiter transaction
             bundle_data = await self.create_bundle_with_tip(
                 transactions=[signed_transaction_base64],
-                user_keypair=user_keypair,
-                tip_amount_lamports=10000   # 0.00001 SOL tip
+                user_keypair=user_keypair
             )
             
             # Send bundle
@@ -337,44 +227,33 @@ class JitoBundleManager:
             
             bundle_id = send_result["bundle_id"]
             
-            # Monitor bundle status
-            logger.info(f"⏳ Monitoring Jito bundle {bundle_id} for {label}...")
-            final_status = await self.check_bundle_status(bundle_id, max_attempts=15)
-            
-            if final_status == 'Finalized':
-                # Extract signature from the original transaction
-                try:
-                    # Decode the original transaction to get signature
-                    import base64
-                    from solders.transaction import VersionedTransaction
-                    
-                    tx_bytes = base64.b64decode(signed_transaction_base64)
-                    tx = VersionedTransaction.from_bytes(tx_bytes)
-                    signature = str(tx.signatures[0]) if tx.signatures else f"jito_bundle_{bundle_id[:16]}"
-                except:
-                    signature = f"jito_bundle_{bundle_id[:16]}"
-                
-                logger.info(f"✅ Jito bundle executed successfully for {label}")
-                
-                return {
-                    "status": "success",
-                    "signature": signature,
-                    "bundle_id": bundle_id,
-                    "method": "jito_bundle",
-                    "tip_amount": bundle_data["tip_amount"],
-                    "final_status": final_status
-                }
-            else:
-                raise Exception(f"Jito bundle failed with status: {final_status}")
-            
+            # The bundle is atomic: it landed if the swap did
+            signature = str(VersionedTransaction.from_bytes(base64.b64decode(signed_transaction_base64)).signatures[0])
+            tip_auction.observe(bundle_data["tip_signature"], bundle_data["tip_amount"])
+            logger.info(f"⏳ Waiting for Jito bundle {bundle_id} ({label}) to finalize...")
+            confirmation = await confirmation_service.wait(signature, "finalized", timeout=90)
+
+            if not confirmation.ok:
+                raise Exception(f"Jito bundle failed: {confirmation.err or 'expired without landing'}")
+
+            logger.info(f"✅ Jito bundle executed successfully for {label}")
+
+            return {
+                "status": "success",
+                "signature": signature,
+                "bundle_id": bundle_id,
+                "method": "jito_bundle",
+                "tip_amount": bundle_data["tip_amount"],
+                "final_status": "Finalized",
+                "slot": confirmation.slot
+            }
+
         except Exception as e:
             logger.error(f"Jito bundle execution failed: {e}")
             raise
         
     async def close(self):
-        """Cleanup resources"""
-        if self.solana_client:
-            await self.solana_client.close()
+        """Nothing to clean up - RPC clients belong to rpc_pool"""
 
 # Global Jito bundle manager instance
 jito_manager = None 
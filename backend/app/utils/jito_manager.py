@@ -8,12 +8,13 @@ from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 from solders.system_program import transfer, TransferParams
 from solders.transaction import VersionedTransaction
-from solana.rpc.async_api import AsyncClient
 import base58
 import aiohttp
 
 from app.models import User
 from app.config import settings
+from app.utils.fee_oracle import fee_oracle
+from app.utils.rpc_pool import rpc_pool
 
 logger = logging.getLogger(__name__)
 
@@ -28,8 +29,7 @@ class JitoTipManager:
     async def get_or_create_tip_account(
         self,
         user: User,
-        db: AsyncSession,
-        connection: AsyncClient
+        db: AsyncSession
     ) -> Tuple[str, bool]:
         """
         Get existing tip account or create a new one for the user.
@@ -42,7 +42,7 @@ class JitoTipManager:
                 
                 # Check if the account exists on-chain and has balance
                 try:
-                    balance_response = await connection.get_balance(Pubkey.from_string(user.jito_tip_account))
+                    balance_response = await rpc_pool.call("get_balance", Pubkey.from_string(user.jito_tip_account))
                     balance = balance_response.value if hasattr(balance_response, 'value') else 0
                     
                     if balance > 0:
@@ -80,7 +80,6 @@ class JitoTipManager:
         self,
         user: User,
         db: AsyncSession,
-        connection: AsyncClient,
         amount_sol: Optional[float] = None 
     ) -> bool:
         """
@@ -100,7 +99,7 @@ class JitoTipManager:
             transfer_lamports = int(transfer_amount_sol * 1_000_000_000)
             
             # Check user's main wallet balance - FIXED: extract value from response
-            balance_response = await connection.get_balance(Pubkey.from_string(user.wallet_address))
+            balance_response = await rpc_pool.call("get_balance", Pubkey.from_string(user.wallet_address))
             user_balance = balance_response.value if balance_response.value else 0
             
             if user_balance < transfer_lamports:
@@ -116,8 +115,8 @@ class JitoTipManager:
                 )
             )
             
-            # Get recent blockhash
-            recent_blockhash = (await connection.get_latest_blockhash()).value.blockhash
+            # Recent blockhash from the oracle
+            recent_blockhash = (await fee_oracle.blockhash()).blockhash
             
             # Create transaction (user will sign on frontend)
             message = VersionedTransaction(
@@ -148,7 +147,6 @@ class JitoTipManager:
         self,
         user: User,
         db: AsyncSession,
-        connection: AsyncClient,
         num_transactions: int = 1
     ) -> bool:
         """
@@ -165,14 +163,14 @@ class JitoTipManager:
             total_tip_sol = total_tip_lamports / 1_000_000_000
             
             # Check tip account balance - FIXED: extract value from response
-            balance_response = await connection.get_balance(Pubkey.from_string(user.jito_tip_account))
+            balance_response = await rpc_pool.call("get_balance", Pubkey.from_string(user.jito_tip_account))
             tip_balance_sol = balance_response.value / 1_000_000_000 if balance_response.value else 0.0
             
             if tip_balance_sol < total_tip_sol:
                 logger.warning(f"Insufficient tip balance for {user.wallet_address[:8]}: {tip_balance_sol:.6f} SOL < {total_tip_sol:.6f} SOL")
                 
                 # Auto-refill if possible
-                await self.auto_refill_tip_account(user, db, connection)
+                await self.auto_refill_tip_account(user, db)
                 return False
             
             # Update user's tip balance in database
@@ -190,8 +188,7 @@ class JitoTipManager:
     async def auto_refill_tip_account(
         self,
         user: User,
-        db: AsyncSession,
-        connection: AsyncClient
+        db: AsyncSession
     ) -> bool:
         """
         Automatically refill tip account from main wallet if needed.
@@ -199,7 +196,7 @@ class JitoTipManager:
         try:
             # Get current tip balance - FIXED: use proper balance check
             if user.jito_tip_account:
-                balance_response = await connection.get_balance(Pubkey.from_string(user.jito_tip_account))
+                balance_response = await rpc_pool.call("get_balance", Pubkey.from_string(user.jito_tip_account))
                 current_balance = balance_response.value / 1_000_000_000 if balance_response.value else 0.0
             else:
                 current_balance = 0.0
@@ -210,7 +207,7 @@ class JitoTipManager:
                 
                 if refill_amount > 0:
                     logger.info(f"Auto-refilling tip account for {user.wallet_address[:8]}: {refill_amount:.4f} SOL")
-                    return await self.fund_tip_account(user, db, connection, refill_amount)
+                    return await self.fund_tip_account(user, db, refill_amount)
             
             return False 
             
@@ -220,8 +217,7 @@ class JitoTipManager:
         
     async def get_tip_account_info(
         self,
-        user: User,
-        connection: AsyncClient
+        user: User
     ) -> Dict:
         """
         Get current tip account information.
@@ -237,7 +233,7 @@ class JitoTipManager:
                 }
                 
             # Get live balance - FIXED: extract value from response
-            balance_response = await connection.get_balance(Pubkey.from_string(user.jito_tip_account))
+            balance_response = await rpc_pool.call("get_balance", Pubkey.from_string(user.jito_tip_account))
             tip_balance_sol = balance_response.value / 1_000_000_000 if balance_response.value else 0.0
             
             return {
@@ -1,9 +1,13 @@
 # jupiter_api.py
 import asyncio
 import logging
-from typing import Optional, Dict, Any
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
 import httpx
 from app.config import settings
+from app.utils.http_clients import http_clients
+from app.utils.index_scheduler import index_scheduler
 
 # --------------------------------------------------------------
 # Logging setup
@@ -17,6 +21,17 @@ logger = logging.getLogger(__name__)
 
 JUPITER_SEARCH_URL = "https://lite-api.jup.ag/tokens/v2/search"
 
+# Cache lifetimes per field class: identity fields never change, market fields go stale in seconds
+METADATA_TTL = 600.0
+MARKET_TTL = 10.0
+CACHE_MAX_ENTRIES = 5000
+METADATA_FIELDS = frozenset({
+    "mint_address", "name", "symbol", "icon", "decimals", "twitter", "telegram", "website",
+    "dev", "total_supply", "token_program", "first_pool_id", "first_pool_created_at",
+    "created_at", "jupiter_url",
+})
+SOL_PRICE_REFRESH = 10.0      # seconds between SOL/USD ticker refreshes
+
 
 def safe_float(value, default: float = 0.0) -> float:
     """Safely convert to float, handles None, "", "null", etc."""
@@ -37,7 +52,7 @@ def safe_int(value, default: int = 0) -> int:
         return default
 
 
-async def get_jupiter_token_data(mint_address: str) -> Optional[Dict[str, Any]]:
+async def _fetch_token_data(mint_address: str) -> Optional[Dict[str, Any]]:
     """
     Fetch FULL token metadata from Jupiter Lite API v2 using mint address.
     Extracts 100% of the fields from the real response (including nested stats, audit, etc.)
@@ -45,10 +60,10 @@ async def get_jupiter_token_data(mint_address: str) -> Optional[Dict[str, Any]]:
     params = {"query": mint_address}
 
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            response = await client.get(JUPITER_SEARCH_URL, params=params)
-            response.raise_for_status()
-            results = response.json()
+        client = http_clients.client_for(JUPITER_SEARCH_URL)
+        response = await client.get(JUPITER_SEARCH_URL, params=params)
+        response.raise_for_status()
+        results = response.json()
 
         if not results or not isinstance(results, list):
             logger.info(f"Jupiter: Empty or invalid response for {mint_address[:8]}")
@@ -151,32 +166,192 @@ async def get_jupiter_token_data(mint_address: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+class JupiterTokenCache:
+    """
+    Coalescing cache in front of the Jupiter search endpoint.
+
+    One request per mint is in flight at a time, shared by every awaiter.
+    Responses are kept with their fetch time: full data (price, mcap,
+    holders, stats) is served for MARKET_TTL, the identity fields
+    (name, symbol, decimals, icon...) for METADATA_TTL. LRU-bounded.
+    """
+
+    def __init__(self, fetch=_fetch_token_data, max_entries: int = CACHE_MAX_ENTRIES):
+        self.fetch = fetch
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # mint -> (fetched_at, data)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "metadata_hits": 0, "fetches": 0, "coalesced": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, mint: str) -> Optional[Dict[str, Any]]:
+        """Full token data no older than MARKET_TTL"""
+        entry = self._entries.get(mint)
+        if entry is not None and time.time() - entry[0] <= MARKET_TTL:
+            self._entries.move_to_end(mint)
+            self.stats["hits"] += 1
+            return dict(entry[1])
+        data = await self._load(mint)
+        return dict(data) if data else None
+
+    async def get_metadata(self, mint: str) -> Optional[Dict[str, Any]]:
+        """Identity fields only, no older than METADATA_TTL"""
+        entry = self._entries.get(mint)
+        if entry is not None and time.time() - entry[0] <= METADATA_TTL:
+            self._entries.move_to_end(mint)
+            self.stats["metadata_hits"] += 1
+            data = entry[1]
+        else:
+            data = await self._load(mint)
+        return {k: v for k, v in data.items() if k in METADATA_FIELDS} if data else None
+
+    async def _load(self, mint: str) -> Optional[Dict[str, Any]]:
+        future = self._inflight.get(mint)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[mint] = future
+        data = None
+        try:
+            self.stats["fetches"] += 1
+            data = await self.fetch(mint)
+            if data:
+                self._entries[mint] = (time.time(), data)
+                self._entries.move_to_end(mint)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        finally:
+            del self._inflight[mint]
+            future.set_result(data)
+        return data
+
+
+# Global instance
+jupiter_token_cache = JupiterTokenCache()
+
+
+async def get_jupiter_token_data(mint_address: str) -> Optional[Dict[str, Any]]:
+    """Full Jupiter token data (coalesced, cached for MARKET_TTL)"""
+    return await jupiter_token_cache.get(mint_address)
+
+
+async def get_jupiter_token_metadata(mint_address: str) -> Optional[Dict[str, Any]]:
+    """Name / symbol / decimals / icon / socials (coalesced, cached for METADATA_TTL)"""
+    return await jupiter_token_cache.get_metadata(mint_address)
+
+
+# ===================================================================
+# SOL/USD ticker
+# ===================================================================
+class SolPriceTicker:
+    """
+    SOL/USD refreshed every SOL_PRICE_REFRESH seconds in the background.
+
+    `price` is the last good value (0.0 until the first one arrives) and
+    never does I/O, so hot paths can read it per tick. get() is for callers
+    that may run before the ticker has started: it refreshes once if the
+    value is missing or older than max_age.
+    """
+
+    def __init__(self, fetch=_fetch_token_data, interval: float = SOL_PRICE_REFRESH):
+        self.fetch = fetch
+        self.interval = interval
+        self.price = 0.0
+        self.updated_at = 0.0
+        self._refreshing: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.updated_at if self.updated_at else float("inf")
+
+    async def get(self, max_age: float = 60.0) -> float:
+        if self.price <= 0 or self.age > max_age:
+            await self.refresh()
+        return self.price
+
+    async def refresh(self) -> float:
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self._refresh())
+        await asyncio.shield(self._refreshing)
+        return self.price
+
+    async def _refresh(self):
+        try:
+            data = await self.fetch(settings.SOL_MINT)
+            price = safe_float((data or {}).get("usd_price"))
+            if price > 0:
+                self.price = price
+                self.updated_at = time.time()
+        except Exception as e:
+            logger.debug(f"SOL/USD refresh failed: {e}")
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def close(self):
+        for task in (self._task, self._refreshing):
+            if task and not task.done():
+                task.cancel()
+        await asyncio.gather(*(t for t in (self._task, self._refreshing) if t), return_exceptions=True)
+        self._task = self._refreshing = None
+
+
+# Global instance
+sol_price_ticker = SolPriceTicker()
+
+
 # ===================================================================
 # Smart Jupiter Fetch with Retry (Same style as your DexScreener)
 # ===================================================================
-async def fetch_jupiter_with_retry(mint: str, max_attempts: int = 10) -> dict:
+JUPITER_INDEX_TIMEOUT = 180.0  # Default deadline for callers that can afford to wait
+
+
+async def _probe_jupiter(mints: List[str]) -> Dict[str, dict]:
+    results = await asyncio.gather(*(get_jupiter_token_data(m) for m in mints), return_exceptions=True)
+    return {
+        mint: data
+        for mint, data in zip(mints, results)
+        if isinstance(data, dict) and data.get("name") and data["name"] != "Unknown"
+    }
+
+
+index_scheduler.register_source("jupiter", _probe_jupiter, batch_size=10)
+
+
+async def fetch_jupiter_with_retry(
+    mint: str,
+    max_attempts: int = 10,
+    timeout: float = JUPITER_INDEX_TIMEOUT,
+) -> dict:
     """
-    Retries until Jupiter indexes the token (they're usually 10–60s behind new launches)
-    Same logic you use for DexScreener.
+    Waits until Jupiter indexes the token (they're usually 10–60s behind new launches),
+    up to `timeout` seconds. Probing is done by the shared index_scheduler, so this
+    never sleeps in the caller's coroutine - it returns {} at the deadline instead.
     """
-    for attempt in range(max_attempts):
-        data = await get_jupiter_token_data(mint)
-
-        if data and data.get("name") and data["name"] != "Unknown":
-            price = data["usd_price"]
-            mc = data.get("market_cap") or data.get("fdv") or 0
-            logger.info(
-                f"Jupiter READY → {mint[:8]} | {data['symbol']} | ${price:.10f} | "
-                f"MC: ${mc:,.0f} | Holders: {data['holder_count']} | Attempt {attempt + 1}"
-            )
-            return data
-
-        delay = min(7 + (attempt ** 2) * 8, 180)  # 7s, 39s, 87s, 151s, 180s...
-        logger.info(f"Jupiter not ready {mint[:8]} → waiting {delay}s (attempt {attempt + 1})")
-        await asyncio.sleep(delay)
-
-    logger.warning(f"Jupiter failed permanently for {mint[:8]} after {max_attempts} attempts")
-    return {}
+    data = await index_scheduler.wait_until_indexed(
+        "jupiter", mint, timeout=timeout, max_attempts=max_attempts
+    )
+    if data:
+        price = data["usd_price"]
+        mc = data.get("market_cap") or data.get("fdv") or 0
+        logger.info(
+            f"Jupiter READY → {mint[:8]} | {data['symbol']} | ${price:.10f} | "
+            f"MC: ${mc:,.0f} | Holders: {data['holder_count']}"
+        )
+    return data
 
 
 #===================================================================
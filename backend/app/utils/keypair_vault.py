@@ -0,0 +1,135 @@
+# app/utils/keypair_vault.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Set
+
+import base58
+from solders.keypair import Keypair
+
+from app.config import settings
+from app.models import User
+from app.security import decrypt_private_key_backend
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL = 60  # seconds between expiry sweeps
+
+
+@dataclass
+class _HeldKey:
+    keypair: Keypair
+    encrypted: str      # Ciphertext it was decrypted from - a rotated key invalidates the entry
+    last_used: float
+
+
+class KeypairVault:
+    """
+    Decrypted signers for armed users, held in this process only.
+
+    admit() decrypts a user's key once and keeps the Keypair until it has
+    been idle for `ttl` seconds, the user is evicted (bot stopped) or the
+    LRU bound pushes it out. keypair_for() serves any user: admitted users
+    from memory (re-decrypting after expiry), everyone else with a one-off
+    decrypt that is not kept. Keys are never serialised or sent to Redis.
+    """
+
+    def __init__(self, ttl: float = settings.KEYPAIR_VAULT_TTL, max_entries: int = settings.KEYPAIR_VAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._held: "OrderedDict[str, _HeldKey]" = OrderedDict()
+        self._admitted: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"hits": 0, "decrypts": 0, "expired": 0, "evicted": 0}
+
+    def __len__(self) -> int:
+        return len(self._held)
+
+    def get(self, wallet_address: str) -> Optional[Keypair]:
+        """Held keypair, without ever decrypting"""
+        held = self._held.get(wallet_address)
+        if held is None:
+            return None
+        now = time.monotonic()
+        if now - held.last_used > self.ttl:
+            del self._held[wallet_address]
+            self.stats["expired"] += 1
+            return None
+        held.last_used = now
+        self._held.move_to_end(wallet_address)
+        self.stats["hits"] += 1
+        return held.keypair
+
+    def admit(self, user: User) -> Keypair:
+        """Decrypt (if needed) and hold this user's keypair - call when their bot is armed"""
+        self._admitted.add(user.wallet_address)
+        try:
+            return self.keypair_for(user)
+        except Exception:
+            self._admitted.discard(user.wallet_address)
+            raise
+
+    def keypair_for(self, user: User) -> Keypair:
+        """The user's signer: held if admitted, decrypted on the spot otherwise. Raises if it can't be decrypted."""
+        wallet = user.wallet_address
+        held = self._held.get(wallet)
+        if held is not None and held.encrypted != user.encrypted_private_key:
+            del self._held[wallet]  # Key changed since it was decrypted
+        keypair = self.get(wallet)
+        if keypair is not None:
+            return keypair
+
+        keypair = Keypair.from_bytes(decrypt_private_key_backend(user.encrypted_private_key))
+        self.stats["decrypts"] += 1
+        if wallet in self._admitted:
+            self._held[wallet] = _HeldKey(keypair, user.encrypted_private_key, time.monotonic())
+            while len(self._held) > self.max_entries:
+                self._held.popitem(last=False)
+                self.stats["evicted"] += 1
+        return keypair
+
+    def base58_for(self, user: User, admit: bool = False) -> str:
+        """Base58 secret key for the on-chain service endpoints"""
+        keypair = self.admit(user) if admit else self.keypair_for(user)
+        return base58.b58encode(bytes(keypair)).decode("utf-8")
+
+    def evict(self, wallet_address: str):
+        """Forget a user's key (bot stopped)"""
+        self._admitted.discard(wallet_address)
+        if self._held.pop(wallet_address, None) is not None:
+            self.stats["evicted"] += 1
+
+    def sweep(self):
+        now = time.monotonic()
+        expired = [w for w, held in self._held.items() if now - held.last_used > self.ttl]
+        for wallet in expired:
+            del self._held[wallet]
+        self.stats["expired"] += len(expired)
+        if expired:
+            logger.info(f"🔐 Keypair vault: {len(expired)} idle keys dropped, {len(self._held)} held")
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL)
+            self.sweep()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sweep_loop())
+
+    def clear(self):
+        self._held.clear()
+        self._admitted.clear()
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.clear()
+
+
+# Global instance
+keypair_vault = KeypairVault()
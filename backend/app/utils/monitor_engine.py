@@ -0,0 +1,525 @@
+# app/utils/monitor_engine.py
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.models import Trade, User
+from app.utils.deadline_scheduler import DeadlineScheduler
+from app.utils.monitor_snapshots import MonitorSnapshotStore
+from app.utils.price_feed_hub import PriceTick, price_feed_hub
+from app.utils.rule_table import (
+    HISTORY_LEN, RULE_DCA, RULE_HEAVY_EXIT, RULE_HEAVY_PARTIAL, RULE_SCALE_IN, RULE_TAKE_PROFIT,
+    RULE_TIMEOUT, RULE_TRAILING_STOP, SCALE_IN_LADDER, RuleTable,
+)
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_RETRY = 5.0          # seconds - retry a deadline that hit a busy / unpriced position or a failed sell
+NO_PRICE_GRACE = 30.0         # seconds after monitoring starts to wait for a first price before a blind timeout sell
+STATUS_EVERY = 5              # ticks between status pushes to the frontend
+TRAILING_DISTANCE_PCT = 15.0
+
+# Strategy "new_launch" always sells on this ladder: (profit_pct, sell_pct)
+NEW_LAUNCH_TP_LADDER = [(25.0, 40.0), (50.0, 30.0), (100.0, 20.0), (200.0, 10.0)]
+
+
+def _epoch(dt: Optional[datetime]) -> float:
+    """Naive UTC datetime (how trades store timestamps) → epoch seconds"""
+    if dt is None:
+        return time.time()
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+@dataclass
+class MonitoredPosition:
+    """One open trade as the monitor engine sees it - rules plus live state, no ORM objects"""
+    trade_id: int
+    wallet_address: str
+    mint: str
+    symbol: str
+    entry_price_usd: float
+    token_amount: float
+    token_decimals: int
+    opened_at: float              # epoch seconds of the buy
+    timeout_seconds: float
+    stop_loss_pct: float
+    tp_ladder: List[Tuple[float, float]]                                    # (profit_pct, sell_pct)
+    dca_ladder: List[Tuple[float, float]] = field(default_factory=list)    # (price_pct, buy_pct)
+    remaining_sol: float = 0.0
+    advanced: bool = False        # Strategy position (DCA / scale-in / ladder) vs plain sniper settings
+    trailing_distance_pct: float = TRAILING_DISTANCE_PCT
+    sell_slippage_bps: int = 1000
+    entry_price_sol: Optional[float] = None
+
+    # Live state (owned by the engine's RuleTable while tracked, mirrored back here)
+    row: int = -1
+    highest_pnl: float = 0.0
+    tp_hit: Set[float] = field(default_factory=set)
+    dca_hit: Set[float] = field(default_factory=set)
+    scale_in_until: float = 0.0   # epoch seconds; no scale-in / heavy-sell exit before this
+    heavy_exit_done: bool = False
+    price_history: Deque[float] = field(default_factory=lambda: deque(maxlen=HISTORY_LEN))
+    last_price_usd: float = 0.0
+    last_price_sol: Optional[float] = None
+    last_pnl: float = 0.0
+    realized_usd: float = 0.0     # Profit booked by partial sells so far
+    realized_sol: float = 0.0
+    ticks: int = 0
+    closed: bool = False
+    tracked_since: float = 0.0    # epoch seconds the engine started monitoring it
+
+    @property
+    def deadline(self) -> float:
+        return self.opened_at + self.timeout_seconds
+
+    def time_left(self, now: Optional[float] = None) -> float:
+        return max(0.0, self.deadline - (now or time.time()))
+
+    def pnl_at(self, price_usd: float) -> float:
+        if self.entry_price_usd <= 0 or price_usd <= 0:
+            return 0.0
+        return (price_usd / self.entry_price_usd - 1) * 100
+
+    @classmethod
+    def from_trade(cls, trade: Trade, user: Optional[User] = None) -> "MonitoredPosition":
+        """
+        Build a position from its Trade row. Trades bought with a strategy
+        (strategy_data) get the strategy rules; the rest use the user's
+        sniper sell settings.
+        """
+        strategy: Dict[str, Any] = {}
+        if trade.strategy_data:
+            try:
+                strategy = json.loads(trade.strategy_data)
+            except (ValueError, TypeError):
+                logger.warning(f"Bad strategy_data on trade {trade.id}, using sniper settings")
+
+        common = dict(
+            trade_id=trade.id,
+            wallet_address=trade.user_wallet_address,
+            mint=trade.mint_address,
+            symbol=trade.token_symbol or trade.mint_address[:8],
+            entry_price_usd=float(trade.price_usd_at_trade or strategy.get("entry_price_usd") or 0),
+            entry_price_sol=trade.price_sol_at_trade or strategy.get("entry_price_sol"),
+            token_amount=float(trade.amount_tokens or 0),
+            token_decimals=trade.token_decimals if trade.token_decimals is not None else 9,
+            opened_at=_epoch(trade.buy_timestamp),
+        )
+
+        if strategy:
+            if strategy.get("strategy_type") == "new_launch":
+                tp_ladder = list(NEW_LAUNCH_TP_LADDER)
+            else:
+                tp_ladder = [(float(l["profit_pct"]), float(l["sell_pct"])) for l in strategy.get("tp_levels", [])]
+            return cls(
+                **common,
+                timeout_seconds=float(strategy.get("original_timeout") or 600),
+                stop_loss_pct=float(strategy.get("stop_loss_pct") or 20.0),
+                tp_ladder=sorted(tp_ladder),
+                dca_ladder=sorted(
+                    ((float(l["price_pct"]), float(l["buy_pct"])) for l in strategy.get("dca_levels", [])),
+                    reverse=True,
+                ),
+                remaining_sol=float(strategy.get("remaining_sol") or 0),
+                advanced=True,
+            )
+
+        take_profit = float(getattr(user, "sniper_sell_take_profit_pct", None) or 50.0)
+        partial = float(getattr(user, "sniper_partial_sell_pct", None) or 0)
+        return cls(
+            **common,
+            timeout_seconds=float(getattr(user, "sniper_sell_timeout_seconds", None) or 3600),
+            stop_loss_pct=float(getattr(user, "sniper_sell_stop_loss_pct", None) or 20.0),
+            tp_ladder=[(take_profit, partial if 0 < partial < 100 else 100.0)],
+            trailing_distance_pct=float(getattr(user, "sniper_trailing_sl_pct", None) or TRAILING_DISTANCE_PCT),
+            sell_slippage_bps=int(getattr(user, "sniper_sell_slippage_bps", None) or 1000),
+        )
+
+
+@dataclass
+class MonitorAction:
+    """A state transition the engine wants executed (swap + trade update)"""
+    kind: str                     # "sell", "dca_buy" or "scale_in"
+    position: MonitoredPosition
+    reason: str
+    price_usd: float
+    pnl: float
+    sell_pct: float = 100.0       # Share of the current token amount to sell
+    buy_sol: float = 0.0
+    slippage_bps: int = 1000
+    jito: bool = False            # Send the sell through execute_jito_optimized_sell
+    level: Optional[float] = None
+    price_sol: Optional[float] = None
+
+    @property
+    def is_full_exit(self) -> bool:
+        return self.kind == "sell" and self.sell_pct >= 100
+
+
+ActionExecutor = Callable[[MonitorAction], Awaitable[None]]
+StatusHook = Callable[[MonitoredPosition], Awaitable[None]]
+
+
+def _txns_m5(data: Dict[str, Any]) -> Tuple[int, int]:
+    m5 = (data.get("txns") or {}).get("m5") or {}
+    return int(m5.get("buys", 0) or 0), int(m5.get("sells", 0) or 0)
+
+
+def _price_sol(tick: PriceTick) -> Optional[float]:
+    try:
+        return float(tick.data.get("price_native") or 0) or None
+    except (ValueError, TypeError):
+        return None
+
+
+class MonitorEngine:
+    """
+    Monitors every open position from one table.
+
+    Each mint with open positions has ONE task reading the shared
+    price_feed_hub subscription. Ticks from all mints are coalesced and
+    evaluated together: every position's rules live as columns in a
+    RuleTable, so one NumPy pass evaluates TP / SL / trailing / DCA for
+    every position that got a tick. Timeouts are not polled - each
+    position's deadline sits in a DeadlineScheduler, moved when the table
+    extends it, and fires the timeout sell when it passes. The executor
+    (swap + trade update, its own short DB session) only runs when a rule
+    fires, so hundreds of positions hold no DB sessions while idle.
+
+    Rule state that can't be rebuilt from the trade row (high-water mark,
+    TP / DCA progress, extended deadline, price history) is snapshotted to
+    Redis on every transition through a MonitorSnapshotStore.
+    """
+
+    def __init__(self, status_every: int = STATUS_EVERY):
+        self.status_every = status_every
+        self.table = RuleTable(on_deadline=self._reschedule)
+        self.deadlines = DeadlineScheduler()
+        self.snapshots = MonitorSnapshotStore(self.get)
+        self._by_mint: Dict[str, Dict[int, MonitoredPosition]] = {}
+        self._mint_of: Dict[int, str] = {}
+        self._by_row: Dict[int, MonitoredPosition] = {}
+        self._rows: Dict[str, np.ndarray] = {}            # mint -> table rows (cache)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._pending: Dict[str, PriceTick] = {}  # ticks waiting for the next evaluation pass
+        self._flush_scheduled = False
+        self._executor: Optional[ActionExecutor] = None
+        self._on_status: Optional[StatusHook] = None
+        self.stats = {"passes": 0, "ticks": 0, "evaluations": 0, "actions": 0, "timeouts": 0, "stale_ticks": 0}
+
+    def __len__(self) -> int:
+        return len(self._mint_of)
+
+    def __contains__(self, trade_id: int) -> bool:
+        return trade_id in self._mint_of
+
+    def get(self, trade_id: int) -> Optional[MonitoredPosition]:
+        """A tracked position, with its rule state synced from the table"""
+        mint = self._mint_of.get(trade_id)
+        if not mint:
+            return None
+        position = self._by_mint[mint][trade_id]
+        self.table.export(position.row, position)
+        return position
+
+    def positions(self, mint: Optional[str] = None) -> List[MonitoredPosition]:
+        if mint is not None:
+            positions = list(self._by_mint.get(mint, {}).values())
+        else:
+            positions = [p for by_trade in self._by_mint.values() for p in by_trade.values()]
+        for position in positions:
+            self.table.export(position.row, position)
+        return positions
+
+    def trade_ids(self) -> Set[int]:
+        return set(self._mint_of)
+
+    def add(self, position: MonitoredPosition) -> bool:
+        """Start monitoring a position. Returns False if it is already tracked or has nothing to sell."""
+        if position.trade_id in self._mint_of:
+            return False
+        if position.token_amount <= 0:
+            logger.warning(f"Invalid token_amount {position.token_amount} for {position.mint} – not monitoring")
+            return False
+
+        position.row = self.table.add(position)
+        position.tracked_since = time.time()
+        self._by_row[position.row] = position
+        self._by_mint.setdefault(position.mint, {})[position.trade_id] = position
+        self._mint_of[position.trade_id] = position.mint
+        self._rows.pop(position.mint, None)
+        # Rebuilt positions whose deadline passed while we were down fire right away
+        self.deadlines.schedule(position.trade_id, position.deadline)
+        self.snapshots.mark((position.trade_id,))
+
+        task = self._tasks.get(position.mint)
+        if task is None or task.done():
+            self._tasks[position.mint] = asyncio.create_task(self._run_mint(position.mint))
+
+        logger.info(
+            f"🎯 Monitoring trade {position.trade_id} ({position.mint[:8]}) | "
+            f"{'strategy' if position.advanced else 'sniper'} rules | "
+            f"timeout in {position.time_left():.0f}s | {len(self)} open positions"
+        )
+        return True
+
+    def remove(self, trade_id: int) -> Optional[MonitoredPosition]:
+        """Stop monitoring a position (sold, or closed outside the engine)"""
+        mint = self._mint_of.pop(trade_id, None)
+        if mint is None:
+            return None
+        self.deadlines.cancel(trade_id)
+        self.snapshots.drop(trade_id)
+        positions = self._by_mint.get(mint, {})
+        position = positions.pop(trade_id, None)
+        if position:
+            self.table.export(position.row, position)
+            self.table.release(position.row)
+            self._by_row.pop(position.row, None)
+        self._rows.pop(mint, None)
+        if not positions:
+            self._by_mint.pop(mint, None)
+            self._pending.pop(mint, None)
+            task = self._tasks.pop(mint, None)
+            if task and task is not asyncio.current_task():
+                task.cancel()
+        return position
+
+    def _rows_for(self, mint: str) -> np.ndarray:
+        rows = self._rows.get(mint)
+        if rows is None:
+            rows = np.fromiter((p.row for p in self._by_mint.get(mint, {}).values()), dtype=np.int64)
+            self._rows[mint] = rows
+        return rows
+
+    async def _run_mint(self, mint: str):
+        queue = price_feed_hub.subscribe(mint)
+        try:
+            while self._by_mint.get(mint):
+                self._queue_tick(mint, await queue.get())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            price_feed_hub.unsubscribe(mint, queue)
+            if self._tasks.get(mint) is asyncio.current_task():
+                self._tasks.pop(mint, None)
+
+    def _queue_tick(self, mint: str, tick: PriceTick):
+        self._pending[mint] = tick
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            # Ticks delivered in the same loop iteration share one evaluation pass
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, {}
+        try:
+            self._evaluate(pending)
+        except Exception as e:
+            logger.error(f"Monitor evaluation failed for {len(pending)} mints: {e}", exc_info=True)
+
+    def _evaluate(self, pending: Dict[str, PriceTick]):
+        now = time.time()
+        table = self.table
+        row_parts, price_parts, buy_parts, sell_parts = [], [], [], []
+        price_sol: Dict[str, Optional[float]] = {}
+        stale_parts = []
+
+        for mint, tick in pending.items():
+            rows = self._rows_for(mint)
+            if tick.stale:
+                # Last good price re-published after failed fetches - no rule may fire on it
+                stale_parts.append(rows)
+                continue
+            prices = np.full(len(rows), tick.price_usd)
+            buys, sells = _txns_m5(tick.data)
+            price_sol[mint] = _price_sol(tick)
+            if not len(rows):
+                continue
+            row_parts.append(rows)
+            price_parts.append(prices)
+            buy_parts.append(np.full(len(rows), buys))
+            sell_parts.append(np.full(len(rows), sells))
+
+        if stale_parts:
+            self.stats["stale_ticks"] += len(stale_parts)
+            self._push_status(np.concatenate(stale_parts))
+        if not row_parts:
+            return
+
+        rows = np.concatenate(row_parts)
+        rows = rows[table.active[rows] & ~table.busy[rows]]
+        highest = table.highest[rows]
+        prices = np.concatenate(price_parts)
+        fired = table.evaluate(
+            np.concatenate(row_parts), prices, now, np.concatenate(buy_parts), np.concatenate(sell_parts)
+        )
+        self.stats["passes"] += 1
+        self.stats["ticks"] += len(pending)
+        self.stats["evaluations"] += len(rows)
+
+        # A new high-water mark is a transition worth a snapshot (the trailing stop hangs off it)
+        raised = rows[table.highest[rows] > highest].tolist()
+        self.snapshots.mark(self._by_row[row].trade_id for row in raised)
+
+        fired_rows = set()
+        for row, rule, level in fired:
+            position = self._by_row[row]
+            fired_rows.add(row)
+            self.snapshots.mark((position.trade_id,))
+            table.export(row, position)
+            position.last_price_sol = price_sol.get(position.mint) or position.last_price_sol
+            self._dispatch(self._action_for(position, rule, level))
+
+        if self._on_status and self.status_every:
+            for row in rows[table.ticks[rows] % self.status_every == 0].tolist():
+                if row in fired_rows:
+                    continue
+                position = self._by_row[row]
+                table.export(row, position)
+                position.last_price_sol = price_sol.get(position.mint) or position.last_price_sol
+                asyncio.create_task(self._send_status(position))
+
+    def _push_status(self, rows: np.ndarray):
+        """Status update for these positions as they stand, without evaluating anything"""
+        if not self._on_status:
+            return
+        table = self.table
+        for row in rows[table.active[rows]].tolist():
+            position = self._by_row[row]
+            table.export(row, position)
+            asyncio.create_task(self._send_status(position))
+
+    def _reschedule(self, rows: np.ndarray, deadlines: np.ndarray):
+        """RuleTable moved some deadlines (dynamic timeout / extension)"""
+        for row, deadline in zip(rows.tolist(), deadlines.tolist()):
+            position = self._by_row.get(row)
+            if position is not None:
+                self.deadlines.schedule(position.trade_id, deadline)
+                self.snapshots.mark((position.trade_id,))
+
+    def _on_deadlines(self, trade_ids: List[int]):
+        """DeadlineScheduler callback: these positions' timeouts just passed"""
+        now = time.time()
+        table = self.table
+        rows = []
+        for trade_id in trade_ids:
+            mint = self._mint_of.get(trade_id)
+            if mint is None:
+                continue
+            position = self._by_mint[mint][trade_id]
+            # Mid-action, or no price yet after a restart: try again shortly rather than sell blind
+            unpriced = table.last_price[position.row] <= 0 and now < position.tracked_since + NO_PRICE_GRACE
+            if table.busy[position.row] or unpriced:
+                self.deadlines.schedule(trade_id, now + DEADLINE_RETRY)
+                continue
+            rows.append(position.row)
+
+        if not rows:
+            return
+        for row, rule, level in table.expire(np.array(rows, dtype=np.int64), now):
+            position = self._by_row[row]
+            table.export(row, position)
+            self.stats["timeouts"] += 1
+            self._dispatch(self._action_for(position, rule, level))
+
+    def _action_for(self, p: MonitoredPosition, rule: int, level: int) -> MonitorAction:
+        """Turn a fired rule into the action the executor runs"""
+        price, pnl = p.last_price_usd, p.last_pnl
+
+        def sell(reason: str, pct: float = 100.0, bps: int = 2000, jito: bool = False, level_pct: Optional[float] = None):
+            # Strategy positions use per-rule slippage and Jito; sniper positions the user's sell settings
+            return MonitorAction("sell", p, reason, price, pnl, sell_pct=pct,
+                                 slippage_bps=bps if p.advanced else p.sell_slippage_bps,
+                                 jito=jito and p.advanced, level=level_pct, price_sol=p.last_price_sol)
+
+        if rule == RULE_TIMEOUT:
+            return sell("Timeout", jito=True)
+        if rule == RULE_HEAVY_EXIT:
+            return sell("Early Exit (Heavy Selling)")
+        if rule == RULE_HEAVY_PARTIAL:
+            return sell("HEAVY_SELL_EXIT", pct=30.0)
+        if rule == RULE_DCA:
+            drop_pct, buy_pct = p.dca_ladder[level]
+            return MonitorAction("dca_buy", p, f"DCA_{abs(drop_pct):g}%_DROP", price, pnl,
+                                 buy_sol=p.remaining_sol * buy_pct / 100, slippage_bps=2500, level=drop_pct)
+        if rule == RULE_SCALE_IN:
+            profit_pct, buy_pct = SCALE_IN_LADDER[level]
+            return MonitorAction("scale_in", p, f"SCALE_IN_{profit_pct:g}", price, pnl,
+                                 buy_sol=p.remaining_sol * buy_pct / 100, slippage_bps=1500, level=profit_pct)
+        if rule == RULE_TAKE_PROFIT:
+            profit_pct, sell_pct = p.tp_ladder[level]
+            reason = f"TP_{profit_pct:g}" if p.advanced else "Take Profit"
+            return sell(reason, pct=sell_pct, bps=1000, jito=True, level_pct=profit_pct)
+        if rule == RULE_TRAILING_STOP:
+            return sell("Trailing Stop", jito=True)
+        return sell("Stop Loss")
+
+    def _dispatch(self, action: MonitorAction):
+        if self._executor is None:
+            logger.warning(f"Monitor action {action.reason} for trade {action.position.trade_id} dropped - engine not started")
+            return
+        self.stats["actions"] += 1
+        self.table.busy[action.position.row] = True
+        asyncio.create_task(self._execute(action))
+
+    async def _execute(self, action: MonitorAction):
+        p = action.position
+        try:
+            await self._executor(action)
+        except Exception as e:
+            logger.error(f"Monitor action {action.reason} failed for trade {p.trade_id} ({p.mint[:8]}): {e}")
+        finally:
+            # The row may have been released (and reused) while the action ran
+            if self._by_row.get(p.row) is p:
+                self.table.busy[p.row] = False
+                self.table.remaining_sol[p.row] = p.remaining_sol
+                if p.closed:
+                    self.remove(p.trade_id)
+                    logger.info(f"🛑 Monitor finished for trade {p.trade_id} ({p.mint[:8]}) | {action.reason}")
+                else:
+                    self.snapshots.mark((p.trade_id,))
+                    if p.trade_id not in self.deadlines:
+                        # The timeout sell didn't go through - its deadline is spent, so retry
+                        self.deadlines.schedule(p.trade_id, max(self.table.deadline(p.row), time.time() + DEADLINE_RETRY))
+
+    async def _send_status(self, p: MonitoredPosition):
+        try:
+            await self._on_status(p)
+        except Exception as e:
+            logger.debug(f"Monitor status push failed for trade {p.trade_id}: {e}")
+
+    def start(self, executor: ActionExecutor, on_status: Optional[StatusHook] = None):
+        """Install the action executor / status hook (positions added before this only record state)"""
+        self._executor = executor
+        self._on_status = on_status
+        self.deadlines.start(self._on_deadlines)
+        logger.info(f"📈 Monitor engine started ({len(self)} positions, {len(self.deadlines)} deadlines)")
+
+    async def close(self):
+        """Stop every mint task (called on app shutdown). Positions are rebuilt from trades + snapshots on restart."""
+        await self.snapshots.close()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._pending.clear()
+        self._by_mint.clear()
+        self._mint_of.clear()
+        self._by_row.clear()
+        self._rows.clear()
+        self.deadlines.close()
+        self.table = RuleTable(on_deadline=self._reschedule)
+
+
+# Global instance
+monitor_engine = MonitorEngine()
@@ -0,0 +1,273 @@
+# app/utils/monitor_snapshots.py
+import asyncio
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set
+
+from app.utils.redis_client import get_redis_client
+
+if TYPE_CHECKING:
+    from app.utils.monitor_engine import MonitoredPosition
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_KEY = "monitor_state:{}"
+LEGACY_KEY = "tp_state:{}"    # Pre-snapshot TP state (highest_pnl + triggered TPs), read once for migration
+SNAPSHOT_TTL = 48 * 3600      # Refreshed on every write; open trades are only reconciled for 24h
+FLUSH_DELAY = 0.5             # seconds - transitions inside this window share one pipeline
+LOAD_CHUNK = 1000             # keys per MGET
+
+
+def encode(p: "MonitoredPosition") -> str:
+    """Compact snapshot of a position's rule state (short keys, no whitespace)"""
+    return json.dumps({
+        "v": SNAPSHOT_VERSION,
+        "to": p.timeout_seconds,
+        "hi": p.highest_pnl,
+        "tp": sorted(p.tp_hit),
+        "dca": sorted(p.dca_hit),
+        "si": p.scale_in_until,
+        "hx": p.heavy_exit_done,
+        "ph": list(p.price_history),
+        "lp": p.last_price_usd,
+        "pnl": p.last_pnl,
+        "rs": p.remaining_sol,
+        "ru": p.realized_usd,
+        "rsol": p.realized_sol,
+        "n": p.ticks,
+    }, separators=(",", ":"))
+
+
+def decode(raw: Optional[str], legacy: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Snapshot dict, or None when missing / unreadable / from an unknown version"""
+    if raw:
+        try:
+            snapshot = json.loads(raw)
+        except (ValueError, TypeError):
+            return None
+        return snapshot if snapshot.get("v") == SNAPSHOT_VERSION else None
+
+    if legacy:
+        try:
+            state = json.loads(legacy)
+        except (ValueError, TypeError):
+            return None
+        return {
+            "v": 0,
+            "hi": float(state.get("highest_pnl") or 0),
+            "tp": [float(pct) for pct, hit in (state.get("triggered") or {}).items() if hit],
+        }
+    return None
+
+
+def restore(p: "MonitoredPosition", snapshot: Dict[str, Any]):
+    """Apply a snapshot to a position rebuilt from its trade (before it is added to the engine)"""
+    p.timeout_seconds = float(snapshot.get("to") or p.timeout_seconds)
+    p.highest_pnl = float(snapshot.get("hi") or 0)
+    p.tp_hit = {float(pct) for pct in snapshot.get("tp", ())}
+    p.dca_hit = {float(pct) for pct in snapshot.get("dca", ())}
+    p.scale_in_until = float(snapshot.get("si") or 0)
+    p.heavy_exit_done = bool(snapshot.get("hx"))
+    p.price_history.extend(float(x) for x in snapshot.get("ph", ()))
+    p.last_price_usd = float(snapshot.get("lp") or 0)
+    p.last_pnl = float(snapshot.get("pnl") or 0)
+    if "rs" in snapshot:
+        p.remaining_sol = float(snapshot["rs"])
+    p.realized_usd = float(snapshot.get("ru") or 0)
+    p.realized_sol = float(snapshot.get("rsol") or 0)
+    p.ticks = int(snapshot.get("n") or 0)
+
+
+class MonitorSnapshotStore:
+    """
+    Write-behind store for monitor state in Redis.
+
+    The engine marks a position dirty on every state transition (new high,
+    TP / DCA level consumed, deadline moved, action done). Marks are
+    coalesced and written FLUSH_DELAY later in one pipeline, encoding each
+    position as it is at flush time - a burst of ticks on a hot mint costs
+    one SET per position, not one per tick. load() restores any number of
+    positions in a few MGETs.
+    """
+
+    def __init__(
+        self,
+        snapshot_of: Callable[[int], Optional["MonitoredPosition"]],
+        flush_delay: float = FLUSH_DELAY,
+        redis=None,
+    ):
+        self.snapshot_of = snapshot_of
+        self.flush_delay = flush_delay
+        self.redis = redis  # None: the shared client from get_redis_client()
+        self._dirty: Set[int] = set()
+        self._dropped: Set[int] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"flushes": 0, "written": 0, "deleted": 0, "loaded": 0}
+
+    def _redis(self):
+        return self.redis if self.redis is not None else get_redis_client()
+
+    def mark(self, trade_ids: Iterable[int]):
+        self._dirty.update(trade_ids)
+        if self._dirty:
+            self._schedule()
+
+    def drop(self, trade_id: int):
+        """Position closed - delete its snapshot with the next flush"""
+        self._dirty.discard(trade_id)
+        self._dropped.add(trade_id)
+        self._schedule()
+
+    def _schedule(self):
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                pass  # No loop (yet) - the next mark schedules it
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        self._flush_task = None  # Marks from here on schedule the next flush
+        await self.flush()
+
+    async def flush(self):
+        dirty, self._dirty = self._dirty, set()
+        dropped, self._dropped = self._dropped, set()
+        if not dirty and not dropped:
+            return
+
+        pipe = self._redis().pipeline(transaction=False)
+        written = 0
+        for trade_id in dirty:
+            position = self.snapshot_of(trade_id)
+            if position is not None:
+                pipe.set(SNAPSHOT_KEY.format(trade_id), encode(position), ex=SNAPSHOT_TTL)
+                written += 1
+        for trade_id in dropped:
+            pipe.delete(SNAPSHOT_KEY.format(trade_id), LEGACY_KEY.format(trade_id))
+
+        try:
+            await pipe.execute()
+            self.stats["flushes"] += 1
+            self.stats["written"] += written
+            self.stats["deleted"] += len(dropped)
+        except Exception as e:
+            logger.error(f"Monitor snapshot flush failed ({written} writes, {len(dropped)} deletes): {e}")
+            # Keep them for the next flush unless something newer happened meanwhile
+            self._dirty.update(dirty - self._dropped)
+            self._dropped.update(dropped - self._dirty)
+
+    async def load(self, trade_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Snapshots for these trades (legacy tp_state as fallback), in one pipelined round trip per chunk"""
+        snapshots: Dict[int, Dict[str, Any]] = {}
+        redis = self._redis()
+        for i in range(0, len(trade_ids), LOAD_CHUNK):
+            chunk = trade_ids[i:i + LOAD_CHUNK]
+            try:
+                pipe = redis.pipeline(transaction=False)
+                pipe.mget([SNAPSHOT_KEY.format(trade_id) for trade_id in chunk])
+                pipe.mget([LEGACY_KEY.format(trade_id) for trade_id in chunk])
+                current, legacy = await pipe.execute()
+            except Exception as e:
+                logger.error(f"Monitor snapshot load failed for {len(chunk)} trades: {e}")
+                continue
+            for trade_id, raw, old in zip(chunk, current, legacy):
+                snapshot = decode(raw, old)
+                if snapshot is not None:
+                    snapshots[trade_id] = snapshot
+        self.stats["loaded"] += len(snapshots)
+        return snapshots
+
+    async def close(self):
+        """Write out whatever is pending (app shutdown)"""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+
+# ===================================================================
+# TEST BLOCK — benchmark: python -m app.utils.monitor_snapshots [positions]
+# ===================================================================
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from app.utils.monitor_engine import MonitorEngine, MonitoredPosition
+
+    POSITIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    RTT = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.001  # simulated Redis round trip
+
+    class MemoryPipeline:
+        """Redis pipeline stand-in: commands run on execute(), after one simulated round trip"""
+
+        def __init__(self, data: Dict[str, str]):
+            self.data = data
+            self.commands: List[Callable[[], Any]] = []
+
+        def set(self, key: str, value: str, ex: Optional[int] = None):
+            self.commands.append(lambda: self.data.__setitem__(key, value) or True)
+
+        def delete(self, *keys: str):
+            self.commands.append(lambda: sum(self.data.pop(key, None) is not None for key in keys))
+
+        def mget(self, keys: List[str]):
+            self.commands.append(lambda: [self.data.get(key) for key in keys])
+
+        async def execute(self) -> list:
+            await asyncio.sleep(RTT)
+            return [command() for command in self.commands]
+
+    class MemoryRedis:
+        def __init__(self):
+            self.data: Dict[str, str] = {}
+
+        def pipeline(self, transaction: bool = True) -> MemoryPipeline:
+            return MemoryPipeline(self.data)
+
+    def make_position(i: int, now: float) -> MonitoredPosition:
+        p = MonitoredPosition(
+            trade_id=10_000_000 + i, wallet_address="bench", mint=f"BENCH{i % 200}", symbol="BENCH",
+            entry_price_usd=0.001, token_amount=1000.0, token_decimals=6, opened_at=now, timeout_seconds=600.0,
+            stop_loss_pct=20.0, tp_ladder=[(25.0, 40.0), (50.0, 30.0), (100.0, 20.0)],
+            dca_ladder=[(-10.0, 30.0), (-20.0, 30.0)], remaining_sol=0.5, advanced=True,
+        )
+        p.tp_hit, p.dca_hit, p.highest_pnl = {25.0}, {-10.0}, 42.0
+        p.price_history.extend([0.0011, 0.0012, 0.00125, 0.0013, 0.00128])
+        return p
+
+    async def bench():
+        redis = MemoryRedis()
+        now = time.time()
+        originals = {p.trade_id: p for p in (make_position(i, now) for i in range(POSITIONS))}
+        store = MonitorSnapshotStore(originals.get, redis=redis)
+        engine = MonitorEngine()
+        engine.snapshots.redis = redis
+
+        t0 = time.perf_counter()
+        store.mark(originals)
+        await store.flush()
+        write_ms = (time.perf_counter() - t0) * 1000
+
+        # Restore: one bulk load, then rebuild + register every position with the engine
+        t0 = time.perf_counter()
+        snapshots = await store.load(list(originals))
+        load_ms = (time.perf_counter() - t0) * 1000
+        for trade_id, snapshot in snapshots.items():
+            p = make_position(trade_id - 10_000_000, now)
+            p.tp_hit, p.dca_hit, p.highest_pnl = set(), set(), 0.0
+            p.price_history.clear()
+            restore(p, snapshot)
+            engine.add(p)
+        restore_ms = (time.perf_counter() - t0) * 1000
+
+        sample = engine.get(10_000_000)
+        size = len(encode(originals[10_000_000]))
+        print(f"{POSITIONS} positions, in-memory Redis with {RTT * 1000:.1f}ms round trips")
+        print(f"  snapshot {size} bytes | write (1 pipeline) {write_ms:.1f}ms")
+        print(f"  restore: load {len(snapshots)} in {load_ms:.1f}ms | load + rebuild + engine.add {restore_ms:.1f}ms")
+        print(f"  restored trade 10000000: tp_hit={sample.tp_hit} dca_hit={sample.dca_hit} "
+              f"highest={sample.highest_pnl} history={list(sample.price_history)}")
+        await engine.close()
+
+    asyncio.run(bench())
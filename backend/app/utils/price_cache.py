@@ -0,0 +1,167 @@
+# app/utils/price_cache.py
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.utils.dexscreener_api import fetch_dexscreener_with_retry
+from app.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+FetchFn = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+FRESH = 8.0                   # seconds - what trading paths should demand
+ANY_AGE = math.inf            # max_stale for UI paths: any cached price beats none
+
+
+@dataclass
+class CachedPrice:
+    data: Dict[str, Any]
+    fetched_at: float         # epoch seconds
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+
+def _has_price(data: Optional[Dict[str, Any]]) -> bool:
+    try:
+        return bool(data) and float(data.get("price_usd") or 0) > 0
+    except (ValueError, TypeError):
+        return False
+
+
+async def _fetch_dexscreener(mint: str) -> Optional[Dict[str, Any]]:
+    return await fetch_dexscreener_with_retry(mint, timeout=5)
+
+
+class PriceCache:
+    """
+    Two-tier cache for token price data with a per-call staleness contract.
+
+    get(mint, max_age, max_stale): anything younger than max_age is served
+    from memory (L1), then from Redis (L2, shared by every worker); only
+    then is the source fetched - once per mint however many callers are
+    waiting (single-flight). If the fetch fails, a cached entry up to
+    max_age + max_stale old is returned instead; max_stale=None means
+    "fresh or fail" and returns None. L1 is an LRU bounded by max_entries,
+    and entries older than `retain` are dropped on both tiers.
+    """
+
+    def __init__(
+        self,
+        fetch: FetchFn = _fetch_dexscreener,
+        max_entries: int = settings.PRICE_CACHE_MAX_ENTRIES,
+        retain: float = 300.0,
+        use_redis: bool = settings.PRICE_CACHE_REDIS,
+        namespace: str = "price",
+    ):
+        self.fetch = fetch
+        self.max_entries = max_entries
+        self.retain = retain
+        self.use_redis = use_redis
+        self.namespace = namespace
+        self._entries: "OrderedDict[str, CachedPrice]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "l2_hits": 0, "misses": 0, "stale": 0, "failures": 0, "coalesced": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def peek(self, mint: str) -> Optional[CachedPrice]:
+        """The L1 entry (any age up to `retain`) without fetching or counting"""
+        entry = self._entries.get(mint)
+        if entry is not None and entry.age > self.retain:
+            del self._entries[mint]
+            return None
+        return entry
+
+    def put(self, mint: str, data: Dict[str, Any], fetched_at: Optional[float] = None):
+        """Store data fetched elsewhere (L1 only)"""
+        self._entries[mint] = CachedPrice(data, fetched_at or time.time())
+        self._entries.move_to_end(mint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def get(self, mint: str, max_age: float = FRESH, max_stale: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        entry = self.peek(mint)
+        if entry is not None and entry.age <= max_age:
+            self._entries.move_to_end(mint)
+            self.stats["hits"] += 1
+            return entry.data
+
+        self.stats["misses"] += 1
+        fresh = await self._load(mint, max_age)
+        if fresh is not None:
+            return fresh.data
+
+        # Source failed - fall back within the caller's staleness budget
+        self.stats["failures"] += 1
+        entry = self.peek(mint)
+        if entry is not None and max_stale is not None and entry.age <= max_age + max_stale:
+            self.stats["stale"] += 1
+            logger.debug(f"Using stale price ({entry.age:.0f}s old) for {mint[:8]}")
+            return entry.data
+        return None
+
+    async def _load(self, mint: str, max_age: float) -> Optional[CachedPrice]:
+        future = self._inflight.get(mint)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            entry = await asyncio.shield(future)
+            # A shared load may be older than this caller allows (e.g. it came from L2)
+            return entry if entry is not None and entry.age <= max_age else None
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[mint] = future
+        entry = None
+        try:
+            entry = await self._read_l2(mint, max_age)
+            if entry is None:
+                data = await self.fetch(mint)
+                if _has_price(data):
+                    entry = CachedPrice(data, time.time())
+                    await self._write_l2(mint, entry)
+            if entry is not None:
+                self.put(mint, entry.data, entry.fetched_at)
+        except Exception as e:
+            logger.debug(f"Price fetch failed for {mint[:8]}: {e}")
+        finally:
+            del self._inflight[mint]
+            future.set_result(entry)
+        return entry
+
+    async def _read_l2(self, mint: str, max_age: float) -> Optional[CachedPrice]:
+        if not self.use_redis:
+            return None
+        try:
+            raw = await get_redis_client().get(f"{self.namespace}:{mint}")
+            if raw:
+                stored = json.loads(raw)
+                entry = CachedPrice(stored["d"], float(stored["t"]))
+                if entry.age <= max_age:
+                    self.stats["l2_hits"] += 1
+                    return entry
+        except Exception as e:
+            logger.debug(f"Price cache L2 read failed for {mint[:8]}: {e}")
+        return None
+
+    async def _write_l2(self, mint: str, entry: CachedPrice):
+        if not self.use_redis:
+            return
+        try:
+            value = json.dumps({"t": entry.fetched_at, "d": entry.data}, separators=(",", ":"))
+            await get_redis_client().setex(f"{self.namespace}:{mint}", int(self.retain), value)
+        except Exception as e:
+            logger.debug(f"Price cache L2 write failed for {mint[:8]}: {e}")
+
+
+# Global instance
+price_cache = PriceCache()
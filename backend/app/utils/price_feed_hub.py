@@ -0,0 +1,204 @@
+# app/utils/price_feed_hub.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from app.utils.dexscreener_api import get_dexscreener_data
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PriceTick:
+    """One price observation for a mint, shared by every subscribed monitor"""
+    mint: str
+    price_usd: float
+    source: str
+    fetched_at: float  # time.monotonic() when the data was fetched
+    data: Dict[str, Any] = field(default_factory=dict)
+    stale: bool = False
+
+    @property
+    def staleness_seconds(self) -> float:
+        return max(0.0, time.monotonic() - self.fetched_at)
+
+    def as_price_data(self) -> Dict[str, Any]:
+        """Return the tick in the dict shape the monitors already consume"""
+        return {
+            **self.data,
+            "priceUsd": self.price_usd,
+            "_source": self.source,
+            "_stale": self.stale,
+            "_stale_seconds": self.staleness_seconds,
+        }
+
+
+class PriceFeedHub:
+    """
+    Keeps ONE refresh task per mint and fans every tick out to all monitors
+    subscribed to that mint, so 40 positions on the same token cost one
+    DexScreener request per interval instead of 40.
+
+    Push sources (e.g. curve_price_engine) publish their own ticks as soon
+    as they have them; a mint a push source can price is not polled.
+    """
+
+    def __init__(self, refresh_interval: float = 2.0, max_stale_republish: float = 30.0):
+        self.refresh_interval = refresh_interval
+        self.max_stale_republish = max_stale_republish
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._latest: Dict[str, PriceTick] = {}
+        self._push_sources: List[Any] = []
+
+    def attach_push_source(self, source: Any):
+        """
+        Add a source with watch(mint) / unwatch(mint) / current(mint) -> Optional[PriceTick]
+        that publishes ticks itself via publish(). Mints it can't price fall back to polling.
+        """
+        self._push_sources.append(source)
+        for mint in self._subscribers:
+            source.watch(mint)
+
+    def subscribe(self, mint: str) -> asyncio.Queue:
+        """Subscribe to price ticks for a mint. Returns a queue that always holds the newest tick."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(mint, set()).add(queue)
+
+        # Late subscribers get the last known tick right away
+        latest = self._latest.get(mint)
+        if latest:
+            queue.put_nowait(latest)
+
+        task = self._tasks.get(mint)
+        if task is None or task.done():
+            self._tasks[mint] = asyncio.create_task(self._refresh_loop(mint))
+            for source in self._push_sources:
+                source.watch(mint)
+            logger.info(f"📡 Price feed started for {mint[:8]}")
+
+        return queue
+
+    def unsubscribe(self, mint: str, queue: asyncio.Queue):
+        """Remove a subscriber. The refresh task stops when the last subscriber leaves."""
+        subscribers = self._subscribers.get(mint)
+        if not subscribers:
+            return
+
+        subscribers.discard(queue)
+        if subscribers:
+            return
+
+        del self._subscribers[mint]
+        self._latest.pop(mint, None)
+        for source in self._push_sources:
+            source.unwatch(mint)
+        task = self._tasks.pop(mint, None)
+        if task and not task.done():
+            task.cancel()
+        logger.info(f"📴 Price feed stopped for {mint[:8]} (no subscribers)")
+
+    async def next_tick(self, queue: asyncio.Queue, timeout: float) -> Optional[PriceTick]:
+        """Wait for the next tick on a subscription queue, or None on timeout"""
+        try:
+            return await asyncio.wait_for(queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def latest(self, mint: str) -> Optional[PriceTick]:
+        """Most recent tick for a mint without waiting"""
+        return self._latest.get(mint)
+
+    def subscriber_count(self, mint: str) -> int:
+        return len(self._subscribers.get(mint, ()))
+
+    def publish(self, tick: PriceTick):
+        """Fan a pushed tick out to the mint's subscribers (ignored if nobody is subscribed)"""
+        if tick.mint in self._subscribers:
+            self._publish(tick)
+
+    def _pushed(self, mint: str) -> Optional[PriceTick]:
+        for source in self._push_sources:
+            tick = source.current(mint)
+            if tick is not None:
+                return tick
+        return None
+
+    def _publish(self, tick: PriceTick):
+        self._latest[tick.mint] = tick
+        for queue in list(self._subscribers.get(tick.mint, ())):
+            # Monitors only care about the newest price - drop the unread one
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(tick)
+
+    async def _fetch(self, mint: str) -> Optional[PriceTick]:
+        data = await get_dexscreener_data(mint)
+        try:
+            price_usd = float(data.get("price_usd") or 0) if data else 0.0
+        except (ValueError, TypeError):
+            price_usd = 0.0
+
+        if price_usd <= 0:
+            return None
+
+        return PriceTick(
+            mint=mint,
+            price_usd=price_usd,
+            source="dexscreener",
+            fetched_at=time.monotonic(),
+            data=data,
+        )
+
+    async def _refresh_loop(self, mint: str):
+        try:
+            while self._subscribers.get(mint):
+                # A push source already publishes on every change - just keep the cadence for quiet mints
+                tick = self._pushed(mint)
+                try:
+                    if tick is None:
+                        tick = await self._fetch(mint)
+                except Exception as e:
+                    logger.debug(f"Price feed fetch failed for {mint[:8]}: {e}")
+                    tick = None
+
+                if tick:
+                    self._publish(tick)
+                else:
+                    # Re-publish the last price flagged as stale so monitors still wake up
+                    last = self._latest.get(mint)
+                    if last and last.staleness_seconds < self.max_stale_republish:
+                        self._publish(PriceTick(
+                            mint=mint,
+                            price_usd=last.price_usd,
+                            source=last.source,
+                            fetched_at=last.fetched_at,
+                            data=last.data,
+                            stale=True,
+                        ))
+
+                await asyncio.sleep(self.refresh_interval)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._tasks.get(mint) is asyncio.current_task():
+                self._tasks.pop(mint, None)
+
+    async def close(self):
+        """Cancel every refresh task (called on app shutdown)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._subscribers.clear()
+        self._latest.clear()
+
+
+# Global instance
+price_feed_hub = PriceFeedHub()
@@ -1,11 +1,18 @@
 # app/utils/pumpfun_grpc_listener.py
 import asyncio
+import base64
+import hashlib
 import logging
-from datetime import datetime, timedelta
-from app.database import AsyncSessionLocal
-from app.models import NewTokens
-from app.main import safe_enrich_token
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Set
+
+import base58
+import grpc
+
 from app.config import settings
+from app.generated import geyser_pb2
+from app.generated.geyser_pb2_grpc import GeyserStub
 
 logger = logging.getLogger(__name__)
 
@@ -15,100 +22,317 @@ GRPC_TOKEN = settings.GRPC_TOKEN   # put in .env
 
 # Pump.fun program
 PUMPFUN_PROGRAM = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+PUMPFUN_PROGRAM_BYTES = base58.b58decode(PUMPFUN_PROGRAM)
 
-async def pumpfun_migration_listener():
-    """Listen for Pump.fun → Raydium migrations using account updates"""
-    try:
-        from triton_yellowstone_grpc import Client
-        from triton_yellowstone_grpc.proto import SubscribeRequest, CommitmentLevel
-    except ImportError:
-        logger.error("Install triton-yellowstone-grpc: pip install triton-yellowstone-grpc")
-        return
-
-    client = Client(GRPC_URL, GRPC_TOKEN)
-    
-    request = SubscribeRequest(
-        accounts={
-            "pumpfun_migration": {
-                "owner": [PUMPFUN_PROGRAM],
-                "filters": [
-                    {
-                        "memcmp": {
-                            "offset": "1",  # offset of 'complete' boolean in Pump.fun bonding curve
-                            "bytes": "AQ==",  # base64 for 1 (True)
-                        }
-                    }
-                ],
-            }
-        },
-        commitment=CommitmentLevel.PROCESSED,
-    )
 
-    while True:
+def _anchor_discriminator(name: str) -> bytes:
+    return hashlib.sha256(f"global:{name}".encode()).digest()[:8]
+
+
+CREATE_DISCRIMINATOR = _anchor_discriminator("create")
+CREATE_V2_DISCRIMINATOR = _anchor_discriminator("create_v2")
+MIGRATE_DISCRIMINATOR = _anchor_discriminator("migrate")
+
+
+@dataclass
+class PumpFunEvent:
+    """A decoded pump.fun create / migrate instruction"""
+    kind: str  # "create" or "migrate"
+    mint: str
+    signature: str
+    slot: int
+    bonding_curve: Optional[str] = None
+    creator: Optional[str] = None
+    name: Optional[str] = None
+    symbol: Optional[str] = None
+    uri: Optional[str] = None
+    pool: Optional[str] = None  # PumpSwap pool (migrate only)
+
+
+EventHandler = Callable[[PumpFunEvent], Awaitable[None]]
+
+
+# ===================================================================
+# INSTRUCTION DECODING
+# ===================================================================
+def _read_string(data: bytes, offset: int):
+    length = int.from_bytes(data[offset:offset + 4], "little")
+    offset += 4
+    value = data[offset:offset + length].decode("utf-8", errors="replace")
+    return value, offset + length
+
+
+def _decode_create_args(data: bytes):
+    """name, symbol, uri and (newer program versions) creator"""
+    offset = 8
+    name, offset = _read_string(data, offset)
+    symbol, offset = _read_string(data, offset)
+    uri, offset = _read_string(data, offset)
+    creator = None
+    if len(data) >= offset + 32:
+        creator = base58.b58encode(data[offset:offset + 32]).decode()
+    return name, symbol, uri, creator
+
+
+def _decode_instruction(
+    data: bytes, accounts: List[int], keys: List[bytes], signature: str, slot: int
+) -> Optional[PumpFunEvent]:
+    def key(i: int) -> Optional[str]:
+        if i < len(accounts) and accounts[i] < len(keys):
+            return base58.b58encode(keys[accounts[i]]).decode()
+        return None
+
+    discriminator = data[:8]
+    if discriminator in (CREATE_DISCRIMINATOR, CREATE_V2_DISCRIMINATOR):
+        name, symbol, uri, creator = _decode_create_args(data)
+        # create: [mint, mint_authority, bonding_curve, associated_bonding_curve, global, mpl, metadata, user, ...]
+        # create_v2: [mint, mint_authority, bonding_curve, associated_bonding_curve, global, user, ...]
+        user_index = 7 if discriminator == CREATE_DISCRIMINATOR else 5
+        return PumpFunEvent(
+            kind="create",
+            mint=key(0),
+            signature=signature,
+            slot=slot,
+            bonding_curve=key(2),
+            creator=creator or key(user_index),
+            name=name,
+            symbol=symbol,
+            uri=uri,
+        )
+
+    if discriminator == MIGRATE_DISCRIMINATOR:
+        # migrate: [global, withdraw_authority, mint, bonding_curve, associated_bonding_curve, user, system, token, pump_amm, pool, ...]
+        return PumpFunEvent(
+            kind="migrate",
+            mint=key(2),
+            signature=signature,
+            slot=slot,
+            bonding_curve=key(3),
+            pool=key(9),
+        )
+
+    return None
+
+
+def decode_pumpfun_transaction(update: "geyser_pb2.SubscribeUpdateTransaction") -> List[PumpFunEvent]:
+    """Decode every pump.fun create / migrate instruction (top-level and CPI) in a transaction update"""
+    info = update.transaction
+    message = info.transaction.message
+    meta = info.meta
+
+    # v0 transactions append lookup-table addresses after the static keys
+    keys = list(message.account_keys) + list(meta.loaded_writable_addresses) + list(meta.loaded_readonly_addresses)
+    program_indexes = {i for i, k in enumerate(keys) if k == PUMPFUN_PROGRAM_BYTES}
+    if not program_indexes:
+        return []
+
+    signature = base58.b58encode(info.signature).decode()
+    instructions = list(message.instructions)
+    for inner in meta.inner_instructions:
+        instructions.extend(inner.instructions)
+
+    events = []
+    for ix in instructions:
+        if ix.program_id_index not in program_indexes or len(ix.data) < 8:
+            continue
         try:
-            logger.info("Pump.fun → Raydium migration listener started...")
-            stream = await client.subscribe()
+            event = _decode_instruction(bytes(ix.data), list(ix.accounts), keys, signature, update.slot)
+        except Exception as e:
+            logger.debug(f"Failed to decode pump.fun instruction in {signature[:8]}: {e}")
+            continue
+        if event and event.mint:
+            events.append(event)
+    return events
+
+
+# ===================================================================
+# STREAM SERVICE
+# ===================================================================
+def create_grpc_channel(endpoint: str, token: Optional[str], secure: bool = True) -> grpc.aio.Channel:
+    """Authenticated (x-token) channel to a Yellowstone endpoint; insecure for local replay servers"""
+    endpoint = endpoint.replace("http://", "").replace("https://", "")
+    options = (
+        ("grpc.keepalive_time_ms", 10000),
+        ("grpc.keepalive_timeout_ms", 5000),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.max_receive_message_length", 64 * 1024 * 1024),
+    )
+    if not secure:
+        return grpc.aio.insecure_channel(endpoint, options=options)
 
-            # Error handling
-            async def on_error(error):
-                logger.error(f"gRPC stream error: {error}")
-                raise error
+    auth_creds = grpc.metadata_call_credentials(
+        lambda context, callback: callback((("x-token", token or ""),), None)
+    )
+    creds = grpc.composite_channel_credentials(grpc.ssl_channel_credentials(), auth_creds)
+    return grpc.aio.secure_channel(endpoint, creds, options=options)
 
-            stream.on("error", on_error)
 
-            # Subscribe
-            await stream.write(request)
+class PumpFunGeyserListener:
+    """
+    Streams pump.fun transactions over our own GeyserStub.Subscribe and decodes
+    create / migrate instructions in-process.
 
-            async for data in stream:
-                if not data.update_account:
-                    continue
+    Reconnects with exponential backoff and resumes from the last processed
+    slot (from_slot) so a dropped stream doesn't lose launches; signatures are
+    de-duplicated because resumed slots are replayed. Decoded events are
+    handed to registered handlers as tasks so a slow handler never stalls the
+    stream.
+    """
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = GRPC_URL,
+        token: Optional[str] = GRPC_TOKEN,
+        secure: bool = True,
+        commitment: int = geyser_pb2.CommitmentLevel.PROCESSED,
+        record_path: Optional[str] = None,
+    ):
+        self.endpoint = endpoint
+        self.token = token
+        self.secure = secure
+        self.commitment = commitment
+        self.record_path = record_path
+        self.last_slot: Optional[int] = None
+        self._handlers: List[EventHandler] = []
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+        self._channel: Optional[grpc.aio.Channel] = None
+        self._resume_supported = True
+        self.stats = {"updates": 0, "creates": 0, "migrates": 0, "reconnects": 0}
+
+    def add_handler(self, handler: EventHandler):
+        self._handlers.append(handler)
+
+    def build_request(self, from_slot: Optional[int] = None) -> "geyser_pb2.SubscribeRequest":
+        request = geyser_pb2.SubscribeRequest(commitment=self.commitment)
+        request.transactions["pumpfun"].CopyFrom(
+            geyser_pb2.SubscribeRequestFilterTransactions(
+                vote=False,
+                failed=False,
+                account_include=[PUMPFUN_PROGRAM],
+            )
+        )
+        if from_slot is not None:
+            request.from_slot = from_slot
+        return request
+
+    async def _requests(self, first: "geyser_pb2.SubscribeRequest", pings: asyncio.Queue) -> AsyncIterator:
+        yield first
+        while True:
+            yield await pings.get()
+
+    def _is_duplicate(self, signature: str) -> bool:
+        if signature in self._seen:
+            return True
+        self._seen[signature] = None
+        if len(self._seen) > 20000:
+            self._seen.popitem(last=False)
+        return False
 
-                account = data.update_account.account
-                if not account:
+    async def _dispatch(self, event: PumpFunEvent):
+        for handler in self._handlers:
+            try:
+                await handler(event)
+            except Exception as e:
+                logger.error(f"Pump.fun {event.kind} handler failed for {event.mint[:8]}: {e}")
+
+    def handle_update(self, update: "geyser_pb2.SubscribeUpdate") -> List[PumpFunEvent]:
+        """Decode one SubscribeUpdate, track the resume slot and schedule handlers"""
+        if not update.HasField("transaction"):
+            return []
+
+        self.stats["updates"] += 1
+        tx_update = update.transaction
+        # Resume from the slot we were in - it may not have been fully streamed
+        self.last_slot = max(self.last_slot or 0, tx_update.slot)
+
+        events = []
+        for event in decode_pumpfun_transaction(tx_update):
+            if self._is_duplicate(f"{event.signature}:{event.kind}:{event.mint}"):
+                continue
+            events.append(event)
+            self.stats["creates" if event.kind == "create" else "migrates"] += 1
+            logger.info(
+                f"🆕 Pump.fun {event.kind.upper()} {event.mint[:8]}... "
+                f"{event.symbol or ''} | slot {event.slot}"
+            )
+            task = asyncio.create_task(self._dispatch(event))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+        return events
+
+    async def _stream_once(self):
+        self._channel = create_grpc_channel(self.endpoint, self.token, secure=self.secure)
+        stub = GeyserStub(self._channel)
+        pings: asyncio.Queue = asyncio.Queue()
+        from_slot = self.last_slot if self._resume_supported else None
+        recorder = open(self.record_path, "a") if self.record_path else None
+
+        try:
+            call = stub.Subscribe(self._requests(self.build_request(from_slot), pings))
+            logger.info(
+                f"📡 Pump.fun gRPC stream connected to {self.endpoint}"
+                + (f" (resuming from slot {from_slot})" if from_slot else "")
+            )
+            async for update in call:
+                if update.HasField("ping"):
+                    # Answer server pings so load balancers keep the stream open
+                    pings.put_nowait(geyser_pb2.SubscribeRequest(ping=geyser_pb2.SubscribeRequestPing(id=1)))
                     continue
+                if recorder:
+                    recorder.write(base64.b64encode(update.SerializeToString()).decode() + "\n")
+                self.handle_update(update)
+                if not self._resume_supported and update.HasField("transaction"):
+                    # Streaming live again - the gap before the next reconnect is short enough to replay
+                    self._resume_supported = True
+        finally:
+            if recorder:
+                recorder.close()
+            await self._channel.close()
+            self._channel = None
 
-                # Decode account data
-                try:
-                    # First 8 bytes = discriminator, next is mint (44 bytes from offset 8+32+1?)
-                    # Known layout: mint is at offset 48
-                    mint_bytes = account.data[48:48+32]
-                    mint = base58.b58encode(mint_bytes).decode()
-
-                    if len(mint) != 44:
-                        continue
-
-                    logger.info(f"PUMPFUN → RAYDIUM MIGRATION DETECTED: {mint[:8]}...")
-
-                    # Immediately trigger processing (no delay!)
-                    async with AsyncSessionLocal() as db:
-                        exists = await db.get(NewTokens, mint) or (
-                            await db.execute(select(NewTokens).where(NewTokens.mint_address == mint))
-                        ).scalar_one_or_none()
-
-                        if not exists:
-                            new_token = NewTokens(
-                                mint_address=mint,
-                                pool_id="pumpfun_migration",
-                                timestamp=datetime.utcnow(),
-                                signature="pumpfun",
-                                tx_type="pumpfun_migration",
-                                metadata_status="pending",
-                                next_reprocess_time=datetime.utcnow() + timedelta(seconds=3),  # FAST!
-                                dexscreener_processed=False,
-                            )
-                            db.add(new_token)
-                            await db.commit()
-                            logger.info(f"Pump.fun token queued for analysis: {mint}")
-
-                            # Trigger analysis immediately
-                            asyncio.create_task(safe_enrich_token(mint, db))
-
-                except Exception as e:
-                    logger.error(f"Error processing pump.fun migration: {e}")
+    async def run(self):
+        """Stream forever with reconnect + slot resume"""
+        backoff = 1.0
+        while True:
+            try:
+                await self._stream_once()
+                backoff = 1.0  # Server closed the stream cleanly
+            except asyncio.CancelledError:
+                raise
+            except grpc.aio.AioRpcError as e:
+                if self.last_slot and e.code() == grpc.StatusCode.INVALID_ARGUMENT and "slot" in (e.details() or ""):
+                    # Provider can't replay that far back - resume from live
+                    logger.warning(f"from_slot {self.last_slot} not available, resuming live: {e.details()}")
+                    self._resume_supported = False
+                else:
+                    logger.error(f"Pump.fun gRPC stream error: {e.code()} {e.details()}")
+            except Exception as e:
+                logger.error(f"Pump.fun listener crashed: {e}")
 
-        except Exception as e:
-            logger.error(f"Pump.fun listener crashed: {e}")
-            await asyncio.sleep(5)
-            
-            
-            
\ No newline at end of file
+            self.stats["reconnects"] += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def start(self) -> Optional[asyncio.Task]:
+        if not self.endpoint:
+            logger.warning("GRPC_URL not set - pump.fun gRPC listener disabled")
+            return None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        dispatches = list(self._dispatches)
+        for task in dispatches:
+            task.cancel()
+        await asyncio.gather(*dispatches, return_exceptions=True)
+
+
+# Global instance
+pumpfun_listener = PumpFunGeyserListener()
@@ -3,6 +3,7 @@ import httpx
 import logging
 import os
 from dotenv import load_dotenv
+from app.utils.http_clients import http_clients
 import asyncio
 from typing import Optional, Dict, Any
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
@@ -70,7 +71,7 @@ async def get_raydium_pool_info(pool_id: str) -> Optional[Dict]:
 
     try:
         url = f"https://api-v3.raydium.io/pools/info/ids?ids={pool_id_candidate}"
-        async with httpx.AsyncClient() as client:
+        async with http_clients.session(url) as client:
             response = await client.get(url)
             response.raise_for_status()
             data = response.json()
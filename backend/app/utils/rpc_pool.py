@@ -0,0 +1,249 @@
+# app/utils/rpc_pool.py
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.types import TxOpts
+
+from app.config import settings
+from app.utils.http_clients import http_clients
+
+logger = logging.getLogger(__name__)
+
+HEALTH_CHECK_INTERVAL = 10  # seconds
+EWMA_ALPHA = 0.2
+MAX_CONSECUTIVE_ERRORS = 3
+MAX_COOLDOWN = 60  # seconds
+MAX_CUSTOM_ENDPOINTS = 256  # users' own RPCs kept open, least recently used closed first
+
+
+@dataclass
+class RpcEndpoint:
+    """One RPC endpoint with its persistent client and health numbers"""
+    url: str
+    client: AsyncClient
+    latency_ms: float = 250.0  # EWMA, optimistic start so new endpoints get tried
+    error_rate: float = 0.0    # EWMA of failures (0..1)
+    requests: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    cooldown_until: float = 0.0
+    custom: bool = False  # A user's own RPC - only used when they ask for it
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def score(self) -> float:
+        """Lower is better: latency, penalised by recent errors"""
+        return self.latency_ms * (1 + 4 * self.error_rate)
+
+    def record_success(self, elapsed_ms: float):
+        self.requests += 1
+        self.latency_ms += EWMA_ALPHA * (elapsed_ms - self.latency_ms)
+        self.error_rate *= (1 - EWMA_ALPHA)
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+
+    def record_error(self):
+        self.requests += 1
+        self.errors += 1
+        self.error_rate += EWMA_ALPHA * (1 - self.error_rate)
+        self.consecutive_errors += 1
+        if self.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+            backoff = min(2 ** (self.consecutive_errors - MAX_CONSECUTIVE_ERRORS) * 5, MAX_COOLDOWN)
+            self.cooldown_until = time.monotonic() + backoff
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "latency_ms": round(self.latency_ms, 1),
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "custom": self.custom,
+        }
+
+
+class RpcPool:
+    """
+    Persistent AsyncClients to every configured Solana RPC endpoint
+    (SOLANA_RPC_URL + SOLANA_RPC_URLS).
+
+    Reads go to the fastest healthy endpoint (latency / error-rate EWMAs) and
+    fail over to the next one on error; an endpoint that keeps failing sits
+    out a growing cooldown. Transactions are broadcast to every healthy
+    endpoint at once. A user's custom RPC (custom_rpc_https) can be passed as
+    `preferred`: it is tried first while healthy and gets sends too. Custom
+    endpoints are kept in a bounded LRU and never health-probed.
+    """
+
+    def __init__(self, urls: Optional[List[str]] = None, timeout: float = 10.0):
+        if urls is None:
+            extra = [u.strip() for u in (settings.SOLANA_RPC_URLS or "").split(",") if u.strip()]
+            urls = [settings.SOLANA_RPC_URL] + extra
+        self.timeout = timeout
+        self._endpoints: Dict[str, RpcEndpoint] = {}
+        for url in dict.fromkeys(urls):
+            self._endpoints[url] = RpcEndpoint(url=url, client=AsyncClient(url, timeout=timeout))
+        self._custom: "OrderedDict[str, RpcEndpoint]" = OrderedDict()
+        self._closing: Set[asyncio.Task] = set()
+        self._health_task: Optional[asyncio.Task] = None
+
+    def register_endpoint(self, url: str) -> RpcEndpoint:
+        """Get or add an endpoint; URLs not in the config are treated as a user's custom RPC"""
+        endpoint = self._endpoints.get(url)
+        if endpoint is not None:
+            return endpoint
+        endpoint = self._custom.get(url)
+        if endpoint is not None:
+            self._custom.move_to_end(url)
+            return endpoint
+        endpoint = RpcEndpoint(url=url, client=AsyncClient(url, timeout=self.timeout), custom=True)
+        self._custom[url] = endpoint
+        if len(self._custom) > MAX_CUSTOM_ENDPOINTS:
+            _, evicted = self._custom.popitem(last=False)
+            task = asyncio.create_task(evicted.client.close())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        return endpoint
+
+    def ranked(self, preferred: Optional[str] = None) -> List[RpcEndpoint]:
+        """Shared endpoints best-first (healthy before cooling down), preferred endpoint on top while healthy"""
+        ranked = sorted(self._endpoints.values(), key=lambda e: (not e.healthy, e.score))
+        if preferred:
+            own = self.register_endpoint(preferred)
+            if own.healthy:
+                ranked.insert(0, own)
+            else:
+                ranked.append(own)
+        return ranked
+
+    def client(self, preferred: Optional[str] = None) -> AsyncClient:
+        """Best client right now - for code that needs an AsyncClient object. Don't close it."""
+        return self.ranked(preferred)[0].client
+
+    async def call(self, method: str, *args, preferred: Optional[str] = None, attempts: int = 3, **kwargs):
+        """
+        Run an AsyncClient read method (e.g. "get_account_info") on the best
+        endpoint, failing over to the next best on error.
+        """
+        last_error: Optional[Exception] = None
+        for endpoint in self.ranked(preferred)[:max(1, attempts)]:
+            # Outside the try: an unknown method is our bug, not the endpoint's
+            fn = getattr(endpoint.client, method)
+            started = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+                endpoint.record_success((time.perf_counter() - started) * 1000)
+                return result
+            except Exception as e:
+                endpoint.record_error()
+                last_error = e
+                logger.warning(f"RPC {method} failed on {endpoint.url}: {e}")
+        raise last_error or RuntimeError(f"No RPC endpoint available for {method}")
+
+    async def request(self, method: str, params: Optional[list] = None, preferred: Optional[str] = None, attempts: int = 3):
+        """
+        Raw JSON-RPC request (e.g. "getRecentPrioritizationFees") for methods
+        AsyncClient has no wrapper for. Same ranking and failover as call();
+        returns the response's "result". A JSON-RPC error means the node
+        answered, so it is raised without counting against the endpoint.
+        """
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or []})
+        last_error: Optional[Exception] = None
+        for endpoint in self.ranked(preferred)[:max(1, attempts)]:
+            started = time.perf_counter()
+            try:
+                response = await http_clients.client_for(endpoint.url).post(
+                    endpoint.url, content=body, headers={"Content-Type": "application/json"}
+                )
+                response.raise_for_status()
+                payload = response.json()
+            except Exception as e:
+                endpoint.record_error()
+                last_error = e
+                logger.warning(f"RPC {method} failed on {endpoint.url}: {e}")
+                continue
+            endpoint.record_success((time.perf_counter() - started) * 1000)
+            if "error" in payload:
+                raise RuntimeError(f"RPC {method} error: {payload['error']}")
+            return payload["result"]
+        raise last_error or RuntimeError(f"No RPC endpoint available for {method}")
+
+    async def send_raw_transaction(
+        self, txn: bytes, opts: Optional[TxOpts] = None, preferred: Optional[str] = None
+    ) -> str:
+        """
+        Broadcast a signed transaction to every healthy endpoint (plus the
+        preferred one) and return the signature from the first that accepts it.
+        The other sends keep going in the background.
+        """
+        targets = [e for e in self.ranked(preferred) if e.healthy] or self.ranked(preferred)[:1]
+
+        async def send(endpoint: RpcEndpoint) -> str:
+            started = time.perf_counter()
+            try:
+                response = await endpoint.client.send_raw_transaction(txn, opts=opts)
+            except Exception:
+                endpoint.record_error()
+                raise
+            endpoint.record_success((time.perf_counter() - started) * 1000)
+            return str(response.value)
+
+        tasks = [asyncio.create_task(send(e)) for e in targets]
+        for task in tasks:
+            # Late failures are already counted in the endpoint stats
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        last_error: Optional[Exception] = None
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                return await next_done
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    async def _probe(self, endpoint: RpcEndpoint):
+        started = time.perf_counter()
+        try:
+            await endpoint.client.get_slot()
+            endpoint.record_success((time.perf_counter() - started) * 1000)
+        except Exception as e:
+            endpoint.record_error()
+            logger.debug(f"RPC health probe failed on {endpoint.url}: {e}")
+
+    async def _health_loop(self):
+        while True:
+            # Shared endpoints only - custom ones are measured by their owner's own requests
+            await asyncio.gather(*(self._probe(e) for e in list(self._endpoints.values())))
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+
+    def start(self):
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+            logger.info(f"🔌 RPC pool started with {len(self._endpoints)} endpoints")
+
+    def stats(self) -> List[dict]:
+        return [e.to_dict() for e in self.ranked()]
+
+    async def close(self):
+        """Stop health checks and close every client (called on app shutdown)"""
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        endpoints = [*self._endpoints.values(), *self._custom.values()]
+        self._custom.clear()
+        await asyncio.gather(*self._closing, *(e.client.close() for e in endpoints), return_exceptions=True)
+
+
+# Global instance
+rpc_pool = RpcPool()
@@ -10,7 +10,7 @@ logger = logging.getLogger(__name__)
 ############################################################
 # 5a. Rugcheck Analysis
 ############################################################
-import aiohttp
+from app.utils.http_clients import http_clients
 
 
 async def check_rug(mint: str):
@@ -20,15 +20,12 @@ async def check_rug(mint: str):
     url = f"https://api.rugcheck.xyz/v1/tokens/{mint}/report/summary"
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data # Return RugCheck report
-                else:
-                    error_message = await response.text()
-                    logger.error(f"Error checking RugCheck API for {mint}: {response.status}")
-                    return None
+        response = await http_clients.client_for(url).get(url)
+        if response.status_code == 200:
+            return response.json() # Return RugCheck report
+        else:
+            logger.error(f"Error checking RugCheck API for {mint}: {response.status_code}")
+            return None
     except Exception as e:
         logger.error(f"Failed to connect to RugCheck API for {mint}: {e}")
         return None
@@ -0,0 +1,354 @@
+# app/utils/rule_table.py
+import logging
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from app.utils.monitor_engine import MonitoredPosition
+
+logger = logging.getLogger(__name__)
+
+MAX_LEVELS = 8                # TP / DCA ladder slots per position
+HISTORY_LEN = 5               # Recent prices kept per position
+TRAILING_ACTIVATION_PCT = 30.0
+SCALE_IN_COOLDOWN = 30        # seconds
+MIN_ORDER_SOL = 0.001
+
+# Buy more while pumping: (profit_pct, buy_pct of remaining SOL), inside [pct, pct * 1.2)
+SCALE_IN_LADDER = [(25.0, 30.0), (50.0, 30.0), (100.0, 20.0)]
+_SCALE_IN_PCT = np.array([pct for pct, _ in SCALE_IN_LADDER])
+_SCALE_IN_BUY = np.array([buy for _, buy in SCALE_IN_LADDER])
+
+# Rule codes, in priority order (the first rule that fires for a position wins)
+RULE_NONE = 0
+RULE_TIMEOUT = 1              # Only from expire() - deadlines are scheduled, not polled
+RULE_HEAVY_EXIT = 2           # Sniper position: sell everything
+RULE_HEAVY_PARTIAL = 3        # Strategy position: sell 30% once
+RULE_DCA = 4
+RULE_SCALE_IN = 5
+RULE_TAKE_PROFIT = 6
+RULE_TRAILING_STOP = 7
+RULE_STOP_LOSS = 8
+
+DEADLINE_EXTENSION = 300.0    # Strategy positions in profit at their deadline get 5 more minutes
+
+Fired = List[Tuple[int, int, int]]  # (row, rule, ladder level index or -1)
+Prices = Union[float, np.ndarray]
+DeadlineHook = Callable[[np.ndarray, np.ndarray], None]  # (rows, new deadlines in epoch seconds)
+
+
+class RuleTable:
+    """
+    Column store of every monitored position's rules and rule state.
+
+    Each position owns one row: entry price, deadline, stop loss, trailing
+    distance, remaining DCA budget, high-water mark, and its TP / DCA ladders
+    as fixed-width (MAX_LEVELS) price / size / hit columns. evaluate() applies
+    a price update to any set of rows with whole-array operations and returns
+    only the rows where a rule fired, so a tick costs the same handful of
+    NumPy calls whether it touches 1 position or 10k.
+
+    Deadlines are not checked per tick: whoever schedules them passes
+    on_deadline to hear about dynamic extensions, and calls expire() for the
+    rows whose deadline passed.
+    """
+
+    def __init__(self, capacity: int = 256, max_levels: int = MAX_LEVELS, on_deadline: Optional[DeadlineHook] = None):
+        self.max_levels = max_levels
+        self.on_deadline = on_deadline
+        self.capacity = 0
+        self._free: List[int] = []
+        self._allocate_columns(max(1, capacity))
+
+    def _allocate_columns(self, capacity: int):
+        old, n, levels = self.capacity, self.capacity, self.max_levels
+
+        def grow(name: str, shape, fill, dtype):
+            column = np.full(shape, fill, dtype=dtype)
+            if old:
+                column[:old] = getattr(self, name)
+            setattr(self, name, column)
+
+        grow("active", capacity, False, bool)
+        grow("busy", capacity, False, bool)        # An action for this row is in flight
+        grow("advanced", capacity, False, bool)
+        grow("heavy_done", capacity, False, bool)
+        for name in ("entry", "opened_at", "timeout", "stop_loss", "trailing",
+                     "remaining_sol", "highest", "scale_in_until", "last_price", "last_pnl"):
+            grow(name, capacity, 0.0, np.float64)
+        grow("ticks", capacity, 0, np.int64)
+        grow("history", (capacity, HISTORY_LEN), 0.0, np.float64)
+        # Padding never fires: TP at +inf, DCA at -inf
+        grow("tp_pct", (capacity, levels), np.inf, np.float64)
+        grow("tp_sell", (capacity, levels), 0.0, np.float64)
+        grow("tp_hit", (capacity, levels), False, bool)
+        grow("dca_pct", (capacity, levels), -np.inf, np.float64)
+        grow("dca_buy", (capacity, levels), 0.0, np.float64)
+        grow("dca_hit", (capacity, levels), False, bool)
+
+        self._free.extend(range(capacity - 1, n - 1, -1))
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return int(self.active.sum())
+
+    # ===================================================================
+    # ROWS
+    # ===================================================================
+    def add(self, position: "MonitoredPosition") -> int:
+        """Copy a position's rules and state into a free row and return the row"""
+        if not self._free:
+            self._allocate_columns(self.capacity * 2)
+        row = self._free.pop()
+        self.active[row] = True
+        self.busy[row] = False
+        self.load(row, position)
+        return row
+
+    def load(self, row: int, p: "MonitoredPosition"):
+        levels = self.max_levels
+        if len(p.tp_ladder) > levels or len(p.dca_ladder) > levels:
+            logger.warning(f"Trade {p.trade_id}: ladder longer than {levels} levels, extra levels ignored")
+        tp, dca = p.tp_ladder[:levels], p.dca_ladder[:levels]
+
+        self.advanced[row] = p.advanced
+        self.heavy_done[row] = p.heavy_exit_done
+        self.entry[row] = p.entry_price_usd
+        self.opened_at[row] = p.opened_at
+        self.timeout[row] = p.timeout_seconds
+        self.stop_loss[row] = p.stop_loss_pct
+        self.trailing[row] = p.trailing_distance_pct
+        self.remaining_sol[row] = p.remaining_sol
+        self.highest[row] = p.highest_pnl
+        self.scale_in_until[row] = p.scale_in_until
+        self.last_price[row] = p.last_price_usd
+        self.last_pnl[row] = p.last_pnl
+        self.ticks[row] = p.ticks
+        self.history[row] = 0.0
+        if p.price_history:
+            recent = list(p.price_history)[-HISTORY_LEN:]
+            self.history[row, -len(recent):] = recent
+
+        self.tp_pct[row], self.tp_sell[row], self.tp_hit[row] = np.inf, 0.0, False
+        self.dca_pct[row], self.dca_buy[row], self.dca_hit[row] = -np.inf, 0.0, False
+        for i, (pct, size) in enumerate(tp):
+            self.tp_pct[row, i], self.tp_sell[row, i], self.tp_hit[row, i] = pct, size, pct in p.tp_hit
+        for i, (pct, size) in enumerate(dca):
+            self.dca_pct[row, i], self.dca_buy[row, i], self.dca_hit[row, i] = pct, size, pct in p.dca_hit
+
+    def export(self, row: int, p: "MonitoredPosition"):
+        """Mirror the row's rule state back onto its position (before actions / status pushes read it)"""
+        p.highest_pnl = float(self.highest[row])
+        p.timeout_seconds = float(self.timeout[row])
+        p.scale_in_until = float(self.scale_in_until[row])
+        p.heavy_exit_done = bool(self.heavy_done[row])
+        p.last_price_usd = float(self.last_price[row])
+        p.last_pnl = float(self.last_pnl[row])
+        p.ticks = int(self.ticks[row])
+        p.tp_hit = {pct for (pct, _), hit in zip(p.tp_ladder, self.tp_hit[row]) if hit}
+        p.dca_hit = {pct for (pct, _), hit in zip(p.dca_ladder, self.dca_hit[row]) if hit}
+        p.price_history.clear()
+        p.price_history.extend(float(x) for x in self.history[row] if x > 0)
+
+    def release(self, row: int):
+        if self.active[row]:
+            self.active[row] = False
+            self.busy[row] = False
+            self._free.append(row)
+
+    def deadline(self, rows: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
+        return self.opened_at[rows] + self.timeout[rows]
+
+    def _set_timeout(self, rows: np.ndarray, timeout: np.ndarray):
+        moved = timeout != self.timeout[rows]
+        self.timeout[rows] = timeout
+        if self.on_deadline is not None and moved.any():
+            self.on_deadline(rows[moved], self.deadline(rows[moved]))
+
+    # ===================================================================
+    # EVALUATION
+    # ===================================================================
+    def evaluate(
+        self,
+        rows: np.ndarray,
+        price_usd: Optional[Prices],
+        now: float,
+        buys: Union[int, np.ndarray] = 0,
+        sells: Union[int, np.ndarray] = 0,
+    ) -> Fired:
+        """
+        Apply one price observation per row (a scalar for a single mint, or
+        one price per row) and return the rules that fired. price_usd=None
+        re-evaluates at each row's last known price.
+
+        Updates the rule state in place: high-water mark, price history,
+        dynamic timeout (reported to on_deadline), consumed TP / DCA levels,
+        scale-in cooldown.
+        """
+        evaluable = self.active[rows] & ~self.busy[rows]
+        rows = rows[evaluable]
+        n = len(rows)
+        if n == 0:
+            return []
+
+        def per_row(value) -> np.ndarray:
+            value = np.asarray(value, dtype=np.float64)
+            return value[evaluable] if value.ndim else np.full(n, float(value))
+
+        price = self.last_price[rows] if price_usd is None else per_row(price_usd)
+        buys = per_row(buys)
+        sells = per_row(sells)
+
+        entry = self.entry[rows]
+        valid = (entry > 0) & (price > 0)
+        pnl = np.zeros(n)
+        np.divide(price, entry, out=pnl, where=valid)
+        pnl = np.where(valid, (pnl - 1) * 100, 0.0)
+
+        highest = np.maximum(self.highest[rows], pnl)
+        self.highest[rows] = highest
+        self.last_price[rows] = price
+        self.last_pnl[rows] = pnl
+        self.ticks[rows] += 1
+        history = self.history[rows]
+        history[:, :-1] = history[:, 1:]
+        history[:, -1] = price
+        self.history[rows] = history
+
+        adv = self.advanced[rows]
+        elapsed = now - self.opened_at[rows]
+        timeout = self.timeout[rows]
+
+        # Dynamic timeout: strategy positions running hot get 30 min, strong buying buys sniper positions 30s
+        timeout = np.where(adv & (pnl > 50) & (elapsed > 300) & (timeout < 1800), 1800.0, timeout)
+        timeout = timeout + np.where(~adv & (buys > sells * 2) & (pnl > 0), 30.0, 0.0)
+        self._set_timeout(rows, timeout)
+
+        rule = np.zeros(n, dtype=np.int8)
+        level = np.full(n, -1, dtype=np.int64)
+        decided = np.zeros(n, dtype=bool)
+
+        def fire(mask: np.ndarray, code: int, levels: Optional[np.ndarray] = None):
+            nonlocal decided
+            mask = mask & ~decided
+            rule[mask] = code
+            if levels is not None:
+                level[mask] = levels[mask]
+            decided = decided | mask
+            return mask
+
+        heavy = sells > buys * 3
+        fire(heavy & ~adv & (pnl > 5), RULE_HEAVY_EXIT)
+        heavy_partial = fire(
+            heavy & adv & (pnl > 25) & ~self.heavy_done[rows] & (now >= self.scale_in_until[rows]),
+            RULE_HEAVY_PARTIAL,
+        )
+        self.heavy_done[rows[heavy_partial]] = True
+
+        remaining = self.remaining_sol[rows]
+        has_sol = remaining > MIN_ORDER_SOL
+
+        # DCA: first untouched level the price has dropped to, with enough budget for an order
+        dca_ok = (~self.dca_hit[rows] & (pnl[:, None] <= self.dca_pct[rows])
+                  & (remaining[:, None] * self.dca_buy[rows] / 100 > MIN_ORDER_SOL))
+        dca = fire(has_sol & dca_ok.any(axis=1), RULE_DCA, dca_ok.argmax(axis=1))
+
+        # Scale in while inside one of the pump bands (bands don't overlap)
+        in_band = ((pnl[:, None] >= _SCALE_IN_PCT) & (pnl[:, None] < _SCALE_IN_PCT * 1.2)
+                   & (remaining[:, None] * _SCALE_IN_BUY / 100 > MIN_ORDER_SOL))
+        scale_in = fire(
+            adv & has_sol & (now >= self.scale_in_until[rows]) & in_band.any(axis=1),
+            RULE_SCALE_IN, in_band.argmax(axis=1),
+        )
+        self.scale_in_until[rows[scale_in]] = now + SCALE_IN_COOLDOWN
+
+        # Take profit: first untouched level reached (ladders are ascending)
+        tp_ok = ~self.tp_hit[rows] & (pnl[:, None] >= self.tp_pct[rows])
+        tp = fire(tp_ok.any(axis=1), RULE_TAKE_PROFIT, tp_ok.argmax(axis=1))
+
+        trailing = self.trailing[rows]
+        fire((trailing > 0) & (highest > TRAILING_ACTIVATION_PCT) & (pnl <= highest - trailing), RULE_TRAILING_STOP)
+
+        stop_loss = self.stop_loss[rows]
+        fire((stop_loss > 0) & (pnl <= -stop_loss), RULE_STOP_LOSS)
+
+        # Consume the ladder levels that fired
+        self.dca_hit[rows[dca], level[dca]] = True
+        self.tp_hit[rows[tp], level[tp]] = True
+
+        fired = np.flatnonzero(rule)
+        return list(zip(rows[fired].tolist(), rule[fired].tolist(), level[fired].tolist()))
+
+    def expire(self, rows: np.ndarray, now: float) -> Fired:
+        """
+        Rows whose deadline passed, at their last known price: strategy
+        positions in profit (or with a TP behind them) are extended instead
+        of sold. Rows whose deadline moved past `now` meanwhile are
+        rescheduled, not fired.
+        """
+        rows = rows[self.active[rows] & ~self.busy[rows]]
+        if not len(rows):
+            return []
+
+        due = now >= self.deadline(rows)
+        extend = due & self.advanced[rows] & (self.tp_hit[rows].any(axis=1) | (self.last_pnl[rows] > 5))
+        self._set_timeout(rows, self.timeout[rows] + np.where(extend, DEADLINE_EXTENSION, 0.0))
+        if self.on_deadline is not None and (~due).any():
+            self.on_deadline(rows[~due], self.deadline(rows[~due]))
+
+        expired = rows[due & ~extend].tolist()
+        return [(row, RULE_TIMEOUT, -1) for row in expired]
+
+
+# ===================================================================
+# TEST BLOCK — benchmark: python -m app.utils.rule_table [positions]
+# ===================================================================
+if __name__ == "__main__":
+    import sys
+    import time
+    from types import SimpleNamespace
+    from collections import deque
+
+    POSITIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rng = np.random.default_rng(7)
+
+    def make_position(i: int, now: float):
+        advanced = i % 2 == 0
+        return SimpleNamespace(
+            trade_id=i, advanced=advanced, heavy_exit_done=False,
+            entry_price_usd=float(rng.uniform(1e-6, 1e-3)), opened_at=now - float(rng.uniform(0, 500)),
+            timeout_seconds=600.0 if advanced else 3600.0, stop_loss_pct=20.0, trailing_distance_pct=15.0,
+            remaining_sol=0.5 if advanced else 0.0, highest_pnl=0.0, scale_in_until=0.0,
+            last_price_usd=0.0, last_pnl=0.0, ticks=0, price_history=deque(maxlen=HISTORY_LEN),
+            tp_ladder=[(25.0, 40.0), (50.0, 30.0), (100.0, 20.0), (200.0, 10.0)] if advanced else [(50.0, 70.0)],
+            dca_ladder=[(-10.0, 30.0), (-20.0, 30.0), (-30.0, 40.0)] if advanced else [],
+            tp_hit=set(), dca_hit=set(),
+        )
+
+    now = time.time()
+    table = RuleTable()
+    start = time.perf_counter()
+    rows = np.array([table.add(make_position(i, now)) for i in range(POSITIONS)])
+    print(f"{POSITIONS} positions loaded in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    entries = table.entry[rows].copy()
+    for label, moves in (("flat ±3%", 0.03), ("volatile ±40%", 0.40)):
+        samples, total_fired = [], 0
+        for _ in range(50):
+            prices = entries * (1 + rng.uniform(-moves, moves, POSITIONS))
+            t0 = time.perf_counter()
+            fired = table.evaluate(rows, prices, now)
+            samples.append(time.perf_counter() - t0)
+            total_fired += len(fired)
+            # Keep positions evaluable: pretend every fired action completed instantly
+            table.busy[rows] = False
+        per_tick = np.median(samples) * 1000
+        print(f"  {label:14} {per_tick:7.3f}ms per tick for {POSITIONS} positions "
+              f"({per_tick * 1000 / POSITIONS:.3f}µs/position) | {total_fired / 50:.0f} actions/tick")
+
+    one = rows[:1]
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        table.evaluate(one, entries[0], now)
+    print(f"  single position {(time.perf_counter() - t0):.3f}ms per tick (fixed NumPy overhead)")
@@ -3,6 +3,7 @@ import logging
 from datetime import datetime
 from typing import Optional
 import redis.asyncio as redis
+from app.utils.sniper_roster import publish_roster_event
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +18,15 @@ async def save_bot_state(wallet_address: str, is_running: bool, settings: dict =
         "last_heartbeat": datetime.utcnow().isoformat(),
         "settings": settings or {}
     }
-    await redis_client.setex(f"bot_state:{wallet_address}", 86400, json.dumps(state))  # 24h TTL
+    previous = await redis_client.set(f"bot_state:{wallet_address}", json.dumps(state), ex=86400, get=True)  # 24h TTL
+    
+    # Heartbeats re-save the same state every cycle - only tell the roster about start/stop
+    try:
+        was_running = bool(previous and json.loads(previous).get("is_running", False))
+    except (ValueError, AttributeError):
+        was_running = False
+    if was_running != is_running:
+        await publish_roster_event(wallet_address, "arm" if is_running else "disarm")
 
 async def load_bot_state(wallet_address: str) -> Optional[dict]:
     """Load bot state from Redis"""
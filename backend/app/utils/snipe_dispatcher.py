@@ -0,0 +1,185 @@
+# app/utils/snipe_dispatcher.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable, List, Optional
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from app.utils.sniper_roster import ArmedSniper
+
+logger = logging.getLogger(__name__)
+
+BuyFn = Callable[["ArmedSniper"], Awaitable[Optional[bool]]]  # False: decided not to buy
+
+
+@dataclass
+class SnipeResult:
+    """How one user's buy went"""
+    wallet_address: str
+    status: str  # "ok", "skipped" (buy declined), "failed", "expired" (never got a slot) or "timeout" (still running)
+    waited_ms: float = 0.0   # Dispatch → buy started (or gave up queueing)
+    elapsed_ms: float = 0.0  # Buy started → finished
+    error: Optional[str] = None
+
+
+@dataclass
+class SnipeReport:
+    """Aggregated outcome of one mint's fan-out"""
+    mint_address: str
+    results: List[SnipeResult] = field(default_factory=list)
+    total_ms: float = 0.0
+
+    def count(self, status: str) -> int:
+        return sum(1 for r in self.results if r.status == status)
+
+    @property
+    def time_to_last_buy_ms(self) -> float:
+        done = [r.waited_ms + r.elapsed_ms for r in self.results if r.status == "ok"]
+        return max(done) if done else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.mint_address[:8]}: {self.count('ok')}/{len(self.results)} bought | "
+            f"skipped {self.count('skipped')} | failed {self.count('failed')} | expired {self.count('expired')} | "
+            f"timeout {self.count('timeout')} | last buy {self.time_to_last_buy_ms:.0f}ms | "
+            f"total {self.total_ms:.0f}ms"
+        )
+
+
+class SnipeDispatcher:
+    """
+    Runs immediate-snipe buys for many users concurrently.
+
+    One semaphore bounds how many buys are in flight across every mint, so a
+    burst of launches can't flood the RPC / Jupiter. Users are queued premium
+    first, then in the order they armed their bot; asyncio.Semaphore wakes
+    waiters FIFO so that order is the order slots are handed out.
+
+    `buy` returns False when it decided not to buy (e.g. the user's lock
+    was already held); that user is reported as "skipped", not "ok".
+
+    Every user stays queued until they get a slot; `buy_timeout` bounds the
+    whole wait + buy. A user still queued at the timeout is dropped as
+    "expired". A buy that has started and runs past it is reported as
+    "timeout" but left running (shielded): cancelling it could lose a
+    transaction that already landed.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.SNIPE_MAX_CONCURRENCY,
+        buy_timeout: float = settings.SNIPE_BUY_TIMEOUT,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.buy_timeout = buy_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @staticmethod
+    def order(snipers: List["ArmedSniper"]) -> List["ArmedSniper"]:
+        """Premium first, then first-armed first"""
+        return sorted(snipers, key=lambda s: (not s.is_premium, s.armed_at))
+
+    async def _run_one(self, sniper: "ArmedSniper", buy: BuyFn, dispatched_at: float) -> SnipeResult:
+        result = SnipeResult(sniper.wallet_address, "ok")
+        started: Optional[float] = None
+
+        async def buy_in_slot():
+            nonlocal started
+            # The slot is held until the buy really finishes, even after we stop waiting for it
+            async with self.semaphore:
+                started = time.perf_counter()
+                result.waited_ms = (started - dispatched_at) * 1000
+                return await buy(sniper)
+
+        task = asyncio.create_task(buy_in_slot())
+        try:
+            if await asyncio.wait_for(asyncio.shield(task), timeout=self.buy_timeout) is False:
+                result.status = "skipped"
+        except asyncio.TimeoutError:
+            if started is None:
+                # Still queued - nothing sent yet, so give the place up
+                task.cancel()
+                result.status = "expired"
+                result.waited_ms = (time.perf_counter() - dispatched_at) * 1000
+                return result
+            result.status = "timeout"
+        except asyncio.CancelledError:
+            if started is None:
+                task.cancel()
+            raise
+        except Exception as e:
+            result.status = "failed"
+            result.error = str(e)[:200]
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        return result
+
+    async def dispatch(self, mint_address: str, snipers: List["ArmedSniper"], buy: BuyFn) -> SnipeReport:
+        """Run `buy(sniper)` for every sniper and return the aggregated report"""
+        dispatched_at = time.perf_counter()
+        # Tasks are created in priority order, so they queue on the semaphore in that order
+        results = await asyncio.gather(*(
+            self._run_one(sniper, buy, dispatched_at) for sniper in self.order(snipers)
+        ))
+        report = SnipeReport(
+            mint_address=mint_address,
+            results=list(results),
+            total_ms=(time.perf_counter() - dispatched_at) * 1000,
+        )
+        logger.info(f"⚡ Snipe report {report.summary()}")
+        return report
+
+
+# Global instance
+snipe_dispatcher = SnipeDispatcher()
+
+
+# ===================================================================
+# TEST BLOCK — benchmark: python -m app.utils.snipe_dispatcher [users] [swap_ms]
+# ===================================================================
+if __name__ == "__main__":
+    import random
+    import sys
+    from types import SimpleNamespace
+
+    logging.basicConfig(level=logging.WARNING)
+    USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    SWAP_MS = float(sys.argv[2]) if len(sys.argv) > 2 else 400
+
+    async def stub_swap(sniper):
+        # Quote + sign + send round trips, with some jitter
+        await asyncio.sleep(random.uniform(0.5, 1.5) * SWAP_MS / 1000)
+
+    async def bench():
+        now = time.monotonic()
+        snipers = [
+            SimpleNamespace(wallet_address=f"user{i:04d}", is_premium=(i % 5 == 0), armed_at=now + i)
+            for i in range(USERS)
+        ]
+        print(f"{USERS} users, stub swap ~{SWAP_MS:.0f}ms")
+        for label, concurrency, timeout in (
+            ("sequential", 1, 3600.0),
+            ("bounded x8", 8, 3600.0),
+            ("bounded x16", 16, 3600.0),
+            ("unbounded", USERS, 3600.0),
+            ("x8 + 2s timeout", 8, 2.0),
+        ):
+            random.seed(7)
+            dispatcher = SnipeDispatcher(max_concurrency=concurrency, buy_timeout=timeout)
+            report = await dispatcher.dispatch("BENCHMINT", snipers, stub_swap)
+            first = min(r.waited_ms + r.elapsed_ms for r in report.results if r.status == "ok")
+            print(
+                f"  {label:18} first buy {first:7.0f}ms | last buy {report.time_to_last_buy_ms:7.0f}ms | "
+                f"bought {report.count('ok')}/{USERS} expired {report.count('expired')}"
+            )
+
+    asyncio.run(bench())
@@ -0,0 +1,202 @@
+# app/utils/sniper_roster.py
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import User
+from app.utils.balance_service import balance_service
+from app.utils.keypair_vault import keypair_vault
+from app.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+ROSTER_EVENTS_CHANNEL = "sniper_roster:events"
+BALANCE_REFRESH_INTERVAL = 15  # seconds - backstop while balance subscriptions are down
+
+
+@dataclass
+class ArmedSniper:
+    """Everything a snipe needs for one user, resolved ahead of time"""
+    wallet_address: str
+    user: User            # Detached snapshot - sessions use expire_on_commit=False; signer is in keypair_vault
+    is_premium: bool
+    buy_amount_sol: float
+    balance_sol: float
+    balance_checked_at: float
+    armed_at: float
+
+    @property
+    def has_balance(self) -> bool:
+        return self.balance_sol >= self.buy_amount_sol
+
+
+async def publish_roster_event(wallet_address: str, action: str):
+    """
+    Tell every app worker's roster that a user changed.
+    action: "arm" (bot started), "disarm" (bot stopped) or "refresh" (settings changed)
+    """
+    try:
+        await get_redis_client().publish(
+            ROSTER_EVENTS_CHANNEL, json.dumps({"wallet": wallet_address, "action": action})
+        )
+    except Exception as e:
+        logger.warning(f"Failed to publish roster event for {wallet_address[:8]}: {e}")
+
+
+class SniperRoster:
+    """
+    In-memory roster of every user whose bot is running: a detached User
+    snapshot and a cached SOL balance, with the decrypted signer admitted to
+    keypair_vault.
+
+    Kept current by roster events (bot start/stop, settings changes) published
+    over Redis pub/sub and by balance_service (account-subscription pushes,
+    batched refresh as a backstop), so
+    trigger_immediate_snipe can fan a new mint out to every eligible user
+    without touching SQL or RPC on the critical path.
+    """
+
+    def __init__(self, balance_refresh_interval: float = BALANCE_REFRESH_INTERVAL):
+        self.balance_refresh_interval = balance_refresh_interval
+        self._armed: Dict[str, ArmedSniper] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def __len__(self) -> int:
+        return len(self._armed)
+
+    def get(self, wallet_address: str) -> Optional[ArmedSniper]:
+        return self._armed.get(wallet_address)
+
+    def snapshot(self, wallets: Optional[Iterable[str]] = None) -> List[ArmedSniper]:
+        """Armed users, optionally limited to the given wallets (e.g. connected websockets)"""
+        if wallets is None:
+            return list(self._armed.values())
+        return [self._armed[w] for w in wallets if w in self._armed]
+
+    def debit(self, wallet_address: str, amount_sol: float):
+        """Reserve SOL locally after a buy so the next snipe sees the lower balance"""
+        sniper = self._armed.get(wallet_address)
+        if sniper:
+            sniper.balance_sol = max(0.0, sniper.balance_sol - amount_sol)
+
+    def _on_balance(self, wallet_address: str, sol: float):
+        sniper = self._armed.get(wallet_address)
+        if sniper:
+            sniper.balance_sol = sol
+            sniper.balance_checked_at = time.monotonic()
+
+    async def arm(self, wallet_address: str) -> Optional[ArmedSniper]:
+        """Load, decrypt and cache a user. Returns None if the user can't snipe."""
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(User).where(User.wallet_address == wallet_address))
+                user = result.scalar_one_or_none()
+                if user:
+                    db.expunge(user)
+
+            if not user or not user.encrypted_private_key:
+                self.disarm(wallet_address)
+                return None
+
+            keypair_vault.admit(user)
+            balance = await balance_service.get_balance(wallet_address)
+
+            now = time.monotonic()
+            sniper = ArmedSniper(
+                wallet_address=wallet_address,
+                user=user,
+                is_premium=bool(user.is_premium),
+                buy_amount_sol=float(user.sniper_buy_amount_sol or 0.1),
+                balance_sol=balance or 0.0,
+                balance_checked_at=now,
+                armed_at=now,
+            )
+            self._armed[wallet_address] = sniper
+            balance_service.watch(wallet_address)
+            logger.info(f"🎯 Armed sniper {wallet_address[:8]} | {sniper.buy_amount_sol} SOL/buy | balance {sniper.balance_sol:.4f}")
+            return sniper
+        except Exception as e:
+            logger.error(f"Failed to arm sniper {wallet_address[:8]}: {e}")
+            return None
+
+    def disarm(self, wallet_address: str):
+        keypair_vault.evict(wallet_address)
+        if self._armed.pop(wallet_address, None):
+            balance_service.unwatch(wallet_address)
+            logger.info(f"🔓 Disarmed sniper {wallet_address[:8]}")
+
+    async def refresh_balances(self):
+        """Re-read every armed user's SOL balance (batched getMultipleAccounts)"""
+        if self._armed:
+            # The balance listener writes the fresh values into the roster
+            await balance_service.get_balances(list(self._armed), max_age=0)
+
+    async def load_running(self, wallets: Iterable[str]):
+        """Arm every wallet whose bot is running (called at startup)"""
+        await asyncio.gather(*(self.arm(w) for w in wallets))
+        logger.info(f"🎯 Sniper roster loaded: {len(self._armed)} armed users")
+
+    async def _handle_event(self, payload: str):
+        try:
+            event = json.loads(payload)
+            wallet = event["wallet"]
+            action = event.get("action")
+        except (ValueError, KeyError, TypeError):
+            return
+
+        if action == "disarm":
+            self.disarm(wallet)
+        elif action == "arm" or (action == "refresh" and wallet in self._armed):
+            await self.arm(wallet)
+
+    async def _listen_events(self):
+        while True:
+            pubsub = get_redis_client().pubsub()
+            try:
+                await pubsub.subscribe(ROSTER_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        await self._handle_event(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Roster event listener error: {e}")
+                await asyncio.sleep(2)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def _balance_loop(self):
+        while True:
+            await asyncio.sleep(self.balance_refresh_interval)
+            try:
+                await self.refresh_balances()
+            except Exception as e:
+                logger.error(f"Roster balance refresh failed: {e}")
+
+    def start(self):
+        if not self._tasks:
+            balance_service.add_listener(self._on_balance)
+            self._tasks = [
+                asyncio.create_task(self._listen_events()),
+                asyncio.create_task(self._balance_loop()),
+            ]
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._armed.clear()
+
+
+# Global instance
+sniper_roster = SniperRoster()
@@ -3,6 +3,7 @@ import httpx
 import logging
 import os
 from dotenv import load_dotenv
+from app.utils.http_clients import http_clients
 
 
 load_dotenv()
@@ -40,7 +41,7 @@ async def get_top_holders_info(mint_address: str, num_top_holders: int = 10) ->
     }
     
     try:
-        async with httpx.AsyncClient() as client:
+        async with http_clients.session(url) as client:
             response = await client.get(url, headers=headers, params=params)
             response.raise_for_status()     # Raise an exception for HTTP errors
             data = response.json()
@@ -114,7 +115,7 @@ async def get_solscan_token_meta(mint_address: str) -> Optional[Dict]:
         headers = {"token": SOLSCAN_API_KEY} # Use 'token' header for Solscan Pro API Key
         params = {"address": mint_address} # Query param for token address
 
-        async with httpx.AsyncClient() as client:
+        async with http_clients.session(url) as client:
             response = await client.get(url, headers=headers, params=params)
             response.raise_for_status()
             data = response.json()
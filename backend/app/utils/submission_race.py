@@ -0,0 +1,296 @@
+# app/utils/submission_race.py
+import asyncio
+import base64
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from solana.rpc.types import TxOpts
+from solders.keypair import Keypair
+from solders.transaction import VersionedTransaction
+
+from app.config import settings
+from app.utils.confirmation_service import Confirmation, ConfirmationService, confirmation_service
+from app.utils.jito_bundles import get_jito_manager
+from app.utils.rpc_pool import rpc_pool
+
+logger = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.2
+LAND_RATE_ALPHA = 0.05  # Slower - one lost race shouldn't reorder the paths
+MAX_CONSECUTIVE_ERRORS = 3
+MAX_COOLDOWN = 120  # seconds
+
+
+@dataclass
+class RouteAck:
+    """What a landing path reports once it has accepted the transaction"""
+    confirmed: bool = False         # The path itself saw it land (Ultra /execute "Success")
+    marker: Optional[str] = None    # Signature that only lands if this path delivered the swap (Jito tip)
+    detail: Dict[str, Any] = field(default_factory=dict)
+
+
+RouteFn = Callable[[], Awaitable[RouteAck]]
+
+
+@dataclass
+class RouteStats:
+    """Landing record of one path - drives which paths the next race uses"""
+    name: str
+    land_ms: float = 1000.0    # EWMA submit -> confirmed, for races this path won
+    ack_ms: float = 250.0      # EWMA submit -> accepted
+    land_rate: float = 1.0     # EWMA of wins (0..1), optimistic start so every path gets tried
+    raced: int = 0
+    landed: int = 0
+    errors: int = 0
+    consecutive_errors: int = 0
+    cooldown_until: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def score(self) -> float:
+        """Lower is better: expected time to land through this path"""
+        return self.land_ms / max(self.land_rate, 0.05)
+
+    def record_ack(self, elapsed_ms: float):
+        self.ack_ms += EWMA_ALPHA * (elapsed_ms - self.ack_ms)
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+
+    def record_result(self, won: bool, land_ms: Optional[float] = None):
+        self.raced += 1
+        self.land_rate += LAND_RATE_ALPHA * ((1.0 if won else 0.0) - self.land_rate)
+        if won:
+            self.landed += 1
+            if land_ms is not None:
+                self.land_ms += EWMA_ALPHA * (land_ms - self.land_ms)
+
+    def record_error(self):
+        self.record_result(False)
+        self.errors += 1
+        self.consecutive_errors += 1
+        if self.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+            backoff = min(2 ** (self.consecutive_errors - MAX_CONSECUTIVE_ERRORS) * 10, MAX_COOLDOWN)
+            self.cooldown_until = time.monotonic() + backoff
+
+    def to_dict(self) -> dict:
+        return {
+            "route": self.name,
+            "healthy": self.healthy,
+            "land_ms": round(self.land_ms, 1),
+            "ack_ms": round(self.ack_ms, 1),
+            "land_rate": round(self.land_rate, 3),
+            "raced": self.raced,
+            "landed": self.landed,
+            "errors": self.errors,
+        }
+
+
+@dataclass
+class SubmissionResult:
+    signature: str
+    landed: bool
+    route: Optional[str]                  # Path credited with landing it (None if it can't be told)
+    err: Optional[str] = None             # On-chain error if it landed but failed
+    expired: bool = False                 # Blockhash ran out without it landing - safe to send a new one
+    elapsed_ms: float = 0.0
+    raced: List[str] = field(default_factory=list)
+    acks: Dict[str, RouteAck] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+def signature_of(signed_tx_base64: str) -> str:
+    """Fee payer signature of a signed transaction - the id every path shares"""
+    tx = VersionedTransaction.from_bytes(base64.b64decode(signed_tx_base64))
+    return str(tx.signatures[0])
+
+
+def rpc_route(signed_tx_base64: str, preferred: Optional[str] = None) -> RouteFn:
+    """Raw sendTransaction to every healthy pool endpoint (plus the user's own RPC)"""
+    async def send() -> RouteAck:
+        await rpc_pool.send_raw_transaction(
+            base64.b64decode(signed_tx_base64), opts=TxOpts(skip_preflight=True), preferred=preferred
+        )
+        return RouteAck()
+    return send
+
+
+def jito_route(signed_tx_base64: str, keypair: Keypair, tip_lamports: Optional[int] = None) -> RouteFn:
+    """[tip, swap] bundle to the Jito block engine (tip defaults to tip_auction's price)"""
+    async def send() -> RouteAck:
+        manager = await get_jito_manager()
+        bundle = await manager.send_swap_bundle(signed_tx_base64, keypair, tip_lamports)
+        return RouteAck(marker=bundle["tip_signature"], detail=bundle)
+    return send
+
+
+class SubmissionRace:
+    """
+    Lands one signed transaction through several paths at once.
+
+    submit() sends it down the best `max_routes` of the paths it is given
+    (Ultra /execute, Jito bundle, raw RPC broadcast...), ranked by each
+    path's landing rate and time-to-land, with paths that keep rejecting
+    sent to a cooldown. confirmation_service confirms it once no matter
+    which path delivered it, and a second submit() of the same signature
+    joins the race already running instead of sending again.
+
+    The landing is credited to the path whose marker landed (a Jito tip),
+    else to a path that confirmed it itself (Ultra), else to the first path
+    that accepted it.
+    """
+
+    def __init__(
+        self,
+        max_routes: int = settings.SUBMIT_MAX_ROUTES,
+        confirm_timeout: float = settings.SUBMIT_CONFIRM_TIMEOUT,
+        confirmations: Optional[ConfirmationService] = None,
+    ):
+        self.max_routes = max_routes
+        self.confirm_timeout = confirm_timeout
+        self.confirmations = confirmations if confirmations is not None else confirmation_service
+        self._routes: Dict[str, RouteStats] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"races": 0, "landed": 0, "failed": 0, "expired": 0, "timeouts": 0, "rejected": 0, "deduplicated": 0}
+
+    def route(self, name: str) -> RouteStats:
+        stats = self._routes.get(name)
+        if stats is None:
+            stats = self._routes[name] = RouteStats(name)
+        return stats
+
+    def select(self, names: Iterable[str], limit: Optional[int] = None) -> List[str]:
+        """Best paths first - healthy before cooling down - trimmed to `limit`"""
+        ranked = sorted(names, key=lambda n: (not self.route(n).healthy, self.route(n).score))
+        healthy = [n for n in ranked if self.route(n).healthy] or ranked[:1]
+        return healthy[:max(1, limit or self.max_routes)]
+
+    async def submit(
+        self, signature: str, routes: Dict[str, RouteFn], label: str = "swap", last_valid_block_height: Optional[int] = None
+    ) -> SubmissionResult:
+        """Race `routes` for the transaction with this signature and wait until it lands, fails or expires"""
+        task = self._inflight.get(signature)
+        if task is not None:
+            self.stats["deduplicated"] += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.create_task(self._race(signature, routes, label, last_valid_block_height))
+        self._inflight[signature] = task
+        task.add_done_callback(lambda _: self._inflight.pop(signature, None))
+        return await asyncio.shield(task)
+
+    async def _race(
+        self, signature: str, routes: Dict[str, RouteFn], label: str, last_valid_block_height: Optional[int]
+    ) -> SubmissionResult:
+        raced = self.select(routes)
+        result = SubmissionResult(signature=signature, landed=False, route=None, raced=raced)
+        self.stats["races"] += 1
+        started = time.perf_counter()
+        acked_at: Dict[str, float] = {}
+        markers: Dict[str, asyncio.Future] = {}   # route -> watch on its marker
+
+        names = {asyncio.create_task(routes[n]()): n for n in raced}
+        confirmed = self.confirmations.watch(signature, last_valid_block_height=last_valid_block_height)
+        pending = set(names) | {confirmed}
+        status: Optional[Confirmation] = None
+        confirmed_by = None
+        deadline = time.monotonic() + self.confirm_timeout
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break  # Timed out
+                for task in done:
+                    if task is confirmed:
+                        status = task.result()
+                        continue
+                    name = names[task]
+                    if task.exception() is not None:
+                        result.errors[name] = str(task.exception())
+                        continue
+                    ack = task.result()
+                    result.acks[name] = ack
+                    acked_at[name] = (time.perf_counter() - started) * 1000
+                    self.route(name).record_ack(acked_at[name])
+                    if ack.marker:
+                        markers[name] = self.confirmations.watch(ack.marker, last_valid_block_height=last_valid_block_height)
+                    if ack.confirmed and confirmed_by is None:
+                        confirmed_by = name
+                if status is not None or confirmed_by is not None:
+                    break
+                if len(result.errors) == len(raced):
+                    break  # Every path rejected it
+        finally:
+            for task in pending:
+                task.cancel()   # Unanswered routes - and the watch, if we stopped before it resolved
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+
+        landed_markers = {n for n, f in markers.items() if f.done() and not f.cancelled() and f.result().ok}
+        if confirmed_by is not None and status is None and len(landed_markers) < len(markers):
+            # Confirmed by a path before the sweep saw it - did a bundle deliver it?
+            try:
+                found = await self.confirmations.lookup([result.acks[n].marker for n in markers])
+                for name in markers:
+                    marker = found.get(result.acks[name].marker)
+                    if marker is not None and marker.ok:
+                        landed_markers.add(name)
+            except Exception:
+                pass
+        for future in markers.values():
+            future.cancel()
+
+        if (status is not None and status.landed) or confirmed_by is not None:
+            result.landed = True
+            result.err = status.err if status is not None else None
+            marked = [n for n in result.acks if n in landed_markers]
+            # Then paths that can't prove delivery: first to accept, then any still waiting on an answer
+            unmarked = sorted((n for n, ack in result.acks.items() if not ack.marker), key=acked_at.get)
+            unmarked += [n for n in raced if n not in result.acks and n not in result.errors]
+            if marked:
+                result.route = marked[0]
+            elif confirmed_by is not None:
+                result.route = confirmed_by
+            elif unmarked:
+                result.route = unmarked[0]
+            self.stats["failed" if result.err else "landed"] += 1
+            logger.info(
+                f"🏁 {label} {signature[:12]}… {'failed on-chain' if result.err else 'landed'} via "
+                f"{result.route or '?'} in {result.elapsed_ms:.0f}ms (raced {', '.join(raced)})"
+            )
+        elif len(result.errors) == len(raced):
+            self.stats["rejected"] += 1
+        elif status is not None and status.expired:
+            result.expired = True
+            self.stats["expired"] += 1
+            logger.warning(f"⌛ {label} {signature[:12]}… expired without landing")
+        else:
+            self.stats["timeouts"] += 1
+            logger.warning(f"⏳ {label} {signature[:12]}… not confirmed after {self.confirm_timeout:.0f}s")
+
+        for name in raced:
+            if name in result.errors:
+                self.route(name).record_error()
+            else:
+                won = name == result.route
+                self.route(name).record_result(won, result.elapsed_ms if won else None)
+        return result
+
+    def route_stats(self) -> List[dict]:
+        return [r.to_dict() for r in sorted(self._routes.values(), key=lambda r: (not r.healthy, r.score))]
+
+    async def close(self):
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
+
+
+# Global instance
+submission_race = SubmissionRace()
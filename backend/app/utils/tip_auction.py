@@ -0,0 +1,222 @@
+# app/utils/tip_auction.py
+import asyncio
+import logging
+import random
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.utils.confirmation_service import confirmation_service
+from app.utils.fee_oracle import fee_oracle
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SIZE = 400            # samples kept per (time of day, congestion) window
+WINDOW_AGE = 7 * 86400       # seconds - older samples fall out of their window
+HOURS_PER_BUCKET = 4         # time-of-day buckets (UTC): 00-04h, 04-08h...
+MIN_SAMPLES = 30             # fewer than this and a recommendation pools wider windows
+LAND_TIMEOUT = 60.0          # seconds a tip gets to land before it counts as lost
+TIP_STEP_UP = 1.25           # nothing observed reaches the target -> bid this much above the highest tip seen
+TIP_JITTER = 0.15            # recommendations spread +-15% so the curve stays measured around them
+CONGESTION_LEVELS = ((20_000, "quiet"), (200_000, "busy"))  # median landed Jito tip (lamports) upper bounds, above -> "congested"
+CURVE_TARGETS = (0.5, 0.8, 0.9, 0.95, 0.99)
+
+Window = Tuple[str, str]  # (time of day, congestion)
+
+
+def congestion_level(median_tip: int) -> str:
+    for bound, level in CONGESTION_LEVELS:
+        if median_tip <= bound:
+            return level
+    return "congested"
+
+
+def time_of_day(now: Optional[datetime] = None) -> str:
+    start = (now or datetime.now(timezone.utc)).hour // HOURS_PER_BUCKET * HOURS_PER_BUCKET
+    return f"{start:02d}-{start + HOURS_PER_BUCKET:02d}h"
+
+
+@dataclass
+class TipSample:
+    tip: int
+    landed: bool
+    latency_ms: Optional[float]   # Send -> tip confirmed, landed bundles only
+    at: float                     # time.time()
+
+
+def fit_landing_curve(samples: List[TipSample]) -> List[Tuple[int, float, int]]:
+    """
+    Landing probability by tip as ascending (tip, probability, samples)
+    points - a pool-adjacent-violators fit, so paying more never predicts
+    landing less. Each point sits at the median tip of the samples it pools.
+    """
+    tips = sorted(s.tip for s in samples)
+    blocks: List[List[int]] = []  # [first index into tips, landed, count]
+    for i, sample in enumerate(sorted(samples, key=lambda s: s.tip)):
+        blocks.append([i, int(sample.landed), 1])
+        while len(blocks) > 1 and blocks[-2][1] * blocks[-1][2] >= blocks[-1][1] * blocks[-2][2]:
+            _, landed, count = blocks.pop()
+            blocks[-1][1] += landed
+            blocks[-1][2] += count
+    return [(tips[start + count // 2], landed / count, count) for start, landed, count in blocks]
+
+
+class TipAuctionModel:
+    """
+    Prices Jito tips from this worker's own landed-bundle history.
+
+    observe() follows each bundle's tip transaction through the
+    confirmation service and records the tip, whether it landed and how
+    long it took, in a sliding window keyed by time of day and congestion
+    (Jito's median landed tip, from the tip_floor feed). recommend() fits
+    landing probability against tip for the current window and returns the
+    cheapest tip expected to reach the target - pooling wider windows
+    while one is thin, and falling back to Jito's landed-tip percentiles
+    with no history at all.
+    """
+
+    def __init__(self, target: float = settings.JITO_TIP_TARGET_LANDING):
+        self.target = target
+        self._windows: Dict[Window, Deque[TipSample]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"observed": 0, "landed": 0, "lost": 0, "preempted": 0}
+
+    def current_window(self) -> Window:
+        return time_of_day(), congestion_level(fee_oracle.jito_tip(50))
+
+    # ------------------------------------------------------------------
+    # History
+    # ------------------------------------------------------------------
+    def record(self, tip: int, landed: bool, latency_ms: Optional[float] = None, window: Optional[Window] = None):
+        window = window or self.current_window()
+        samples = self._windows.get(window)
+        if samples is None:
+            samples = self._windows[window] = deque(maxlen=WINDOW_SIZE)
+        samples.append(TipSample(int(tip), landed, latency_ms, time.time()))
+        self.stats["landed" if landed else "lost"] += 1
+
+    def observe(self, tip_signature: str, tip: int, swap_signature: Optional[str] = None):
+        """Record how a sent bundle's tip fares, in the background"""
+        task = asyncio.create_task(self._settle(tip_signature, tip, swap_signature, self.current_window()))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.stats["observed"] += 1
+
+    async def _settle(self, tip_signature: str, tip: int, swap_signature: Optional[str], window: Window):
+        sent = time.monotonic()
+        try:
+            confirmation = await confirmation_service.wait(tip_signature, "confirmed", timeout=LAND_TIMEOUT)
+            landed = confirmation.landed
+        except asyncio.TimeoutError:
+            landed = False
+        except Exception as e:
+            logger.debug(f"Tip {tip_signature[:8]} not tracked: {e}")
+            return
+
+        if landed:
+            self.record(tip, True, (time.monotonic() - sent) * 1000, window)
+            return
+        if swap_signature:
+            # The swap landed through another route, so the bundle could not -
+            # that says nothing about the tip
+            try:
+                status = (await confirmation_service.lookup([swap_signature]))[swap_signature]
+            except Exception:
+                status = None
+            if status is not None:
+                self.stats["preempted"] += 1
+                return
+        self.record(tip, False, None, window)
+
+    def _samples(self, windows: List[Window]) -> List[TipSample]:
+        cutoff = time.time() - WINDOW_AGE
+        samples = []
+        for window in windows:
+            history = self._windows.get(window)
+            if not history:
+                continue
+            while history and history[0].at < cutoff:
+                history.popleft()
+            samples.extend(history)
+        return samples
+
+    def _pooled(self, window: Window) -> Tuple[List[TipSample], str]:
+        """Samples for this window, widened until there are enough to fit"""
+        # Never other congestion levels - their prices are the wrong market
+        scopes = (
+            ("window", [window]),
+            ("congestion", [w for w in self._windows if w[1] == window[1]]),
+        )
+        for scope, windows in scopes:
+            samples = self._samples(windows)
+            if len(samples) >= MIN_SAMPLES:
+                return samples, scope
+        return [], "jito_tip_floor"
+
+    # ------------------------------------------------------------------
+    # Pricing
+    # ------------------------------------------------------------------
+    def minimum_tip(self, target: Optional[float] = None, window: Optional[Window] = None) -> int:
+        """Cheapest tip expected to land with probability >= target"""
+        target = self.target if target is None else target
+        samples, _ = self._pooled(window or self.current_window())
+        if not samples:
+            return fee_oracle.jito_tip(round(target * 100))
+        curve = fit_landing_curve(samples)
+        below = None
+        for tip, probability, _ in curve:
+            if probability >= target:
+                if below is not None:
+                    # Interpolate between the points either side of the target
+                    low_tip, low_p = below
+                    tip = low_tip + (target - low_p) / (probability - low_p) * (tip - low_tip)
+                return fee_oracle.clamp_tip(tip)
+            below = (tip, probability)
+        return fee_oracle.clamp_tip(max(curve[-1][0] * TIP_STEP_UP, fee_oracle.jito_tip(round(target * 100))))
+
+    def recommend(self, target: Optional[float] = None) -> int:
+        """Tip for the next bundle: minimum_tip() with a little spread to keep learning"""
+        tip = self.minimum_tip(target) * random.uniform(1 - TIP_JITTER, 1 + TIP_JITTER)
+        return fee_oracle.clamp_tip(tip)
+
+    def curve(self) -> dict:
+        """The current window's fitted landing curve, for get_jito_statistics"""
+        window = self.current_window()
+        samples, scope = self._pooled(window)
+        steps = fit_landing_curve(samples)
+        points = []
+        ordered = sorted(samples, key=lambda s: s.tip)
+        start = 0
+        for tip, probability, count in steps:
+            latencies = [s.latency_ms for s in ordered[start:start + count] if s.latency_ms is not None]
+            start += count
+            points.append({
+                "tip_lamports": tip,
+                "land_probability": round(probability, 3),
+                "samples": count,
+                "p50_latency_ms": round(statistics.median(latencies)) if latencies else None,
+            })
+        return {
+            "time_of_day": window[0],
+            "congestion": window[1],
+            "scope": scope,   # Which history the curve was fitted on
+            "samples": len(samples),
+            "curve": points,
+            "minimum_tips": {f"{round(t * 100)}%": self.minimum_tip(t, window) for t in CURVE_TARGETS},
+            "windows": {f"{w[0]}/{w[1]}": len(h) for w, h in sorted(self._windows.items())},
+            **self.stats,
+        }
+
+    async def close(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Global instance
+tip_auction = TipAuctionModel()
@@ -0,0 +1,213 @@
+# app/utils/token_ingestion.py
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from redis.exceptions import ResponseError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+EnrichFn = Callable[[str, AsyncSession], Awaitable[None]]
+
+STREAM_KEY = "token_ingest"
+STREAM_GROUP = "enrichment"
+SEEN_KEY = "token_ingest:seen:{mint}"
+SEEN_TTL = 120  # Seconds a mint stays de-duplicated across app workers
+
+
+class TokenIngestionQueue:
+    """
+    Push-based token ingestion.
+
+    Detectors (the new-token webhook, the Pump.fun listener) push mints in with
+    `submit()` and a pool of enrichment workers drains them concurrently. The
+    queue is bounded: when it is full `submit()` gives up after a short wait and
+    the token stays "pending" in NewTokens, where the recovery sweep in
+    app/main.py picks it up later. NewTokens is the durable log, the queue is
+    the fast path.
+
+    backend="memory" keeps a per-process asyncio.Queue.
+    backend="redis" uses a Redis stream + consumer group so several uvicorn
+    workers share one queue.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.INGESTION_QUEUE_SIZE,
+        workers: int = settings.ENRICHMENT_WORKERS,
+        backend: str = settings.INGESTION_BACKEND,
+    ):
+        self.maxsize = maxsize
+        self.worker_count = max(1, workers)
+        self.backend = backend if backend in ("memory", "redis") else "memory"
+        self._queue: Optional[asyncio.Queue] = None
+        self._in_flight: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self._enrich: Optional[EnrichFn] = None
+        self._consumer_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self.stats: Dict[str, float] = {
+            "submitted": 0,
+            "rejected": 0,
+            "processed": 0,
+            "failed": 0,
+            "last_wait_ms": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return any(not w.done() for w in self._workers)
+
+    def is_pending(self, mint: str) -> bool:
+        """True if this process already has the mint queued or in progress"""
+        return mint in self._in_flight
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self, enrich: EnrichFn):
+        """Start the worker pool. `enrich(mint, db)` does the actual enrichment."""
+        if self.running:
+            return
+
+        self._enrich = enrich
+        if self.backend == "redis":
+            try:
+                await get_redis_client().xgroup_create(STREAM_KEY, STREAM_GROUP, id="0", mkstream=True)
+            except ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        else:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.worker_count)
+        ]
+        logger.info(
+            f"🚰 Token ingestion started: {self.worker_count} workers, "
+            f"backend={self.backend}, max queue={self.maxsize}"
+        )
+
+    async def submit(self, mint: str, source: str = "", timeout: float = 1.0) -> bool:
+        """
+        Queue a mint for enrichment. Returns False when the queue is full or not
+        running - the caller's NewTokens row keeps it pending for the recovery sweep.
+        """
+        if not mint or mint in self._in_flight:
+            return True
+
+        if not self.running:
+            return False
+
+        try:
+            if self.backend == "redis":
+                accepted = await self._submit_redis(mint, source)
+            else:
+                self._in_flight.add(mint)
+                try:
+                    await asyncio.wait_for(
+                        self._queue.put((mint, source, time.monotonic())), timeout=timeout
+                    )
+                    accepted = True
+                except asyncio.TimeoutError:
+                    self._in_flight.discard(mint)
+                    accepted = False
+        except Exception as e:
+            logger.error(f"Failed to queue {mint[:8]} for enrichment: {e}")
+            accepted = False
+
+        if accepted:
+            self.stats["submitted"] += 1
+        else:
+            self.stats["rejected"] += 1
+            logger.warning(f"⏳ Ingestion queue full - {mint[:8]} left for recovery sweep")
+        return accepted
+
+    async def _submit_redis(self, mint: str, source: str) -> bool:
+        redis = get_redis_client()
+        if await redis.xlen(STREAM_KEY) >= self.maxsize:
+            return False
+        # Another app worker may have queued it already
+        if not await redis.set(SEEN_KEY.format(mint=mint), "1", nx=True, ex=SEEN_TTL):
+            return True
+        await redis.xadd(
+            STREAM_KEY,
+            {"mint": mint, "source": source, "ts": str(time.time())},
+            maxlen=self.maxsize * 2,
+            approximate=True,
+        )
+        return True
+
+    async def _process(self, mint: str, source: str, queued_for: float):
+        self.stats["last_wait_ms"] = queued_for * 1000
+        try:
+            async with AsyncSessionLocal() as db:
+                await self._enrich(mint, db)
+            self.stats["processed"] += 1
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"Enrichment worker failed on {mint[:8]} ({source or 'unknown'}): {e}")
+
+    async def _worker(self, idx: int):
+        if self.backend == "redis":
+            await self._redis_worker(idx)
+            return
+
+        while True:
+            mint, source, queued_at = await self._queue.get()
+            try:
+                await self._process(mint, source, time.monotonic() - queued_at)
+            finally:
+                self._in_flight.discard(mint)
+                self._queue.task_done()
+
+    async def _redis_worker(self, idx: int):
+        redis = get_redis_client()
+        consumer = f"{self._consumer_prefix}-{idx}"
+        while True:
+            try:
+                entries = await redis.xreadgroup(
+                    STREAM_GROUP, consumer, {STREAM_KEY: ">"}, count=1, block=5000
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion stream read failed: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for _stream, messages in entries or []:
+                for message_id, fields in messages:
+                    mint = fields.get("mint")
+                    if not mint:
+                        await redis.xack(STREAM_KEY, STREAM_GROUP, message_id)
+                        continue
+
+                    self._in_flight.add(mint)
+                    try:
+                        queued_for = max(0.0, time.time() - float(fields.get("ts") or time.time()))
+                        await self._process(mint, fields.get("source", ""), queued_for)
+                    finally:
+                        self._in_flight.discard(mint)
+                        await redis.xack(STREAM_KEY, STREAM_GROUP, message_id)
+                        await redis.xdel(STREAM_KEY, message_id)
+
+    async def close(self):
+        """Stop the workers (called on app shutdown). Unprocessed tokens stay pending in NewTokens."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._in_flight.clear()
+        self._queue = None
+
+
+# Global instance
+token_ingestion = TokenIngestionQueue()
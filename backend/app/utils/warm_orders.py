@@ -0,0 +1,182 @@
+# app/utils/warm_orders.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+OrderKey = Tuple[str, str, str, int, int]   # wallet, input mint, output mint, amount (raw units), slippage bps
+
+
+@dataclass
+class WarmOrder:
+    """A signed swap order that only needs to be executed"""
+    order_data: Dict[str, Any]
+    signed_tx: str                 # base64
+    fee_decision: Dict[str, Any]
+    built_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.built_at
+
+
+BuildFn = Callable[[], Awaitable[Optional[WarmOrder]]]
+
+
+class WarmOrderBook:
+    """
+    Swap orders built speculatively, before the buy is decided.
+
+    warm(key, build) starts building in the background as soon as a buy
+    looks likely; take(key) hands the order to the swap, which then only has
+    to execute it. Orders are single-use and keyed by (wallet, input mint,
+    output mint, amount, slippage) - a buy that settles on different terms
+    simply misses and orders the normal way.
+
+    Until `hold` runs out an untaken order is rebuilt every `refresh_after`
+    seconds (fresh quote and blockhash), and take() never returns one older
+    than `ttl`. A take() that arrives while the build is still in flight
+    waits for it instead of ordering a second time.
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.WARM_ORDER_TTL,
+        refresh_after: float = settings.WARM_ORDER_REFRESH,
+        hold: float = settings.WARM_ORDER_HOLD,
+    ):
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self.hold = hold
+        self._orders: Dict[OrderKey, asyncio.Future] = {}   # key -> latest build (done or in flight)
+        self._tasks: Dict[OrderKey, asyncio.Task] = {}
+        self.stats = {"warmed": 0, "built": 0, "refreshed": 0, "failed": 0, "hits": 0, "waited": 0, "misses": 0, "stale": 0, "dropped": 0}
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def warm(self, key: OrderKey, build: BuildFn):
+        """Keep an order for `key` ready for the next `hold` seconds (no-op if it already is)"""
+        task = self._tasks.get(key)
+        if task is not None and not task.done():
+            return
+        self.stats["warmed"] += 1
+        self._tasks[key] = asyncio.create_task(self._keep_warm(key, build, time.monotonic() + self.hold))
+
+    async def _keep_warm(self, key: OrderKey, build: BuildFn, hold_until: float):
+        loop = asyncio.get_running_loop()
+        future = None
+        try:
+            while True:
+                future = loop.create_future()
+                self._orders[key] = future
+                try:
+                    order = await build()
+                except Exception as e:
+                    logger.debug(f"Warm order build failed for {key[0][:8]} → {key[2][:8]}: {e}")
+                    order = None
+                future.set_result(order)
+                if order is None:
+                    self.stats["failed"] += 1
+                    if self._orders.get(key) is future:
+                        del self._orders[key]
+                    return  # Not tradable yet - the buy orders normally
+                self.stats["built"] += 1
+
+                if time.monotonic() + self.refresh_after > hold_until:
+                    await asyncio.sleep(self.ttl)  # Last one - kept until it goes stale
+                    return
+                await asyncio.sleep(self.refresh_after)
+                self.stats["refreshed"] += 1
+        finally:
+            if future is not None and not future.done():
+                future.set_result(None)  # Cancelled mid-build - release any take() waiting on it
+            # Nobody took it: drop whatever is left
+            if future is not None and self._orders.get(key) is future:
+                del self._orders[key]
+                self.stats["dropped"] += 1
+            if self._tasks.get(key) is asyncio.current_task():
+                del self._tasks[key]
+
+    async def take(self, key: OrderKey) -> Optional[WarmOrder]:
+        """The warm order for `key` (waiting for an in-flight build), or None"""
+        future = self._orders.pop(key, None)
+        if future is None:
+            self.stats["misses"] += 1
+            return None
+
+        task = self._tasks.pop(key, None)
+        if not future.done():
+            self.stats["waited"] += 1
+            try:
+                await asyncio.wait_for(asyncio.shield(future), timeout=self.ttl)
+            except asyncio.TimeoutError:
+                pass
+        if task is not None:
+            task.cancel()  # Taken - stop refreshing
+
+        order = future.result() if future.done() else None
+        if order is None or order.age > self.ttl:
+            self.stats["stale"] += 1
+            return None
+        self.stats["hits"] += 1
+        return order
+
+    async def close(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._orders.clear()
+        self._tasks.clear()
+
+
+# Global instance
+warm_orders = WarmOrderBook()
+
+
+# ===================================================================
+# TEST BLOCK — benchmark: python -m app.utils.warm_orders [buys] [order_ms]
+# ===================================================================
+if __name__ == "__main__":
+    import random
+    import statistics
+    import sys
+
+    BUYS = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    ORDER_MS = float(sys.argv[2]) if len(sys.argv) > 2 else 180
+
+    async def order_round_trip() -> WarmOrder:
+        # Fee decision + Redis write, then GET /order (long-tailed) and signing
+        await asyncio.sleep(random.uniform(0.002, 0.006))
+        await asyncio.sleep(random.lognormvariate(0, 0.5) * ORDER_MS / 1000)
+        return WarmOrder({"requestId": "bench"}, "c2lnbmVk", {"reason": "bench"})
+
+    async def buy(book: WarmOrderBook, i: int, warm: bool) -> float:
+        key = (f"user{i}", "SOL", "MINT", 50_000_000, 2000)
+        if warm:
+            book.warm(key, order_round_trip)
+        # Strategy data, ATA check, fee tracking... before the swap is called
+        await asyncio.sleep(random.uniform(0.05, 0.6))
+        decided = time.perf_counter()
+        if await book.take(key) is None:
+            await order_round_trip()
+        return (time.perf_counter() - decided) * 1000  # decision -> ready to POST /execute
+
+    async def bench():
+        print(f"{BUYS} buys, GET /order ~{ORDER_MS:.0f}ms median (lognormal)")
+        for warm in (False, True):
+            random.seed(11)
+            book = WarmOrderBook(ttl=20, refresh_after=10, hold=20)
+            latencies = sorted(await asyncio.gather(*(buy(book, i, warm) for i in range(BUYS))))
+            p50 = statistics.median(latencies)
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(f"  {'warm' if warm else 'cold':4} decision -> submit p50 {p50:7.1f}ms  p99 {p99:7.1f}ms | {book.stats}")
+            await book.close()
+
+    asyncio.run(bench())
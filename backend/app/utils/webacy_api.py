@@ -1,9 +1,10 @@
 import os
-import aiohttp
+import httpx
 import asyncio
 from typing import Dict, List, Optional, Any
 from app.utils.bot_logger import get_logger
 from app.config import settings
+from app.utils.http_clients import http_clients
 
 logger = get_logger(__name__)
 
@@ -20,31 +21,29 @@ class WebacyAPI:
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        f"{self.base_url}/{endpoint}",
-                        headers=self.headers,
-                        params=params,
-                        timeout=30
-                    ) as resp:
-                        if resp.status == 200:
-                            data = await resp.json()
-                            return data
-                        elif resp.status == 429:
-                            wait_time = 2 ** attempt
-                            logger.warning(f"Rate limited, waiting {wait_time}s")
-                            await asyncio.sleep(wait_time)
-                            continue
-                        elif resp.status == 402:
-                            logger.error(f"Premium endpoint requires subscription: {endpoint}")
-                            return None
-                        elif resp.status == 403:
-                            logger.error(f"API key invalid or insufficient permissions: {endpoint}")
-                            return None
-                        else:
-                            logger.warning(f"Webacy API error {resp.status} for {endpoint}")
-                            return None
-            except asyncio.TimeoutError:
+                url = f"{self.base_url}/{endpoint}"
+                resp = await http_clients.client_for(url).get(
+                    url,
+                    headers=self.headers,
+                    params=params
+                )
+                if resp.status_code == 200:
+                    return resp.json()
+                elif resp.status_code == 429:
+                    wait_time = 2 ** attempt
+                    logger.warning(f"Rate limited, waiting {wait_time}s")
+                    await asyncio.sleep(wait_time)
+                    continue
+                elif resp.status_code == 402:
+                    logger.error(f"Premium endpoint requires subscription: {endpoint}")
+                    return None
+                elif resp.status_code == 403:
+                    logger.error(f"API key invalid or insufficient permissions: {endpoint}")
+                    return None
+                else:
+                    logger.warning(f"Webacy API error {resp.status_code} for {endpoint}")
+                    return None
+            except (asyncio.TimeoutError, httpx.TimeoutException):
                 logger.warning(f"Webacy request timeout (attempt {attempt + 1})")
                 if attempt < max_retries - 1:
                     await asyncio.sleep(1)
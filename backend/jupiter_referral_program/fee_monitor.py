@@ -4,9 +4,9 @@ import json
 from datetime import datetime, timedelta
 import httpx
 from solders.pubkey import Pubkey
-from solana.rpc.async_api import AsyncClient
 from spl.token.instructions import get_associated_token_address
 from app.config import settings
+from app.utils.rpc_pool import rpc_pool
 
 async def monitor_fees():
     """Monitor accumulated fees in real-time"""
@@ -17,7 +17,6 @@ async def monitor_fees():
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
     
-    connection = AsyncClient(settings.SOLANA_RPC_URL)
     referral_pubkey = Pubkey.from_string(settings.JUPITER_REFERRAL_ACCOUNT)
     
     # Track previous balances to show changes
@@ -43,7 +42,7 @@ async def monitor_fees():
                     ata = get_associated_token_address(referral_pubkey, mint_pubkey)
                     
                     # Get balance
-                    balance_info = await connection.get_token_account_balance(ata)
+                    balance_info = await rpc_pool.call("get_token_account_balance", ata)
                     
                     if balance_info.value:
                         amount = int(balance_info.value.amount)
@@ -81,8 +80,6 @@ async def monitor_fees():
         except Exception as e:
             print(f"\n⚠️  Error: {e}")
             await asyncio.sleep(10)
-    
-    await connection.close()
 
 async def get_fee_summary():
     """Get a summary of all accumulated fees"""
@@ -90,7 +87,6 @@ async def get_fee_summary():
     print("💰 FEE EARNINGS SUMMARY")
     print("=" * 60)
     
-    connection = AsyncClient(settings.SOLANA_RPC_URL)
     referral_pubkey = Pubkey.from_string(settings.JUPITER_REFERRAL_ACCOUNT)
     
     tokens = [
@@ -106,7 +102,7 @@ async def get_fee_summary():
             mint_pubkey = Pubkey.from_string(mint)
             ata = get_associated_token_address(referral_pubkey, mint_pubkey)
             
-            balance_info = await connection.get_token_account_balance(ata)
+            balance_info = await rpc_pool.call("get_token_account_balance", ata)
             
             if balance_info.value:
                 amount = int(balance_info.value.amount)
@@ -123,8 +119,6 @@ async def get_fee_summary():
     
     print("-" * 60)
     print(f"TOTAL: ${total_value:.2f}")
-    
-    await connection.close()
 
 if __name__ == "__main__":
     import argparse
@@ -135,10 +129,13 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
-    if args.monitor:
-        asyncio.run(monitor_fees())
-    else:
-        asyncio.run(get_fee_summary())
+    async def main():
+        try:
+            await (monitor_fees() if args.monitor else get_fee_summary())
+        finally:
+            await rpc_pool.close()
+    
+    asyncio.run(main())
         
         
         
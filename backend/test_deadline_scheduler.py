@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from app.utils.deadline_scheduler import DeadlineScheduler
+
+RESOLUTION = 0.02
+
+
+def test_fires_due_keys_once():
+    fired = []
+    deadlines = {}
+
+    async def run():
+        scheduler = DeadlineScheduler(resolution=RESOLUTION)
+        scheduler.start(lambda keys: fired.append((time.time(), sorted(keys))))
+        now = time.time()
+        for key, offset in (("a", 0.05), ("b", 0.05), ("c", 0.15)):
+            deadlines[key] = now + offset
+            scheduler.schedule(key, deadlines[key])
+        await asyncio.sleep(0.3)
+        scheduler.close()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    keys = [key for _, batch in fired for key in batch]
+    assert sorted(keys) == ["a", "b", "c"], fired
+    for fired_at, batch in fired:
+        for key in batch:
+            # Never early, and at most one slot (plus loop jitter) late
+            assert deadlines[key] <= fired_at < deadlines[key] + RESOLUTION + 0.05, (key, fired_at - deadlines[key])
+    assert len(scheduler) == 0 and scheduler.stats["fired"] == 3
+
+
+def test_reschedule_moves_the_deadline():
+    fired = []
+
+    async def run():
+        scheduler = DeadlineScheduler(resolution=RESOLUTION)
+        scheduler.start(lambda keys: fired.extend(keys))
+        now = time.time()
+        scheduler.schedule("early", now + 0.05)
+        scheduler.schedule("moved", now + 0.05)
+        scheduler.schedule("moved", now + 0.5)   # Extended past the wait
+        scheduler.schedule("pulled", now + 1.0)
+        scheduler.schedule("pulled", now + 0.1)  # Brought forward - must re-arm earlier
+        await asyncio.sleep(0.25)
+        pending = [key for key in ("early", "moved", "pulled") if key in scheduler]
+        moved_to = scheduler.deadline("moved") - now
+        scheduler.close()
+        return pending, moved_to
+
+    pending, moved_to = asyncio.run(run())
+    assert sorted(fired) == ["early", "pulled"], fired
+    assert pending == ["moved"] and abs(moved_to - 0.5) < 1e-6, (pending, moved_to)
+
+
+def test_cancel_drops_the_key():
+    fired = []
+
+    async def run():
+        scheduler = DeadlineScheduler(resolution=RESOLUTION)
+        scheduler.start(lambda keys: fired.append(sorted(keys)))
+        now = time.time()
+        scheduler.schedule("kept", now + 0.05)
+        scheduler.schedule("dropped", now + 0.05)
+        scheduler.cancel("dropped")
+        scheduler.cancel("never-scheduled")  # No-op
+        assert "dropped" not in scheduler and scheduler.deadline("dropped") is None
+        await asyncio.sleep(0.2)
+        scheduler.close()
+        return len(scheduler)
+
+    pending = asyncio.run(run())
+    assert fired == [["kept"]], fired
+    assert pending == 0
+
+
+def test_callback_error_does_not_stop_the_scheduler():
+    calls = []
+
+    def on_due(keys):
+        calls.append(sorted(keys))
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+
+    async def run():
+        scheduler = DeadlineScheduler(resolution=RESOLUTION)
+        scheduler.start(on_due)
+        now = time.time()
+        scheduler.schedule("first", now + 0.03)
+        scheduler.schedule("second", now + 0.12)
+        await asyncio.sleep(0.25)
+        scheduler.close()
+
+    asyncio.run(run())
+    assert calls == [["first"], ["second"]], calls
+
+
+if __name__ == "__main__":
+    test_fires_due_keys_once()
+    test_reschedule_moves_the_deadline()
+    test_cancel_drops_the_key()
+    test_callback_error_does_not_stop_the_scheduler()
+    print("DeadlineScheduler OK")
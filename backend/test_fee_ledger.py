@@ -0,0 +1,158 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis", reason='needs fakeredis with Lua support: pip install "fakeredis[lua]"')
+pytest.importorskip("lupa", reason='fakeredis needs lupa to run the ledger script: pip install "fakeredis[lua]"')
+
+from app.utils.fee_manager import UnifiedFeeManager
+from app.utils.fee_tracker import BUCKETS_KEY, PROFILE_KEY, TOKEN_TRADES_KEY, FeeProfile, FeeTracker
+
+DAY = 86400
+T0 = 1_700_000_000.0  # Fixed clock so windows are deterministic
+WALLET = "wallet1"
+
+
+def test_windows_slide():
+    async def run():
+        tracker = FeeTracker(fakeredis.FakeAsyncRedis(decode_responses=True))
+        redis = tracker.redis
+        # 10 SOL a day for 40 days, one trade each
+        for day in range(40):
+            await tracker.track_trade_for_fee_optimization(WALLET, 10.0, "MINT", "BUY", now=T0 + day * DAY)
+        now = T0 + 39 * DAY
+        profile = await tracker.fee_profile(WALLET, now=now)
+        fields = await redis.hgetall(PROFILE_KEY.format(WALLET))
+        buckets = await redis.zcard(BUCKETS_KEY.format(WALLET))
+        token_trades = await redis.get(TOKEN_TRADES_KEY.format(WALLET, "MINT"))
+        return profile, fields, buckets, token_trades
+
+    profile, fields, buckets, token_trades = asyncio.run(run())
+    assert profile.total_trades == 40
+    assert profile.volume_30d == 300.0, profile   # Only the last 30 days
+    assert profile.trades_24h == 1, profile
+    # Buckets that slid out were deleted by the script - 30 day + 24 hour fields at most, plus total_trades
+    day_fields = [f for f in fields if f.startswith("v:")]
+    hour_fields = [f for f in fields if f.startswith("n:")]
+    assert len(day_fields) <= 31 and len(hour_fields) <= 25, fields
+    assert buckets == len(day_fields) + len(hour_fields)
+    assert token_trades == "40"
+
+
+def test_trades_24h_counts_the_last_day_only():
+    async def run():
+        tracker = FeeTracker(fakeredis.FakeAsyncRedis(decode_responses=True))
+        for i in range(12):
+            await tracker.track_trade_for_fee_optimization(WALLET, 0.5, "MINT", "BUY", now=T0 + i * 3600)
+        inside = await tracker.fee_profile(WALLET, now=T0 + 11 * 3600)
+        later = await tracker.fee_profile(WALLET, now=T0 + 11 * 3600 + DAY)
+        return inside, later
+
+    inside, later = asyncio.run(run())
+    assert inside.trades_24h == 12 and inside.tier()[0] is True
+    assert later.trades_24h == 0 and later.volume_30d == 6.0
+    assert inside.changes_at <= T0 + DAY + 3600  # First hour bucket leaves the 24h window
+
+
+def test_legacy_counters_are_folded_in_once():
+    async def run():
+        tracker = FeeTracker(fakeredis.FakeAsyncRedis(decode_responses=True))
+        redis = tracker.redis
+        await redis.set(f"total_trades:{WALLET}", 7)
+        await redis.set(f"volume_30d:{WALLET}", 120.5)
+        await redis.set(f"trade_count_24h:{WALLET}", 4)
+        before = await tracker.fee_profile(WALLET, now=T0)
+        await tracker.track_trade_for_fee_optimization(WALLET, 1.0, "MINT", "BUY", now=T0)
+        await tracker.track_trade_for_fee_optimization(WALLET, 1.0, "MINT", "SELL", now=T0 + 60)
+        after = await tracker.fee_profile(WALLET, now=T0 + 60)
+        legacy = await redis.exists(f"total_trades:{WALLET}", f"volume_30d:{WALLET}", f"trade_count_24h:{WALLET}")
+        return before, after, legacy
+
+    before, after, legacy = asyncio.run(run())
+    assert (before.total_trades, before.trades_24h, before.volume_30d) == (7, 4, 120.5)
+    assert (after.total_trades, after.trades_24h, after.volume_30d) == (9, 6, 122.5), after
+    assert legacy == 0
+
+
+def test_cached_profile_sees_this_workers_trades():
+    async def run():
+        tracker = FeeTracker(fakeredis.FakeAsyncRedis(decode_responses=True))
+        await tracker.track_trade_for_fee_optimization(WALLET, 2.0, "MINT", "BUY")
+        first = await tracker.cached_profile(WALLET)
+        reads = tracker.redis.hgetall
+        calls = {"n": 0}
+
+        async def counting_hgetall(key):
+            calls["n"] += 1
+            return await reads(key)
+
+        tracker.redis.hgetall = counting_hgetall
+        await tracker.track_trade_for_fee_optimization(WALLET, 3.0, "MINT", "BUY")
+        second = await tracker.cached_profile(WALLET)
+        return first, second, calls["n"]
+
+    first, second, reads = asyncio.run(run())
+    assert (first.total_trades, first.volume_30d) == (1, 2.0)
+    assert (second.total_trades, second.volume_30d) == (2, 5.0)
+    assert reads == 0  # Served from the mirrored cache entry
+
+
+def test_tier_thresholds():
+    assert FeeProfile().tier() == (False, 0, True)
+    assert FeeProfile(total_trades=3, trades_24h=11, volume_30d=101).tier() == (True, 1, False)
+    assert FeeProfile(total_trades=50, volume_30d=501).tier() == (False, 2, False)
+
+
+def test_decisions_are_memoised_per_tier():
+    async def run():
+        manager = UnifiedFeeManager(fakeredis.FakeAsyncRedis(decode_responses=True))
+        user = SimpleNamespace(wallet_address=WALLET, is_premium=False)
+        for _ in range(5):
+            await manager.tracker.track_trade_for_fee_optimization(WALLET, 30.0, "MINT", "BUY")
+        first = await manager.calculate_fee_decision(user, "BUY", 0.5, "MINT")
+        again = await manager.calculate_fee_decision(user, "BUY", 0.5, "OTHER")
+        hits = manager.stats["decision_hits"]
+        tier_before = (await manager.tracker.cached_profile(WALLET)).tier()
+        # The 11th trade in 24h makes the user a high-frequency trader
+        for _ in range(6):
+            await manager.tracker.track_trade_for_fee_optimization(WALLET, 0.5, "MINT", "BUY")
+        await manager.calculate_fee_decision(user, "BUY", 0.5, "MINT")
+        tier_after = (await manager.tracker.cached_profile(WALLET)).tier()
+        return first, again, hits, tier_before, tier_after, manager.stats
+
+    first, again, hits, tier_before, tier_after, stats = asyncio.run(run())
+    assert first == again and first["should_apply"] and first["fee_bps"] == 66  # 150 SOL/30d: high-volume discount
+    assert hits == 1
+    assert tier_before == (False, 1, False) and tier_after == (True, 1, False)
+    assert stats["decision_misses"] == 2
+
+
+def test_audit_records_are_written_in_one_batch():
+    async def run():
+        redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+        manager = UnifiedFeeManager(redis)
+        for i in range(100):
+            manager.record_decision(manager.get_fee_decision_key(WALLET, f"mint{i}", "BUY"), {"fee_bps": i}, ttl=600)
+        manager.record_decision(manager.get_fee_decision_key(WALLET, "mint0", "BUY"), {"fee_bps": 7}, ttl=600)
+        pending = await redis.get(f"fee:{WALLET}:mint0:BUY")
+        await manager.close()
+        written = await redis.get(f"fee:{WALLET}:mint0:BUY")
+        return pending, written, await redis.ttl(f"fee:{WALLET}:mint99:BUY"), manager.stats
+
+    pending, written, ttl, stats = asyncio.run(run())
+    assert pending is None                   # Nothing on the trade path
+    assert written == '{"fee_bps": 7}'       # Latest record for a key wins
+    assert 0 < ttl <= 600
+    assert stats["audit_flushes"] == 1 and stats["audit_written"] == 100
+
+
+if __name__ == "__main__":
+    test_windows_slide()
+    test_trades_24h_counts_the_last_day_only()
+    test_legacy_counters_are_folded_in_once()
+    test_cached_profile_sees_this_workers_trades()
+    test_tier_thresholds()
+    test_decisions_are_memoised_per_tier()
+    test_audit_records_are_written_in_one_batch()
+    print("Fee ledger OK")
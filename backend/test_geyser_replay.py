@@ -0,0 +1,141 @@
+"""
+Replay harness for the pump.fun Geyser listener.
+
+Starts a local fake Yellowstone server (our own GeyserServicer) that replays
+recorded SubscribeUpdate messages, points PumpFunGeyserListener at it and
+prints every decoded event. The server drops the stream once half-way through
+to exercise reconnect + from_slot resume.
+
+    python test_geyser_replay.py                   # synthetic create + migrate updates
+    python test_geyser_replay.py updates.b64       # file recorded with PumpFunGeyserListener(record_path=...)
+"""
+import asyncio
+import base64
+import logging
+import struct
+import sys
+
+import base58
+import grpc
+
+from app.generated import geyser_pb2, solana_storage_pb2
+from app.generated.geyser_pb2_grpc import GeyserServicer, add_GeyserServicer_to_server
+from app.utils.pumpfun_grpc_listener import (
+    CREATE_DISCRIMINATOR,
+    MIGRATE_DISCRIMINATOR,
+    PUMPFUN_PROGRAM,
+    PumpFunEvent,
+    PumpFunGeyserListener,
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _borsh_string(value: str) -> bytes:
+    raw = value.encode()
+    return struct.pack("<I", len(raw)) + raw
+
+
+def _key(seed: int) -> bytes:
+    return bytes([seed]) * 32
+
+
+def synthetic_updates():
+    """One create and one migrate transaction for two fake mints, in consecutive slots"""
+    program = base58.b58decode(PUMPFUN_PROGRAM)
+    updates = []
+    for n, slot in enumerate((1000, 1001, 1002, 1003)):
+        mint, bonding_curve, user, pool = _key(10 + n), _key(40 + n), _key(70 + n), _key(100 + n)
+        if n % 2 == 0:
+            data = CREATE_DISCRIMINATOR + _borsh_string(f"Replay {n}") + _borsh_string(f"RP{n}") + _borsh_string("https://example.com/meta.json")
+            # [mint, mint_authority, bonding_curve, associated_bonding_curve, global, mpl, metadata, user, program]
+            keys = [mint, _key(1), bonding_curve, _key(2), _key(3), _key(4), _key(5), user, program]
+            accounts = bytes(range(8))
+        else:
+            data = MIGRATE_DISCRIMINATOR
+            # [global, withdraw_authority, mint, bonding_curve, associated_bonding_curve, user, system, token, pump_amm, pool, program]
+            keys = [_key(3), _key(6), _key(10 + n - 1), bonding_curve, _key(2), user, _key(7), _key(8), _key(9), pool, program]
+            accounts = bytes(range(10))
+
+        message = solana_storage_pb2.Message(
+            account_keys=keys,
+            instructions=[solana_storage_pb2.CompiledInstruction(
+                program_id_index=len(keys) - 1, accounts=accounts, data=data
+            )],
+        )
+        updates.append(geyser_pb2.SubscribeUpdate(
+            filters=["pumpfun"],
+            transaction=geyser_pb2.SubscribeUpdateTransaction(
+                slot=slot,
+                transaction=geyser_pb2.SubscribeUpdateTransactionInfo(
+                    signature=bytes([n + 1]) * 64,
+                    transaction=solana_storage_pb2.Transaction(message=message),
+                    meta=solana_storage_pb2.TransactionStatusMeta(),
+                ),
+            ),
+        ))
+    return updates
+
+
+def load_updates(path: str):
+    with open(path) as f:
+        return [geyser_pb2.SubscribeUpdate.FromString(base64.b64decode(line)) for line in f if line.strip()]
+
+
+class ReplayGeyser(GeyserServicer):
+    def __init__(self, updates):
+        self.updates = updates
+        self.connections = 0
+        self.from_slots = []
+
+    async def Subscribe(self, request_iterator, context):
+        request = await request_iterator.__anext__()
+        self.connections += 1
+        from_slot = request.from_slot if request.HasField("from_slot") else None
+        self.from_slots.append(from_slot)
+
+        pending = [u for u in self.updates if from_slot is None or u.transaction.slot >= from_slot]
+        for i, update in enumerate(pending):
+            if self.connections == 1 and i == len(pending) // 2:
+                await context.abort(grpc.StatusCode.UNAVAILABLE, "replay: simulated disconnect")
+            yield update
+            await asyncio.sleep(0.01)
+
+        yield geyser_pb2.SubscribeUpdate(ping=geyser_pb2.SubscribeUpdatePing())
+        await asyncio.sleep(3600)  # Keep the stream open like a live server
+
+
+async def test_replay():
+    updates = load_updates(sys.argv[1]) if len(sys.argv) > 1 else synthetic_updates()
+    servicer = ReplayGeyser(updates)
+    server = grpc.aio.server()
+    add_GeyserServicer_to_server(servicer, server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    await server.start()
+
+    events = []
+
+    async def collect(event: PumpFunEvent):
+        events.append(event)
+
+    listener = PumpFunGeyserListener(endpoint=f"127.0.0.1:{port}", token=None, secure=False)
+    listener.add_handler(collect)
+    listener.start()
+
+    await asyncio.sleep(4)
+    await listener.close()
+    await server.stop(None)
+
+    for event in events:
+        logging.info(f"{event.kind:8} mint={event.mint[:8]} slot={event.slot} symbol={event.symbol} pool={(event.pool or '')[:8]}")
+    logging.info(f"connections={servicer.connections} from_slots={servicer.from_slots} stats={listener.stats}")
+
+    if len(sys.argv) == 1:
+        assert [e.kind for e in events] == ["create", "migrate", "create", "migrate"], events
+        assert servicer.connections == 2 and servicer.from_slots[1] is not None
+        assert events[1].mint == events[0].mint
+        logging.info("Replay OK")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_replay())
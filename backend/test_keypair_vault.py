@@ -0,0 +1,96 @@
+import time
+from types import SimpleNamespace
+
+from solders.keypair import Keypair
+
+from app.security import encrypt_private_key_backend
+from app.utils.keypair_vault import KeypairVault
+
+
+def test_admitted_users_are_held():
+    vault = KeypairVault(ttl=60, max_entries=10)
+    keypair = Keypair()
+    user = SimpleNamespace(wallet_address="armed", encrypted_private_key=encrypt_private_key_backend(bytes(keypair)))
+
+    assert vault.admit(user) == keypair
+    assert vault.keypair_for(user) == keypair
+    assert vault.get("armed") == keypair
+    assert vault.stats["decrypts"] == 1 and vault.stats["hits"] == 2
+
+
+def test_other_users_are_not_kept():
+    vault = KeypairVault(ttl=60, max_entries=10)
+    keypair = Keypair()
+    user = SimpleNamespace(wallet_address="manual", encrypted_private_key=encrypt_private_key_backend(bytes(keypair)))
+
+    assert vault.keypair_for(user) == keypair
+    assert vault.keypair_for(user) == keypair
+    assert len(vault) == 0 and vault.get("manual") is None
+    assert vault.stats["decrypts"] == 2
+
+
+def test_lru_bound_evicts_least_recently_used():
+    vault = KeypairVault(ttl=60, max_entries=2)
+    keypairs = {wallet: Keypair() for wallet in ("a", "b", "c")}
+    users = {
+        wallet: SimpleNamespace(wallet_address=wallet, encrypted_private_key=encrypt_private_key_backend(bytes(keypair)))
+        for wallet, keypair in keypairs.items()
+    }
+    vault.admit(users["a"])
+    vault.admit(users["b"])
+    vault.keypair_for(users["a"])  # a is now the most recent
+    vault.admit(users["c"])
+
+    assert vault.get("b") is None
+    assert vault.get("a") == keypairs["a"] and vault.get("c") == keypairs["c"]
+    assert vault.stats["evicted"] == 1
+    # Still admitted - the next lookup decrypts again and holds it
+    assert vault.keypair_for(users["b"]) == keypairs["b"]
+    assert vault.get("b") == keypairs["b"] and len(vault) == 2
+
+
+def test_idle_keys_expire():
+    vault = KeypairVault(ttl=0.05, max_entries=10)
+    keypair = Keypair()
+    user = SimpleNamespace(wallet_address="idle", encrypted_private_key=encrypt_private_key_backend(bytes(keypair)))
+    vault.admit(user)
+    time.sleep(0.1)
+
+    assert vault.get("idle") is None and vault.stats["expired"] == 1
+    assert vault.keypair_for(user) == keypair  # Admitted - decrypted and held again
+    time.sleep(0.1)
+    vault.sweep()
+    assert len(vault) == 0 and vault.stats["expired"] == 2
+
+
+def test_rotated_key_is_not_served_from_memory():
+    vault = KeypairVault(ttl=60, max_entries=10)
+    old = Keypair()
+    user = SimpleNamespace(wallet_address="rotating", encrypted_private_key=encrypt_private_key_backend(bytes(old)))
+    vault.admit(user)
+
+    new = Keypair()
+    user.encrypted_private_key = encrypt_private_key_backend(bytes(new))
+    assert vault.keypair_for(user) == new
+    assert vault.get("rotating") == new and vault.stats["decrypts"] == 2
+
+
+def test_evict_forgets_the_user():
+    vault = KeypairVault(ttl=60, max_entries=10)
+    user = SimpleNamespace(wallet_address="stopped", encrypted_private_key=encrypt_private_key_backend(bytes(Keypair())))
+    vault.admit(user)
+    vault.evict("stopped")
+
+    assert len(vault) == 0
+    vault.keypair_for(user)  # No longer admitted - not held again
+    assert len(vault) == 0
+
+
+if __name__ == "__main__":
+    test_admitted_users_are_held()
+    test_other_users_are_not_kept()
+    test_lru_bound_evicts_least_recently_used()
+    test_idle_keys_expire()
+    test_rotated_key_is_not_served_from_memory()
+    test_evict_forgets_the_user()
+    print("KeypairVault OK")
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from app.utils.price_cache import ANY_AGE, FRESH, PriceCache
+
+
+def test_concurrent_cold_callers_share_one_fetch():
+    calls = []
+
+    async def source(mint: str):
+        calls.append(mint)
+        await asyncio.sleep(0.05)
+        return {"price_usd": 1.0, "mint": mint}
+
+    cache = PriceCache(fetch=source, max_entries=100, use_redis=False)
+
+    async def run():
+        results = await asyncio.gather(*(cache.get("MINT") for _ in range(50)))
+        again = await cache.get("MINT")
+        return results, again
+
+    results, again = asyncio.run(run())
+    assert calls == ["MINT"], calls
+    assert all(r == {"price_usd": 1.0, "mint": "MINT"} for r in results)
+    assert again is results[0] and cache.stats["hits"] == 1
+    assert cache.stats["coalesced"] == 49
+
+
+def test_expired_entry_is_refetched():
+    async def source(mint: str):
+        return {"price_usd": 1.0}
+
+    cache = PriceCache(fetch=source, use_redis=False)
+    cache.put("MINT", {"price_usd": 5.0}, fetched_at=time.time() - FRESH - 1)
+
+    data = asyncio.run(cache.get("MINT"))
+    assert data == {"price_usd": 1.0} and cache.stats["misses"] == 1
+
+
+def test_source_down_fresh_or_fail_vs_stale_ok():
+    async def down(mint: str):
+        return None
+
+    cache = PriceCache(fetch=down, use_redis=False)
+    cache.put("OLD", {"price_usd": 2.0}, fetched_at=time.time() - 20)
+
+    async def run():
+        trading = await cache.get("OLD", max_age=FRESH)
+        bounded = await cache.get("OLD", max_age=FRESH, max_stale=5)  # 20s > 8 + 5
+        ui = await cache.get("OLD", max_age=FRESH, max_stale=ANY_AGE)
+        return trading, bounded, ui
+
+    trading, bounded, ui = asyncio.run(run())
+    assert trading is None and bounded is None
+    assert ui == {"price_usd": 2.0}
+    assert cache.stats["failures"] == 3 and cache.stats["stale"] == 1
+
+
+def test_fetch_error_counts_as_failure():
+    calls = []
+
+    async def broken(mint: str):
+        calls.append(mint)
+        raise RuntimeError("source unreachable")
+
+    cache = PriceCache(fetch=broken, use_redis=False)
+
+    async def run():
+        first = await cache.get("MINT", max_stale=ANY_AGE)
+        second = await cache.get("MINT", max_stale=ANY_AGE)
+        return first, second
+
+    assert asyncio.run(run()) == (None, None)
+    assert len(calls) == 2  # The failed fetch wasn't left in flight for the next caller
+    assert cache.stats["failures"] == 2 and len(cache) == 0
+
+
+def test_lru_bound_and_retention():
+    cache = PriceCache(fetch=None, max_entries=3, retain=60, use_redis=False)
+    for mint in ("A", "B", "C"):
+        cache.put(mint, {"price_usd": 1.0})
+    assert asyncio.run(cache.get("A")) == {"price_usd": 1.0}  # L1 hit makes A most recent
+    cache.put("D", {"price_usd": 1.0})
+    assert cache.peek("B") is None  # Least recently used
+    assert all(cache.peek(mint) is not None for mint in ("A", "C", "D"))
+    assert len(cache) == 3 and cache.stats["evictions"] == 1
+
+    cache.put("E", {"price_usd": 1.0}, fetched_at=time.time() - 61)
+    assert cache.peek("E") is None and len(cache) == 2  # Past `retain`: dropped on read
+
+
+if __name__ == "__main__":
+    test_concurrent_cold_callers_share_one_fetch()
+    test_expired_entry_is_refetched()
+    test_source_down_fresh_or_fail_vs_stale_ok()
+    test_fetch_error_counts_as_failure()
+    test_lru_bound_and_retention()
+    print("PriceCache OK")